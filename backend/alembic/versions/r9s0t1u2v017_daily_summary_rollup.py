@@ -0,0 +1,144 @@
+"""daily_summaries as incrementally maintained P&L rollup
+
+Revision ID: r9s0t1u2v017
+Revises: q8r9s0t1u016
+Create Date: 2026-01-18 10:30:00.000000
+
+Turns daily_summaries into the per (branch, date) rollup read by the
+bilanco/report endpoints:
+- Widens money columns to Numeric(14, 5) so sums of computed values
+  (courier KDV, production cost) do not lose precision
+- Adds channel breakdown and expense component columns
+- Adds unique (branch_id, summary_date) index
+- Backfills from source tables
+
+Re-running the backfill later: python rebuild_daily_summaries.py
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'r9s0t1u2v017'
+down_revision: Union[str, None] = 'q8r9s0t1u016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MONEY_COLUMNS = ['total_sales', 'total_purchases', 'total_expenses']
+
+NEW_MONEY_COLUMNS = [
+    'sales_visa',
+    'sales_nakit',
+    'sales_online',
+    'total_courier',
+    'total_part_time',
+    'total_staff_meals',
+    'total_production',
+]
+
+
+def upgrade() -> None:
+    # Step 1: Widen existing money columns
+    for column in MONEY_COLUMNS:
+        op.alter_column(
+            'daily_summaries', column,
+            type_=sa.Numeric(precision=14, scale=5),
+            existing_type=sa.Numeric(precision=12, scale=2),
+            server_default='0'
+        )
+
+    # Step 2: New rollup columns
+    for column in NEW_MONEY_COLUMNS:
+        op.add_column(
+            'daily_summaries',
+            sa.Column(column, sa.Numeric(precision=14, scale=5), nullable=False, server_default='0')
+        )
+    op.add_column('daily_summaries', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # Step 3: Table was never written by the app; start clean and backfill
+    op.execute("DELETE FROM daily_summaries")
+    op.create_index(
+        'ix_daily_summaries_branch_date',
+        'daily_summaries',
+        ['branch_id', 'summary_date'],
+        unique=True
+    )
+
+    # Step 4: Backfill from source tables (same formulas as daily_summary_service)
+    op.execute("""
+        INSERT INTO daily_summaries (
+            branch_id, summary_date,
+            total_sales, sales_visa, sales_nakit, sales_online,
+            total_purchases, total_expenses, total_courier,
+            total_part_time, total_staff_meals, total_production,
+            order_count, salon_orders, paket_orders, updated_at
+        )
+        SELECT
+            branch_id, day,
+            SUM(sales), SUM(visa), SUM(nakit), SUM(online),
+            SUM(purchases), SUM(expenses), SUM(courier),
+            SUM(parttime), SUM(staff), SUM(production),
+            0, 0, 0, NOW()
+        FROM (
+            SELECT s.branch_id, s.sale_date AS day,
+                   s.amount AS sales,
+                   CASE WHEN p.channel_type = 'pos_visa' THEN s.amount ELSE 0 END AS visa,
+                   CASE WHEN p.channel_type = 'pos_nakit' THEN s.amount ELSE 0 END AS nakit,
+                   CASE WHEN p.channel_type = 'online' THEN s.amount ELSE 0 END AS online,
+                   0 AS purchases, 0 AS expenses, 0 AS courier,
+                   0 AS parttime, 0 AS staff, 0 AS production
+            FROM online_sales s
+            LEFT JOIN online_platforms p ON p.id = s.platform_id
+            UNION ALL
+            SELECT branch_id, purchase_date, 0, 0, 0, 0, total, 0, 0, 0, 0, 0
+            FROM purchases
+            UNION ALL
+            SELECT branch_id, expense_date, 0, 0, 0, 0, 0, amount, 0, 0, 0, 0
+            FROM expenses
+            UNION ALL
+            SELECT branch_id, expense_date, 0, 0, 0, 0, 0, 0,
+                   amount + amount * vat_rate / 100, 0, 0, 0
+            FROM courier_expenses
+            UNION ALL
+            SELECT branch_id, cost_date, 0, 0, 0, 0, 0, 0, 0, amount, 0, 0
+            FROM part_time_costs
+            UNION ALL
+            SELECT branch_id, meal_date, 0, 0, 0, 0, 0, 0, 0, 0, unit_price * staff_count, 0
+            FROM staff_meals
+            UNION ALL
+            SELECT branch_id, production_date, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+                   CASE WHEN legen_kg > 0 THEN kneaded_kg / legen_kg * legen_cost ELSE 0 END
+            FROM daily_productions
+        ) src
+        GROUP BY branch_id, day
+    """)
+
+    # Step 5: tenant_id (added in k2l3m4n5o010) via branches
+    op.execute("""
+        UPDATE daily_summaries
+        SET tenant_id = (
+            SELECT b.organization_id
+            FROM branches b
+            WHERE b.id = daily_summaries.branch_id
+        )
+        WHERE tenant_id IS NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_daily_summaries_branch_date', table_name='daily_summaries')
+
+    op.drop_column('daily_summaries', 'updated_at')
+    for column in reversed(NEW_MONEY_COLUMNS):
+        op.drop_column('daily_summaries', column)
+
+    for column in MONEY_COLUMNS:
+        op.alter_column(
+            'daily_summaries', column,
+            type_=sa.Numeric(precision=12, scale=2),
+            existing_type=sa.Numeric(precision=14, scale=5),
+            server_default=None
+        )
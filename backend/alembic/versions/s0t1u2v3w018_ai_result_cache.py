@@ -0,0 +1,42 @@
+"""ai_result_cache table for AI categorization / POS OCR results
+
+Revision ID: s0t1u2v3w018
+Revises: r9s0t1u2v017
+Create Date: 2026-01-19 09:00:00.000000
+
+Content-addressed (kind, sha256) cache so repeat descriptions and
+re-uploaded screenshots do not call the external model again.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 's0t1u2v3w018'
+down_revision: Union[str, None] = 'r9s0t1u2v017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_result_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(30), nullable=False),
+        sa.Column('key_hash', sa.String(64), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ai_result_cache_kind_key', 'ai_result_cache', ['kind', 'key_hash'], unique=True)
+    op.create_index('ix_ai_result_cache_kind_created', 'ai_result_cache', ['kind', 'created_at'])
+    op.create_index('ix_ai_result_cache_expires_at', 'ai_result_cache', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ai_result_cache_expires_at', table_name='ai_result_cache')
+    op.drop_index('ix_ai_result_cache_kind_created', table_name='ai_result_cache')
+    op.drop_index('ix_ai_result_cache_kind_key', table_name='ai_result_cache')
+    op.drop_table('ai_result_cache')
@@ -0,0 +1,121 @@
+"""supplier ledger totals, balance checkpoints and ledger-order index
+
+Revision ID: t1u2v3w4x019
+Revises: s0t1u2v3w018
+Create Date: 2026-01-20 09:00:00.000000
+
+- supplier_balances: running totals per supplier, updated with each movement
+- supplier_balance_checkpoints: prefix totals every N movements
+- (supplier_id, transaction_date, id) index for keyset history pages
+- Recomputes running_balance in ledger order and backfills the totals
+
+Checkpoints for existing history: python rebuild_supplier_ledger.py --full
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 't1u2v3w4x019'
+down_revision: Union[str, None] = 's0t1u2v3w018'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('supplier_balances',
+        sa.Column('supplier_id', sa.Integer(), nullable=False),
+        sa.Column('balance', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('total_debt', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('total_credit', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('transaction_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_transaction_id', sa.Integer(), nullable=True),
+        sa.Column('last_transaction_date', sa.DateTime(), nullable=True),
+        sa.Column('last_payment_date', sa.DateTime(), nullable=True),
+        sa.Column('checkpoint_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'], ),
+        sa.PrimaryKeyConstraint('supplier_id')
+    )
+    op.create_table('supplier_balance_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('supplier_id', sa.Integer(), nullable=False),
+        sa.Column('transaction_id', sa.Integer(), nullable=False),
+        sa.Column('transaction_date', sa.DateTime(), nullable=False),
+        sa.Column('balance', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('total_debt', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('total_credit', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_supplier_balance_checkpoints_supplier_date_id',
+        'supplier_balance_checkpoints',
+        ['supplier_id', 'transaction_date', 'transaction_id']
+    )
+    op.create_index(
+        'ix_supplier_transactions_supplier_date_id',
+        'supplier_transactions',
+        ['supplier_id', 'transaction_date', 'id']
+    )
+    op.create_index(
+        'ix_supplier_transactions_reference',
+        'supplier_transactions',
+        ['reference_type', 'reference_id']
+    )
+
+    # running_balance was taken from the latest row at insert time; recompute
+    # it in (transaction_date, id) order so backdated movements are right
+    op.execute("""
+        UPDATE supplier_transactions AS t
+        SET running_balance = o.balance
+        FROM (
+            SELECT id, SUM(debt_amount - credit_amount) OVER (
+                PARTITION BY supplier_id
+                ORDER BY transaction_date, id
+                ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+            ) AS balance
+            FROM supplier_transactions
+        ) AS o
+        WHERE t.id = o.id AND t.running_balance <> o.balance
+    """)
+
+    op.execute("""
+        INSERT INTO supplier_balances (
+            supplier_id, balance, total_debt, total_credit, transaction_count,
+            last_payment_date, checkpoint_count, updated_at
+        )
+        SELECT
+            supplier_id,
+            SUM(debt_amount - credit_amount),
+            SUM(debt_amount),
+            SUM(credit_amount),
+            COUNT(*),
+            MAX(CASE WHEN transaction_type = 'PAYMENT' THEN transaction_date END),
+            0,
+            CURRENT_TIMESTAMP
+        FROM supplier_transactions
+        GROUP BY supplier_id
+    """)
+    op.execute("""
+        UPDATE supplier_balances AS b
+        SET last_transaction_id = l.id, last_transaction_date = l.transaction_date
+        FROM (
+            SELECT DISTINCT ON (supplier_id) supplier_id, id, transaction_date
+            FROM supplier_transactions
+            ORDER BY supplier_id, transaction_date DESC, id DESC
+        ) AS l
+        WHERE b.supplier_id = l.supplier_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_supplier_transactions_reference', table_name='supplier_transactions')
+    op.drop_index('ix_supplier_transactions_supplier_date_id', table_name='supplier_transactions')
+    op.drop_index('ix_supplier_balance_checkpoints_supplier_date_id', table_name='supplier_balance_checkpoints')
+    op.drop_table('supplier_balance_checkpoints')
+    op.drop_table('supplier_balances')
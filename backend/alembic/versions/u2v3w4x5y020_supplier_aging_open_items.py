@@ -0,0 +1,77 @@
+"""supplier_open_items aging snapshot and covering ledger index
+
+Revision ID: u2v3w4x5y020
+Revises: t1u2v3w4x019
+Create Date: 2026-01-21 09:00:00.000000
+
+- supplier_open_items: unpaid debts (FIFO) per supplier, read by
+  GET /payments/supplier/ar/aging and refreshed by the ledger on each posting
+- (supplier_id, transaction_date, id) ledger index now INCLUDEs the amounts
+  so the aging window runs as an index-only scan
+- Backfills the open items with the same window query as supplier_aging
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'u2v3w4x5y020'
+down_revision: Union[str, None] = 't1u2v3w4x019'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_supplier_transactions_supplier_date_id', table_name='supplier_transactions')
+    op.create_index(
+        'ix_supplier_transactions_supplier_date_id',
+        'supplier_transactions',
+        ['supplier_id', 'transaction_date', 'id'],
+        postgresql_include=['debt_amount', 'credit_amount']
+    )
+
+    op.create_table('supplier_open_items',
+        sa.Column('transaction_id', sa.Integer(), nullable=False),
+        sa.Column('supplier_id', sa.Integer(), nullable=False),
+        sa.Column('transaction_date', sa.DateTime(), nullable=False),
+        sa.Column('open_amount', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['transaction_id'], ['supplier_transactions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'], ),
+        sa.PrimaryKeyConstraint('transaction_id')
+    )
+    op.create_index(
+        'ix_supplier_open_items_supplier_date',
+        'supplier_open_items',
+        ['supplier_id', 'transaction_date']
+    )
+
+    # Credits settle the oldest debts first
+    op.execute("""
+        INSERT INTO supplier_open_items (supplier_id, transaction_id, transaction_date, open_amount)
+        SELECT supplier_id, id, transaction_date, LEAST(debt_amount, debt_through - credit_total)
+        FROM (
+            SELECT
+                supplier_id, id, transaction_date, debt_amount,
+                SUM(debt_amount) OVER (
+                    PARTITION BY supplier_id
+                    ORDER BY transaction_date, id
+                    ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                ) AS debt_through,
+                SUM(credit_amount) OVER (PARTITION BY supplier_id) AS credit_total
+            FROM supplier_transactions
+        ) AS ledger
+        WHERE debt_amount > 0 AND debt_through - credit_total > 0
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_supplier_open_items_supplier_date', table_name='supplier_open_items')
+    op.drop_table('supplier_open_items')
+    op.drop_index('ix_supplier_transactions_supplier_date_id', table_name='supplier_transactions')
+    op.create_index(
+        'ix_supplier_transactions_supplier_date_id',
+        'supplier_transactions',
+        ['supplier_id', 'transaction_date', 'id']
+    )
@@ -0,0 +1,43 @@
+"""(branch_id, date, id) indexes for keyset-paginated list endpoints
+
+Revision ID: v3w4x5y6z021
+Revises: u2v3w4x5y020
+Create Date: 2026-01-24 09:00:00.000000
+
+List endpoints page with WHERE branch_id = ? AND (date, id) < (?, ?)
+ORDER BY date DESC, id DESC LIMIT n + 1 (app/utils/pagination.py); these
+indexes serve every page as a single range scan.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'v3w4x5y6z021'
+down_revision: Union[str, None] = 'u2v3w4x5y020'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+KEYSET_INDEXES = [
+    ('ix_purchases_branch_date_id', 'purchases', 'purchase_date'),
+    ('ix_expenses_branch_date_id', 'expenses', 'expense_date'),
+    ('ix_daily_productions_branch_date_id', 'daily_productions', 'production_date'),
+    ('ix_monthly_payrolls_branch_date_id', 'monthly_payrolls', 'payment_date'),
+    ('ix_part_time_costs_branch_date_id', 'part_time_costs', 'cost_date'),
+    ('ix_online_sales_branch_date_id', 'online_sales', 'sale_date'),
+    ('ix_courier_expenses_branch_date_id', 'courier_expenses', 'expense_date'),
+    ('ix_cash_differences_branch_date_id', 'cash_differences', 'difference_date'),
+    ('ix_import_history_branch_created_id', 'import_history', 'created_at'),
+]
+
+
+def upgrade() -> None:
+    for name, table, date_column in KEYSET_INDEXES:
+        op.create_index(name, table, ['branch_id', date_column, 'id'])
+
+
+def downgrade() -> None:
+    for name, table, _ in KEYSET_INDEXES:
+        op.drop_index(name, table_name=table)
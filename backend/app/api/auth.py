@@ -5,7 +5,7 @@ from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 from app.api.deps import (
     DBSession, CurrentUser, verify_password, create_access_token, get_password_hash,
-    get_accessible_branches, get_default_branch_id
+    get_accessible_branches, get_default_branch_id, mark_branch_context_dirty
 )
 from app.config import settings
 from app.models import User, UserBranch, InvitationCode, InvitationCodeUse, Branch
@@ -142,6 +142,7 @@ def switch_branch(
             UserBranch.user_id == current_user.id,
             UserBranch.is_default == True
         ).update({"is_default": False})
+        mark_branch_context_dirty(db, current_user.id)
 
         user_branch.is_default = True
     else:
@@ -150,6 +151,7 @@ def switch_branch(
             UserBranch.user_id == current_user.id,
             UserBranch.is_default == True
         ).update({"is_default": False})
+        mark_branch_context_dirty(db, current_user.id)
 
         new_ub = UserBranch(
             user_id=current_user.id,
@@ -1,33 +1,35 @@
 """
 Cash Difference API - Kasa Farki Takibi
 """
+import asyncio
 from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Query, UploadFile, File, Header
-from sqlalchemy import func, and_
-from app.api.deps import DBSession, CurrentBranchContext
-from app.models import CashDifference, Expense, ExpenseCategory, OnlineSale, OnlinePlatform, ImportHistory, ImportHistoryItem
+from fastapi import APIRouter, HTTPException, Query, Response, UploadFile, File, Header
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func, and_, select, Select
+from app.api.deps import DBSession, AsyncDBSession, CurrentBranchContext
+from app.models import CashDifference, Expense, OnlineSale, ImportHistory, ImportHistoryItem
 from app.schemas import (
     CashDifferenceCreate, CashDifferenceUpdate, CashDifferenceResponse,
     CashDifferenceSummary, ExcelParseResult, POSParseResult,
-    CashDifferenceImportRequest
+    CashDifferenceImportRequest, CashDifferenceBulkImportResponse
 )
 # TASK-1125b771: Use async parsers to avoid blocking event loop
-from app.utils.async_excel_parser import async_parse_kasa_raporu, async_parse_hasilat_raporu
-from app.idempotency import check_idempotency, save_idempotency
+from app.utils.async_excel_parser import (
+    async_parse_kasa_raporu, async_parse_hasilat_raporu, async_parse_pos_image,
+    async_parse_kasa_days, async_parse_hasilat_days
+)
+from app.utils.parsing_executor import ParsingBusyError
+from app.idempotency import idempotent
+from app.services.ai_result_cache import AIResultCache
+from app.services.cash_import_service import existing_dates, import_days, import_month
+from app.services.catalog_cache import get_catalog
+from app.utils.pagination import Keyset, set_next_cursor
 
 router = APIRouter(prefix="/cash-difference", tags=["cash-difference"])
 
-
-def calculate_severity(diff_total: Decimal) -> str:
-    abs_diff = abs(diff_total)
-    if abs_diff <= 50:
-        return "ok"
-    elif abs_diff <= 200:
-        return "warning"
-    else:
-        return "critical"
+PARSER_BUSY_DETAIL = "Sunucu mesgul, dosya birazdan tekrar yuklenmeli"
 
 
 @router.post("/parse-excel", response_model=ExcelParseResult)
@@ -54,6 +56,8 @@ async def parse_excel_file(
             total=data["total"],
             expenses=data["expenses"]
         )
+    except ParsingBusyError:
+        raise HTTPException(status_code=503, detail=PARSER_BUSY_DETAIL)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Excel parse hatasi: {str(e)}")
 
@@ -82,10 +86,33 @@ async def parse_hasilat_excel_file(
             total=data["total"],
             confidence_score=Decimal("1.0")  # Excel parsing is 100% confident
         )
+    except ParsingBusyError:
+        raise HTTPException(status_code=503, detail=PARSER_BUSY_DETAIL)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Hasılat Excel parse hatasi: {str(e)}")
 
 
+@router.post("/parse-pos-image", response_model=POSParseResult)
+async def parse_pos_image_file(
+    db: DBSession,
+    file: UploadFile = File(...),
+    ctx: CurrentBranchContext = None
+):
+    """Parse POS Hasılat Raporu screenshot (OCR, cached by image hash)"""
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=400, detail="Sadece resim dosyalari kabul edilir")
+
+    content = await file.read()
+
+    try:
+        data = await async_parse_pos_image(content, file.content_type, cache=AIResultCache(db))
+        return POSParseResult(**data)
+    except ParsingBusyError:
+        raise HTTPException(status_code=503, detail=PARSER_BUSY_DETAIL)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"POS goruntu parse hatasi: {str(e)}")
+
+
 @router.post("/import", response_model=CashDifferenceResponse)
 def import_cash_difference(
     request: CashDifferenceImportRequest,
@@ -99,242 +126,138 @@ def import_cash_difference(
 
     Also syncs POS values to online_sales table for dashboard counters.
     """
-    # Check idempotency cache first
-    if x_idempotency_key:
-        cached = check_idempotency(x_idempotency_key)
-        if cached:
-            return cached
-
-    existing = db.query(CashDifference).filter(
-        CashDifference.branch_id == ctx.current_branch_id,
-        CashDifference.difference_date == request.difference_date
-    ).first()
+    # Idempotency: cached response, or wait while a duplicate is in flight
+    with idempotent(x_idempotency_key, scope=f"{ctx.current_branch_id}:cash-difference-import") as slot:
+        if slot.cached is not None:
+            return slot.cached
 
-    if existing:
-        raise HTTPException(status_code=400, detail=f"{request.difference_date} icin zaten kayit var")
-
-    diff_total = request.pos_total - request.kasa_total
-    severity = calculate_severity(diff_total)
-
-    record = CashDifference(
-        branch_id=ctx.current_branch_id,
-        difference_date=request.difference_date,
-        kasa_visa=request.kasa_visa,
-        kasa_nakit=request.kasa_nakit,
-        kasa_trendyol=request.kasa_trendyol,
-        kasa_getir=request.kasa_getir,
-        kasa_yemeksepeti=request.kasa_yemeksepeti,
-        kasa_migros=request.kasa_migros,
-        kasa_total=request.kasa_total,
-        pos_visa=request.pos_visa,
-        pos_nakit=request.pos_nakit,
-        pos_trendyol=request.pos_trendyol,
-        pos_getir=request.pos_getir,
-        pos_yemeksepeti=request.pos_yemeksepeti,
-        pos_migros=request.pos_migros,
-        pos_total=request.pos_total,
-        status="pending",
-        severity=severity,
-        excel_file_url=request.excel_file_url,
-        pos_image_url=request.pos_image_url,
-        ocr_confidence_score=request.ocr_confidence_score,
-        created_by=ctx.user.id
-    )
-
-    db.add(record)
-    db.flush()  # Flush to get record.id
-
-    if import_expenses and request.expenses:
-        uncategorized = db.query(ExpenseCategory).filter(
-            ExpenseCategory.name == "Kategorize Edilmemis"
-        ).first()
+        if existing_dates(db, ctx.current_branch_id, [request.difference_date]):
+            raise HTTPException(status_code=400, detail=f"{request.difference_date} icin zaten kayit var")
 
-        if uncategorized:
-            for exp in request.expenses:
-                if exp.amount > 0:
-                    # Use user-selected category_id from import UI, fallback to uncategorized
-                    category_id = exp.category_id if exp.category_id is not None else uncategorized.id
-                    expense = Expense(
-                        branch_id=ctx.current_branch_id,
-                        category_id=category_id,
-                        expense_date=request.difference_date,
-                        description=exp.description or "Excel'den aktarildi",
-                        amount=exp.amount,
-                        created_by=ctx.user.id
-                    )
-                    db.add(expense)
-
-    # Sync POS values to online_sales table
-    if sync_to_sales:
-        platform_mapping = {
-            'pos_visa': 'Visa',
-            'pos_nakit': 'Nakit',
-            'pos_trendyol': 'Trendyol',
-            'pos_getir': 'Getir',
-            'pos_yemeksepeti': 'Yemek Sepeti',
-            'pos_migros': 'Migros Yemek',
-        }
-
-        for field, platform_name in platform_mapping.items():
-            amount = getattr(request, field, None)
-            if amount and amount > 0:
-                platform = db.query(OnlinePlatform).filter(
-                    OnlinePlatform.name == platform_name
-                ).first()
+        [day] = import_days(
+            db, ctx.current_branch_id, ctx.user.id, [request],
+            import_expenses=import_expenses, sync_to_sales=sync_to_sales
+        )
 
-                if platform:
-                    # Upsert: update existing or create new
-                    existing_sale = db.query(OnlineSale).filter(
-                        OnlineSale.branch_id == ctx.current_branch_id,
-                        OnlineSale.sale_date == request.difference_date,
-                        OnlineSale.platform_id == platform.id
-                    ).first()
+        db.commit()
+        db.refresh(day.record)
 
-                    if existing_sale:
-                        existing_sale.amount = amount
-                        existing_sale.notes = "Kasa Farki'ndan guncellendi"
-                    else:
-                        sale = OnlineSale(
-                            branch_id=ctx.current_branch_id,
-                            platform_id=platform.id,
-                            sale_date=request.difference_date,
-                            amount=amount,
-                            notes="Kasa Farki'ndan aktarildi",
-                            created_by=ctx.user.id
-                        )
-                        db.add(sale)
-
-    # Track import in history
-    history = ImportHistory(
-        branch_id=ctx.current_branch_id,
-        import_type="kasa_raporu",
-        import_date=request.difference_date,
-        source_filename=None,  # Could be added from request if available
-        status="completed",
-        import_metadata={
-            "ocr_confidence": float(request.ocr_confidence_score) if request.ocr_confidence_score else None,
-            "kasa_total": float(request.kasa_total),
-            "pos_total": float(request.pos_total),
-            "diff_total": float(request.pos_total - request.kasa_total)
-        },
-        created_by=ctx.user.id
-    )
-    db.add(history)
-    db.flush()  # Get the history.id
-
-    # Track the cash difference record
-    db.add(ImportHistoryItem(
-        import_history_id=history.id,
-        entity_type="cash_difference",
-        entity_id=record.id,
-        action="created",
-        data={"difference_date": str(request.difference_date)}
-    ))
-
-    # Track any expenses that were created during the import
-    if import_expenses and request.expenses:
-        # Get the expenses we just created for this date
-        created_expenses = db.query(Expense).filter(
-            Expense.branch_id == ctx.current_branch_id,
-            Expense.expense_date == request.difference_date,
-            Expense.created_by == ctx.user.id
-        ).order_by(Expense.id.desc()).limit(len(request.expenses)).all()
-
-        for expense in created_expenses:
-            db.add(ImportHistoryItem(
-                import_history_id=history.id,
-                entity_type="expense",
-                entity_id=expense.id,
-                action="created",
-                data={
-                    "description": expense.description,
-                    "amount": float(expense.amount)
-                }
-            ))
-
-    # Track online sales that were synced
-    if sync_to_sales:
-        # Track the sales we just created/updated
-        platform_mapping = {
-            'pos_visa': 'Visa',
-            'pos_nakit': 'Nakit',
-            'pos_trendyol': 'Trendyol',
-            'pos_getir': 'Getir',
-            'pos_yemeksepeti': 'Yemek Sepeti',
-            'pos_migros': 'Migros Yemek',
-        }
+        # Convert to response model for caching
+        response = CashDifferenceResponse.model_validate(day.record)
+        slot.save(response)
 
-        for field, platform_name in platform_mapping.items():
-            amount = getattr(request, field, None)
-            if amount and amount > 0:
-                platform = db.query(OnlinePlatform).filter(
-                    OnlinePlatform.name == platform_name
-                ).first()
+    return response
 
-                if platform:
-                    sale = db.query(OnlineSale).filter(
-                        OnlineSale.branch_id == ctx.current_branch_id,
-                        OnlineSale.sale_date == request.difference_date,
-                        OnlineSale.platform_id == platform.id
-                    ).first()
 
-                    if sale:
-                        db.add(ImportHistoryItem(
-                            import_history_id=history.id,
-                            entity_type="online_sale",
-                            entity_id=sale.id,
-                            action="created",  # We track both creates and updates as 'created' for import context
-                            data={
-                                "platform": platform_name,
-                                "amount": float(amount)
-                            }
-                        ))
+@router.post("/import-month", response_model=CashDifferenceBulkImportResponse)
+async def import_cash_difference_month(
+    db: DBSession,
+    ctx: CurrentBranchContext,
+    kasa_file: UploadFile = File(...),
+    pos_file: UploadFile = File(...),
+    import_expenses: bool = Query(default=True),
+    sync_to_sales: bool = Query(default=True),
+    x_idempotency_key: str | None = Header(default=None, alias="X-Idempotency-Key")
+):
+    """Import a whole month of Kasa Raporu + Hasılat Raporu.
 
-    db.commit()
-    db.refresh(record)
+    Each file is a workbook with one sheet per day or a zip of daily
+    .xlsx files. Days are parsed in parallel, matched by date and written
+    in one transaction; the response lists the outcome of every day.
+    """
+    async with idempotent(x_idempotency_key, scope=f"{ctx.current_branch_id}:cash-difference-import-month") as slot:
+        if slot.cached is not None:
+            return slot.cached
+
+        for upload in (kasa_file, pos_file):
+            if not upload.filename.endswith(('.xlsx', '.zip')):
+                raise HTTPException(status_code=400, detail="Sadece Excel (.xlsx) veya zip dosyalari kabul edilir")
+
+        kasa_content = await kasa_file.read()
+        pos_content = await pos_file.read()
+
+        try:
+            kasa_days, pos_days = await asyncio.gather(
+                async_parse_kasa_days(kasa_content, kasa_file.filename),
+                async_parse_hasilat_days(pos_content, pos_file.filename)
+            )
+        except ParsingBusyError:
+            raise HTTPException(status_code=503, detail=PARSER_BUSY_DETAIL)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Excel parse hatasi: {str(e)}")
+
+        def write() -> CashDifferenceBulkImportResponse:
+            result = import_month(
+                db, ctx.current_branch_id, ctx.user.id, kasa_days, pos_days,
+                import_expenses=import_expenses, sync_to_sales=sync_to_sales,
+                source_filename=kasa_file.filename[:255]
+            )
+            db.commit()
+            return result
+
+        # Sync session: keep the writes off the event loop
+        response = await run_in_threadpool(write)
+        slot.save(response)
 
-    # Convert to response model for caching
-    response = CashDifferenceResponse.model_validate(record)
+    return response
 
-    # Save to idempotency cache
-    if x_idempotency_key:
-        save_idempotency(x_idempotency_key, response)
 
-    return response
+CASH_DIFFERENCE_KEYSET = Keyset(CashDifference.difference_date, CashDifference.id)
 
 
-@router.get("", response_model=list[CashDifferenceResponse])
-def get_cash_differences(
-    db: DBSession,
-    ctx: CurrentBranchContext,
+def cash_differences_statement(
+    branch_id: int,
     start_date: date | None = None,
     end_date: date | None = None,
     status: str | None = None,
     month: int | None = None,
     year: int | None = None,
-    limit: int = Query(default=50, le=200)
-):
-    """Get cash difference records with filters"""
-    query = db.query(CashDifference).filter(
-        CashDifference.branch_id == ctx.current_branch_id
+    limit: int = 50,
+    cursor: str | None = None
+) -> Select:
+    """Filtered cash difference list page, limit + 1 rows (sync/async ortak)"""
+    stmt = select(CashDifference).where(
+        CashDifference.branch_id == branch_id
     )
 
     if start_date:
-        query = query.filter(CashDifference.difference_date >= start_date)
+        stmt = stmt.where(CashDifference.difference_date >= start_date)
     if end_date:
-        query = query.filter(CashDifference.difference_date <= end_date)
+        stmt = stmt.where(CashDifference.difference_date <= end_date)
     if status:
-        query = query.filter(CashDifference.status == status)
+        stmt = stmt.where(CashDifference.status == status)
     if month and year:
         from calendar import monthrange
         start = date(year, month, 1)
         end = date(year, month, monthrange(year, month)[1])
-        query = query.filter(
+        stmt = stmt.where(
             CashDifference.difference_date >= start,
             CashDifference.difference_date <= end
         )
 
-    return query.order_by(CashDifference.difference_date.desc()).limit(limit).all()
+    return CASH_DIFFERENCE_KEYSET.apply(stmt, limit, cursor)
+
+
+@router.get("", response_model=list[CashDifferenceResponse])
+async def get_cash_differences(
+    db: AsyncDBSession,
+    ctx: CurrentBranchContext,
+    response: Response,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    status: str | None = None,
+    month: int | None = None,
+    year: int | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None
+):
+    """Get cash difference records with filters (next page: X-Next-Cursor)"""
+    stmt = cash_differences_statement(
+        ctx.current_branch_id, start_date, end_date, status, month, year, limit, cursor
+    )
+    records, next_cursor = CASH_DIFFERENCE_KEYSET.page((await db.scalars(stmt)).all(), limit)
+    set_next_cursor(response, next_cursor)
+    return records
 
 
 @router.get("/summary", response_model=CashDifferenceSummary)
@@ -617,9 +540,7 @@ def preview_delete_cash_difference(record_id: int, db: DBSession, ctx: CurrentBr
                         sale.updated_at > sale.created_at
                     )
                     # Get platform name
-                    platform = db.query(OnlinePlatform).filter(
-                        OnlinePlatform.id == sale.platform_id
-                    ).first()
+                    platform = get_catalog(db).platforms_by_id.get(sale.platform_id)
                     sale_info = {
                         "id": sale.id,
                         "platform": platform.name if platform else "Bilinmiyor",
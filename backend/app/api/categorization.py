@@ -4,8 +4,9 @@ Expense Categorization API
 from fastapi import APIRouter
 from pydantic import BaseModel
 from app.api.deps import DBSession, CurrentBranchContext
-from app.services.categorization import get_categorizer
-from app.models import ExpenseCategory
+from app.services.ai_result_cache import AIResultCache
+from app.services.categorization import get_categorizer, get_rule_index
+from app.services.catalog_cache import get_catalog
 
 router = APIRouter(prefix="/categorization", tags=["categorization"])
 
@@ -34,10 +35,7 @@ def suggest_category(
 ):
     """Get category suggestions for a single expense"""
     # Get available categories for this branch
-    categories = db.query(ExpenseCategory).filter(
-        (ExpenseCategory.branch_id == None) |
-        (ExpenseCategory.branch_id == ctx.current_branch_id)
-    ).all()
+    categories = get_catalog(db).categories_for_branch(ctx.current_branch_id)
 
     available = [{"id": c.id, "name": c.name} for c in categories]
 
@@ -45,7 +43,9 @@ def suggest_category(
     suggestions = categorizer.categorize(
         expense.description,
         expense.amount,
-        available
+        available,
+        learned=get_rule_index().get(db, ctx.current_branch_id),
+        cache=AIResultCache(db)
     )
 
     # Map category names to IDs
@@ -54,7 +54,7 @@ def suggest_category(
     return [
         CategorySuggestionResponse(
             category=s.category,
-            category_id=category_map.get(s.category.lower()),
+            category_id=s.category_id or category_map.get(s.category.lower()),
             confidence=s.confidence,
             reasoning=s.reasoning
         )
@@ -69,10 +69,7 @@ def suggest_categories_batch(
     ctx: CurrentBranchContext
 ):
     """Get category suggestions for multiple expenses"""
-    categories = db.query(ExpenseCategory).filter(
-        (ExpenseCategory.branch_id == None) |
-        (ExpenseCategory.branch_id == ctx.current_branch_id)
-    ).all()
+    categories = get_catalog(db).categories_for_branch(ctx.current_branch_id)
 
     available = [{"id": c.id, "name": c.name} for c in categories]
     category_map = {c.name.lower(): c.id for c in categories}
@@ -80,11 +77,16 @@ def suggest_categories_batch(
     expenses = [{"description": e.description, "amount": e.amount} for e in batch.expenses]
 
     categorizer = get_categorizer()
-    results = categorizer.categorize_batch(expenses, available)
+    results = categorizer.categorize_batch(
+        expenses,
+        available,
+        learned=get_rule_index().get(db, ctx.current_branch_id),
+        cache=AIResultCache(db)
+    )
 
-    # Add category IDs
+    # Add category IDs (learned rules already carry one)
     for r in results:
         cat_name = r.get("suggested_category", "").lower()
-        r["category_id"] = category_map.get(cat_name)
+        r["category_id"] = r.get("category_id") or category_map.get(cat_name)
 
     return results
@@ -1,6 +1,6 @@
 from datetime import date
 from decimal import Decimal
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from sqlalchemy import func, extract
 from app.api.deps import DBSession, CurrentBranchContext
 from app.models import CourierExpense
@@ -8,9 +8,12 @@ from app.schemas import (
     CourierExpenseCreate, CourierExpenseResponse, CourierExpenseUpdate,
     CourierExpenseSummary, CourierExpenseBulkCreate
 )
+from app.utils.pagination import Keyset, set_next_cursor
 
 router = APIRouter(prefix="/courier-expenses", tags=["courier-expenses"])
 
+COURIER_EXPENSE_KEYSET = Keyset(CourierExpense.expense_date, CourierExpense.id)
+
 
 @router.post("", response_model=CourierExpenseResponse)
 def create_courier_expense(data: CourierExpenseCreate, db: DBSession, ctx: CurrentBranchContext):
@@ -84,13 +87,15 @@ def create_bulk_courier_expenses(data: CourierExpenseBulkCreate, db: DBSession,
 def get_courier_expenses(
     db: DBSession,
     ctx: CurrentBranchContext,
+    response: Response,
     start_date: date | None = None,
     end_date: date | None = None,
     year: int | None = None,
     month: int | None = None,
-    limit: int = Query(default=100, le=500)
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = None
 ):
-    """Kurye giderlerini listele"""
+    """Kurye giderlerini listele (sonraki sayfa: X-Next-Cursor)"""
     query = db.query(CourierExpense).filter(CourierExpense.branch_id == ctx.current_branch_id)
 
     if year and month:
@@ -104,7 +109,11 @@ def get_courier_expenses(
         if end_date:
             query = query.filter(CourierExpense.expense_date <= end_date)
 
-    return query.order_by(CourierExpense.expense_date.desc()).limit(limit).all()
+    expenses, next_cursor = COURIER_EXPENSE_KEYSET.page(
+        COURIER_EXPENSE_KEYSET.apply(query, limit, cursor).all(), limit
+    )
+    set_next_cursor(response, next_cursor)
+    return expenses
 
 
 @router.get("/summary", response_model=CourierExpenseSummary)
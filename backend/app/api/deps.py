@@ -1,15 +1,19 @@
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from threading import Lock
 from typing import Annotated, Optional
 from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status, Header, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import User, Branch, UserBranch
 from app.schemas import TokenData
 
@@ -39,6 +43,132 @@ class BranchContext:
     is_super_admin: bool
 
 
+class BranchContextCache:
+    """
+    Short-TTL, size-bounded cache of resolved BranchContext values.
+
+    Keyed by (user_id, X-Branch-Id header). Entries hold detached snapshots
+    of the User/Branch rows; a hit merges them into the request session with
+    load=False, so resolving the context costs no DB round trip.
+
+    Invalidated on commit of any change to users / user_branches (per user)
+    or branches (everything). Other workers converge within the TTL.
+    """
+
+    def __init__(self, ttl_seconds: int = 30, max_entries: int = 1024):
+        self._store: OrderedDict[tuple[int, Optional[int]], tuple[float, dict]] = OrderedDict()
+        self._lock = Lock()
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _snapshot(obj):
+        """Detached copy of an ORM row with all column attributes loaded"""
+        mapper = inspect(obj).mapper
+        clone = mapper.class_(**{attr.key: getattr(obj, attr.key) for attr in mapper.column_attrs})
+        make_transient_to_detached(clone)
+        return clone
+
+    def get(self, db: Session, user_id: int, x_branch_id: Optional[int]) -> Optional[BranchContext]:
+        key = (user_id, x_branch_id)
+        with self._lock:
+            cached = self._store.get(key)
+            if cached is None or time.monotonic() > cached[0]:
+                self._store.pop(key, None)
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+            snapshot = cached[1]
+
+        branches = {b.id: db.merge(b, load=False) for b in snapshot["accessible_branches"]}
+        current_branch = branches.get(snapshot["current_branch"].id) or db.merge(snapshot["current_branch"], load=False)
+        return BranchContext(
+            user=db.merge(snapshot["user"], load=False),
+            current_branch_id=snapshot["current_branch_id"],
+            current_branch=current_branch,
+            accessible_branches=list(branches.values()),
+            is_super_admin=snapshot["is_super_admin"]
+        )
+
+    def save(self, x_branch_id: Optional[int], ctx: BranchContext) -> None:
+        snapshot = {
+            "user": self._snapshot(ctx.user),
+            "current_branch_id": ctx.current_branch_id,
+            "current_branch": self._snapshot(ctx.current_branch),
+            "accessible_branches": [self._snapshot(b) for b in ctx.accessible_branches],
+            "is_super_admin": ctx.is_super_admin
+        }
+        with self._lock:
+            self._store[(ctx.user.id, x_branch_id)] = (time.monotonic() + self._ttl_seconds, snapshot)
+            self._store.move_to_end((ctx.user.id, x_branch_id))
+            while len(self._store) > self._max_entries:
+                self._store.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in [k for k in self._store if k[0] == user_id]:
+                del self._store[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+
+# Global cache instance
+_branch_context_cache = BranchContextCache(
+    ttl_seconds=settings.BRANCH_CONTEXT_CACHE_TTL_SECONDS,
+    max_entries=settings.BRANCH_CONTEXT_CACHE_MAX_ENTRIES
+)
+
+
+def get_branch_context_cache() -> BranchContextCache:
+    """Get the global branch context cache"""
+    return _branch_context_cache
+
+
+# Session.info keys for pending branch context invalidations
+_CONTEXT_DIRTY_KEY = "branch_context_dirty_users"
+_CONTEXT_CLEAR_KEY = "branch_context_clear"
+
+
+def mark_branch_context_dirty(db: Session, user_id: int) -> None:
+    """Invalidate the user's cached contexts after commit (bulk update paths skip flush events)"""
+    db.info.setdefault(_CONTEXT_DIRTY_KEY, set()).add(user_id)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_context_invalidations(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Branch):
+            session.info[_CONTEXT_CLEAR_KEY] = True
+        elif isinstance(obj, User):
+            if obj.id is not None:
+                session.info.setdefault(_CONTEXT_DIRTY_KEY, set()).add(obj.id)
+        elif isinstance(obj, UserBranch):
+            history = inspect(obj).attrs.user_id.history
+            user_ids = {obj.user_id, *(history.deleted or ())}
+            session.info.setdefault(_CONTEXT_DIRTY_KEY, set()).update(u for u in user_ids if u is not None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_context_invalidations(session):
+    if session.info.pop(_CONTEXT_CLEAR_KEY, False):
+        session.info.pop(_CONTEXT_DIRTY_KEY, None)
+        _branch_context_cache.clear()
+        return
+    for user_id in session.info.pop(_CONTEXT_DIRTY_KEY, ()):
+        _branch_context_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_context_invalidations(session):
+    session.info.pop(_CONTEXT_DIRTY_KEY, None)
+    session.info.pop(_CONTEXT_CLEAR_KEY, None)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -146,6 +276,11 @@ def get_branch_context(
     except JWTError:
         raise credentials_exception
 
+    # Cache hit: no DB round trip
+    cached = _branch_context_cache.get(db, token_data.user_id, x_branch_id)
+    if cached is not None:
+        return cached
+
     user = db.query(User).filter(User.id == token_data.user_id).first()
     if user is None:
         raise credentials_exception
@@ -178,13 +313,15 @@ def get_branch_context(
             detail="Sube bulunamadi"
         )
 
-    return BranchContext(
+    ctx = BranchContext(
         user=user,
         current_branch_id=current_branch_id,
         current_branch=current_branch,
         accessible_branches=accessible_branches,
         is_super_admin=user.is_super_admin
     )
+    _branch_context_cache.save(x_branch_id, ctx)
+    return ctx
 
 
 def get_current_tenant(
@@ -270,5 +407,6 @@ def get_current_tenant(
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 DBSession = Annotated[Session, Depends(get_db)]
+AsyncDBSession = Annotated[AsyncSession, Depends(get_async_db)]
 CurrentBranchContext = Annotated[BranchContext, Depends(get_branch_context)]
 CurrentTenantContext = Annotated[TenantContext, Depends(get_current_tenant)]
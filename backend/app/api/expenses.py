@@ -1,19 +1,24 @@
 from datetime import date
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from app.api.deps import DBSession, CurrentBranchContext
+from app.api.loaders import EXPENSE_RESPONSE, reload
 from app.models import Expense, ExpenseCategory
 from app.schemas import (
     ExpenseCreate, ExpenseResponse,
     ExpenseCategoryCreate, ExpenseCategoryResponse
 )
+from app.services.catalog_cache import get_catalog
+from app.utils.pagination import Keyset, set_next_cursor
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
 
+EXPENSE_KEYSET = Keyset(Expense.expense_date, Expense.id)
+
 
 # Expense Categories
 @router.get("/categories", response_model=list[ExpenseCategoryResponse])
 def get_expense_categories(db: DBSession, ctx: CurrentBranchContext):
-    return db.query(ExpenseCategory).order_by(ExpenseCategory.name).all()
+    return get_catalog(db).categories
 
 
 @router.post("/categories", response_model=ExpenseCategoryResponse)
@@ -71,10 +76,7 @@ def delete_expense_category(category_id: int, db: DBSession, ctx: CurrentBranchC
 @router.post("", response_model=ExpenseResponse)
 def create_expense(data: ExpenseCreate, db: DBSession, ctx: CurrentBranchContext):
     # Kategoriyi kontrol et
-    category = db.query(ExpenseCategory).filter(
-        ExpenseCategory.id == data.category_id
-    ).first()
-    if not category:
+    if data.category_id not in get_catalog(db).categories_by_id:
         raise HTTPException(status_code=400, detail="Gider kategorisi bulunamadi")
 
     expense = Expense(
@@ -84,20 +86,23 @@ def create_expense(data: ExpenseCreate, db: DBSession, ctx: CurrentBranchContext
     )
     db.add(expense)
     db.commit()
-    db.refresh(expense)
-    return expense
+    return reload(db, expense, EXPENSE_RESPONSE)
 
 
 @router.get("", response_model=list[ExpenseResponse])
 def get_expenses(
     db: DBSession,
     ctx: CurrentBranchContext,
+    response: Response,
     start_date: date | None = None,
     end_date: date | None = None,
     category_id: int | None = None,
-    limit: int = Query(default=50, le=200)
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None
 ):
-    query = db.query(Expense).filter(Expense.branch_id == ctx.current_branch_id)
+    query = db.query(Expense).filter(
+        Expense.branch_id == ctx.current_branch_id
+    ).options(*EXPENSE_RESPONSE)
 
     if start_date:
         query = query.filter(Expense.expense_date >= start_date)
@@ -106,7 +111,9 @@ def get_expenses(
     if category_id:
         query = query.filter(Expense.category_id == category_id)
 
-    return query.order_by(Expense.expense_date.desc(), Expense.id.desc()).limit(limit).all()
+    expenses, next_cursor = EXPENSE_KEYSET.page(EXPENSE_KEYSET.apply(query, limit, cursor).all(), limit)
+    set_next_cursor(response, next_cursor)
+    return expenses
 
 
 @router.get("/today", response_model=list[ExpenseResponse])
@@ -115,7 +122,7 @@ def get_today_expenses(db: DBSession, ctx: CurrentBranchContext):
     return db.query(Expense).filter(
         Expense.branch_id == ctx.current_branch_id,
         Expense.expense_date == today
-    ).order_by(Expense.created_at.desc()).all()
+    ).options(*EXPENSE_RESPONSE).order_by(Expense.created_at.desc()).all()
 
 
 @router.get("/{expense_id}", response_model=ExpenseResponse)
@@ -123,7 +130,7 @@ def get_expense(expense_id: int, db: DBSession, ctx: CurrentBranchContext):
     expense = db.query(Expense).filter(
         Expense.id == expense_id,
         Expense.branch_id == ctx.current_branch_id
-    ).first()
+    ).options(*EXPENSE_RESPONSE).first()
     if not expense:
         raise HTTPException(status_code=404, detail="Gider bulunamadi")
     return expense
@@ -6,6 +6,8 @@ Provides shallow and deep health check endpoints for system verification.
 Endpoints:
 - GET /api/health - Quick check (verifies DB connectivity, fast for load balancers)
 - GET /api/health/deep - E2E verification (comprehensive)
+- GET /api/health/pool - Connection pool stats (checked-out, overflow, wait time)
+- GET /api/health/parsing - Upload parsing pools (active, queued, rejected, wait time)
 """
 import time
 from fastapi import APIRouter, Depends
@@ -13,8 +15,9 @@ from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_pool_stats
 from app.core.health_checks import HealthChecker
+from app.utils.parsing_executor import get_parsing_executor
 from app.config import settings
 
 router = APIRouter(tags=["health"])
@@ -73,3 +76,27 @@ def health_deep(db: Session = Depends(get_db)):
     """
     checker = HealthChecker(db)
     return checker.run_all_checks()
+
+
+@router.get("/health/pool")
+def health_pool():
+    """
+    Connection pool stats.
+
+    No DB round trip; reads pool counters only:
+    - size / checked_in / checked_out / overflow
+    - checkouts, timeouts, avg/max wait for a connection (ms)
+    """
+    return get_pool_stats()
+
+
+@router.get("/health/parsing")
+def health_parsing():
+    """
+    Upload parsing pool stats (Excel process pool, OCR thread pool).
+
+    - active / queued: current load, queued = waiting for a worker
+    - rejected: uploads refused with 503 because the queue was full
+    - avg/max wait, avg run time (ms)
+    """
+    return get_parsing_executor().stats()
@@ -2,29 +2,36 @@
 Import History API - Track and manage import audit trail
 """
 from datetime import date
-from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import desc
+from fastapi import APIRouter, HTTPException, Query, Response
 from app.api.deps import DBSession, CurrentBranchContext
+from app.api.loaders import IMPORT_HISTORY_RESPONSE
 from app.models import ImportHistory, ImportHistoryItem
 from app.schemas import ImportHistoryResponse
+from app.services.daily_summary_service import TRACKED_MODELS, mark_daily_summary_dirty
+from app.report_cache import INVALIDATING_MODELS, mark_report_cache_dirty
+from app.utils.pagination import Keyset, set_next_cursor
 
 router = APIRouter(prefix="/import-history", tags=["import-history"])
 
+IMPORT_HISTORY_KEYSET = Keyset(ImportHistory.created_at, ImportHistory.id)
+
 
 @router.get("", response_model=list[ImportHistoryResponse])
 def get_import_history(
     db: DBSession,
     ctx: CurrentBranchContext,
+    response: Response,
     import_type: str | None = None,
     start_date: date | None = None,
     end_date: date | None = None,
     status: str | None = None,
-    limit: int = Query(default=50, le=200)
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None
 ):
-    """Get import history with optional filters"""
+    """Get import history with optional filters (next page: X-Next-Cursor)"""
     query = db.query(ImportHistory).filter(
         ImportHistory.branch_id == ctx.current_branch_id
-    )
+    ).options(*IMPORT_HISTORY_RESPONSE)
 
     if import_type:
         query = query.filter(ImportHistory.import_type == import_type)
@@ -35,7 +42,9 @@ def get_import_history(
     if status:
         query = query.filter(ImportHistory.status == status)
 
-    return query.order_by(desc(ImportHistory.created_at)).limit(limit).all()
+    history, next_cursor = IMPORT_HISTORY_KEYSET.page(IMPORT_HISTORY_KEYSET.apply(query, limit, cursor).all(), limit)
+    set_next_cursor(response, next_cursor)
+    return history
 
 
 @router.get("/{history_id}", response_model=ImportHistoryResponse)
@@ -48,7 +57,7 @@ def get_import_history_detail(
     record = db.query(ImportHistory).filter(
         ImportHistory.id == history_id,
         ImportHistory.branch_id == ctx.current_branch_id
-    ).first()
+    ).options(*IMPORT_HISTORY_RESPONSE).first()
 
     if not record:
         raise HTTPException(status_code=404, detail="Import history not found")
@@ -67,7 +76,7 @@ def undo_import(
         ImportHistory.id == history_id,
         ImportHistory.branch_id == ctx.current_branch_id,
         ImportHistory.status == "completed"
-    ).first()
+    ).options(*IMPORT_HISTORY_RESPONSE).first()
 
     if not record:
         raise HTTPException(status_code=404, detail="Import not found or already undone")
@@ -86,6 +95,17 @@ def undo_import(
         for item in record.items:
             if item.action == "created" and item.entity_type in entity_models:
                 model = entity_models[item.entity_type]
+                # Bulk delete bypasses flush hooks - mark rollup/cache day explicitly
+                date_attr = INVALIDATING_MODELS.get(model)
+                if date_attr:
+                    entity_date = db.query(getattr(model, date_attr)).filter(
+                        model.id == item.entity_id,
+                        model.branch_id == ctx.current_branch_id
+                    ).scalar()
+                    if entity_date:
+                        if model in TRACKED_MODELS:
+                            mark_daily_summary_dirty(db, ctx.current_branch_id, entity_date)
+                        mark_report_cache_dirty(db, ctx.current_branch_id, entity_date)
                 # Validate branch ownership before deleting
                 deleted = db.query(model).filter(
                     model.id == item.entity_id,
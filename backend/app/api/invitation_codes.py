@@ -2,6 +2,7 @@ import secrets
 import string
 from fastapi import APIRouter, HTTPException, status
 from app.api.deps import DBSession, CurrentUser, CurrentBranchContext
+from app.api.loaders import INVITATION_CODE_RESPONSE
 from app.models import InvitationCode, InvitationCodeUse, Organization, Branch
 from app.schemas import (
     InvitationCodeCreate, InvitationCodeUpdate, InvitationCodeResponse,
@@ -43,15 +44,11 @@ def list_invitation_codes(
     codes = db.query(InvitationCode).filter(
         InvitationCode.organization_id == user.organization_id,
         InvitationCode.is_active == True
-    ).order_by(InvitationCode.created_at.desc()).all()
+    ).options(*INVITATION_CODE_RESPONSE).order_by(InvitationCode.created_at.desc()).all()
 
     result = []
     for code in codes:
-        branch = None
-        if code.branch_id:
-            branch_obj = db.query(Branch).filter(Branch.id == code.branch_id).first()
-            if branch_obj:
-                branch = BranchResponse.model_validate(branch_obj)
+        branch = BranchResponse.model_validate(code.branch) if code.branch else None
 
         result.append(InvitationCodeResponse(
             id=code.id,
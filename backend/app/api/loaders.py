@@ -0,0 +1,86 @@
+# backend/app/api/loaders.py
+"""
+Loader options per endpoint: the relationships each response model
+serializes, loaded up front instead of one lazy SELECT per row.
+
+- collections (Purchase.items, ImportHistory.items): selectinload, one
+  extra SELECT ... WHERE parent_id IN (...) per page, no row multiplication
+  under LIMIT
+- many-to-one (Purchase.supplier, Expense.category, ...): joinedload, same
+  SELECT
+
+Requests run with the lazy-load guard (app/utils/lazy_load_guard.py) in
+tests, so a response field that is missing here fails loudly instead of
+turning into an N+1.
+
+    query = db.query(Purchase).options(*PURCHASE_RESPONSE)
+    purchase = reload(db, purchase, PURCHASE_RESPONSE)  # after commit
+"""
+from typing import Sequence, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.models import (
+    Expense, ImportHistory, InvitationCode, MenuCategory, MenuItem, MonthlyPayroll,
+    OnlineSale, Purchase, PurchaseItem
+)
+
+Model = TypeVar("Model")
+
+# PurchaseResponse: items (+ product) and supplier
+PURCHASE_RESPONSE = (
+    selectinload(Purchase.items).joinedload(PurchaseItem.product),
+    joinedload(Purchase.supplier),
+)
+
+# ExpenseResponse: category
+EXPENSE_RESPONSE = (joinedload(Expense.category),)
+
+# OnlineSaleResponse / DailySalesResponse entries: platform
+ONLINE_SALE_RESPONSE = (joinedload(OnlineSale.platform),)
+
+# MonthlyPayrollResponse: employee
+PAYROLL_RESPONSE = (joinedload(MonthlyPayroll.employee),)
+
+# ImportHistoryResponse: items
+IMPORT_HISTORY_RESPONSE = (selectinload(ImportHistory.items),)
+
+# InvitationCodeResponse: branch
+INVITATION_CODE_RESPONSE = (joinedload(InvitationCode.branch),)
+
+# Deletes: collections the unit of work has to load to cascade / null out
+MENU_CATEGORY_DELETE = (selectinload(MenuCategory.items),)
+MENU_ITEM_DELETE = (selectinload(MenuItem.prices),)
+
+
+def reload(db: Session, instance: Model, options: Sequence[LoaderOption]) -> Model:
+    """
+    db.refresh() with loader options: re-select a committed row together
+    with the relationships its response serializes
+    """
+    model = type(instance)
+    stmt = (
+        select(model)
+        .where(model.id == instance.id)
+        .options(*options)
+        .execution_options(populate_existing=True)
+    )
+    return db.scalars(stmt).unique().one()
+
+
+def reload_all(db: Session, instances: Sequence[Model], options: Sequence[LoaderOption]) -> list[Model]:
+    """reload() for a batch of rows of one model, in the given order"""
+    if not instances:
+        return []
+    model = type(instances[0])
+    ids = [instance.id for instance in instances]
+    stmt = (
+        select(model)
+        .where(model.id.in_(ids))
+        .options(*options)
+        .execution_options(populate_existing=True)
+    )
+    by_id = {row.id: row for row in db.scalars(stmt).unique()}
+    return [by_id[id_] for id_ in ids]
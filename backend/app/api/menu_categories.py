@@ -8,6 +8,7 @@ Hybrid tenant isolation:
 from fastapi import APIRouter, HTTPException, status, Response
 from sqlalchemy import or_
 from app.api.deps import DBSession, CurrentBranchContext
+from app.api.loaders import MENU_CATEGORY_DELETE
 from app.models import MenuCategory
 from app.schemas import MenuCategoryCreate, MenuCategoryUpdate, MenuCategoryResponse
 
@@ -158,6 +159,7 @@ def delete_menu_category(
                 MenuCategory.branch_id == ctx.current_branch_id
             )
         )
+        .options(*MENU_CATEGORY_DELETE)  # items: category_id is nulled on delete
         .first()
     )
     if not category:
@@ -5,107 +5,87 @@ MenuItem: Product info (name, description, category, image)
 MenuItemPrice: Branch-specific pricing (NULL branch_id = default price)
 """
 from typing import Optional
-from decimal import Decimal
 from fastapi import APIRouter, HTTPException, status, Response, Query
-from sqlalchemy import or_
-from app.api.deps import DBSession, CurrentBranchContext
+from sqlalchemy import or_, select, Select
+from app.api.deps import DBSession, AsyncDBSession, CurrentBranchContext
+from app.api.loaders import MENU_ITEM_DELETE
 from app.models import MenuItem, MenuItemPrice, MenuCategory
 from app.schemas import (
     MenuItemCreate, MenuItemUpdate, MenuItemResponse,
     MenuItemPriceSet, MenuItemPriceResponse
 )
+from app.services.menu_price_service import (
+    get_menu_cache, item_response, items_to_responses, load_resolved_prices, menu_prices_statement
+)
 
 router = APIRouter(prefix="/v1/menu-items", tags=["menu-items"])
 
 
-def _resolve_price(item: MenuItem, branch_id: int, db: DBSession) -> tuple[Optional[Decimal], Optional[bool]]:
-    """Resolve price for a menu item in a specific branch.
+def _item_to_response(item: MenuItem, branch_id: int, db: DBSession) -> dict:
+    """Convert MenuItem to response dict with resolved price."""
+    return item_response(item, load_resolved_prices(db, [item.id], branch_id))
 
-    Returns (price, is_default):
-    - Branch-specific price if exists -> (price, False)
-    - Default price if exists -> (price, True)
-    - No price -> (None, None)
-    """
-    # First try branch-specific price
-    branch_price = (
-        db.query(MenuItemPrice)
-        .filter(
-            MenuItemPrice.menu_item_id == item.id,
-            MenuItemPrice.branch_id == branch_id
+
+def menu_items_statement(branch_id: int, category_id: Optional[int] = None) -> Select:
+    """Active items from accessible categories (global + branch-specific)."""
+    accessible_categories = (
+        select(MenuCategory.id)
+        .where(
+            MenuCategory.is_active == True,
+            or_(
+                MenuCategory.branch_id == None,
+                MenuCategory.branch_id == branch_id
+            )
         )
-        .first()
     )
-    if branch_price:
-        return branch_price.price, False
 
-    # Fall back to default price (branch_id=NULL)
-    default_price = (
-        db.query(MenuItemPrice)
-        .filter(
-            MenuItemPrice.menu_item_id == item.id,
-            MenuItemPrice.branch_id == None
+    stmt = (
+        select(MenuItem)
+        .where(
+            MenuItem.is_active == True,
+            MenuItem.category_id.in_(accessible_categories)
         )
-        .first()
     )
-    if default_price:
-        return default_price.price, True
 
-    return None, None
+    if category_id is not None:
+        stmt = stmt.where(MenuItem.category_id == category_id)
 
+    return stmt.order_by(MenuItem.display_order)
 
-def _item_to_response(item: MenuItem, branch_id: int, db: DBSession) -> dict:
-    """Convert MenuItem to response dict with resolved price."""
-    price, is_default = _resolve_price(item, branch_id, db)
-    return {
-        "id": item.id,
-        "category_id": item.category_id,
-        "name": item.name,
-        "description": item.description,
-        "image_url": item.image_url,
-        "display_order": item.display_order,
-        "is_active": item.is_active,
-        "price": price,
-        "price_is_default": is_default,
-        "created_at": item.created_at
-    }
+
+def list_menu_items(db: DBSession, branch_id: int, category_id: Optional[int] = None) -> list[dict]:
+    """Menu items with resolved prices - sync session, 2 queries"""
+    items = db.scalars(menu_items_statement(branch_id, category_id)).all()
+    resolved = load_resolved_prices(db, [i.id for i in items], branch_id)
+    return [item_response(item, resolved) for item in items]
 
 
 @router.get("", response_model=list[MenuItemResponse])
-def get_menu_items(
-    db: DBSession,
+async def get_menu_items(
+    db: AsyncDBSession,
     ctx: CurrentBranchContext,
     category_id: Optional[int] = Query(None, description="Filter by category ID")
 ):
     """
     Get menu items with resolved prices for current branch.
     Returns items from accessible categories (global + branch-specific).
+    Served from the per-branch menu cache when warm.
     """
-    # Get accessible category IDs
-    accessible_categories = (
-        db.query(MenuCategory.id)
-        .filter(
-            MenuCategory.is_active == True,
-            or_(
-                MenuCategory.branch_id == None,
-                MenuCategory.branch_id == ctx.current_branch_id
-            )
-        )
-    )
+    branch_id = ctx.current_branch_id
+    menu_cache = get_menu_cache()
+    cached = menu_cache.get(branch_id, category_id)
+    if cached is not None:
+        return cached
 
-    query = (
-        db.query(MenuItem)
-        .filter(
-            MenuItem.is_active == True,
-            MenuItem.category_id.in_(accessible_categories)
-        )
-    )
-
-    if category_id is not None:
-        query = query.filter(MenuItem.category_id == category_id)
+    generation = menu_cache.generation(branch_id)
+    items = (await db.scalars(menu_items_statement(branch_id, category_id))).all()
+    prices = []
+    if items:
+        prices = (await db.scalars(menu_prices_statement([i.id for i in items], branch_id))).all()
 
-    items = query.order_by(MenuItem.display_order).all()
-
-    return [_item_to_response(item, ctx.current_branch_id, db) for item in items]
+    responses = items_to_responses(items, prices, branch_id)
+    menu_cache.set(branch_id, category_id, responses, generation)
+    return responses
 
 
 @router.get("/{item_id}", response_model=MenuItemResponse)
@@ -288,7 +268,7 @@ def delete_menu_item(
     ctx: CurrentBranchContext
 ):
     """Delete a menu item and all its prices."""
-    item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
+    item = db.query(MenuItem).filter(MenuItem.id == item_id).options(*MENU_ITEM_DELETE).first()
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,22 @@
+"""
+Metrics API - Prometheus text exposition
+
+GET /api/metrics: request counts / latency histograms per route, in-flight
+requests, DB pool, cache hit ratios, parsing pools and AI/OCR call latency
+(app/metrics.py). Unauthenticated like /api/health; scrape from inside
+the network.
+"""
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.metrics import CONTENT_TYPE, get_metrics_registry
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return PlainTextResponse(get_metrics_registry().exposition(), media_type=CONTENT_TYPE)
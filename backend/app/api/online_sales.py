@@ -1,8 +1,9 @@
 from datetime import date
 from decimal import Decimal
-from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import func, and_
-from app.api.deps import DBSession, CurrentBranchContext
+from fastapi import APIRouter, HTTPException, Query, Response
+from sqlalchemy import func, and_, select, Select
+from app.api.deps import DBSession, AsyncDBSession, CurrentBranchContext
+from app.api.loaders import ONLINE_SALE_RESPONSE, reload_all
 from app.models import OnlinePlatform, OnlineSale
 from app.schemas import (
     OnlinePlatformCreate, OnlinePlatformUpdate, OnlinePlatformResponse,
@@ -10,9 +11,15 @@ from app.schemas import (
     DailySalesCreate, DailySalesResponse,
     OnlineSalesSummary
 )
+from app.services.daily_summary_service import mark_daily_summary_dirty
+from app.services.catalog_cache import PlatformEntry, get_catalog, get_catalog_cache
+from app.report_cache import mark_report_cache_dirty
+from app.utils.pagination import Keyset, set_next_cursor
 
 router = APIRouter(prefix="/online-sales", tags=["online-sales"])
 
+SALE_KEYSET = Keyset(OnlineSale.sale_date, OnlineSale.id)
+
 
 # ==================== CHANNELS / PLATFORMS ====================
 
@@ -22,9 +29,7 @@ def get_channels_grouped(db: DBSession, ctx: CurrentBranchContext):
     Satış kanallarını tip bazında gruplandırılmış şekilde döndür.
     Frontend'de birleşik satış girişi için kullanılır.
     """
-    platforms = db.query(OnlinePlatform).filter(
-        OnlinePlatform.is_active == True
-    ).order_by(OnlinePlatform.display_order).all()
+    platforms = get_catalog(db).active_platforms
 
     pos_channels = []
     online_channels = []
@@ -51,9 +56,7 @@ def get_channels_grouped(db: DBSession, ctx: CurrentBranchContext):
 @router.get("/platforms", response_model=list[OnlinePlatformResponse])
 def get_platforms(db: DBSession, ctx: CurrentBranchContext):
     """Tüm satış kanallarını listele (POS + Online)"""
-    return db.query(OnlinePlatform).filter(
-        OnlinePlatform.is_active == True
-    ).order_by(OnlinePlatform.display_order).all()
+    return get_catalog(db).active_platforms
 
 
 @router.post("/platforms", response_model=OnlinePlatformResponse)
@@ -115,30 +118,19 @@ def delete_platform(platform_id: int, db: DBSession, ctx: CurrentBranchContext):
 
 # ==================== SALES ====================
 
-@router.get("/today")
-def get_today_sales(db: DBSession, ctx: CurrentBranchContext):
-    """
-    Bugünün tüm kanal satışlarını getir - birleşik giriş sayfası için.
-    Her kanal için mevcut değeri döndürür.
-    """
-    today = date.today()
-    branch_id = ctx.current_branch_id
-
-    # Tüm aktif kanalları al
-    platforms = db.query(OnlinePlatform).filter(
-        OnlinePlatform.is_active == True
-    ).order_by(OnlinePlatform.display_order).all()
-
-    # Bugünün satışlarını al
-    sales = db.query(OnlineSale).filter(
+def today_sales_statement(branch_id: int, today: date) -> Select:
+    """Bugünün satışları (sync/async ortak); aktif kanallar catalog cache'ten"""
+    return select(OnlineSale).where(
         OnlineSale.branch_id == branch_id,
         OnlineSale.sale_date == today
-    ).all()
+    )
+
 
+def today_sales_from_rows(platforms: list[PlatformEntry], sales: list[OnlineSale], today: date) -> dict:
+    """Her kanal için bugünün değerini döndür"""
     # Platform ID -> Sale eşleştirmesi
     sales_by_platform = {s.platform_id: s for s in sales}
 
-    # Her kanal için değer döndür
     entries = []
     for p in platforms:
         sale = sales_by_platform.get(p.id)
@@ -160,17 +152,42 @@ def get_today_sales(db: DBSession, ctx: CurrentBranchContext):
     }
 
 
+def fetch_today_sales(db: DBSession, branch_id: int, today: date) -> dict:
+    """Bugünün kanal satışları - sync session"""
+    return today_sales_from_rows(
+        get_catalog(db).active_platforms,
+        db.scalars(today_sales_statement(branch_id, today)).all(),
+        today
+    )
+
+
+@router.get("/today")
+async def get_today_sales(db: AsyncDBSession, ctx: CurrentBranchContext):
+    """
+    Bugünün tüm kanal satışlarını getir - birleşik giriş sayfası için.
+    Her kanal için mevcut değeri döndürür.
+    """
+    today = date.today()
+    catalog = await get_catalog_cache().aget(db)
+    sales = (await db.scalars(today_sales_statement(ctx.current_branch_id, today))).all()
+    return today_sales_from_rows(catalog.active_platforms, sales, today)
+
+
 @router.get("", response_model=list[OnlineSaleResponse])
 def get_sales(
     db: DBSession,
     ctx: CurrentBranchContext,
+    response: Response,
     start_date: date | None = None,
     end_date: date | None = None,
     platform_id: int | None = None,
-    limit: int = Query(default=100, le=500)
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = None
 ):
-    """Online satışları listele"""
-    query = db.query(OnlineSale).filter(OnlineSale.branch_id == ctx.current_branch_id)
+    """Online satışları listele (sonraki sayfa: X-Next-Cursor)"""
+    query = db.query(OnlineSale).filter(
+        OnlineSale.branch_id == ctx.current_branch_id
+    ).options(*ONLINE_SALE_RESPONSE)
 
     if start_date:
         query = query.filter(OnlineSale.sale_date >= start_date)
@@ -179,7 +196,9 @@ def get_sales(
     if platform_id:
         query = query.filter(OnlineSale.platform_id == platform_id)
 
-    return query.order_by(OnlineSale.sale_date.desc()).limit(limit).all()
+    sales, next_cursor = SALE_KEYSET.page(SALE_KEYSET.apply(query, limit, cursor).all(), limit)
+    set_next_cursor(response, next_cursor)
+    return sales
 
 
 @router.get("/daily/{sale_date}", response_model=DailySalesResponse)
@@ -188,7 +207,7 @@ def get_daily_sales(sale_date: date, db: DBSession, ctx: CurrentBranchContext):
     sales = db.query(OnlineSale).filter(
         OnlineSale.branch_id == ctx.current_branch_id,
         OnlineSale.sale_date == sale_date
-    ).all()
+    ).options(*ONLINE_SALE_RESPONSE).all()
 
     total = sum(s.amount for s in sales)
     return DailySalesResponse(sale_date=sale_date, entries=sales, total=total)
@@ -205,7 +224,9 @@ def create_or_update_daily_sales(
     Önce o günün tüm kayıtlarını siler, sonra yeni kayıtları oluşturur.
     Bu sayede kullanıcı bir kanalı 0'a çektiğinde eski kayıt silinmiş olur.
     """
-    # Önce o günün tüm satış kayıtlarını sil
+    # Önce o günün tüm satış kayıtlarını sil (bulk delete flush hook'larını atlar)
+    mark_daily_summary_dirty(db, ctx.current_branch_id, data.sale_date)
+    mark_report_cache_dirty(db, ctx.current_branch_id, data.sale_date)
     db.query(OnlineSale).filter(
         OnlineSale.branch_id == ctx.current_branch_id,
         OnlineSale.sale_date == data.sale_date
@@ -230,8 +251,7 @@ def create_or_update_daily_sales(
         result_entries.append(sale)
 
     db.commit()
-    for sale in result_entries:
-        db.refresh(sale)
+    result_entries = reload_all(db, result_entries, ONLINE_SALE_RESPONSE)
 
     total = sum(e.amount for e in result_entries)
     return DailySalesResponse(sale_date=data.sale_date, entries=result_entries, total=total)
@@ -255,6 +275,8 @@ def delete_sale(sale_id: int, db: DBSession, ctx: CurrentBranchContext):
 @router.delete("/daily/{sale_date}")
 def delete_daily_sales(sale_date: date, db: DBSession, ctx: CurrentBranchContext):
     """Bir günün tüm satışlarını sil"""
+    mark_daily_summary_dirty(db, ctx.current_branch_id, sale_date)
+    mark_report_cache_dirty(db, ctx.current_branch_id, sale_date)
     deleted = db.query(OnlineSale).filter(
         OnlineSale.branch_id == ctx.current_branch_id,
         OnlineSale.sale_date == sale_date
@@ -294,10 +316,12 @@ def get_sales_summary(
 
     sales = query.all()
 
-    # Platform bazlı toplamlar
+    # Platform bazlı toplamlar (isimler catalog cache'ten, satış başına sorgu yok)
+    platforms = get_catalog(db).platforms_by_id
     platform_totals: dict[str, Decimal] = {}
     for sale in sales:
-        platform_name = sale.platform.name if sale.platform else "Bilinmeyen"
+        platform = platforms.get(sale.platform_id)
+        platform_name = platform.name if platform else "Bilinmeyen"
         if platform_name not in platform_totals:
             platform_totals[platform_name] = Decimal("0")
         platform_totals[platform_name] += sale.amount
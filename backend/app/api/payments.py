@@ -1,15 +1,18 @@
 # backend/app/api/payments.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import Optional, Literal
-from datetime import datetime
+from datetime import date, datetime
 
 from app.database import get_db
 from app.services.supplier_ar_service import SupplierARService
 from app.services.payment_service import PaymentService
+from app.services.supplier_aging import aging_report
+from app.utils.pagination import set_next_cursor
 from app.schemas.supplier_ar import (
     SupplierARSummary,
     SupplierARDetail,
+    SupplierAgingReport,
     SupplierTransaction,
     SupplierPaymentCreate,
     SupplierPaymentUpdate,
@@ -39,15 +42,31 @@ def get_all_supplier_ar(
     return service.get_all_supplier_ar()
 
 
+@router.get("/supplier/ar/aging", response_model=SupplierAgingReport)
+def get_supplier_ar_aging(
+    as_of: Optional[date] = None,
+    branch_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Tedarikçi borç yaşlandırma raporu (0-30, 31-60, 61-90, 90+ gün).
+    as_of verilmezse güncel snapshot'tan okunur.
+    """
+    return aging_report(db, as_of=as_of, branch_id=branch_id)
+
+
 @router.get("/supplier/ar/{supplier_id}", response_model=SupplierARDetail)
 def get_supplier_ar_detail(
     supplier_id: int,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     service: SupplierARService = Depends(get_ar_service)
 ):
     """
     Tek tedarikçinin detaylı cari hesap bilgisini getirir.
+    Hareketlerin ilk sayfası döner; devamı next_cursor ile /transactions'tan.
     """
-    result = service.get_supplier_ar_detail(supplier_id)
+    result = service.get_supplier_ar_detail(supplier_id, limit=limit, cursor=cursor)
     if not result:
         raise HTTPException(status_code=404, detail="Supplier not found")
     return result
@@ -56,16 +75,22 @@ def get_supplier_ar_detail(
 @router.get("/supplier/ar/{supplier_id}/transactions", response_model=list[SupplierTransaction])
 def get_supplier_transactions(
     supplier_id: int,
+    response: Response,
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     service: SupplierARService = Depends(get_ar_service)
 ):
     """
-    Tedarikçinin hareket geçmişini getirir.
+    Tedarikçinin hareket geçmişini getirir (en yeniden eskiye).
+    Sonraki sayfa için X-Next-Cursor başlığındaki değer cursor olarak gönderilir.
     """
-    detail = service.get_supplier_ar_detail(supplier_id)
-    if not detail:
+    result = service.get_transactions(supplier_id, limit=limit, cursor=cursor)
+    if result is None:
         raise HTTPException(status_code=404, detail="Supplier not found")
-    return detail.transactions[:limit]
+
+    transactions, next_cursor = result
+    set_next_cursor(response, next_cursor)
+    return transactions
 
 
 # ============ Payment Endpoints ============
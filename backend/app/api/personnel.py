@@ -1,17 +1,21 @@
 from datetime import date
 from decimal import Decimal
-from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy.orm import joinedload
+from fastapi import APIRouter, HTTPException, Query, Response
 from app.api.deps import DBSession, CurrentBranchContext
+from app.api.loaders import PAYROLL_RESPONSE, reload
 from app.models import Employee, MonthlyPayroll, PartTimeCost
 from app.schemas import (
     EmployeeCreate, EmployeeUpdate, EmployeeResponse,
     MonthlyPayrollCreate, MonthlyPayrollUpdate, MonthlyPayrollResponse, PayrollSummary,
     PartTimeCostCreate, PartTimeCostUpdate, PartTimeCostResponse, PartTimeCostSummary
 )
+from app.utils.pagination import Keyset, set_next_cursor
 
 router = APIRouter(prefix="/personnel", tags=["personnel"])
 
+PAYROLL_KEYSET = Keyset(MonthlyPayroll.payment_date, MonthlyPayroll.id)
+PART_TIME_KEYSET = Keyset(PartTimeCost.cost_date, PartTimeCost.id)
+
 
 # ==================== EMPLOYEES ====================
 
@@ -105,14 +109,17 @@ def delete_employee(employee_id: int, db: DBSession, ctx: CurrentBranchContext):
 def get_payrolls(
     db: DBSession,
     ctx: CurrentBranchContext,
+    response: Response,
     year: int | None = None,
     month: int | None = Query(default=None, ge=1, le=12),
-    employee_id: int | None = None
+    employee_id: int | None = None,
+    limit: int = Query(default=500, ge=1, le=500),
+    cursor: str | None = None
 ):
-    """Maas bordrolarina getir"""
+    """Maas bordrolarina getir (sonraki sayfa: X-Next-Cursor)"""
     query = db.query(MonthlyPayroll).filter(
         MonthlyPayroll.branch_id == ctx.current_branch_id
-    ).options(joinedload(MonthlyPayroll.employee))
+    ).options(*PAYROLL_RESPONSE)
 
     if year:
         query = query.filter(MonthlyPayroll.year == year)
@@ -121,10 +128,9 @@ def get_payrolls(
     if employee_id:
         query = query.filter(MonthlyPayroll.employee_id == employee_id)
 
-    return query.order_by(
-        MonthlyPayroll.payment_date.desc(),
-        MonthlyPayroll.employee_id
-    ).all()
+    payrolls, next_cursor = PAYROLL_KEYSET.page(PAYROLL_KEYSET.apply(query, limit, cursor).all(), limit)
+    set_next_cursor(response, next_cursor)
+    return payrolls
 
 
 @router.post("/payroll", response_model=MonthlyPayrollResponse)
@@ -170,8 +176,7 @@ def create_payroll(data: MonthlyPayrollCreate, db: DBSession, ctx: CurrentBranch
     )
     db.add(payroll)
     db.commit()
-    db.refresh(payroll)
-    return payroll
+    return reload(db, payroll, PAYROLL_RESPONSE)
 
 
 @router.get("/payroll/summary", response_model=PayrollSummary)
@@ -224,7 +229,7 @@ def get_payroll(payroll_id: int, db: DBSession, ctx: CurrentBranchContext):
     payroll = db.query(MonthlyPayroll).filter(
         MonthlyPayroll.id == payroll_id,
         MonthlyPayroll.branch_id == ctx.current_branch_id
-    ).options(joinedload(MonthlyPayroll.employee)).first()
+    ).options(*PAYROLL_RESPONSE).first()
     if not payroll:
         raise HTTPException(status_code=404, detail="Bordro bulunamadi")
     return payroll
@@ -250,8 +255,7 @@ def update_payroll(
         setattr(payroll, field, value)
 
     db.commit()
-    db.refresh(payroll)
-    return payroll
+    return reload(db, payroll, PAYROLL_RESPONSE)
 
 
 @router.delete("/payroll/{payroll_id}")
@@ -275,13 +279,15 @@ def delete_payroll(payroll_id: int, db: DBSession, ctx: CurrentBranchContext):
 def get_part_time_costs(
     db: DBSession,
     ctx: CurrentBranchContext,
+    response: Response,
     month: int | None = Query(default=None, ge=1, le=12),
     year: int | None = None,
     start_date: date | None = None,
     end_date: date | None = None,
-    limit: int = Query(default=50, le=200)
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None
 ):
-    """Part-time personel giderlerini getir"""
+    """Part-time personel giderlerini getir (sonraki sayfa: X-Next-Cursor)"""
     query = db.query(PartTimeCost).filter(PartTimeCost.branch_id == ctx.current_branch_id)
 
     # Ay/yil filtresi
@@ -299,7 +305,9 @@ def get_part_time_costs(
         if end_date:
             query = query.filter(PartTimeCost.cost_date <= end_date)
 
-    return query.order_by(PartTimeCost.cost_date.desc()).limit(limit).all()
+    costs, next_cursor = PART_TIME_KEYSET.page(PART_TIME_KEYSET.apply(query, limit, cursor).all(), limit)
+    set_next_cursor(response, next_cursor)
+    return costs
 
 
 @router.post("/part-time", response_model=PartTimeCostResponse)
@@ -1,13 +1,16 @@
 from datetime import date
 from decimal import Decimal
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from sqlalchemy import func
 from app.api.deps import DBSession, CurrentBranchContext
 from app.models import DailyProduction
 from app.schemas import DailyProductionCreate, DailyProductionResponse, ProductionSummary
+from app.utils.pagination import Keyset, set_next_cursor
 
 router = APIRouter(prefix="/production", tags=["production"])
 
+PRODUCTION_KEYSET = Keyset(DailyProduction.production_date, DailyProduction.id)
+
 
 @router.post("", response_model=DailyProductionResponse)
 def create_production(data: DailyProductionCreate, db: DBSession, ctx: CurrentBranchContext):
@@ -59,12 +62,15 @@ def create_production(data: DailyProductionCreate, db: DBSession, ctx: CurrentBr
 def get_productions(
     db: DBSession,
     ctx: CurrentBranchContext,
+    response: Response,
     start_date: date | None = Query(None),
     end_date: date | None = Query(None),
     month: int | None = Query(None, ge=1, le=12),
-    year: int | None = Query(None, ge=2020, le=2100)
+    year: int | None = Query(None, ge=2020, le=2100),
+    limit: int = Query(default=500, ge=1, le=500),
+    cursor: str | None = None
 ):
-    """Günlük üretim listesi"""
+    """Günlük üretim listesi (sonraki sayfa: X-Next-Cursor)"""
     query = db.query(DailyProduction).filter(
         DailyProduction.branch_id == ctx.current_branch_id
     )
@@ -85,7 +91,8 @@ def get_productions(
         from sqlalchemy import extract
         query = query.filter(extract('year', DailyProduction.production_date) == year)
 
-    productions = query.order_by(DailyProduction.production_date.desc()).all()
+    productions, next_cursor = PRODUCTION_KEYSET.page(PRODUCTION_KEYSET.apply(query, limit, cursor).all(), limit)
+    set_next_cursor(response, next_cursor)
 
     return [
         DailyProductionResponse(
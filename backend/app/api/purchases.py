@@ -1,8 +1,9 @@
 from datetime import date
 from decimal import Decimal
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from sqlalchemy import func
 from app.api.deps import DBSession, CurrentBranchContext
+from app.api.loaders import PURCHASE_RESPONSE, reload
 from app.models import Purchase, PurchaseItem, Supplier, PurchaseProductGroup, PurchaseProduct
 from app.schemas import (
     PurchaseCreate, PurchaseResponse,
@@ -10,9 +11,13 @@ from app.schemas import (
     PurchaseProductGroupResponse, PurchaseProductGroupCreate,
     PurchaseProductResponse, PurchaseProductCreate
 )
+from app.services.catalog_cache import get_catalog
+from app.utils.pagination import Keyset, set_next_cursor
 
 router = APIRouter(prefix="/purchases", tags=["purchases"])
 
+PURCHASE_KEYSET = Keyset(Purchase.purchase_date, Purchase.id)
+
 
 # Suppliers
 @router.get("/suppliers", response_model=list[SupplierResponse])
@@ -77,9 +82,7 @@ def delete_supplier(supplier_id: int, db: DBSession, ctx: CurrentBranchContext):
 @router.get("/product-groups", response_model=list[PurchaseProductGroupResponse])
 def get_product_groups(db: DBSession, ctx: CurrentBranchContext):
     """Ürün gruplarını ürünleriyle birlikte getir"""
-    return db.query(PurchaseProductGroup).filter(
-        PurchaseProductGroup.is_active == True
-    ).order_by(PurchaseProductGroup.display_order).all()
+    return get_catalog(db).active_product_groups
 
 
 @router.post("/product-groups", response_model=PurchaseProductGroupResponse)
@@ -203,20 +206,23 @@ def create_purchase(data: PurchaseCreate, db: DBSession, ctx: CurrentBranchConte
         db.add(item)
 
     db.commit()
-    db.refresh(purchase)
-    return purchase
+    return reload(db, purchase, PURCHASE_RESPONSE)
 
 
 @router.get("", response_model=list[PurchaseResponse])
 def get_purchases(
     db: DBSession,
     ctx: CurrentBranchContext,
+    response: Response,
     start_date: date | None = None,
     end_date: date | None = None,
     supplier_id: int | None = None,
-    limit: int = Query(default=50, le=200)
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None
 ):
-    query = db.query(Purchase).filter(Purchase.branch_id == ctx.current_branch_id)
+    query = db.query(Purchase).filter(
+        Purchase.branch_id == ctx.current_branch_id
+    ).options(*PURCHASE_RESPONSE)
 
     if start_date:
         query = query.filter(Purchase.purchase_date >= start_date)
@@ -225,7 +231,9 @@ def get_purchases(
     if supplier_id:
         query = query.filter(Purchase.supplier_id == supplier_id)
 
-    return query.order_by(Purchase.purchase_date.desc()).limit(limit).all()
+    purchases, next_cursor = PURCHASE_KEYSET.page(PURCHASE_KEYSET.apply(query, limit, cursor).all(), limit)
+    set_next_cursor(response, next_cursor)
+    return purchases
 
 
 @router.get("/today", response_model=list[PurchaseResponse])
@@ -234,7 +242,7 @@ def get_today_purchases(db: DBSession, ctx: CurrentBranchContext):
     return db.query(Purchase).filter(
         Purchase.branch_id == ctx.current_branch_id,
         Purchase.purchase_date == today
-    ).order_by(Purchase.created_at.desc()).all()
+    ).options(*PURCHASE_RESPONSE).order_by(Purchase.created_at.desc()).all()
 
 
 @router.get("/{purchase_id}", response_model=PurchaseResponse)
@@ -242,7 +250,7 @@ def get_purchase(purchase_id: int, db: DBSession, ctx: CurrentBranchContext):
     purchase = db.query(Purchase).filter(
         Purchase.id == purchase_id,
         Purchase.branch_id == ctx.current_branch_id
-    ).first()
+    ).options(*PURCHASE_RESPONSE).first()
     if not purchase:
         raise HTTPException(status_code=404, detail="Alim bulunamadi")
     return purchase
@@ -292,8 +300,7 @@ def update_purchase(purchase_id: int, data: PurchaseCreate, db: DBSession, ctx:
     purchase.total = total
 
     db.commit()
-    db.refresh(purchase)
-    return purchase
+    return reload(db, purchase, PURCHASE_RESPONSE)
 
 
 @router.delete("/{purchase_id}")
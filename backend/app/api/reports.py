@@ -1,44 +1,152 @@
+from collections import namedtuple
 from datetime import date, timedelta, datetime
 from decimal import Decimal
 from calendar import monthrange
 from enum import Enum
-import csv
-import io
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy import func, and_, case
-from openpyxl import Workbook
-from app.api.deps import DBSession, CurrentBranchContext
-from app.models import Purchase, Expense, DailyProduction, StaffMeal, OnlineSale, OnlinePlatform, CourierExpense, PartTimeCost, CashDifference
-from app.schemas import DashboardStats, BilancoStats, DaySummary, ComparisonResponse, BilancoPeriodData, RevenueBreakdown, ExpenseBreakdown, DashboardComparisonResponse, ComparisonMetric, AnalyticsEnvelope, AnalyticsMeta, AnalyticsSummary, AnalyticsData, DailySalesRecord
+from sqlalchemy import func, case, select, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import DBSession, AsyncDBSession, CurrentBranchContext
+from app.models import Purchase, Expense, DailyProduction, StaffMeal, OnlineSale, CourierExpense, PartTimeCost, CashDifference, DailySummary
+from app.schemas import DashboardStats, BilancoStats, DaySummary, ComparisonResponse, BilancoPeriodData, RevenueBreakdown, ExpenseBreakdown, DashboardComparisonResponse, ComparisonMetric, AnalyticsEnvelope, AnalyticsMeta, AnalyticsSummary, AnalyticsData, DailySalesRecord, ConsolidatedReport
+from app.services.consolidated_report import consolidated_report
+from app.services.daily_summary_service import fetch_daily_summaries, sync_pending_daily_summaries
+from app.services.export_service import iter_analytics_rows, stream_csv, stream_excel
+from app.services.catalog_cache import Catalog, get_catalog, get_catalog_cache
+from app.report_cache import get_report_cache
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
 
+ChannelTotal = namedtuple("ChannelTotal", "channel_type name total")
+
+
+def platform_totals_statement(branch_id: int, start_date: date, end_date: date) -> Select:
+    """Platform bazında satış toplamları; platform adı/kanal tipi catalog cache'ten eklenir"""
+    return select(
+        OnlineSale.platform_id,
+        func.sum(OnlineSale.amount).label('total')
+    ).where(
+        OnlineSale.branch_id == branch_id,
+        OnlineSale.sale_date >= start_date,
+        OnlineSale.sale_date <= end_date
+    ).group_by(
+        OnlineSale.platform_id
+    )
+
+
+def channel_totals(catalog: Catalog, platform_rows) -> list[ChannelTotal]:
+    """
+    Aktif platformlar için (channel_type, name) bazında toplamlar.
+    Satışı olmayan platform 0 ile gelir (eski OUTER JOIN davranışı).
+    """
+    totals = {row.platform_id: row.total for row in platform_rows}
+    grouped: dict[tuple[str, str], Decimal] = {}
+    for platform in catalog.active_platforms:
+        key = (platform.channel_type, platform.name)
+        grouped[key] = grouped.get(key, Decimal("0")) + Decimal(str(totals.get(platform.id) or 0))
+    return [ChannelTotal(channel_type, name, total) for (channel_type, name), total in grouped.items()]
+
+
+def dashboard_statements(branch_id: int, today: date) -> tuple[Select, Select]:
+    """
+    Dashboard verisi için 2 statement (önceden ~14 query).
+    Sync (DBSession) ve async (AsyncDBSession) yollar aynı statement'ları çalıştırır.
+
+    1. Bugünün platform bazında satışları (platform bilgisi catalog cache'ten)
+    2. daily_summaries rollup'ından son 7 gün tek range scan ile +
+       bugünün üretim kilosu (scalar subquery)
+    """
+    week_start = today - timedelta(days=6)
+
+    # Statement 1: bugünün platform satışları
+    platform_stmt = platform_totals_statement(branch_id, today, today)
+
+    # Statement 2: 7 günlük rollup + bugünün yoğrulan kilosu
+    production_kg = select(
+        func.coalesce(func.sum(DailyProduction.kneaded_kg), 0)
+    ).where(
+        DailyProduction.branch_id == branch_id,
+        DailyProduction.production_date == today
+    ).scalar_subquery()
+
+    rollup_stmt = select(DailySummary, production_kg).where(
+        DailySummary.branch_id == branch_id,
+        DailySummary.summary_date >= week_start,
+        DailySummary.summary_date <= today
+    )
+
+    return platform_stmt, rollup_stmt
+
+
+def dashboard_snapshot_from_rows(catalog: Catalog, platform_rows, rollup_rows, today: date) -> dict:
+    """
+    Returns:
+        {"channels": [(channel_type, name, total)], "days": {date: DailySummary|None},
+         "production_kg": Decimal}
+    """
+    week_start = today - timedelta(days=6)
+    days = {week_start + timedelta(days=i): None for i in range(7)}
+    today_production_kg = Decimal("0")
+    for summary, kg in rollup_rows:
+        days[summary.summary_date] = summary
+        today_production_kg = Decimal(str(kg or 0))
+
+    # Üretim kaydı rollup satırı da oluşturur; satır yoksa üretim de yoktur
+    return {
+        "channels": channel_totals(catalog, platform_rows),
+        "days": days,
+        "production_kg": today_production_kg
+    }
+
+
+def fetch_dashboard_snapshot(db: DBSession, branch_id: int, today: date) -> dict:
+    """Dashboard verilerini sync session ile çeker"""
+    sync_pending_daily_summaries(db)
+    catalog = get_catalog(db)
+    platform_stmt, rollup_stmt = dashboard_statements(branch_id, today)
+    return dashboard_snapshot_from_rows(
+        catalog,
+        db.execute(platform_stmt).all(),
+        db.execute(rollup_stmt).all(),
+        today
+    )
+
+
+async def fetch_dashboard_snapshot_async(db: AsyncSession, branch_id: int, today: date) -> dict:
+    """Dashboard verilerini async session ile çeker (yeni session, bekleyen yazma yok)"""
+    catalog = await get_catalog_cache().aget(db)
+    platform_stmt, rollup_stmt = dashboard_statements(branch_id, today)
+    platform_rows = (await db.execute(platform_stmt)).all()
+    rollup_rows = (await db.execute(rollup_stmt)).all()
+    return dashboard_snapshot_from_rows(catalog, platform_rows, rollup_rows, today)
+
+
 @router.get("/dashboard", response_model=DashboardStats)
-def get_dashboard_stats(db: DBSession, ctx: CurrentBranchContext):
+async def get_dashboard_stats(db: AsyncDBSession, ctx: CurrentBranchContext):
     today = date.today()
     branch_id = ctx.current_branch_id
 
-    # Tüm kanalları ve bugünün satışlarını çek
-    channel_sales = db.query(
-        OnlinePlatform.channel_type,
-        OnlinePlatform.name,
-        func.coalesce(func.sum(OnlineSale.amount), 0).label('total')
-    ).outerjoin(
-        OnlineSale,
-        and_(
-            OnlineSale.platform_id == OnlinePlatform.id,
-            OnlineSale.branch_id == branch_id,
-            OnlineSale.sale_date == today
-        )
-    ).filter(
-        OnlinePlatform.is_active == True
-    ).group_by(
-        OnlinePlatform.channel_type,
-        OnlinePlatform.name
-    ).all()
+    return await get_report_cache().aget_or_compute(
+        "dashboard", branch_id, {"today": today},
+        [(today - timedelta(days=6), today)],
+        lambda: build_dashboard_stats_async(db, branch_id, today)
+    )
+
 
+def build_dashboard_stats(db: DBSession, branch_id: int, today: date) -> DashboardStats:
+    """Dashboard istatistiklerini hesapla - sync session"""
+    return dashboard_stats_from_snapshot(fetch_dashboard_snapshot(db, branch_id, today), today)
+
+
+async def build_dashboard_stats_async(db: AsyncSession, branch_id: int, today: date) -> DashboardStats:
+    """Dashboard istatistiklerini hesapla - async session (cache miss)"""
+    return dashboard_stats_from_snapshot(await fetch_dashboard_snapshot_async(db, branch_id, today), today)
+
+
+def dashboard_stats_from_snapshot(snapshot: dict, today: date) -> DashboardStats:
+    """Snapshot'tan DashboardStats üret (sync/async ortak)"""
     # Kanal tipine göre toplamlar
     today_salon = Decimal("0")
     today_telefon = Decimal("0")
@@ -46,12 +154,12 @@ def get_dashboard_stats(db: DBSession, ctx: CurrentBranchContext):
     online_breakdown = {}
     online_platform_count = 0
 
-    for sale in channel_sales:
+    for sale in snapshot["channels"]:
         amount = Decimal(str(sale.total))
         if sale.channel_type == 'pos_visa':
-            today_salon = amount
+            today_salon += amount
         elif sale.channel_type == 'pos_nakit':
-            today_telefon = amount
+            today_telefon += amount
         elif sale.channel_type == 'online':
             if amount > 0:
                 online_breakdown[sale.name] = amount
@@ -61,75 +169,40 @@ def get_dashboard_stats(db: DBSession, ctx: CurrentBranchContext):
     # Toplam satış
     today_total_sales = today_salon + today_telefon + today_online
 
-    # Bugünün mal alımları
-    today_purchases = db.query(func.coalesce(func.sum(Purchase.total), 0)).filter(
-        Purchase.branch_id == branch_id,
-        Purchase.purchase_date == today
-    ).scalar()
+    # Bugünün giderleri (rollup)
+    today_summary = snapshot["days"][today]
 
-    # Bugünün giderleri
-    today_expenses = db.query(func.coalesce(func.sum(Expense.amount), 0)).filter(
-        Expense.branch_id == branch_id,
-        Expense.expense_date == today
-    ).scalar()
+    def today_value(field: str) -> Decimal:
+        return Decimal(str(getattr(today_summary, field) or 0)) if today_summary else Decimal("0")
 
-    # Bugünün kurye giderleri (KDV dahil: amount + amount * vat_rate / 100)
-    today_courier_expense = db.query(
-        func.coalesce(func.sum(CourierExpense.amount + CourierExpense.amount * CourierExpense.vat_rate / 100), 0)
-    ).filter(
-        CourierExpense.branch_id == branch_id,
-        CourierExpense.expense_date == today
-    ).scalar()
-    today_courier_cost = Decimal(str(today_courier_expense))
-
-    # Bugünün part-time giderleri
-    today_part_time_expense = db.query(func.coalesce(func.sum(PartTimeCost.amount), 0)).filter(
-        PartTimeCost.branch_id == branch_id,
-        PartTimeCost.cost_date == today
-    ).scalar()
-    today_part_time_cost = Decimal(str(today_part_time_expense))
-
-    # Bugünün personel yemekleri
-    today_staff_meal = db.query(StaffMeal).filter(
-        StaffMeal.branch_id == branch_id,
-        StaffMeal.meal_date == today
-    ).first()
-    today_staff_meals = today_staff_meal.total if today_staff_meal else Decimal("0")
+    today_purchases = today_value("total_purchases")
+    today_expenses = today_value("total_expenses")
+    today_courier_cost = today_value("total_courier")  # KDV dahil
+    today_part_time_cost = today_value("total_part_time")
+    today_staff_meals = today_value("total_staff_meals")
 
     # Bugünün karı
     today_profit = (
-        today_total_sales 
-        - Decimal(str(today_purchases)) 
-        - Decimal(str(today_expenses)) 
+        today_total_sales
+        - today_purchases
+        - today_expenses
         - today_staff_meals
         - today_courier_cost
         - today_part_time_cost
     )
 
     # Bugünün üretimi
-    today_production = db.query(DailyProduction).filter(
-        DailyProduction.branch_id == branch_id,
-        DailyProduction.production_date == today
-    ).first()
-
-    today_production_kg = Decimal("0")
-    today_production_cost = Decimal("0")
-    if today_production:
-        today_production_kg = today_production.kneaded_kg or Decimal("0")
-        today_production_cost = today_production.total_cost or Decimal("0")
+    today_production_kg = snapshot["production_kg"]
+    today_production_cost = today_value("total_production")
 
     # Son 7 günlük satış trendi (tüm kanalların toplamı)
     week_sales = []
-    for i in range(6, -1, -1):
-        day = today - timedelta(days=i)
-        day_total = db.query(func.coalesce(func.sum(OnlineSale.amount), 0)).filter(
-            OnlineSale.branch_id == branch_id,
-            OnlineSale.sale_date == day
-        ).scalar()
+    for day, summary in snapshot["days"].items():
+        day_total = summary.total_sales if summary else 0
         week_sales.append({
             "date": day.isoformat(),
             "day": day.strftime("%a"),
-            "sales": float(day_total)
+            "sales": float(day_total or 0)
         })
 
     return DashboardStats(
@@ -139,8 +212,8 @@ def get_dashboard_stats(db: DBSession, ctx: CurrentBranchContext):
         today_total_sales=today_total_sales,
         online_breakdown=online_breakdown,
         online_platform_count=online_platform_count,
-        today_purchases=Decimal(str(today_purchases)),
-        today_expenses=Decimal(str(today_expenses)),
+        today_purchases=today_purchases,
+        today_expenses=today_expenses,
         today_staff_meals=today_staff_meals,
         today_courier_cost=today_courier_cost,
         today_part_time_cost=today_part_time_cost,
@@ -166,51 +239,17 @@ def get_daily_summary(
     if not end_date:
         end_date = date.today()
 
-    results = []
-    current = start_date
-
-    while current <= end_date:
-        # O günün satışları (kanal tipine göre)
-        day_sales_query = db.query(
-            OnlinePlatform.channel_type,
-            func.coalesce(func.sum(OnlineSale.amount), 0).label('total')
-        ).outerjoin(
-            OnlineSale,
-            and_(
-                OnlineSale.platform_id == OnlinePlatform.id,
-                OnlineSale.branch_id == branch_id,
-                OnlineSale.sale_date == current
-            )
-        ).group_by(OnlinePlatform.channel_type).all()
-
-        day_salon = Decimal("0")
-        day_telefon = Decimal("0")
-        day_online = Decimal("0")
-
-        for row in day_sales_query:
-            amount = Decimal(str(row.total))
-            if row.channel_type == 'pos_visa':
-                day_salon = amount
-            elif row.channel_type == 'pos_nakit':
-                day_telefon = amount
-            elif row.channel_type == 'online':
-                day_online = amount
+    # daily_summaries rollup: tek range scan
+    daily_data = fetch_daily_data(db, branch_id, start_date, end_date)
 
+    results = []
+    for current, data in daily_data.items():
+        day_salon = data["visa"]
+        day_telefon = data["nakit"]
+        day_online = data["online"]
         day_total = day_salon + day_telefon + day_online
 
-        # O günün alımları
-        day_purchases = db.query(func.coalesce(func.sum(Purchase.total), 0)).filter(
-            Purchase.branch_id == branch_id,
-            Purchase.purchase_date == current
-        ).scalar()
-
-        # O günün giderleri
-        day_expenses = db.query(func.coalesce(func.sum(Expense.amount), 0)).filter(
-            Expense.branch_id == branch_id,
-            Expense.expense_date == current
-        ).scalar()
-
-        day_profit = float(day_total) - float(day_purchases) - float(day_expenses)
+        day_profit = float(day_total) - float(data["purchases"]) - float(data["expenses"])
 
         results.append({
             "date": current.isoformat(),
@@ -218,13 +257,11 @@ def get_daily_summary(
             "salon": float(day_salon),
             "telefon": float(day_telefon),
             "online": float(day_online),
-            "purchases": float(day_purchases),
-            "expenses": float(day_expenses),
+            "purchases": float(data["purchases"]),
+            "expenses": float(data["expenses"]),
             "profit": day_profit
         })
 
-        current += timedelta(days=1)
-
     return results
 
 
@@ -241,22 +278,10 @@ def fetch_channel_breakdown(db: DBSession, branch_id: int, start_date: date, end
     Returns:
         {"visa": Decimal, "nakit": Decimal, "online": Decimal}
     """
-    channel_sales = db.query(
-        OnlinePlatform.channel_type,
-        func.coalesce(func.sum(OnlineSale.amount), 0).label('total')
-    ).outerjoin(
-        OnlineSale,
-        and_(
-            OnlineSale.platform_id == OnlinePlatform.id,
-            OnlineSale.branch_id == branch_id,
-            OnlineSale.sale_date >= start_date,
-            OnlineSale.sale_date <= end_date
-        )
-    ).filter(
-        OnlinePlatform.is_active == True
-    ).group_by(
-        OnlinePlatform.channel_type
-    ).all()
+    channel_sales = channel_totals(
+        get_catalog(db),
+        db.execute(platform_totals_statement(branch_id, start_date, end_date)).all()
+    )
 
     breakdown = {
         "visa": Decimal("0"),
@@ -267,11 +292,11 @@ def fetch_channel_breakdown(db: DBSession, branch_id: int, start_date: date, end
     for row in channel_sales:
         amount = Decimal(str(row.total))
         if row.channel_type == 'pos_visa':
-            breakdown["visa"] = amount
+            breakdown["visa"] += amount
         elif row.channel_type == 'pos_nakit':
-            breakdown["nakit"] = amount
+            breakdown["nakit"] += amount
         elif row.channel_type == 'online':
-            breakdown["online"] = amount
+            breakdown["online"] += amount
 
     return breakdown
 
@@ -289,60 +314,22 @@ def fetch_expense_breakdown(db: DBSession, branch_id: int, start_date: date, end
             "uretim": Decimal      # Production costs
         }
     """
-    # Mal Alımı (Purchases)
-    purchases = db.query(func.coalesce(func.sum(Purchase.total), 0)).filter(
-        Purchase.branch_id == branch_id,
-        Purchase.purchase_date >= start_date,
-        Purchase.purchase_date <= end_date
-    ).scalar()
-
-    # İşletme Giderleri (Expenses)
-    expenses = db.query(func.coalesce(func.sum(Expense.amount), 0)).filter(
-        Expense.branch_id == branch_id,
-        Expense.expense_date >= start_date,
-        Expense.expense_date <= end_date
-    ).scalar()
-
-    # Personel Yemekleri (Staff meals) - total is a calculated property: unit_price * staff_count
-    staff_meals = db.query(func.coalesce(func.sum(StaffMeal.unit_price * StaffMeal.staff_count), 0)).filter(
-        StaffMeal.branch_id == branch_id,
-        StaffMeal.meal_date >= start_date,
-        StaffMeal.meal_date <= end_date
-    ).scalar()
-
-    # Kurye Giderleri (KDV dahil: amount + amount * vat_rate / 100)
-    courier = db.query(
-        func.coalesce(func.sum(CourierExpense.amount + CourierExpense.amount * CourierExpense.vat_rate / 100), 0)
+    sync_pending_daily_summaries(db)
+
+    totals = db.query(
+        func.coalesce(func.sum(DailySummary.total_purchases), 0),
+        func.coalesce(func.sum(DailySummary.total_expenses), 0),
+        func.coalesce(func.sum(DailySummary.total_staff_meals), 0),
+        func.coalesce(func.sum(DailySummary.total_courier), 0),
+        func.coalesce(func.sum(DailySummary.total_part_time), 0),
+        func.coalesce(func.sum(DailySummary.total_production), 0)
     ).filter(
-        CourierExpense.branch_id == branch_id,
-        CourierExpense.expense_date >= start_date,
-        CourierExpense.expense_date <= end_date
-    ).scalar()
-
-    # Part-Time Giderleri
-    parttime = db.query(func.coalesce(func.sum(PartTimeCost.amount), 0)).filter(
-        PartTimeCost.branch_id == branch_id,
-        PartTimeCost.cost_date >= start_date,
-        PartTimeCost.cost_date <= end_date
-    ).scalar()
+        DailySummary.branch_id == branch_id,
+        DailySummary.summary_date >= start_date,
+        DailySummary.summary_date <= end_date
+    ).one()
 
-    # Üretim Maliyetleri (Production costs) - total_cost is a property: (kneaded_kg / legen_kg) * legen_cost
-    # Calculate in SQL using case to handle division by zero
-    production = db.query(
-        func.coalesce(
-            func.sum(
-                case(
-                    (DailyProduction.legen_kg > 0, DailyProduction.kneaded_kg / DailyProduction.legen_kg * DailyProduction.legen_cost),
-                    else_=0
-                )
-            ),
-            0
-        )
-    ).filter(
-        DailyProduction.branch_id == branch_id,
-        DailyProduction.production_date >= start_date,
-        DailyProduction.production_date <= end_date
-    ).scalar()
+    purchases, expenses, staff_meals, courier, parttime, production = totals
 
     return {
         "mal_alimi": Decimal(str(purchases)),
@@ -357,12 +344,16 @@ def fetch_expense_breakdown(db: DBSession, branch_id: int, start_date: date, end
 def fetch_daily_data(db: DBSession, branch_id: int, start_date: date, end_date: date) -> dict:
     """
     Belirli bir tarih aralığı için tüm günlük verileri tek seferde çeker.
-    ~200 query yerine 7 query kullanır (batch optimization).
+    daily_summaries rollup tablosundan tek bir range scan ile okunur
+    (bkz. app/services/daily_summary_service.py).
 
     Returns:
         {
             date: {
                 "revenue": Decimal,
+                "visa": Decimal,
+                "nakit": Decimal,
+                "online": Decimal,
                 "purchases": Decimal,
                 "expenses": Decimal,
                 "courier": Decimal,
@@ -372,115 +363,7 @@ def fetch_daily_data(db: DBSession, branch_id: int, start_date: date, end_date:
             }
         }
     """
-    result = {}
-
-    # Initialize all dates with zeros
-    current = start_date
-    while current <= end_date:
-        result[current] = {
-            "revenue": Decimal("0"),
-            "purchases": Decimal("0"),
-            "expenses": Decimal("0"),
-            "courier": Decimal("0"),
-            "parttime": Decimal("0"),
-            "staff": Decimal("0"),
-            "production": Decimal("0")
-        }
-        current += timedelta(days=1)
-
-    # Query 1: Revenue (OnlineSale)
-    revenue_rows = db.query(
-        OnlineSale.sale_date,
-        func.sum(OnlineSale.amount)
-    ).filter(
-        OnlineSale.branch_id == branch_id,
-        OnlineSale.sale_date >= start_date,
-        OnlineSale.sale_date <= end_date
-    ).group_by(OnlineSale.sale_date).all()
-
-    for row in revenue_rows:
-        if row[0] in result:
-            result[row[0]]["revenue"] = Decimal(str(row[1] or 0))
-
-    # Query 2: Purchases
-    purchase_rows = db.query(
-        Purchase.purchase_date,
-        func.sum(Purchase.total)
-    ).filter(
-        Purchase.branch_id == branch_id,
-        Purchase.purchase_date >= start_date,
-        Purchase.purchase_date <= end_date
-    ).group_by(Purchase.purchase_date).all()
-
-    for row in purchase_rows:
-        if row[0] in result:
-            result[row[0]]["purchases"] = Decimal(str(row[1] or 0))
-
-    # Query 3: Expenses
-    expense_rows = db.query(
-        Expense.expense_date,
-        func.sum(Expense.amount)
-    ).filter(
-        Expense.branch_id == branch_id,
-        Expense.expense_date >= start_date,
-        Expense.expense_date <= end_date
-    ).group_by(Expense.expense_date).all()
-
-    for row in expense_rows:
-        if row[0] in result:
-            result[row[0]]["expenses"] = Decimal(str(row[1] or 0))
-
-    # Query 4: Courier (KDV dahil: amount + amount * vat_rate / 100)
-    courier_rows = db.query(
-        CourierExpense.expense_date,
-        func.sum(CourierExpense.amount + CourierExpense.amount * CourierExpense.vat_rate / 100)
-    ).filter(
-        CourierExpense.branch_id == branch_id,
-        CourierExpense.expense_date >= start_date,
-        CourierExpense.expense_date <= end_date
-    ).group_by(CourierExpense.expense_date).all()
-
-    for row in courier_rows:
-        if row[0] in result:
-            result[row[0]]["courier"] = Decimal(str(row[1] or 0))
-
-    # Query 5: Part-time
-    parttime_rows = db.query(
-        PartTimeCost.cost_date,
-        func.sum(PartTimeCost.amount)
-    ).filter(
-        PartTimeCost.branch_id == branch_id,
-        PartTimeCost.cost_date >= start_date,
-        PartTimeCost.cost_date <= end_date
-    ).group_by(PartTimeCost.cost_date).all()
-
-    for row in parttime_rows:
-        if row[0] in result:
-            result[row[0]]["parttime"] = Decimal(str(row[1] or 0))
-
-    # Query 6: Staff meals
-    staff_rows = db.query(StaffMeal).filter(
-        StaffMeal.branch_id == branch_id,
-        StaffMeal.meal_date >= start_date,
-        StaffMeal.meal_date <= end_date
-    ).all()
-
-    for row in staff_rows:
-        if row.meal_date in result:
-            result[row.meal_date]["staff"] = row.total or Decimal("0")
-
-    # Query 7: Production (Üretim/Leğen)
-    production_rows = db.query(DailyProduction).filter(
-        DailyProduction.branch_id == branch_id,
-        DailyProduction.production_date >= start_date,
-        DailyProduction.production_date <= end_date
-    ).all()
-
-    for row in production_rows:
-        if row.production_date in result:
-            result[row.production_date]["production"] = row.total_cost or Decimal("0")
-
-    return result
+    return fetch_daily_summaries(db, branch_id, start_date, end_date)
 
 
 def get_day_total_expenses(data: dict) -> Decimal:
@@ -497,12 +380,26 @@ def get_bilanco_stats(db: DBSession, ctx: CurrentBranchContext):
     """
     Bilanço dashboard - Dün, Bu Hafta, Bu Ay özeti
 
-    Performance: 6 batch queries (optimized from ~200 individual queries)
+    Performance: tek daily_summaries range scan (optimized from ~200 individual queries)
     """
     today = date.today()
+    branch_id = ctx.current_branch_id
+
+    # Geçen ayın başından (veya 2 hafta öncesinden) bugüne kadar olan veriyi kullanır
+    last_month_start = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+    range_start = min(last_month_start, today - timedelta(days=14))
+
+    return get_report_cache().get_or_compute(
+        "bilanco", branch_id, {"today": today},
+        [(range_start, today)],
+        lambda: build_bilanco_stats(db, branch_id, today)
+    )
+
+
+def build_bilanco_stats(db: DBSession, branch_id: int, today: date) -> BilancoStats:
+    """Bilanço istatistiklerini hesapla (cache miss)"""
     yesterday = today - timedelta(days=1)
     day_before_yesterday = today - timedelta(days=2)
-    branch_id = ctx.current_branch_id
 
     # Tarih aralıklarını hesapla (Hafta: Pazartesi-Pazar)
     days_since_monday = today.weekday()
@@ -544,7 +441,7 @@ def get_bilanco_stats(db: DBSession, ctx: CurrentBranchContext):
     min_date = min(last_week_start, last_month_start, day_before_yesterday)
     max_date = today  # Include today
 
-    # BATCH QUERY: Tüm verileri tek seferde çek (6 query)
+    # BATCH QUERY: Tüm verileri tek seferde çek (daily_summaries rollup)
     daily_data = fetch_daily_data(db, branch_id, min_date, max_date)
 
     # ===== BUGÜN =====
@@ -560,23 +457,10 @@ def get_bilanco_stats(db: DBSession, ctx: CurrentBranchContext):
     today_day_name = TURKISH_DAYS[today.weekday()]
 
     # Bugün kanal bazlı detay (Visa, Nakit, Online platformlar)
-    today_channel_sales = db.query(
-        OnlinePlatform.name,
-        OnlinePlatform.channel_type,
-        func.coalesce(func.sum(OnlineSale.amount), 0).label('total')
-    ).outerjoin(
-        OnlineSale,
-        and_(
-            OnlineSale.platform_id == OnlinePlatform.id,
-            OnlineSale.branch_id == branch_id,
-            OnlineSale.sale_date == today
-        )
-    ).filter(
-        OnlinePlatform.is_active == True
-    ).group_by(
-        OnlinePlatform.name,
-        OnlinePlatform.channel_type
-    ).all()
+    today_channel_sales = channel_totals(
+        get_catalog(db),
+        db.execute(platform_totals_statement(branch_id, today, today)).all()
+    )
 
     today_breakdown = {
         "visa": Decimal("0"),
@@ -593,9 +477,9 @@ def get_bilanco_stats(db: DBSession, ctx: CurrentBranchContext):
     for row in today_channel_sales:
         amount = Decimal(str(row.total))
         if row.channel_type == 'pos_visa':
-            today_breakdown["visa"] = amount
+            today_breakdown["visa"] += amount
         elif row.channel_type == 'pos_nakit':
-            today_breakdown["nakit"] = amount
+            today_breakdown["nakit"] += amount
         elif row.channel_type == 'online':
             today_breakdown["online"] += amount
 
@@ -891,24 +775,10 @@ def get_period_data(db: DBSession, branch_id: int, start_date: date, end_date: d
     Returns dict with all period data for comparison.
     """
     # Get revenue breakdown by channel
-    channel_sales = db.query(
-        OnlinePlatform.name,
-        OnlinePlatform.channel_type,
-        func.coalesce(func.sum(OnlineSale.amount), 0).label('total')
-    ).outerjoin(
-        OnlineSale,
-        and_(
-            OnlineSale.platform_id == OnlinePlatform.id,
-            OnlineSale.branch_id == branch_id,
-            OnlineSale.sale_date >= start_date,
-            OnlineSale.sale_date <= end_date
-        )
-    ).filter(
-        OnlinePlatform.is_active == True
-    ).group_by(
-        OnlinePlatform.name,
-        OnlinePlatform.channel_type
-    ).all()
+    channel_sales = channel_totals(
+        get_catalog(db),
+        db.execute(platform_totals_statement(branch_id, start_date, end_date)).all()
+    )
 
     revenue_breakdown = {
         "visa": Decimal("0"),
@@ -923,9 +793,9 @@ def get_period_data(db: DBSession, branch_id: int, start_date: date, end_date: d
     for sale in channel_sales:
         amount = Decimal(str(sale.total))
         if sale.channel_type == 'pos_visa':
-            revenue_breakdown["visa"] = amount
+            revenue_breakdown["visa"] += amount
         elif sale.channel_type == 'pos_nakit':
-            revenue_breakdown["nakit"] = amount
+            revenue_breakdown["nakit"] += amount
         elif sale.channel_type == 'online':
             revenue_breakdown["online"] += amount
             # Track individual platforms - accumulate each platform's sales
@@ -946,68 +816,10 @@ def get_period_data(db: DBSession, branch_id: int, start_date: date, end_date: d
         revenue_breakdown["online"]
     )
 
-    # Get expense breakdown
-    # Mal Alımı (Purchases)
-    purchases = db.query(func.coalesce(func.sum(Purchase.total), 0)).filter(
-        Purchase.branch_id == branch_id,
-        Purchase.purchase_date >= start_date,
-        Purchase.purchase_date <= end_date
-    ).scalar()
-
-    # İşletme Giderleri (Expenses)
-    expenses = db.query(func.coalesce(func.sum(Expense.amount), 0)).filter(
-        Expense.branch_id == branch_id,
-        Expense.expense_date >= start_date,
-        Expense.expense_date <= end_date
-    ).scalar()
-
-    # Personel Yemekleri (Staff meals)
-    staff_meals = db.query(func.coalesce(func.sum(StaffMeal.unit_price * StaffMeal.staff_count), 0)).filter(
-        StaffMeal.branch_id == branch_id,
-        StaffMeal.meal_date >= start_date,
-        StaffMeal.meal_date <= end_date
-    ).scalar()
-
-    # Kurye Giderleri (KDV dahil)
-    courier = db.query(
-        func.coalesce(func.sum(CourierExpense.amount + CourierExpense.amount * CourierExpense.vat_rate / 100), 0)
-    ).filter(
-        CourierExpense.branch_id == branch_id,
-        CourierExpense.expense_date >= start_date,
-        CourierExpense.expense_date <= end_date
-    ).scalar()
-
-    # Part-Time Giderleri
-    parttime = db.query(func.coalesce(func.sum(PartTimeCost.amount), 0)).filter(
-        PartTimeCost.branch_id == branch_id,
-        PartTimeCost.cost_date >= start_date,
-        PartTimeCost.cost_date <= end_date
-    ).scalar()
-
-    # Üretim Maliyetleri
-    production = db.query(
-        func.coalesce(
-            func.sum(
-                case(
-                    (DailyProduction.legen_kg > 0, DailyProduction.kneaded_kg / DailyProduction.legen_kg * DailyProduction.legen_cost),
-                    else_=0
-                )
-            ),
-            0
-        )
-    ).filter(
-        DailyProduction.branch_id == branch_id,
-        DailyProduction.production_date >= start_date,
-        DailyProduction.production_date <= end_date
-    ).scalar()
-
+    # Get expense breakdown (daily_summaries rollup)
     expense_breakdown = {
-        "mal_alimi": float(Decimal(str(purchases))),
-        "gider": float(Decimal(str(expenses))),
-        "staff": float(Decimal(str(staff_meals))),
-        "kurye": float(Decimal(str(courier))),
-        "parttime": float(Decimal(str(parttime))),
-        "uretim": float(Decimal(str(production)))
+        key: float(value)
+        for key, value in fetch_expense_breakdown(db, branch_id, start_date, end_date).items()
     }
 
     total_expenses = sum(expense_breakdown.values())
@@ -1141,6 +953,21 @@ def get_dashboard_comparison(
     else:
         raise HTTPException(status_code=400, detail=f"Invalid compare_to value: {compare_to}")
 
+    return get_report_cache().get_or_compute(
+        "dashboard-comparison", branch_id,
+        {"current_date": current_date, "compare_date": compare_date},
+        [(current_date, current_date), (compare_date, compare_date)],
+        lambda: build_dashboard_comparison(db, branch_id, current_date, compare_date)
+    )
+
+
+def build_dashboard_comparison(
+    db: DBSession,
+    branch_id: int,
+    current_date: date,
+    compare_date: date
+) -> DashboardComparisonResponse:
+    """Satış/gider karşılaştırmasını hesapla (cache miss)"""
     # Get current date sales (all channels: pos_visa, pos_nakit, online)
     # NOTE: OnlineSale table contains ALL sales channels, not just "online" ones.
     # The name is historical - it stores Salon (pos_visa), Nakit (pos_nakit), and Online sales.
@@ -1268,6 +1095,16 @@ def get_daily_sales_analytics(
     """
     branch_id = ctx.current_branch_id
 
+    return get_report_cache().get_or_compute(
+        "daily-sales-analytics", branch_id,
+        {"start_date": start_date, "end_date": end_date},
+        [(start_date, end_date)],
+        lambda: build_daily_sales_analytics(db, branch_id, start_date, end_date)
+    )
+
+
+def build_daily_sales_analytics(db: DBSession, branch_id: int, start_date: date, end_date: date) -> AnalyticsEnvelope:
+    """Kasa farkı analitiğini hesapla (cache miss)"""
     # Query cash differences for the date range
     records = db.query(CashDifference).filter(
         CashDifference.branch_id == branch_id,
@@ -1341,7 +1178,8 @@ def export_daily_sales_analytics(
     ctx: CurrentBranchContext,
     start_date: date,
     end_date: date,
-    format: ExportFormat = Query(default=ExportFormat.csv)
+    format: ExportFormat = Query(default=ExportFormat.csv),
+    all_branches: bool = Query(default=False, description="Erisilebilen tum subeler tek dosyada")
 ):
     """
     Export daily sales analytics as CSV or Excel file.
@@ -1350,58 +1188,24 @@ def export_daily_sales_analytics(
     - CSV: text/csv with UTF-8 encoding
     - Excel: application/vnd.openxmlformats-officedocument.spreadsheetml.sheet
 
+    Rows are streamed (yield_per + chunked writers), so memory does not grow
+    with the date range. all_branches=true exports every accessible branch
+    with branch_id / branch_code columns.
+
     Returns StreamingResponse with Content-Disposition for file download.
     """
-    branch_id = ctx.current_branch_id
-
-    # Query cash differences for the date range (same as analytics endpoint)
-    records = db.query(CashDifference).filter(
-        CashDifference.branch_id == branch_id,
-        CashDifference.difference_date >= start_date,
-        CashDifference.difference_date <= end_date
-    ).order_by(CashDifference.difference_date).all()
-
-    # Prepare data rows
-    headers = [
-        "date", "kasa_visa", "kasa_nakit", "kasa_trendyol", "kasa_getir",
-        "kasa_yemeksepeti", "kasa_migros", "kasa_total",
-        "pos_visa", "pos_nakit", "pos_trendyol", "pos_getir",
-        "pos_yemeksepeti", "pos_migros", "pos_total", "diff_total", "status"
-    ]
+    if all_branches:
+        branch_ids = [b.id for b in ctx.accessible_branches]
+        filename_base = f"analytics_all_branches_{start_date}_{end_date}"
+    else:
+        branch_ids = [ctx.current_branch_id]
+        filename_base = f"analytics_{start_date}_{end_date}"
 
-    rows = []
-    for record in records:
-        rows.append([
-            str(record.difference_date),
-            str(record.kasa_visa or 0),
-            str(record.kasa_nakit or 0),
-            str(record.kasa_trendyol or 0),
-            str(record.kasa_getir or 0),
-            str(record.kasa_yemeksepeti or 0),
-            str(record.kasa_migros or 0),
-            str(record.kasa_total or 0),
-            str(record.pos_visa or 0),
-            str(record.pos_nakit or 0),
-            str(record.pos_trendyol or 0),
-            str(record.pos_getir or 0),
-            str(record.pos_yemeksepeti or 0),
-            str(record.pos_migros or 0),
-            str(record.pos_total or 0),
-            str((record.pos_total or 0) - (record.kasa_total or 0)),
-            record.status or ""
-        ])
-
-    filename_base = f"analytics_{start_date}_{end_date}"
+    rows = iter_analytics_rows(db.get_bind(), branch_ids, start_date, end_date, with_branch=all_branches)
 
     if format == ExportFormat.csv:
-        # Generate CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(headers)
-        writer.writerows(rows)
-
         return StreamingResponse(
-            iter([output.getvalue()]),
+            stream_csv(rows),
             media_type="text/csv",
             headers={
                 "Content-Disposition": f"attachment; filename={filename_base}.csv"
@@ -1409,29 +1213,43 @@ def export_daily_sales_analytics(
         )
 
     elif format == ExportFormat.excel:
-        # Generate Excel
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Daily Sales Analytics"
-
-        # Write headers
-        for col, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col, value=header)
-
-        # Write data
-        for row_idx, row in enumerate(rows, 2):
-            for col_idx, value in enumerate(row, 1):
-                ws.cell(row=row_idx, column=col_idx, value=value)
-
-        # Save to bytes
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-
         return StreamingResponse(
-            iter([output.getvalue()]),
+            stream_excel(rows),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={
                 "Content-Disposition": f"attachment; filename={filename_base}.xlsx"
             }
         )
+
+
+@router.get("/consolidated", response_model=ConsolidatedReport)
+def get_consolidated_report(
+    db: DBSession,
+    ctx: CurrentBranchContext,
+    start_date: date,
+    end_date: date,
+    branch_id: list[int] | None = Query(default=None, description="Sadece bu subeler (varsayilan: erisilebilen tum subeler)")
+):
+    """
+    Merkez raporu: erisilebilen subelerin P&L, kanal/platform kirilimi ve
+    kasa farki ozeti, sube x metrik matrisi + toplam + gunluk seri.
+
+    Sube sayisindan bagimsiz 3 gruplu sorgu (bkz. app/services/consolidated_report.py).
+    """
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Baslangic tarihi bitis tarihinden sonra olamaz")
+
+    branches = ctx.accessible_branches
+    if branch_id:
+        accessible = {b.id for b in branches}
+        if not set(branch_id) <= accessible:
+            raise HTTPException(status_code=403, detail="Bu subeye erisim yetkiniz yok")
+        branches = [b for b in branches if b.id in set(branch_id)]
+
+    return consolidated_report(db, branches, start_date, end_date)
+
+
+@router.get("/cache/stats")
+def get_report_cache_stats(ctx: CurrentBranchContext):
+    """Rapor cache hit/miss sayaçları"""
+    return get_report_cache().stats()
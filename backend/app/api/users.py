@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, status
 from sqlalchemy.orm import joinedload
-from app.api.deps import DBSession, CurrentUser, get_password_hash
+from app.api.deps import DBSession, CurrentUser, get_password_hash, mark_branch_context_dirty
 from app.models import User, Branch, UserBranch
 from app.schemas import UserResponse, UserCreate
 from pydantic import BaseModel
@@ -244,6 +244,7 @@ def assign_user_to_branch(
                 UserBranch.user_id == user_id,
                 UserBranch.is_default == True
             ).update({"is_default": False})
+            mark_branch_context_dirty(db, user_id)
             existing.is_default = True
         db.commit()
         db.refresh(existing)
@@ -263,6 +264,7 @@ def assign_user_to_branch(
             UserBranch.user_id == user_id,
             UserBranch.is_default == True
         ).update({"is_default": False})
+        mark_branch_context_dirty(db, user_id)
 
     user_branch = UserBranch(
         user_id=user_id,
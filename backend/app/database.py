@@ -1,6 +1,12 @@
-from sqlalchemy import create_engine
+import time
+from threading import Lock
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import QueuePool
 from app.config import settings
+from app.utils.lazy_load_guard import forbid_lazy_loads
 
 
 # Fix DATABASE_URL for psycopg3 compatibility
@@ -9,9 +15,125 @@ database_url = settings.DATABASE_URL
 if database_url.startswith("postgresql://"):
     database_url = database_url.replace("postgresql://", "postgresql+psycopg://", 1)
 
-engine = create_engine(database_url)
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long callers wait for a connection.
+    Wait time includes opening a new connection when the pool grows.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = Lock()
+        self.checkout_count = 0
+        self.timeout_count = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self.timeout_count += 1
+            raise
+        # Only successful checkouts count (avg_wait_ms is per checkout)
+        waited_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self.checkout_count += 1
+            self.total_wait_ms += waited_ms
+            self.max_wait_ms = max(self.max_wait_ms, waited_ms)
+        return connection
+
+
+def get_async_database_url(url: str) -> str:
+    """Async driver URL: psycopg is async-capable, SQLite needs aiosqlite"""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+def get_engine_options(url: str, is_async: bool = False) -> dict:
+    """
+    create_engine keyword arguments driven by Settings (DB_* fields).
+
+    SQLite keeps SQLAlchemy defaults; PostgreSQL gets a sized QueuePool,
+    pre-ping, recycle, statement_timeout and optional PgBouncer mode.
+    The async engine uses SQLAlchemy's AsyncAdaptedQueuePool with the
+    same sizing.
+    """
+    if not url.startswith("postgresql"):
+        return {}
+
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    connect_args = {}
+
+    if settings.DB_PGBOUNCER_MODE:
+        # Transaction pooling: server-side prepared statements don't survive
+        # a backend switch, and startup "options" are rejected by PgBouncer.
+        # statement_timeout is applied per transaction instead (see below).
+        connect_args["prepare_threshold"] = None
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    if not is_async:
+        options["poolclass"] = InstrumentedQueuePool
+    return options
+
+
+engine = create_engine(database_url, **get_engine_options(database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async path for hot read endpoints (AsyncDBSession dependency)
+async_database_url = get_async_database_url(database_url)
+async_engine = create_async_engine(async_database_url, **get_engine_options(async_database_url, is_async=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def _set_local_statement_timeout(conn):
+    # SET LOCAL is transaction-scoped, safe with PgBouncer transaction pooling
+    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+
+
+if settings.DB_PGBOUNCER_MODE and settings.DB_STATEMENT_TIMEOUT_MS and database_url.startswith("postgresql"):
+    event.listen(engine, "begin", _set_local_statement_timeout)
+    event.listen(async_engine.sync_engine, "begin", _set_local_statement_timeout)
+
+
+def get_pool_stats() -> dict:
+    """Connection pool status for the pool-stats endpoint"""
+    pool = engine.pool
+    stats = {
+        "pool_class": type(pool).__name__,
+        "pgbouncer_mode": settings.DB_PGBOUNCER_MODE,
+    }
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),  # negative = pool not yet filled
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            stats.update({
+                "checkouts": pool.checkout_count,
+                "timeouts": pool.timeout_count,
+                "avg_wait_ms": round(pool.total_wait_ms / pool.checkout_count, 3) if pool.checkout_count else 0.0,
+                "max_wait_ms": round(pool.max_wait_ms, 3),
+            })
+    return stats
+
 
 class Base(DeclarativeBase):
     pass
@@ -19,7 +141,18 @@ class Base(DeclarativeBase):
 
 def get_db():
     db = SessionLocal()
+    if settings.DB_RAISE_ON_LAZY_LOAD:
+        forbid_lazy_loads(db)
     try:
         yield db
+    except Exception:
+        # Return the connection to the pool clean, without waiting for GC
+        db.rollback()
+        raise
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -2,13 +2,49 @@
 """
 Idempotency Key Support
 
-Prevents duplicate submissions by caching responses.
-Uses in-memory store for simplicity (can upgrade to Redis later).
+Prevents duplicate submissions (X-Idempotency-Key) by caching responses.
+
+Backends:
+- memory: per-process LRU bounded by IDEMPOTENCY_MAX_ENTRIES (default)
+- redis: shared by all workers (REDIS_URL, or the local FakeRedis from
+  app.report_cache for development/tests)
+
+In-flight locking: the first request with a key claims it; a duplicate
+that arrives while the first one is still running waits (up to
+IDEMPOTENCY_WAIT_SECONDS) and returns the first one's response instead of
+executing again. A claim expires after IDEMPOTENCY_LOCK_SECONDS so a
+crashed worker can't block a key forever; each claim carries a token, so a
+request whose claim expired and was taken over never releases the new
+owner's claim. Expired memory entries are
+removed by the sweeper started in the app lifespan.
+
+    with idempotent(key, scope=f"{branch_id}:cash-import") as slot:
+        if slot.cached is not None:
+            return slot.cached
+        response = do_work()
+        slot.save(response)
 """
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, UTC
+from threading import Condition
 from typing import Any, Optional
-from dataclasses import dataclass
-from threading import Lock
+
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyInProgressError(Exception):
+    """The same key is still being processed by another request (HTTP 409)"""
 
 
 @dataclass
@@ -19,54 +55,267 @@ class CachedResponse:
     expires_at: datetime
 
 
-class IdempotencyStore:
+class MemoryIdempotencyBackend:
     """
-    In-memory idempotency key store.
-    Thread-safe with automatic expiration.
+    In-process LRU backend.
+    Thread-safe; evicts least recently used entries beyond max_entries.
     """
 
-    def __init__(self, ttl_seconds: int = 86400):  # 24 hours default
-        self._store: dict[str, CachedResponse] = {}
-        self._lock = Lock()
-        self._ttl_seconds = ttl_seconds
+    def __init__(self, max_entries: int = 10000):
+        self._store: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._claims: dict[str, tuple[float, str]] = {}  # key -> (monotonic expiry, token)
+        self._cond = Condition()
+        self._max_entries = max_entries
 
     def get(self, key: str) -> Optional[Any]:
-        """Get cached response for key, or None if not found/expired"""
-        with self._lock:
-            if key not in self._store:
+        with self._cond:
+            cached = self._store.get(key)
+            if cached is None:
                 return None
-
-            cached = self._store[key]
-
-            # Check expiration
             if datetime.now(UTC) > cached.expires_at:
                 del self._store[key]
                 return None
-
+            self._store.move_to_end(key)
             return cached.response
 
-    def save(self, key: str, response: Any) -> None:
-        """Save response for key"""
-        with self._lock:
+    def _drop_claim(self, key: str, token: Optional[str]) -> None:
+        claim = self._claims.get(key)
+        if claim is not None and claim[1] == token:
+            del self._claims[key]
+
+    def set(self, key: str, response: Any, ttl_seconds: int, token: Optional[str] = None) -> None:
+        with self._cond:
             now = datetime.now(UTC)
             self._store[key] = CachedResponse(
                 response=response,
                 created_at=now,
-                expires_at=now + timedelta(seconds=self._ttl_seconds)
+                expires_at=now + timedelta(seconds=ttl_seconds)
             )
+            self._store.move_to_end(key)
+            while len(self._store) > self._max_entries:
+                self._store.popitem(last=False)
+            self._drop_claim(key, token)
+            self._cond.notify_all()
+
+    def claim(self, key: str, lock_seconds: int) -> Optional[str]:
+        with self._cond:
+            claim = self._claims.get(key)
+            if claim is not None and claim[0] > time.monotonic():
+                return None
+            token = uuid.uuid4().hex
+            self._claims[key] = (time.monotonic() + lock_seconds, token)
+            return token
+
+    def release(self, key: str, token: Optional[str]) -> None:
+        with self._cond:
+            self._drop_claim(key, token)
+            self._cond.notify_all()
+
+    def wait(self, key: str, seconds: float) -> None:
+        """Block until the key's claim changes (or seconds pass)"""
+        with self._cond:
+            self._cond.wait(timeout=seconds)
 
     def cleanup(self) -> int:
-        """Remove expired entries, return count removed"""
-        with self._lock:
+        with self._cond:
             now = datetime.now(UTC)
             expired = [k for k, v in self._store.items() if now > v.expires_at]
             for k in expired:
                 del self._store[k]
+            mono = time.monotonic()
+            for k in [k for k, (expires_at, _) in self._claims.items() if expires_at <= mono]:
+                del self._claims[k]
             return len(expired)
 
+    def clear(self) -> None:
+        with self._cond:
+            self._store.clear()
+            self._claims.clear()
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class RedisIdempotencyBackend:
+    """
+    Redis backend, shared by all workers.
+
+    Responses are JSON under idem:{key} (EX = ttl); the in-flight claim is
+    idem-lock:{key} = token, set with NX so exactly one worker wins it.
+    The lock is only deleted by the claim that still holds it (GET +
+    compare; the window is two round trips, far below the lock TTL). Redis
+    expires both keys, so cleanup() has nothing to do.
+    """
+
+    PREFIX = "idem"
+    POLL_SECONDS = 0.05
+
+    def __init__(self, client):
+        self._client = client
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(f"{self.PREFIX}:{key}")
+        return json.loads(raw) if raw is not None else None
+
+    def _drop_claim(self, key: str, token: Optional[str]) -> None:
+        lock_key = f"{self.PREFIX}-lock:{key}"
+        current = self._client.get(lock_key)
+        if token is not None and current is not None and current == token.encode():
+            self._client.delete(lock_key)
+
+    def set(self, key: str, response: Any, ttl_seconds: int, token: Optional[str] = None) -> None:
+        self._client.set(f"{self.PREFIX}:{key}", json.dumps(jsonable_encoder(response)), ex=ttl_seconds)
+        self._drop_claim(key, token)
+
+    def claim(self, key: str, lock_seconds: int) -> Optional[str]:
+        token = uuid.uuid4().hex
+        if self._client.set(f"{self.PREFIX}-lock:{key}", token, ex=lock_seconds, nx=True):
+            return token
+        return None
+
+    def release(self, key: str, token: Optional[str]) -> None:
+        self._drop_claim(key, token)
+
+    def wait(self, key: str, seconds: float) -> None:
+        time.sleep(min(seconds, self.POLL_SECONDS))
+
+    def cleanup(self) -> int:
+        return 0
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(match=f"{self.PREFIX}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+class IdempotencyStore:
+    """
+    Idempotency front-end: TTL, in-flight claims and waiting for duplicates.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 86400,  # 24 hours default
+        backend=None,
+        lock_seconds: int = 300,
+        wait_seconds: float = 30
+    ):
+        self.backend = backend if backend is not None else MemoryIdempotencyBackend()
+        self._ttl_seconds = ttl_seconds
+        self._lock_seconds = lock_seconds
+        self._wait_seconds = wait_seconds
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get cached response for key, or None if not found/expired"""
+        return self.backend.get(key)
+
+    def save(self, key: str, response: Any, token: Optional[str] = None) -> None:
+        """Save response for key (and release the in-flight claim token holds)"""
+        self.backend.set(key, response, self._ttl_seconds, token)
+
+    def acquire(self, key: str) -> tuple[Optional[Any], Optional[str]]:
+        """
+        (cached response, None) for key, or (None, claim token) after
+        claiming it for this request. Waits while another request holds the
+        claim; raises IdempotencyInProgressError if it is still running
+        after wait_seconds.
+        """
+        deadline = time.monotonic() + self._wait_seconds
+        while True:
+            cached = self.backend.get(key)
+            if cached is not None:
+                return cached, None
+            token = self.backend.claim(key, self._lock_seconds)
+            if token is not None:
+                # The first request may have finished between get and claim
+                cached = self.backend.get(key)
+                if cached is not None:
+                    self.backend.release(key, token)
+                    return cached, None
+                return None, token
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IdempotencyInProgressError(key)
+            self.backend.wait(key, remaining)
+
+    def release(self, key: str, token: Optional[str]) -> None:
+        """Give up the claim without a response (the request failed)"""
+        self.backend.release(key, token)
+
+    def cleanup(self) -> int:
+        """Remove expired entries, return count removed"""
+        return self.backend.cleanup()
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+class IdempotencySlot:
+    """
+    One request's use of a key; see module docstring. Without a key it is
+    a no-op (cached is None, save does nothing).
+    """
+
+    def __init__(self, store: IdempotencyStore, key: Optional[str]):
+        self.store = store
+        self.key = key
+        self.cached: Optional[Any] = None
+        self._token: Optional[str] = None
+        self._saved = False
+
+    def _acquire(self) -> "IdempotencySlot":
+        if self.key:
+            self.cached, self._token = self.store.acquire(self.key)
+        return self
+
+    def save(self, response: Any) -> None:
+        if self.key:
+            self.store.save(self.key, response, self._token)
+            self._saved = True
+
+    def _finish(self) -> None:
+        if self._token is not None and not self._saved:
+            self.store.release(self.key, self._token)
+
+    def __enter__(self) -> "IdempotencySlot":
+        return self._acquire()
+
+    def __exit__(self, *exc) -> None:
+        self._finish()
+
+    async def __aenter__(self) -> "IdempotencySlot":
+        # Waiting for a duplicate blocks; keep it off the event loop
+        return await run_in_threadpool(self._acquire)
+
+    async def __aexit__(self, *exc) -> None:
+        self._finish()
+
+
+def _create_backend():
+    if settings.IDEMPOTENCY_BACKEND == "redis":
+        from app.report_cache import FakeRedis
+        if settings.REDIS_URL:
+            import redis  # optional dependency, only needed for a real server
+            return RedisIdempotencyBackend(redis.Redis.from_url(settings.REDIS_URL))
+        return RedisIdempotencyBackend(FakeRedis())
+    return MemoryIdempotencyBackend(max_entries=settings.IDEMPOTENCY_MAX_ENTRIES)
+
 
 # Global store instance
-_store = IdempotencyStore()
+_store = IdempotencyStore(
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    backend=_create_backend(),
+    lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS
+)
+
+
+def idempotent(key: Optional[str], scope: str = "") -> IdempotencySlot:
+    """Slot for an X-Idempotency-Key; scope keeps keys of different branches/endpoints apart"""
+    if key and scope:
+        key = f"{scope}:{key}"
+    return IdempotencySlot(_store, key)
 
 
 def check_idempotency(key: Optional[str]) -> Optional[Any]:
@@ -85,3 +334,15 @@ def save_idempotency(key: Optional[str], response: Any) -> None:
 def get_idempotency_store() -> IdempotencyStore:
     """Get the global idempotency store"""
     return _store
+
+
+async def run_idempotency_sweeper(interval_seconds: float) -> None:
+    """Drop expired keys every interval (started by the app lifespan)"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            removed = await run_in_threadpool(_store.cleanup)
+            if removed:
+                logger.info(f"Idempotency sweeper removed {removed} expired keys")
+        except Exception as e:
+            logger.error(f"Idempotency sweeper failed: {e}")
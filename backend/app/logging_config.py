@@ -3,11 +3,39 @@
 Structured JSON Logging Configuration
 
 Provides consistent, parseable logs for production monitoring.
+
+Loggers from get_logger() / setup_logging() don't write to stdout in the
+request path: a QueueHandler puts the record on a bounded queue and a
+single listener thread formats (JSONFormatter) and writes it. When the
+queue is full (stdout back-pressure) LOG_QUEUE_POLICY decides: "drop"
+counts and drops INFO/DEBUG records (warnings and errors still wait),
+"block" waits for room. Request log lines of health check / metrics
+routes are sampled (1 in LOG_SAMPLE_EVERY, errors always kept).
+LOG_QUEUE_ENABLED=False writes synchronously like before.
 """
+import atexit
+import itertools
 import logging
 import json
+import queue
 import sys
+import threading
 from datetime import datetime, UTC
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:  # optional, stdlib json fallback
+    orjson = None
+
+from app.config import settings
+
+
+def _dumps(log_entry: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(log_entry).decode()
+    return json.dumps(log_entry)
 
 
 class JSONFormatter(logging.Formatter):
@@ -20,7 +48,9 @@ class JSONFormatter(logging.Formatter):
     # Extra fields we support
     EXTRA_FIELDS = (
         "user_id", "branch_id", "request_id",
-        "duration_ms", "endpoint", "method", "status_code"
+        "duration_ms", "endpoint", "method", "status_code", "error",
+        # Per-request SQL stats (app/query_stats.py)
+        "db_query_count", "db_time_ms", "db_slowest", "db_repeated"
     )
 
     def format(self, record: logging.LogRecord) -> str:
@@ -42,13 +72,128 @@ class JSONFormatter(logging.Formatter):
         if record.exc_info:
             log_entry["exception"] = self.formatException(record.exc_info)
 
-        # Safe JSON serialization with fallback
+        # Safe JSON serialization with fallback (orjson errors are TypeErrors too)
         try:
-            return json.dumps(log_entry)
+            return _dumps(log_entry)
         except TypeError:
             # Fallback for non-serializable values
             log_entry = {k: str(v) for k, v in log_entry.items()}
-            return json.dumps(log_entry)
+            return _dumps(log_entry)
+
+
+class SampledRoutesFilter(logging.Filter):
+    """
+    Keep 1 in `every` request log records of the given path prefixes
+    (health checks, metrics scrapes); records with status >= 400 and
+    records without an endpoint always pass.
+    """
+
+    def __init__(self, prefixes: tuple[str, ...], every: int):
+        super().__init__()
+        self.prefixes = prefixes
+        self.every = every
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        endpoint = getattr(record, "endpoint", None)
+        if self.every <= 1 or not endpoint or not endpoint.startswith(self.prefixes):
+            return True
+        if getattr(record, "status_code", 500) >= 400:
+            return True
+        return next(self._counter) % self.every == 0
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded queue. The record is only made safe to hand
+    over (message merged); formatting happens on the listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block: bool):
+        super().__init__(log_queue)
+        self.block = block
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.block or record.levelno >= logging.WARNING:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _FlushingQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Wait for room instead of put_nowait, so stop() never fails on a full queue
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    """Shared queue handler + listener thread writing JSON lines to stdout"""
+
+    def __init__(self, maxsize: int, block: bool, sample_prefixes: tuple[str, ...], sample_every: int):
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        formatter = JSONFormatter()
+        self.handler = BoundedQueueHandler(self.queue, block=block)
+        self.handler.setFormatter(formatter)  # used by the listener's handler
+        self.handler.addFilter(SampledRoutesFilter(sample_prefixes, sample_every))
+
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(formatter)
+        self._listener = _FlushingQueueListener(self.queue, output)
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self) -> None:
+        with self._lock:
+            if not self._started:
+                self._listener.start()
+                self._started = True
+
+    def stop(self) -> None:
+        """Flush what's queued and stop the listener thread"""
+        with self._lock:
+            if self._started:
+                self._listener.stop()
+                self._started = False
+
+    def stats(self) -> dict:
+        return {"queued": self.queue.qsize(), "dropped": self.handler.dropped}
+
+
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_log_pipeline() -> LogPipeline:
+    """Shared pipeline, listener started on first use and stopped at exit"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = LogPipeline(
+                maxsize=settings.LOG_QUEUE_SIZE,
+                block=settings.LOG_QUEUE_POLICY == "block",
+                sample_prefixes=tuple(settings.LOG_SAMPLED_PATHS),
+                sample_every=settings.LOG_SAMPLE_EVERY,
+            )
+            atexit.register(_pipeline.stop)
+        _pipeline.start()
+        return _pipeline
+
+
+def _json_handler() -> logging.Handler:
+    if settings.LOG_QUEUE_ENABLED:
+        return get_log_pipeline().handler
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JSONFormatter())
+    return handler
 
 
 def setup_logging(level: str = "INFO") -> None:
@@ -71,10 +216,8 @@ def setup_logging(level: str = "INFO") -> None:
     # Remove existing handlers
     root_logger.handlers.clear()
 
-    # Add JSON handler
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(JSONFormatter())
-    root_logger.addHandler(handler)
+    # Add JSON handler (queued, see module docstring)
+    root_logger.addHandler(_json_handler())
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -93,8 +236,6 @@ def get_logger(name: str) -> logging.Logger:
     )
 
     if not has_json_handler:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(JSONFormatter())
-        logger.addHandler(handler)
+        logger.addHandler(_json_handler())
 
     return logger
@@ -1,8 +1,9 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import bcrypt
-import traceback
 import sys
 
 # Monkey patch bcrypt for passlib compatibility - ROBUST VERSION
@@ -17,7 +18,10 @@ except Exception as e:
 from app.config import settings
 from app.middleware import RequestLoggingMiddleware
 from app.logging_config import setup_logging
-from app.api import auth, purchases, expenses, reports, production, staff_meals, personnel, online_sales, branches, users, invitation_codes, courier_expenses, ai_insights, cash_difference, import_history, categorization, payments, health, menu_categories, menu_items, branch_hours, branch_holidays
+from app.utils.parsing_executor import get_parsing_executor
+from app.utils.pagination import InvalidCursorError, NEXT_CURSOR_HEADER
+from app.idempotency import IdempotencyInProgressError, run_idempotency_sweeper
+from app.api import auth, purchases, expenses, reports, production, staff_meals, personnel, online_sales, branches, users, invitation_codes, courier_expenses, ai_insights, cash_difference, import_history, categorization, payments, health, menu_categories, menu_items, branch_hours, branch_holidays, metrics
 
 # Startup Configuration Validation (P0.43)
 def validate_configuration():
@@ -54,47 +58,48 @@ def validate_configuration():
 # Run validation on module load
 validate_configuration()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweeper = asyncio.create_task(run_idempotency_sweeper(settings.IDEMPOTENCY_SWEEP_SECONDS))
+    yield
+    sweeper.cancel()
+    # Parsing worker processes/threads are created lazily; stop them on exit
+    get_parsing_executor().shutdown()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
+    lifespan=lifespan,
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json"
 )
 
-# Global 500 Handler for Debugging
-@app.middleware("http")
-async def debug_exception_handler(request: Request, call_next):
-    try:
-        return await call_next(request)
-    except Exception as e:
-        print(f"\nCRITICAL ERROR: {request.method} {request.url.path}", file=sys.stderr)
-        traceback.print_exc(file=sys.stderr)
-        return JSONResponse(
-            status_code=500,
-            content={"detail": "Internal Server Error", "debug_trace": str(e)}
-        )
-
-# Identity Header Middleware (Prevents Port Confusion)
-@app.middleware("http")
-async def add_identity_header(request: Request, call_next):
-    response = await call_next(request)
-    response.headers["X-Service-Name"] = "cigkoftecibey-webapp"
-    response.headers["X-Service-Port"] = "8000"
-    return response
-
-# CORS
+# Keyset pagination: malformed / foreign ?cursor= values
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+# X-Idempotency-Key still being processed by another request after the wait
+@app.exception_handler(IdempotencyInProgressError)
+async def idempotency_in_progress_handler(request: Request, exc: IdempotencyInProgressError):
+    return JSONResponse(status_code=409, content={"detail": "Ayni istek hala isleniyor, lutfen tekrar deneyin"})
+
+# Request ID, identity headers, logging, metrics, 500 capture (pure ASGI, app/middleware.py)
+app.add_middleware(RequestLoggingMiddleware)
+
+# CORS (outermost, so the 500 responses above carry CORS headers too)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # keyset pagination
 )
 
-# Request logging middleware
-app.add_middleware(RequestLoggingMiddleware)
-
 # Routers
 app.include_router(auth.router, prefix="/api")
 app.include_router(purchases.router, prefix="/api")
@@ -114,6 +119,7 @@ app.include_router(import_history.router, prefix="/api")
 app.include_router(categorization.router, prefix="/api")
 app.include_router(payments.router, prefix="/api")
 app.include_router(health.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
 app.include_router(menu_categories.router, prefix="/api")
 app.include_router(menu_items.router, prefix="/api")
 app.include_router(branch_hours.router, prefix="/api")
@@ -0,0 +1,428 @@
+# backend/app/metrics.py
+"""
+In-process metrics registry with Prometheus text exposition (GET /api/metrics).
+
+No client library: counters, gauges and histograms are plain dicts keyed
+by label values behind a lock. RequestLoggingMiddleware feeds the HTTP
+metrics; pool, cache, parsing-pool and log queue numbers are read from their
+existing stats() at scrape time; AI/OCR calls are timed with observe_ai_call().
+
+Multiple workers (uvicorn/gunicorn --workers N): set METRICS_MULTIPROC_DIR
+to a directory shared by the workers. Each worker writes its snapshot to
+<dir>/<pid>.json at most every METRICS_FLUSH_SECONDS (and on every scrape
+it serves); a scrape merges all files. Counters and histograms of exited
+workers are kept so totals don't go backwards, gauges only count live
+workers.
+"""
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Callable, Iterable, Optional
+
+from app.config import settings
+
+# Latency buckets (seconds): fast reads up to slow imports / OCR
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+        self._values: dict[tuple, object] = {}
+
+    def _key(self, labelvalues: tuple) -> tuple:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {labelvalues}")
+        return tuple(str(v) for v in labelvalues)
+
+    def state(self) -> dict:
+        with self._lock:
+            samples = [[list(key), self._copy(value)] for key, value in self._values.items()]
+        return {
+            "name": self.name, "type": self.type, "help": self.documentation,
+            "labelnames": list(self.labelnames), "samples": samples,
+        }
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, *labelvalues) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *labelvalues, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram(_Metric):
+    """Value per label set: [count per bucket (non-cumulative) ..., +Inf count, sum]"""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues) -> None:
+        key = self._key(labelvalues)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    @staticmethod
+    def _copy(value):
+        return list(value)
+
+    def state(self) -> dict:
+        return {**super().state(), "buckets": list(self.buckets)}
+
+
+# ==================== EXPOSITION ====================
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def render(states: list[dict]) -> str:
+    """Prometheus text format (0.0.4) of metric states"""
+    lines = []
+    for state in states:
+        name, names = state["name"], state["labelnames"]
+        lines.append(f"# HELP {name} {state['help']}")
+        lines.append(f"# TYPE {name} {state['type']}")
+        for labelvalues, value in sorted(state["samples"]):
+            if state["type"] == "histogram":
+                cumulative = 0
+                for bound, count in zip(state["buckets"] + [math.inf], value[:-1]):
+                    cumulative += count
+                    le = 'le="' + _number(bound) + '"'
+                    lines.append(f"{name}_bucket{_labels(names, labelvalues, le)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(names, labelvalues)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(names, labelvalues)} {cumulative}")
+            else:
+                lines.append(f"{name}{_labels(names, labelvalues)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def merge(snapshots: list[tuple[bool, list[dict]]]) -> list[dict]:
+    """
+    Sum metric states of several workers; snapshots are (alive, states).
+    Gauges of workers that are no longer running are skipped.
+    """
+    merged: dict[str, dict] = {}
+    for alive, states in snapshots:
+        for state in states:
+            if state["type"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(state["name"], {**state, "samples": {}})
+            samples = target["samples"]
+            for labelvalues, value in state["samples"]:
+                key = tuple(labelvalues)
+                if key not in samples:
+                    samples[key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    samples[key] = [a + b for a, b in zip(samples[key], value)]
+                else:
+                    samples[key] += value
+    return [
+        {**state, "samples": [[list(k), v] for k, v in state["samples"].items()]}
+        for state in merged.values()
+    ]
+
+
+# ==================== REGISTRY ====================
+
+class MetricsRegistry:
+    """
+    Own metrics plus collectors (callables returning metric states, read
+    at snapshot time) and the optional shared-directory snapshot file
+    """
+
+    def __init__(self, multiproc_dir: str = "", flush_seconds: float = 5.0):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], list[dict]]] = []
+        self.multiproc_dir = multiproc_dir
+        self.flush_seconds = flush_seconds
+        self._last_flush = 0.0
+        self._flush_lock = Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], list[dict]]) -> None:
+        self._collectors.append(collector)
+
+    def snapshot(self) -> list[dict]:
+        states = [metric.state() for metric in self._metrics]
+        for collector in self._collectors:
+            states.extend(collector())
+        return states
+
+    def clear(self) -> None:
+        for metric in self._metrics:
+            metric.clear()
+
+    # ---- multi-worker ----
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.multiproc_dir, f"{pid}.json")
+
+    def flush(self) -> None:
+        """Write this worker's snapshot (atomic replace)"""
+        if not self.multiproc_dir:
+            return
+        os.makedirs(self.multiproc_dir, exist_ok=True)
+        path = self._path(os.getpid())
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"pid": os.getpid(), "states": self.snapshot()}, f)
+        os.replace(tmp, path)
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self) -> None:
+        """flush() at most every flush_seconds; called after each request"""
+        if not self.multiproc_dir or time.monotonic() - self._last_flush < self.flush_seconds:
+            return
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self.flush()
+        except OSError:
+            pass  # metrics must never fail a request
+        finally:
+            self._flush_lock.release()
+
+    def _worker_snapshots(self) -> list[tuple[bool, list[dict]]]:
+        snapshots = []
+        for filename in os.listdir(self.multiproc_dir):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.multiproc_dir, filename)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue  # being replaced / partial; next scrape picks it up
+            snapshots.append((_pid_alive(data.get("pid")), data.get("states", [])))
+        return snapshots
+
+    def exposition(self) -> str:
+        """Text for GET /api/metrics: this worker, or all workers in multiproc mode"""
+        if not self.multiproc_dir:
+            return render(self.snapshot())
+        self.flush()
+        states = merge(self._worker_snapshots())
+        return render(_with_hit_ratios(states))
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Global registry
+_registry = MetricsRegistry(
+    multiproc_dir=settings.METRICS_MULTIPROC_DIR,
+    flush_seconds=settings.METRICS_FLUSH_SECONDS
+)
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the global metrics registry"""
+    return _registry
+
+
+# ==================== APPLICATION METRICS ====================
+
+HTTP_REQUESTS = _registry.counter(
+    "http_requests_total", "HTTP requests by route template and status code",
+    ("method", "route", "status")
+)
+HTTP_LATENCY = _registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route")
+)
+HTTP_IN_FLIGHT = _registry.gauge(
+    "http_requests_in_flight", "Requests currently being served", ("method",)
+)
+AI_CALL_LATENCY = _registry.histogram(
+    "ai_call_duration_seconds", "External AI / OCR API call latency",
+    ("kind", "outcome")
+)
+
+
+@contextmanager
+def observe_ai_call(kind: str):
+    """Time an AI/OCR API call: with observe_ai_call("pos_ocr"): client.messages.create(...)"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        AI_CALL_LATENCY.observe(time.perf_counter() - start, kind, outcome)
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    HTTP_REQUESTS.inc(method, route, status)
+    HTTP_LATENCY.observe(seconds, method, route)
+    _registry.maybe_flush()
+
+
+def _state(name: str, type_: str, documentation: str, labelnames: tuple, samples: list) -> dict:
+    return {
+        "name": name, "type": type_, "help": documentation,
+        "labelnames": list(labelnames), "samples": [[list(k), v] for k, v in samples],
+    }
+
+
+def _pool_collector() -> list[dict]:
+    from app.database import get_pool_stats
+
+    stats = get_pool_stats()
+    states = []
+    for field in ("size", "checked_in", "checked_out", "overflow"):
+        if field in stats:
+            states.append(_state(f"db_pool_{field}", "gauge", f"Connection pool {field.replace('_', ' ')}", (), [((), stats[field])]))
+    for field in ("checkouts", "timeouts"):
+        if field in stats:
+            states.append(_state(f"db_pool_{field}_total", "counter", f"Connection pool {field}", (), [((), stats[field])]))
+    return states
+
+
+def _cache_stats() -> dict[str, dict]:
+    from app.api.deps import get_branch_context_cache
+    from app.report_cache import get_report_cache
+    from app.services.catalog_cache import get_catalog_cache
+    from app.services.menu_price_service import get_menu_cache
+
+    branch_context = get_branch_context_cache()
+    return {
+        "report": get_report_cache().stats(),
+        "menu": get_menu_cache().stats(),
+        "catalog": get_catalog_cache().stats(),
+        "branch_context": {"hits": branch_context.hits, "misses": branch_context.misses},
+    }
+
+
+def _with_hit_ratios(states: list[dict]) -> list[dict]:
+    """cache_hit_ratio from the (possibly merged) hit / miss counters"""
+    by_name = {state["name"]: state for state in states}
+    hits = {tuple(k): v for k, v in by_name.get("cache_hits_total", {}).get("samples", [])}
+    misses = {tuple(k): v for k, v in by_name.get("cache_misses_total", {}).get("samples", [])}
+    ratios = []
+    for key in sorted(set(hits) | set(misses)):
+        total = hits.get(key, 0) + misses.get(key, 0)
+        ratios.append((key, round(hits.get(key, 0) / total, 4) if total else 0.0))
+    states = [state for state in states if state["name"] != "cache_hit_ratio"]
+    return states + [_state("cache_hit_ratio", "gauge", "Cache hits / lookups since start", ("cache",), ratios)]
+
+
+def _cache_collector() -> list[dict]:
+    stats = _cache_stats()
+    states = [
+        _state("cache_hits_total", "counter", "Cache hits", ("cache",), [((name,), s["hits"]) for name, s in stats.items()]),
+        _state("cache_misses_total", "counter", "Cache misses", ("cache",), [((name,), s["misses"]) for name, s in stats.items()]),
+    ]
+    return _with_hit_ratios(states)
+
+
+def _parsing_collector() -> list[dict]:
+    from app.utils.parsing_executor import get_parsing_executor
+
+    pools = get_parsing_executor().stats()
+    labels = ("pool",)
+    return [
+        _state("parse_pool_active", "gauge", "Upload parsing jobs running", labels, [((p,), s["active"]) for p, s in pools.items()]),
+        _state("parse_pool_queued", "gauge", "Upload parsing jobs waiting for a worker", labels, [((p,), s["queued"]) for p, s in pools.items()]),
+        _state("parse_pool_rejected_total", "counter", "Uploads refused because the queue was full", labels, [((p,), s["rejected"]) for p, s in pools.items()]),
+    ]
+
+
+def _logging_collector() -> list[dict]:
+    from app.logging_config import get_log_pipeline
+
+    if not settings.LOG_QUEUE_ENABLED:
+        return []
+    stats = get_log_pipeline().stats()
+    return [
+        _state("log_queue_size", "gauge", "Log records waiting for the writer thread", (), [((), stats["queued"])]),
+        _state("log_records_dropped_total", "counter", "Log records dropped because the queue was full", (), [((), stats["dropped"])]),
+    ]
+
+
+_registry.add_collector(_pool_collector)
+_registry.add_collector(_cache_collector)
+_registry.add_collector(_parsing_collector)
+_registry.add_collector(_logging_collector)
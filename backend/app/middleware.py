@@ -2,62 +2,118 @@
 """
 Request/Response Middleware
 
-Adds request ID, logs all requests with timing.
+One pure ASGI middleware for every request:
+- request ID (request.state.request_id, X-Request-ID header)
+- identity headers (X-Service-Name / X-Service-Port, prevents port confusion)
+- timing + SQL stats (statement count, DB time, slowest statements; see
+  app/query_stats.py) in the request log and the Server-Timing header
+- request metrics (app/metrics.py)
+- unhandled exceptions: traceback to stderr, 500 JSON with debug_trace
+
+Response messages are passed through as they come (headers are added to
+http.response.start), so streaming responses are never buffered. The
+request is logged once the last body chunk is sent, so duration_ms covers
+the whole streamed body. Replaces the BaseHTTPMiddleware layers (request
+logging, debug 500 handler, identity header); bench_middleware.py compares
+the two stacks.
 """
+import sys
 import time
+import traceback
 import uuid
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
 from app.logging_config import get_logger
+from app.metrics import HTTP_IN_FLIGHT, observe_request
+from app.query_stats import track_queries
 
 logger = get_logger("api")
 
+SERVICE_NAME = "cigkoftecibey-webapp"
+SERVICE_PORT = "8000"
+
+
+def route_template(scope: Scope) -> str:
+    """Matched route path (/api/purchases/{purchase_id}), keeps metric labels bounded"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestLoggingMiddleware:
+    """Request ID, identity headers, timing, SQL stats, metrics, 500 capture and logging"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Generate request ID (Request.state reads scope["state"])
+        request_id = uuid.uuid4().hex[:8]
+        scope.setdefault("state", {})["request_id"] = request_id
+        method = scope["method"]
+        path = scope["path"]
+
+        start_time = time.perf_counter()
+        status_code = 500
+        response_started = False
+        error = None
+
+        # Statements run by the request are counted in query_stats
+        with track_queries() as query_stats:
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal status_code, response_started
+                if message["type"] == "http.response.start":
+                    response_started = True
+                    status_code = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-Request-ID", request_id)
+                    headers.append("X-Service-Name", SERVICE_NAME)
+                    headers.append("X-Service-Port", SERVICE_PORT)
+                    if settings.DB_SERVER_TIMING:
+                        duration_ms = (time.perf_counter() - start_time) * 1000
+                        headers.append("Server-Timing", query_stats.server_timing(duration_ms))
+                await send(message)
+
+            HTTP_IN_FLIGHT.inc(method)
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception as e:
+                error = e
+                print(f"\nCRITICAL ERROR: {method} {path}", file=sys.stderr)
+                traceback.print_exc(file=sys.stderr)
+                if response_started:
+                    # Mid-stream failure: headers are out, the server closes the connection
+                    raise
+                response = JSONResponse(
+                    status_code=500,
+                    content={"detail": "Internal Server Error", "debug_trace": str(e)}
+                )
+                await response(scope, receive, send_wrapper)
+            finally:
+                HTTP_IN_FLIGHT.dec(method)
+                duration_ms = (time.perf_counter() - start_time) * 1000
+                observe_request(method, route_template(scope), status_code, duration_ms / 1000)
+                self._log(request_id, method, path, status_code, duration_ms, error, query_stats)
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Log all requests with timing and context"""
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        # Generate request ID
-        request_id = str(uuid.uuid4())[:8]
-        request.state.request_id = request_id
-
-        # Start timer
-        start_time = time.time()
-
-        # Process request
-        try:
-            response = await call_next(request)
-        except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            logger.error(
-                f"{request.method} {request.url.path} - ERROR",
-                extra={
-                    "request_id": request_id,
-                    "method": request.method,
-                    "endpoint": request.url.path,
-                    "duration_ms": round(duration_ms, 2),
-                    "error": str(e)
-                }
-            )
-            raise
-
-        # Calculate duration
-        duration_ms = (time.time() - start_time) * 1000
-
-        # Log request
-        logger.info(
-            f"{request.method} {request.url.path} - {response.status_code}",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "endpoint": request.url.path,
-                "status_code": response.status_code,
-                "duration_ms": round(duration_ms, 2)
-            }
-        )
-
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
-
-        return response
+    @staticmethod
+    def _log(request_id, method, path, status_code, duration_ms, error, query_stats) -> None:
+        fields = {
+            "request_id": request_id,
+            "method": method,
+            "endpoint": path,
+            "status_code": status_code,
+            "duration_ms": round(duration_ms, 2),
+            **query_stats.log_fields()
+        }
+        if error is not None:
+            logger.error(f"{method} {path} - ERROR", extra={**fields, "error": str(error)})
+        else:
+            logger.info(f"{method} {path} - {status_code}", extra=fields)
@@ -102,6 +102,11 @@ class Purchase(Base):
     supplier: Mapped["Supplier"] = relationship(back_populates="purchases")
     items: Mapped[list["PurchaseItem"]] = relationship(back_populates="purchase", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset list pages: branch, newest (date, id) first (app/utils/pagination.py)
+        Index('ix_purchases_branch_date_id', 'branch_id', 'purchase_date', 'id'),
+    )
+
 
 class PurchaseProductGroup(Base):
     """Mal alımı ürün grupları (Manav, Lavaş, Kuru Gıda, vb.)"""
@@ -180,19 +185,43 @@ class Expense(Base):
     branch: Mapped["Branch"] = relationship(back_populates="expenses")
     category: Mapped["ExpenseCategory"] = relationship(back_populates="expenses")
 
+    __table_args__ = (
+        # Keyset list pages: branch, newest (date, id) first (app/utils/pagination.py)
+        Index('ix_expenses_branch_date_id', 'branch_id', 'expense_date', 'id'),
+    )
+
 
 class DailySummary(Base):
+    """Günlük kar/zarar özeti (branch, date) - rapor sorguları için rollup tablosu
+
+    Kaynak tablolara (online_sales, purchases, expenses, courier_expenses,
+    part_time_costs, staff_meals, daily_productions) yapılan her yazma ile
+    aynı transaction içinde güncellenir (bkz. app/services/daily_summary_service.py).
+    """
     __tablename__ = "daily_summaries"
 
     id: Mapped[int] = mapped_column(primary_key=True)
     branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"))
     summary_date: Mapped[date] = mapped_column(Date)
-    total_sales: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
-    total_purchases: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
-    total_expenses: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0)
+    total_sales: Mapped[Decimal] = mapped_column(Numeric(14, 5), default=0)  # Tüm kanallar
+    sales_visa: Mapped[Decimal] = mapped_column(Numeric(14, 5), default=0)  # pos_visa
+    sales_nakit: Mapped[Decimal] = mapped_column(Numeric(14, 5), default=0)  # pos_nakit
+    sales_online: Mapped[Decimal] = mapped_column(Numeric(14, 5), default=0)  # online
+    total_purchases: Mapped[Decimal] = mapped_column(Numeric(14, 5), default=0)
+    total_expenses: Mapped[Decimal] = mapped_column(Numeric(14, 5), default=0)
+    total_courier: Mapped[Decimal] = mapped_column(Numeric(14, 5), default=0)  # KDV dahil
+    total_part_time: Mapped[Decimal] = mapped_column(Numeric(14, 5), default=0)
+    total_staff_meals: Mapped[Decimal] = mapped_column(Numeric(14, 5), default=0)
+    total_production: Mapped[Decimal] = mapped_column(Numeric(14, 5), default=0)
     order_count: Mapped[int] = mapped_column(Integer, default=0)
     salon_orders: Mapped[int] = mapped_column(Integer, default=0)
     paket_orders: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, default=lambda: datetime.now(UTC))
+
+    __table_args__ = (
+        # One rollup row per branch per day; also serves month/year range reads
+        Index('ix_daily_summaries_branch_date', 'branch_id', 'summary_date', unique=True),
+    )
 
 
 class DailyProduction(Base):
@@ -223,6 +252,11 @@ class DailyProduction(Base):
         """Toplam Maliyet = Legen Sayısı × 1 Legenin Maliyeti"""
         return self.legen_count * self.legen_cost
 
+    __table_args__ = (
+        # Keyset list pages: branch, newest (date, id) first (app/utils/pagination.py)
+        Index('ix_daily_productions_branch_date_id', 'branch_id', 'production_date', 'id'),
+    )
+
 
 class StaffMeal(Base):
     """Günlük personel yemek takibi (Tabldot)"""
@@ -313,6 +347,11 @@ class MonthlyPayroll(Base):
             return (self.base_salary + self.sgk_amount + self.bonus +
                     self.premium + self.overtime_amount - self.advance - self.absence_deduction)
 
+    __table_args__ = (
+        # Keyset list pages: branch, newest (date, id) first (app/utils/pagination.py)
+        Index('ix_monthly_payrolls_branch_date_id', 'branch_id', 'payment_date', 'id'),
+    )
+
 
 class PartTimeCost(Base):
     """Part-time günlük gider"""
@@ -326,6 +365,11 @@ class PartTimeCost(Base):
     created_by: Mapped[int] = mapped_column(ForeignKey("users.id"))
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
 
+    __table_args__ = (
+        # Keyset list pages: branch, newest (date, id) first (app/utils/pagination.py)
+        Index('ix_part_time_costs_branch_date_id', 'branch_id', 'cost_date', 'id'),
+    )
+
 
 class OnlinePlatform(Base):
     """Satış kanalları (Salon, Telefon Paket, Trendyol, Getir, vb.)"""
@@ -360,6 +404,11 @@ class OnlineSale(Base):
     # Relationships
     platform: Mapped["OnlinePlatform"] = relationship(back_populates="sales")
 
+    __table_args__ = (
+        # Keyset list pages: branch, newest (date, id) first (app/utils/pagination.py)
+        Index('ix_online_sales_branch_date_id', 'branch_id', 'sale_date', 'id'),
+    )
+
 
 class UserBranch(Base):
     """Kullanıcı-Şube ilişkisi (Many-to-Many)"""
@@ -449,6 +498,11 @@ class CourierExpense(Base):
         """KDV dahil toplam"""
         return self.amount + self.vat_amount
 
+    __table_args__ = (
+        # Keyset list pages: branch, newest (date, id) first (app/utils/pagination.py)
+        Index('ix_courier_expenses_branch_date_id', 'branch_id', 'expense_date', 'id'),
+    )
+
 
 class CashDifference(Base):
     """Kasa farki takibi - Excel vs POS karsilastirmasi"""
@@ -528,6 +582,11 @@ class CashDifference(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Keyset list pages: branch, newest (date, id) first (app/utils/pagination.py)
+        Index('ix_cash_differences_branch_date_id', 'branch_id', 'difference_date', 'id'),
+    )
+
 
 class CashDifferenceItem(Base):
     """Normalized cash difference amounts per platform"""
@@ -580,6 +639,11 @@ class ImportHistory(Base):
     branch: Mapped["Branch"] = relationship()
     creator: Mapped["User"] = relationship()
 
+    __table_args__ = (
+        # Keyset list pages: branch, newest (date, id) first (app/utils/pagination.py)
+        Index('ix_import_history_branch_created_id', 'branch_id', 'created_at', 'id'),
+    )
+
 
 class ImportHistoryItem(Base):
     """Individual entities created/modified by an import"""
@@ -705,10 +769,36 @@ class BranchHoliday(Base):
     branch: Mapped[Optional["Branch"]] = relationship()
 
 
+class AIResultCache(Base):
+    """Content-addressed cache of external AI results (categorization, POS OCR).
+
+    key_hash: SHA-256 of the normalized description / raw image bytes.
+    Entries expire after expires_at; oldest entries per kind are evicted
+    beyond AI_CACHE_MAX_ENTRIES (see app/services/ai_result_cache.py).
+    """
+    __tablename__ = "ai_result_cache"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(30))  # category_suggest, category_batch, pos_ocr
+    key_hash: Mapped[str] = mapped_column(String(64))
+    result: Mapped[dict | list] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+
+    __table_args__ = (
+        Index('ix_ai_result_cache_kind_key', 'kind', 'key_hash', unique=True),
+        # Size-based eviction: oldest first per kind
+        Index('ix_ai_result_cache_kind_created', 'kind', 'created_at'),
+    )
+
+
 # Import Supplier AR (Accounts Receivable) models
 from .supplier_ar import (
     SupplierPayment,
     SupplierTransaction,
+    SupplierBalance,
+    SupplierBalanceCheckpoint,
+    SupplierOpenItem,
     PaymentType,
     PaymentStatus,
     TransactionType
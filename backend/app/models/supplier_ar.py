@@ -2,7 +2,7 @@ from datetime import datetime, UTC
 from decimal import Decimal
 from typing import Optional
 from enum import Enum
-from sqlalchemy import String, Integer, Numeric, DateTime, ForeignKey, Text
+from sqlalchemy import String, Integer, Numeric, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import Enum as SQLEnum
 from app.database import Base
@@ -99,3 +99,88 @@ class SupplierTransaction(Base):
 
     # Relationships
     supplier: Mapped["Supplier"] = relationship(back_populates="transactions")
+
+    __table_args__ = (
+        # Ledger order (transaction_date, id): keyset pages and running balances
+        Index(
+            'ix_supplier_transactions_supplier_date_id', 'supplier_id', 'transaction_date', 'id',
+            postgresql_include=['debt_amount', 'credit_amount']  # index-only aging window
+        ),
+        Index('ix_supplier_transactions_reference', 'reference_type', 'reference_id'),
+    )
+
+
+class SupplierBalance(Base):
+    """
+    Tedarikçi başına güncel cari toplamları (app/services/supplier_ledger.py)
+    Her hareketle aynı transaction içinde güncellenir
+    """
+    __tablename__ = "supplier_balances"
+
+    supplier_id: Mapped[int] = mapped_column(ForeignKey("suppliers.id"), primary_key=True)
+
+    balance: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)
+    total_debt: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)
+    total_credit: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)
+    transaction_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Last movement in ledger order (transaction_date, id)
+    last_transaction_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    last_transaction_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_payment_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # transaction_count at the latest checkpoint
+    checkpoint_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC)
+    )
+
+
+class SupplierBalanceCheckpoint(Base):
+    """
+    Periyodik bakiye kontrol noktası: (transaction_date, transaction_id)
+    dahil olmak üzere o ana kadarki toplamlar
+    """
+    __tablename__ = "supplier_balance_checkpoints"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    supplier_id: Mapped[int] = mapped_column(ForeignKey("suppliers.id"))
+
+    transaction_id: Mapped[int] = mapped_column(Integer)
+    transaction_date: Mapped[datetime] = mapped_column(DateTime)
+
+    balance: Mapped[Decimal] = mapped_column(Numeric(14, 2))
+    total_debt: Mapped[Decimal] = mapped_column(Numeric(14, 2))
+    total_credit: Mapped[Decimal] = mapped_column(Numeric(14, 2))
+    transaction_count: Mapped[int] = mapped_column(Integer)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(UTC)
+    )
+
+    __table_args__ = (
+        Index('ix_supplier_balance_checkpoints_supplier_date_id', 'supplier_id', 'transaction_date', 'transaction_id'),
+    )
+
+
+class SupplierOpenItem(Base):
+    """
+    Açık (ödenmemiş) borç kalemleri; ödemeler FIFO ile en eski borçtan düşer.
+    Yaşlandırma raporunun materialized snapshot'ı (app/services/supplier_aging.py)
+    """
+    __tablename__ = "supplier_open_items"
+
+    transaction_id: Mapped[int] = mapped_column(
+        ForeignKey("supplier_transactions.id", ondelete="CASCADE"), primary_key=True
+    )
+    supplier_id: Mapped[int] = mapped_column(ForeignKey("suppliers.id"))
+    transaction_date: Mapped[datetime] = mapped_column(DateTime)
+    open_amount: Mapped[Decimal] = mapped_column(Numeric(14, 2))
+
+    __table_args__ = (
+        Index('ix_supplier_open_items_supplier_date', 'supplier_id', 'transaction_date'),
+    )
@@ -0,0 +1,163 @@
+# backend/app/query_stats.py
+"""
+Per-request SQL instrumentation.
+
+Cursor hooks on every Engine (sync, async and test engines alike) time each
+statement. Inside a request (RequestLoggingMiddleware opens track_queries())
+they accumulate into a RequestQueryStats: statement count, total DB time,
+the slowest statements and a count per statement shape. The middleware puts
+the totals into the JSON request log and the Server-Timing header.
+
+- Slow query log: any statement slower than DB_SLOW_QUERY_MS, in or out of
+  a request
+- N+1 detector: a warning when one statement shape runs more than
+  DB_N_PLUS_ONE_THRESHOLD times in one request (usually a lazy load or a
+  query inside a loop)
+
+The stats object lives in a ContextVar; sync endpoints run in worker
+threads with a copy of the request context, so they record into the same
+object.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.logging_config import get_logger
+
+logger = get_logger("sql")
+
+# Statements kept per request for the log line / slow query log
+SLOWEST_KEPT = 3
+MAX_LOGGED_SQL = 500
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists and multi-row VALUES differ only in length
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|\$\d+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|\$\d+)\s*\)")
+_NUMBER = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+
+
+def statement_shape(statement: str) -> str:
+    """SQL with whitespace, placeholder lists and inline numbers normalized"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _NUMBER.sub("?", shape)
+
+
+def _truncate(statement: str) -> str:
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return statement if len(statement) <= MAX_LOGGED_SQL else statement[:MAX_LOGGED_SQL] + "..."
+
+
+@dataclass
+class RequestQueryStats:
+    count: int = 0
+    total_ms: float = 0.0
+    slowest: list[tuple[float, str]] = field(default_factory=list)  # (ms, sql), slowest first
+    shapes: Counter = field(default_factory=Counter)
+    repeated: list[str] = field(default_factory=list)  # shapes reported as N+1
+
+    def record(self, statement: str, elapsed_ms: float) -> Optional[int]:
+        """Add one statement; returns the shape's count when it just crossed the N+1 threshold"""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if len(self.slowest) < SLOWEST_KEPT or elapsed_ms > self.slowest[-1][0]:
+            self.slowest.append((elapsed_ms, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+        threshold = settings.DB_N_PLUS_ONE_THRESHOLD
+        if threshold <= 0:
+            return None
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        if self.shapes[shape] == threshold + 1:
+            self.repeated.append(shape)
+            return self.shapes[shape]
+        return None
+
+    def log_fields(self) -> dict:
+        """Extra fields for the request log line"""
+        fields = {
+            "db_query_count": self.count,
+            "db_time_ms": round(self.total_ms, 2),
+        }
+        if self.slowest:
+            fields["db_slowest"] = [
+                {"ms": round(ms, 2), "sql": _truncate(sql)} for ms, sql in self.slowest
+            ]
+        if self.repeated:
+            fields["db_repeated"] = [_truncate(shape) for shape in self.repeated]
+        return fields
+
+    def server_timing(self, total_ms: Optional[float] = None) -> str:
+        """Server-Timing header value: db time (+ statement count), optionally app total"""
+        parts = [f'db;dur={self.total_ms:.2f};desc="{self.count} queries"']
+        if total_ms is not None:
+            parts.append(f"app;dur={total_ms:.2f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def track_queries():
+    """Collect the statements executed in this context (one request)"""
+    stats = RequestQueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+# Connection.info key: start times of the statements in flight
+_START_KEY = "query_stats_start"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    stats = _current.get()
+    if stats is not None:
+        repeats = stats.record(statement, elapsed_ms)
+        if repeats:
+            logger.warning(
+                f"Possible N+1: same statement ran {repeats} times in one request",
+                extra={"db_repeated": [_truncate(statement_shape(statement))]}
+            )
+
+    slow_ms = settings.DB_SLOW_QUERY_MS
+    if slow_ms and elapsed_ms >= slow_ms:
+        logger.warning(
+            f"Slow query: {elapsed_ms:.1f} ms",
+            extra={"duration_ms": round(elapsed_ms, 2), "db_slowest": [{"ms": round(elapsed_ms, 2), "sql": _truncate(statement)}]}
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_failed_statement(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_START_KEY):
+        conn.info[_START_KEY].pop()
@@ -0,0 +1,487 @@
+# backend/app/report_cache.py
+"""
+Report Response Cache
+
+Caches report endpoint payloads keyed by (endpoint, branch_id, params).
+Every entry records the date ranges it was computed from; committed writes
+to the source tables invalidate only the entries of the affected branch
+whose ranges cover a changed date.
+
+Invalidation also bumps a per-branch generation (clear() a global one). A
+computation takes the generation before it starts and is not stored if it
+changed meanwhile, so a result computed from pre-commit data never
+overwrites the invalidation.
+
+Backends:
+- memory: in-process LRU (default)
+- redis: any redis-py compatible client; FakeRedis is a local stand-in
+  used by tests and for development without a Redis server
+"""
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, UTC
+from threading import Lock
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models import CashDifference, OnlinePlatform
+from app.services.daily_summary_service import TRACKED_MODELS
+
+# Session.info key holding (branch_id, date) buckets written in this transaction
+DIRTY_KEY = "report_cache_dirty"
+# Session.info flag: a branch-independent table changed, drop everything
+CLEAR_KEY = "report_cache_clear"
+
+# Source model -> date column; rollup sources + cash difference analytics
+INVALIDATING_MODELS = {**TRACKED_MODELS, CashDifference: "difference_date"}
+
+# Changes here affect every branch's channel breakdown
+GLOBAL_MODELS = (OnlinePlatform,)
+
+
+DateRange = tuple[date, date]
+
+
+@dataclass
+class CacheEntry:
+    """Cached report payload"""
+    branch_id: int
+    ranges: list[DateRange]
+    value: Any
+    expires_at: datetime
+
+
+def _covers(ranges: Iterable[DateRange], days: set[date]) -> bool:
+    return any(start <= day <= end for start, end in ranges for day in days)
+
+
+class LRUCacheBackend:
+    """
+    In-process LRU backend.
+    Thread-safe; evicts least recently used entries beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self._store: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = Lock()
+        self._max_entries = max_entries
+        self._generations: dict[int, int] = {}
+        self._clear_generation = 0
+
+    def generation(self, branch_id: int) -> Hashable:
+        with self._lock:
+            return self._clear_generation, self._generations.get(branch_id, 0)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            if datetime.now(UTC) > entry.expires_at:
+                del self._store[key]
+                return None
+            self._store.move_to_end(key)
+            return entry.value
+
+    def set(
+        self,
+        key: str,
+        branch_id: int,
+        ranges: list[DateRange],
+        value: Any,
+        ttl_seconds: int,
+        generation: Optional[Hashable] = None
+    ) -> bool:
+        with self._lock:
+            current = (self._clear_generation, self._generations.get(branch_id, 0))
+            if generation is not None and generation != current:
+                return False
+            self._store[key] = CacheEntry(
+                branch_id=branch_id,
+                ranges=ranges,
+                value=value,
+                expires_at=datetime.now(UTC) + timedelta(seconds=ttl_seconds)
+            )
+            self._store.move_to_end(key)
+            while len(self._store) > self._max_entries:
+                self._store.popitem(last=False)
+            return True
+
+    def invalidate(self, branch_id: int, days: Iterable[date]) -> int:
+        with self._lock:
+            self._generations[branch_id] = self._generations.get(branch_id, 0) + 1
+            stale = [
+                key for key, entry in self._store.items()
+                if entry.branch_id == branch_id and _covers(entry.ranges, days)
+            ]
+            for key in stale:
+                del self._store[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear_generation += 1
+            self._store.clear()
+
+
+class FakeRedis:
+    """
+    Minimal in-memory stand-in for the redis-py client.
+    Implements only the commands RedisCacheBackend and the idempotency
+    store's Redis backend use.
+    """
+
+    def __init__(self):
+        self._data: dict[str, Any] = {}
+        self._expires: dict[str, datetime] = {}
+        self._lock = Lock()
+
+    def _alive(self, key: str) -> bool:
+        expires_at = self._expires.get(key)
+        if expires_at and datetime.now(UTC) > expires_at:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._data[key] if self._alive(key) else None
+
+    def set(self, key: str, value: str | bytes, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        with self._lock:
+            if nx and self._alive(key):
+                return None
+            self._data[key] = value.encode() if isinstance(value, str) else value
+            if ex:
+                self._expires[key] = datetime.now(UTC) + timedelta(seconds=ex)
+            else:
+                self._expires.pop(key, None)
+            return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._alive(key):
+                    removed += 1
+                self._data.pop(key, None)
+                self._expires.pop(key, None)
+            return removed
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = int(self._data[key]) + 1 if self._alive(key) else 1
+            self._data[key] = str(value).encode()
+            return value
+
+    def expire(self, key: str, seconds: int) -> bool:
+        with self._lock:
+            if not self._alive(key):
+                return False
+            self._expires[key] = datetime.now(UTC) + timedelta(seconds=seconds)
+            return True
+
+    def sadd(self, key: str, *members: str) -> int:
+        with self._lock:
+            current = self._data.setdefault(key, set())
+            before = len(current)
+            current.update(m.encode() if isinstance(m, str) else m for m in members)
+            return len(current) - before
+
+    def smembers(self, key: str) -> Set[bytes]:
+        with self._lock:
+            return set(self._data.get(key, set()))
+
+    def srem(self, key: str, *members: str) -> int:
+        with self._lock:
+            current = self._data.get(key, set())
+            before = len(current)
+            current.difference_update(m.encode() if isinstance(m, str) else m for m in members)
+            return before - len(current)
+
+    def scan_iter(self, match: str):
+        prefix = match.rstrip("*")
+        with self._lock:
+            keys = [k for k in self._data if k.startswith(prefix)]
+        return iter(keys)
+
+    def flushdb(self) -> bool:
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+            return True
+
+
+class RedisCacheBackend:
+    """
+    Redis backend, shared by all workers.
+
+    Payloads are stored as JSON under report:{branch_id}:{endpoint}:{hash}.
+    A per-branch index set holds "key|start|end|expires" members so
+    invalidation can find the entries covering a date without scanning the
+    keyspace. The index carries the entry TTL and invalidation prunes
+    members of expired entries, so it does not outgrow the live entries.
+    Generations live in report-gen (clear) and report-gen:{branch_id}.
+    """
+
+    PREFIX = "report"
+
+    def __init__(self, client):
+        self._client = client
+
+    def _index_key(self, branch_id: int) -> str:
+        return f"{self.PREFIX}-idx:{branch_id}"
+
+    def _generation_key(self, branch_id: Optional[int] = None) -> str:
+        return f"{self.PREFIX}-gen" if branch_id is None else f"{self.PREFIX}-gen:{branch_id}"
+
+    def generation(self, branch_id: int) -> Hashable:
+        return self._client.get(self._generation_key()), self._client.get(self._generation_key(branch_id))
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(
+        self,
+        key: str,
+        branch_id: int,
+        ranges: list[DateRange],
+        value: Any,
+        ttl_seconds: int,
+        generation: Optional[Hashable] = None
+    ) -> bool:
+        # Check-then-set, not atomic: narrows the race to these two calls
+        if generation is not None and generation != self.generation(branch_id):
+            return False
+        index_key = self._index_key(branch_id)
+        expires = int(datetime.now(UTC).timestamp()) + ttl_seconds
+        self._client.set(key, json.dumps(value), ex=ttl_seconds)
+        self._client.sadd(
+            index_key,
+            *[f"{key}|{start.isoformat()}|{end.isoformat()}|{expires}" for start, end in ranges]
+        )
+        self._client.expire(index_key, ttl_seconds)
+        return True
+
+    def invalidate(self, branch_id: int, days: Iterable[date]) -> int:
+        self._client.incr(self._generation_key(branch_id))
+        index_key = self._index_key(branch_id)
+        now = datetime.now(UTC).timestamp()
+        members = [
+            raw.decode() if isinstance(raw, bytes) else raw
+            for raw in self._client.smembers(index_key)
+        ]
+        stale_keys = set()
+        for member in members:
+            key, start, end, _ = member.rsplit("|", 3)
+            if _covers([(date.fromisoformat(start), date.fromisoformat(end))], days):
+                stale_keys.add(key)
+
+        # Drop every index member of a stale key (not only the matching
+        # range) and the members of entries that have already expired
+        drop = [
+            member for member in members
+            if member.rsplit("|", 3)[0] in stale_keys or int(member.rsplit("|", 1)[1]) <= now
+        ]
+        if drop:
+            self._client.srem(index_key, *drop)
+        if stale_keys:
+            self._client.delete(*stale_keys)
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        generation_prefix = self._generation_key()
+        keys = [
+            key for key in self._client.scan_iter(match=f"{self.PREFIX}*")
+            if not (key.decode() if isinstance(key, bytes) else key).startswith(generation_prefix)
+        ]
+        if keys:
+            self._client.delete(*keys)
+        self._client.incr(generation_prefix)
+
+
+class ReportCache:
+    """
+    Report cache front-end: key building, hit/miss counters, invalidation.
+    """
+
+    def __init__(self, backend, ttl_seconds: int = 300):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def make_key(self, endpoint: str, branch_id: int, params: dict) -> str:
+        raw = json.dumps(jsonable_encoder(params), sort_keys=True)
+        digest = hashlib.sha1(raw.encode()).hexdigest()[:16]
+        return f"{RedisCacheBackend.PREFIX}:{branch_id}:{endpoint}:{digest}"
+
+    def get_or_compute(
+        self,
+        endpoint: str,
+        branch_id: int,
+        params: dict,
+        ranges: list[DateRange],
+        compute: Callable[[], Any]
+    ) -> Any:
+        """
+        Return the cached payload or compute, encode and store it (unless
+        the branch was invalidated while computing).
+
+        The payload is always returned JSON-encoded so hits and misses
+        serialize identically.
+        """
+        key = self.make_key(endpoint, branch_id, params)
+        cached = self.backend.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached
+
+        with self._lock:
+            self.misses += 1
+        generation = self.backend.generation(branch_id)
+        value = jsonable_encoder(compute())
+        self.backend.set(key, branch_id, ranges, value, self.ttl_seconds, generation)
+        return value
+
+    async def aget_or_compute(
+        self,
+        endpoint: str,
+        branch_id: int,
+        params: dict,
+        ranges: list[DateRange],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Async variant of get_or_compute for AsyncDBSession endpoints.
+        Backend calls are blocking (Redis round trips), so they run in the
+        threadpool instead of on the event loop.
+        """
+        key = self.make_key(endpoint, branch_id, params)
+        cached = await run_in_threadpool(self.backend.get, key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached
+
+        with self._lock:
+            self.misses += 1
+        generation = await run_in_threadpool(self.backend.generation, branch_id)
+        value = jsonable_encoder(await compute())
+        await run_in_threadpool(self.backend.set, key, branch_id, ranges, value, self.ttl_seconds, generation)
+        return value
+
+    def invalidate(self, branch_id: int, days: Iterable[date]) -> int:
+        removed = self.backend.invalidate(branch_id, set(days))
+        with self._lock:
+            self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+
+def _create_backend():
+    if settings.REPORT_CACHE_BACKEND == "redis":
+        if settings.REDIS_URL:
+            import redis  # optional dependency, only needed for a real server
+            return RedisCacheBackend(redis.Redis.from_url(settings.REDIS_URL))
+        return RedisCacheBackend(FakeRedis())
+    return LRUCacheBackend(max_entries=settings.REPORT_CACHE_MAX_ENTRIES)
+
+
+# Global cache instance
+_cache = ReportCache(_create_backend(), ttl_seconds=settings.REPORT_CACHE_TTL_SECONDS)
+
+
+def get_report_cache() -> ReportCache:
+    """Get the global report cache"""
+    return _cache
+
+
+def mark_report_cache_dirty(db: Session, branch_id: int, day: date) -> None:
+    """Mark a bucket for invalidation after commit (bulk delete/update paths)."""
+    db.info.setdefault(DIRTY_KEY, set()).add((branch_id, day))
+
+
+# ==================== SESSION HOOKS ====================
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load previous branch/date on change so the old bucket is invalidated too
+# (rollup models already get this in daily_summary_service)
+for _attr in (CashDifference.branch_id, CashDifference.difference_date):
+    event.listen(_attr, "set", _keep_old_value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_invalidations(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        model = type(obj)
+        if model in GLOBAL_MODELS:
+            session.info[CLEAR_KEY] = True
+            continue
+        date_attr = INVALIDATING_MODELS.get(model)
+        if date_attr is None:
+            continue
+
+        state = inspect(obj)
+        branch_ids = {obj.branch_id, *(state.attrs.branch_id.history.deleted or ())}
+        dates = {getattr(obj, date_attr), *(state.attrs[date_attr].history.deleted or ())}
+        session.info.setdefault(DIRTY_KEY, set()).update(
+            (b, d) for b in branch_ids for d in dates if b is not None and d is not None
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session):
+    if session.info.pop(CLEAR_KEY, False):
+        session.info.pop(DIRTY_KEY, None)
+        _cache.clear()
+        return
+
+    buckets = session.info.pop(DIRTY_KEY, None)
+    if not buckets:
+        return
+
+    by_branch: dict[int, set[date]] = {}
+    for branch_id, day in buckets:
+        by_branch.setdefault(branch_id, set()).add(day)
+    for branch_id, days in by_branch.items():
+        _cache.invalidate(branch_id, days)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop(DIRTY_KEY, None)
+    session.info.pop(CLEAR_KEY, None)
@@ -856,6 +856,26 @@ class CashDifferenceImportRequest(CashDifferenceCreate):
     expenses: list[ExpenseItem] = []
 
 
+class CashDifferenceBulkDayResult(BaseModel):
+    """One day of a multi-day (monthly) import"""
+    difference_date: Optional[date] = None
+    source: Optional[str] = None  # Sheet or file name the day came from
+    status: str  # created, exists, missing_pos, missing_kasa, error
+    record_id: Optional[int] = None
+    diff_total: Optional[Decimal] = None
+    severity: Optional[str] = None
+    expenses_created: int = 0
+    sales_synced: int = 0
+    error: Optional[str] = None
+
+
+class CashDifferenceBulkImportResponse(BaseModel):
+    created: int
+    skipped: int
+    failed: int
+    days: list[CashDifferenceBulkDayResult]
+
+
 class CashDifferenceUpdate(BaseModel):
     status: Optional[str] = None
     resolution_note: Optional[str] = None
@@ -1218,6 +1238,62 @@ class AnalyticsEnvelope(BaseModel):
     summary: AnalyticsSummary
 
 
+# Consolidated (multi-branch) reports
+class ConsolidatedPnL(BaseModel):
+    """P&L metrics of one branch (or all branches) for a period"""
+    revenue: Decimal = Decimal("0")
+    visa: Decimal = Decimal("0")
+    nakit: Decimal = Decimal("0")
+    online: Decimal = Decimal("0")
+    purchases: Decimal = Decimal("0")
+    expenses: Decimal = Decimal("0")
+    courier: Decimal = Decimal("0")
+    parttime: Decimal = Decimal("0")
+    staff: Decimal = Decimal("0")
+    production: Decimal = Decimal("0")
+    total_expenses: Decimal = Decimal("0")
+    profit: Decimal = Decimal("0")
+
+
+class BranchCashDifferenceSummary(BaseModel):
+    """Kasa vs POS summary for a period"""
+    days: int = 0
+    kasa_total: Decimal = Decimal("0")
+    pos_total: Decimal = Decimal("0")
+    diff_total: Decimal = Decimal("0")  # pos - kasa
+    warning_days: int = 0
+    critical_days: int = 0
+    open_days: int = 0  # pending / flagged
+
+
+class ConsolidatedBranch(BaseModel):
+    branch_id: int
+    branch_name: str
+    pnl: ConsolidatedPnL
+    platforms: dict[str, Decimal] = {}  # platform name -> sales
+    cash_difference: BranchCashDifferenceSummary = BranchCashDifferenceSummary()
+
+
+class ConsolidatedDay(BaseModel):
+    """All branches together, one day"""
+    date: date
+    revenue: Decimal = Decimal("0")
+    total_expenses: Decimal = Decimal("0")
+    profit: Decimal = Decimal("0")
+
+
+class ConsolidatedReport(BaseModel):
+    """Branch x metric matrix: branches[i].pnl has the metrics columns"""
+    start_date: date
+    end_date: date
+    metrics: list[str]
+    branches: list[ConsolidatedBranch] = []
+    total: ConsolidatedPnL
+    platforms: dict[str, Decimal] = {}
+    cash_difference: BranchCashDifferenceSummary
+    daily: list[ConsolidatedDay] = []
+
+
 # Supplier AR (Supplier Accounts Receivable)
 from .supplier_ar import (
     SupplierARSummary,
@@ -1227,6 +1303,10 @@ from .supplier_ar import (
     SupplierPaymentCreate,
     SupplierPaymentUpdate,
     SupplierPaymentWithSupplier,
+    AgingBuckets,
+    SupplierAgingRow,
+    BranchAging,
+    SupplierAgingReport,
     PaymentTypeLiteral,
     PaymentStatusLiteral,
     TransactionTypeLiteral
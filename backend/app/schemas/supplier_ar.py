@@ -1,7 +1,7 @@
 # backend/app/schemas/supplier_ar.py
 from pydantic import BaseModel, Field
 from typing import Optional, Literal
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
 
@@ -106,6 +106,35 @@ class SupplierARDetail(BaseModel):
     total_credit: Decimal
     last_transaction_date: Optional[datetime] = None
     transactions: list[SupplierTransaction] = []
+    next_cursor: Optional[str] = None  # sonraki hareket sayfasi (/transactions?cursor=)
 
     class Config:
         from_attributes = True
+
+
+# ============ Supplier AR Aging ============
+class AgingBuckets(BaseModel):
+    days_0_30: Decimal = Decimal('0')
+    days_31_60: Decimal = Decimal('0')
+    days_61_90: Decimal = Decimal('0')
+    days_90_plus: Decimal = Decimal('0')
+    total: Decimal = Decimal('0')
+
+
+class SupplierAgingRow(AgingBuckets):
+    supplier_id: int
+    supplier_name: str
+    branch_id: int
+    oldest_open_date: Optional[datetime] = None
+
+
+class BranchAging(AgingBuckets):
+    branch_id: int
+
+
+class SupplierAgingReport(BaseModel):
+    as_of: date
+    source: Literal["snapshot", "live"]
+    suppliers: list[SupplierAgingRow] = []
+    branches: list[BranchAging] = []
+    totals: AgingBuckets
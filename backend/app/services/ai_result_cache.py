@@ -0,0 +1,149 @@
+# backend/app/services/ai_result_cache.py
+"""
+Persistent, content-addressed cache for external AI results.
+
+Keys are SHA-256 hashes of the normalized expense description or the raw
+POS screenshot bytes, so repeat imports are answered from the database
+without an API call. Entries expire after AI_CACHE_TTL_SECONDS; beyond
+AI_CACHE_MAX_ENTRIES per kind the oldest entries are evicted on write.
+
+Reads go through the caller's session; writes and eviction run in their
+own short-lived session on the same engine, so a cache write never commits
+or rolls back the request's pending work.
+
+Only successful AI responses are stored (fallbacks on missing key or
+errors are not), so a later retry still reaches the API.
+"""
+import hashlib
+import re
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.models import AIResultCache as AIResultCacheEntry
+
+KIND_CATEGORY_SUGGEST = "category_suggest"
+KIND_CATEGORY_BATCH = "category_batch"
+KIND_POS_OCR = "pos_ocr"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def description_key(description: str, categories: Optional[Iterable[str]] = None) -> str:
+    """Hash of the folded description (+ offered category names, they change the prompt)"""
+    from app.services.categorization import fold_turkish
+
+    normalized = _WHITESPACE_RE.sub(" ", fold_turkish(description)).strip()
+    if categories:
+        normalized += "|" + ",".join(sorted(fold_turkish(c) for c in categories))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def image_key(content: bytes) -> str:
+    """Hash of the raw image bytes"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+class AIResultCache:
+    """Access to the ai_result_cache table (reads via db, writes in their own session)"""
+
+    def __init__(
+        self,
+        db: Session,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
+        self.db = db
+        self.session_factory = session_factory or sessionmaker(bind=db.get_bind(), autoflush=False)
+        self.ttl_seconds = settings.AI_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = settings.AI_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        return self.get_many(kind, [key]).get(key)
+
+    def get_many(self, kind: str, keys: Iterable[str]) -> dict[str, Any]:
+        """key -> cached result for unexpired entries, one query"""
+        keys = list(set(keys))
+        if not keys:
+            return {}
+        rows = self.db.execute(
+            select(AIResultCacheEntry.key_hash, AIResultCacheEntry.result).where(
+                AIResultCacheEntry.kind == kind,
+                AIResultCacheEntry.key_hash.in_(keys),
+                AIResultCacheEntry.expires_at > _now()
+            )
+        ).all()
+        return {key_hash: result for key_hash, result in rows}
+
+    def put(self, kind: str, key: str, result: Any) -> None:
+        self.put_many(kind, {key: result})
+
+    def put_many(self, kind: str, results: dict[str, Any]) -> None:
+        """Store results (replacing existing keys), then evict; commits its own session"""
+        if not results:
+            return
+        now = _now()
+        with self.session_factory() as session:
+            try:
+                session.execute(
+                    delete(AIResultCacheEntry).where(
+                        AIResultCacheEntry.kind == kind,
+                        AIResultCacheEntry.key_hash.in_(list(results))
+                    )
+                )
+                session.add_all([
+                    AIResultCacheEntry(
+                        kind=kind,
+                        key_hash=key,
+                        result=result,
+                        created_at=now,
+                        expires_at=now + timedelta(seconds=self.ttl_seconds)
+                    )
+                    for key, result in results.items()
+                ])
+                session.flush()
+                self._evict(session, kind)
+                session.commit()
+            except IntegrityError:
+                # Concurrent request stored the same key first
+                session.rollback()
+
+    def evict(self, kind: str) -> int:
+        """Drop expired entries and the oldest beyond max_entries for kind; commits its own session"""
+        with self.session_factory() as session:
+            removed = self._evict(session, kind)
+            session.commit()
+        return removed
+
+    def _evict(self, session: Session, kind: str) -> int:
+        removed = session.execute(
+            delete(AIResultCacheEntry).where(
+                AIResultCacheEntry.kind == kind,
+                AIResultCacheEntry.expires_at <= _now()
+            )
+        ).rowcount or 0
+
+        count = session.scalar(
+            select(func.count()).select_from(AIResultCacheEntry).where(AIResultCacheEntry.kind == kind)
+        )
+        overflow = count - self.max_entries
+        if overflow > 0:
+            oldest = (
+                select(AIResultCacheEntry.id)
+                .where(AIResultCacheEntry.kind == kind)
+                .order_by(AIResultCacheEntry.created_at, AIResultCacheEntry.id)
+                .limit(overflow)
+            )
+            removed += session.execute(
+                delete(AIResultCacheEntry).where(AIResultCacheEntry.id.in_(oldest))
+            ).rowcount or 0
+        return removed
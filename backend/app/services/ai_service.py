@@ -1,5 +1,6 @@
 import google.generativeai as genai
 from app.config import settings
+from app.metrics import observe_ai_call
 import logging
 
 logger = logging.getLogger(__name__)
@@ -50,7 +51,8 @@ class AIService:
             Samimi ve profesyonel bir dil kullan. Türkçe yanıt ver.
             """
             
-            response = await self.model.generate_content_async(prompt)
+            with observe_ai_call("daily_brief"):
+                response = await self.model.generate_content_async(prompt)
             return response.text
             
         except Exception as e:
@@ -0,0 +1,312 @@
+# backend/app/services/cash_import_service.py
+"""
+Cash difference import (kasa raporu vs POS) for one or many days.
+
+POST /cash-difference/import (one day) and /import-month (a whole month)
+both go through import_days(): the uncategorized category and platforms
+come from the reference data cache, already synced online sales are
+loaded in one query, and all rows are written in one flush plus one
+executemany for the import history items. The flush goes out as batched INSERTs (insertmanyvalues, ids via RETURNING
+on PostgreSQL) and executemany UPDATEs; staying on the unit of work keeps
+the before_flush hooks (report cache, daily summaries, learned
+categorization rules) in the loop.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models import CashDifference, Expense, ImportHistory, ImportHistoryItem, OnlineSale
+from app.schemas import (
+    CashDifferenceBulkDayResult, CashDifferenceBulkImportResponse, CashDifferenceImportRequest, ExpenseItem
+)
+from app.services.catalog_cache import get_catalog
+from app.utils.excel_parser import CHANNELS
+
+# POS field -> OnlinePlatform.name synced to online_sales
+PLATFORM_MAPPING = {
+    'pos_visa': 'Visa',
+    'pos_nakit': 'Nakit',
+    'pos_trendyol': 'Trendyol',
+    'pos_getir': 'Getir',
+    'pos_yemeksepeti': 'Yemek Sepeti',
+    'pos_migros': 'Migros Yemek',
+}
+
+UNCATEGORIZED_CATEGORY = "Kategorize Edilmemis"
+
+
+def calculate_severity(diff_total: Decimal) -> str:
+    abs_diff = abs(diff_total)
+    if abs_diff <= 50:
+        return "ok"
+    elif abs_diff <= 200:
+        return "warning"
+    else:
+        return "critical"
+
+
+@dataclass
+class ImportedDay:
+    """Rows written for one imported day"""
+    record: CashDifference
+    history: ImportHistory
+    expenses: list[Expense] = field(default_factory=list)
+    sales: list[tuple[str, Decimal, OnlineSale]] = field(default_factory=list)  # (platform, amount, sale)
+
+
+def existing_dates(db: Session, branch_id: int, dates: Iterable[date]) -> set[date]:
+    """Dates that already have a CashDifference record for the branch"""
+    dates = list(dates)
+    if not dates:
+        return set()
+    return set(db.scalars(
+        select(CashDifference.difference_date).where(
+            CashDifference.branch_id == branch_id,
+            CashDifference.difference_date.in_(dates)
+        )
+    ))
+
+
+def import_days(
+    db: Session,
+    branch_id: int,
+    user_id: int,
+    requests: list[CashDifferenceImportRequest],
+    import_expenses: bool = True,
+    sync_to_sales: bool = True,
+    source_filename: Optional[str] = None
+) -> list[ImportedDay]:
+    """
+    Create CashDifference, expenses, online sales (upsert) and import
+    history for each request. Dates must be unique and not imported yet
+    (see existing_dates); the caller commits.
+    """
+    if not requests:
+        return []
+    dates = {r.difference_date for r in requests}
+
+    catalog = get_catalog(db)
+    uncategorized_id = catalog.category_id(UNCATEGORIZED_CATEGORY) if import_expenses else None
+
+    platform_ids: dict[str, int] = {}
+    sales_by_key: dict[tuple[date, int], OnlineSale] = {}
+    if sync_to_sales:
+        for platform_name in PLATFORM_MAPPING.values():
+            platform_id = catalog.platform_id(platform_name)
+            if platform_id is not None:
+                platform_ids[platform_name] = platform_id
+
+        if platform_ids:
+            sales = db.scalars(
+                select(OnlineSale).where(
+                    OnlineSale.branch_id == branch_id,
+                    OnlineSale.sale_date.in_(dates),
+                    OnlineSale.platform_id.in_(platform_ids.values())
+                ).order_by(OnlineSale.id)
+            )
+            for sale in sales:
+                sales_by_key.setdefault((sale.sale_date, sale.platform_id), sale)
+
+    imported = []
+    for request in requests:
+        day_date = request.difference_date
+        record = CashDifference(
+            branch_id=branch_id,
+            **request.model_dump(exclude={"expenses"}),
+            status="pending",
+            severity=calculate_severity(request.pos_total - request.kasa_total),
+            created_by=user_id
+        )
+        day = ImportedDay(
+            record=record,
+            history=ImportHistory(
+                branch_id=branch_id,
+                import_type="kasa_raporu",
+                import_date=day_date,
+                source_filename=source_filename,
+                status="completed",
+                import_metadata={
+                    "ocr_confidence": float(request.ocr_confidence_score) if request.ocr_confidence_score else None,
+                    "kasa_total": float(request.kasa_total),
+                    "pos_total": float(request.pos_total),
+                    "diff_total": float(request.pos_total - request.kasa_total)
+                },
+                created_by=user_id
+            )
+        )
+
+        if uncategorized_id is not None:
+            # Use user-selected category_id from import UI, fallback to uncategorized
+            day.expenses = [
+                Expense(
+                    branch_id=branch_id,
+                    category_id=exp.category_id if exp.category_id is not None else uncategorized_id,
+                    expense_date=day_date,
+                    description=exp.description or "Excel'den aktarildi",
+                    amount=exp.amount,
+                    created_by=user_id
+                )
+                for exp in request.expenses if exp.amount > 0
+            ]
+
+        for pos_field, platform_name in PLATFORM_MAPPING.items():
+            amount = getattr(request, pos_field)
+            platform_id = platform_ids.get(platform_name)
+            if platform_id is None or not (amount and amount > 0):
+                continue
+
+            sale = sales_by_key.get((day_date, platform_id))
+            if sale is not None:
+                sale.amount = amount
+                sale.notes = "Kasa Farki'ndan guncellendi"
+            else:
+                sale = OnlineSale(
+                    branch_id=branch_id,
+                    platform_id=platform_id,
+                    sale_date=day_date,
+                    amount=amount,
+                    notes="Kasa Farki'ndan aktarildi",
+                    created_by=user_id
+                )
+                sales_by_key[(day_date, platform_id)] = sale
+                db.add(sale)
+            day.sales.append((platform_name, amount, sale))
+
+        db.add(record)
+        db.add(day.history)
+        db.add_all(day.expenses)
+        imported.append(day)
+
+    db.flush()  # ids for the history items
+
+    # History items need no ids back and no session hooks track them:
+    # one executemany instead of a RETURNING insert per row
+    items = []
+    for day in imported:
+        history_id = day.history.id
+        items.append({
+            "import_history_id": history_id,
+            "entity_type": "cash_difference",
+            "entity_id": day.record.id,
+            "action": "created",
+            "data": {"difference_date": str(day.record.difference_date)}
+        })
+        items.extend(
+            {
+                "import_history_id": history_id,
+                "entity_type": "expense",
+                "entity_id": expense.id,
+                "action": "created",
+                "data": {"description": expense.description, "amount": float(expense.amount)}
+            }
+            for expense in day.expenses
+        )
+        # Creates and updates are both tracked as 'created' for import context
+        items.extend(
+            {
+                "import_history_id": history_id,
+                "entity_type": "online_sale",
+                "entity_id": sale.id,
+                "action": "created",
+                "data": {"platform": platform_name, "amount": float(amount)}
+            }
+            for platform_name, amount, sale in day.sales
+        )
+    db.execute(insert(ImportHistoryItem), items)
+
+    return imported
+
+
+def day_request(kasa: dict, pos: dict) -> CashDifferenceImportRequest:
+    """Import request from parsed kasa raporu + hasilat raporu days"""
+    return CashDifferenceImportRequest(
+        difference_date=kasa["date"],
+        **{f"kasa_{channel}": kasa[channel] for channel in CHANNELS},
+        kasa_total=kasa["total"],
+        **{f"pos_{channel}": pos[channel] for channel in CHANNELS},
+        pos_total=pos["total"],
+        ocr_confidence_score=Decimal("1.0"),  # Both sides come from Excel
+        expenses=[ExpenseItem(description=e["description"], amount=e["amount"]) for e in kasa["expenses"]]
+    )
+
+
+def import_month(
+    db: Session,
+    branch_id: int,
+    user_id: int,
+    kasa_days: list[dict],
+    pos_days: list[dict],
+    import_expenses: bool = True,
+    sync_to_sales: bool = True,
+    source_filename: Optional[str] = None
+) -> CashDifferenceBulkImportResponse:
+    """
+    Match parsed kasa and hasilat days by date and import every complete,
+    not yet imported day in one go. Days that can't be imported are
+    reported, not raised; the caller commits.
+    """
+    results: list[CashDifferenceBulkDayResult] = []
+    kasa_by_date: dict[date, dict] = {}
+    pos_by_date: dict[date, dict] = {}
+
+    for days, by_date in ((kasa_days, kasa_by_date), (pos_days, pos_by_date)):
+        for day in days:
+            if "error" in day:
+                results.append(CashDifferenceBulkDayResult(source=day["source"], status="error", error=day["error"]))
+            elif day["date"] in by_date:
+                results.append(CashDifferenceBulkDayResult(
+                    difference_date=day["date"], source=day["source"], status="error",
+                    error=f"{day['date']} tarihi birden fazla sayfada/dosyada var"
+                ))
+            else:
+                by_date[day["date"]] = day
+
+    all_dates = kasa_by_date.keys() | pos_by_date.keys()
+    existing = existing_dates(db, branch_id, all_dates)
+
+    pending: list[tuple[str, CashDifferenceImportRequest]] = []
+    for day_date in sorted(all_dates):
+        kasa, pos = kasa_by_date.get(day_date), pos_by_date.get(day_date)
+        source = (kasa or pos)["source"]
+        if day_date in existing:
+            results.append(CashDifferenceBulkDayResult(
+                difference_date=day_date, source=source, status="exists", error=f"{day_date} icin zaten kayit var"
+            ))
+        elif pos is None:
+            results.append(CashDifferenceBulkDayResult(
+                difference_date=day_date, source=source, status="missing_pos", error="Hasilat raporu bulunamadi"
+            ))
+        elif kasa is None:
+            results.append(CashDifferenceBulkDayResult(
+                difference_date=day_date, source=source, status="missing_kasa", error="Kasa raporu bulunamadi"
+            ))
+        else:
+            pending.append((source, day_request(kasa, pos)))
+
+    imported = import_days(
+        db, branch_id, user_id, [request for _, request in pending],
+        import_expenses=import_expenses, sync_to_sales=sync_to_sales, source_filename=source_filename
+    )
+    for (source, _), day in zip(pending, imported):
+        results.append(CashDifferenceBulkDayResult(
+            difference_date=day.record.difference_date,
+            source=source,
+            status="created",
+            record_id=day.record.id,
+            diff_total=day.record.diff_total,
+            severity=day.record.severity,
+            expenses_created=len(day.expenses),
+            sales_synced=len(day.sales)
+        ))
+
+    results.sort(key=lambda r: (r.difference_date is None, r.difference_date or date.min, r.source or ""))
+    return CashDifferenceBulkImportResponse(
+        created=sum(r.status == "created" for r in results),
+        skipped=sum(r.status in ("exists", "missing_pos", "missing_kasa") for r in results),
+        failed=sum(r.status == "error" for r in results),
+        days=results
+    )
@@ -0,0 +1,262 @@
+# backend/app/services/catalog_cache.py
+"""
+In-process cache for reference data: sales platforms, expense categories
+and purchase product groups/products.
+
+These tables change a few times a year but are read on every dashboard,
+report and import. The whole catalog is loaded in one go (four small
+SELECTs) into an immutable, versioned snapshot with id / name /
+channel_type indexes, so hot paths can skip the lookups and platform joins.
+
+Any commit that touches one of the models drops the snapshot (session
+hooks below, same pattern as the report and menu caches); the TTL bounds
+staleness across worker processes.
+"""
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import ExpenseCategory, OnlinePlatform, PurchaseProduct, PurchaseProductGroup
+
+
+@dataclass(frozen=True)
+class PlatformEntry:
+    id: int
+    branch_id: Optional[int]
+    name: str
+    channel_type: str
+    is_system: bool
+    display_order: int
+    is_active: bool
+
+
+@dataclass(frozen=True)
+class CategoryEntry:
+    id: int
+    branch_id: Optional[int]
+    name: str
+    is_fixed: bool
+    is_system: bool
+    display_order: int
+
+
+@dataclass(frozen=True)
+class ProductEntry:
+    id: int
+    branch_id: Optional[int]
+    group_id: int
+    name: str
+    default_unit: str
+    display_order: int
+    is_active: bool
+
+
+@dataclass(frozen=True)
+class ProductGroupEntry:
+    id: int
+    branch_id: Optional[int]
+    name: str
+    display_order: int
+    is_active: bool
+    products: tuple[ProductEntry, ...] = ()
+
+
+def _entry(cls, obj, **extra):
+    return cls(**{f: getattr(obj, f) for f in cls.__dataclass_fields__ if f not in extra}, **extra)
+
+
+def _display_sorted(entries):
+    # Same order as ORDER BY display_order, with id as a stable tie-break
+    return sorted(entries, key=lambda e: (e.display_order, e.id))
+
+
+@dataclass
+class Catalog:
+    """Immutable reference data snapshot; don't mutate the returned collections"""
+    version: int
+    platforms: list[PlatformEntry]                  # all, display order
+    categories: list[CategoryEntry]                 # all, by name
+    product_groups: list[ProductGroupEntry]         # all, display order
+    platforms_by_id: dict[int, PlatformEntry] = field(init=False)
+    categories_by_id: dict[int, CategoryEntry] = field(init=False)
+    products_by_id: dict[int, ProductEntry] = field(init=False)
+    _platform_ids_by_name: dict[str, int] = field(init=False)
+    _category_ids_by_name: dict[str, int] = field(init=False)
+    _platforms_by_channel: dict[str, list[PlatformEntry]] = field(init=False)
+
+    def __post_init__(self):
+        self.platforms_by_id = {p.id: p for p in self.platforms}
+        self.categories_by_id = {c.id: c for c in self.categories}
+        self.products_by_id = {p.id: p for g in self.product_groups for p in g.products}
+
+        # Name lookups resolve to the lowest id, like the old .first() queries
+        self._platform_ids_by_name = {}
+        for p in sorted(self.platforms, key=lambda p: p.id):
+            self._platform_ids_by_name.setdefault(p.name, p.id)
+        self._category_ids_by_name = {}
+        for c in sorted(self.categories, key=lambda c: c.id):
+            self._category_ids_by_name.setdefault(c.name, c.id)
+
+        self._platforms_by_channel = {}
+        for p in self.active_platforms:
+            self._platforms_by_channel.setdefault(p.channel_type, []).append(p)
+
+    @property
+    def active_platforms(self) -> list[PlatformEntry]:
+        return [p for p in self.platforms if p.is_active]
+
+    @property
+    def active_product_groups(self) -> list[ProductGroupEntry]:
+        return [g for g in self.product_groups if g.is_active]
+
+    def platform_id(self, name: str) -> Optional[int]:
+        return self._platform_ids_by_name.get(name)
+
+    def platforms_for_channel(self, channel_type: str) -> list[PlatformEntry]:
+        """Active platforms of a channel type (pos_visa, pos_nakit, online)"""
+        return self._platforms_by_channel.get(channel_type, [])
+
+    def category_id(self, name: str) -> Optional[int]:
+        return self._category_ids_by_name.get(name)
+
+    def categories_for_branch(self, branch_id: int) -> list[CategoryEntry]:
+        """Global categories plus the branch's own"""
+        return [c for c in self.categories if c.branch_id is None or c.branch_id == branch_id]
+
+
+def catalog_statements():
+    return (
+        select(OnlinePlatform),
+        select(ExpenseCategory).order_by(ExpenseCategory.name, ExpenseCategory.id),
+        select(PurchaseProductGroup),
+        select(PurchaseProduct).order_by(PurchaseProduct.id),
+    )
+
+
+def _build_catalog(version: int, platforms, categories, groups, products) -> Catalog:
+    products_by_group: dict[int, list[ProductEntry]] = {}
+    for product in products:
+        products_by_group.setdefault(product.group_id, []).append(_entry(ProductEntry, product))
+
+    return Catalog(
+        version=version,
+        platforms=_display_sorted(_entry(PlatformEntry, p) for p in platforms),
+        categories=[_entry(CategoryEntry, c) for c in categories],
+        product_groups=_display_sorted(
+            _entry(ProductGroupEntry, g, products=tuple(products_by_group.get(g.id, ()))) for g in groups
+        )
+    )
+
+
+class CatalogCache:
+    """
+    Holds the current Catalog. invalidate() bumps the generation; a load
+    that raced with an invalidation is returned but not kept.
+    """
+
+    def __init__(self, ttl_seconds: int = 300):
+        self._lock = Lock()
+        self._ttl_seconds = ttl_seconds
+        self._catalog: Optional[Catalog] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self) -> Optional[Catalog]:
+        with self._lock:
+            if self._catalog is not None and self._expires_at > time.monotonic():
+                self.hits += 1
+                return self._catalog
+            self.misses += 1
+            return None
+
+    def _store(self, generation: int, rows: tuple) -> Catalog:
+        with self._lock:
+            self.version += 1
+            catalog = _build_catalog(self.version, *rows)
+            if generation == self._generation:
+                self._catalog = catalog
+                self._expires_at = time.monotonic() + self._ttl_seconds
+            return catalog
+
+    def get(self, db: Session) -> Catalog:
+        catalog = self._cached()
+        if catalog is not None:
+            return catalog
+        generation = self._generation
+        rows = tuple(db.scalars(stmt).all() for stmt in catalog_statements())
+        return self._store(generation, rows)
+
+    async def aget(self, db: AsyncSession) -> Catalog:
+        catalog = self._cached()
+        if catalog is not None:
+            return catalog
+        generation = self._generation
+        rows = tuple([(await db.scalars(stmt)).all() for stmt in catalog_statements()])
+        return self._store(generation, rows)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._catalog = None
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self.version,
+                "loaded": self._catalog is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Global cache instance
+_catalog_cache = CatalogCache(ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS)
+
+
+def get_catalog_cache() -> CatalogCache:
+    """Get the global reference data cache"""
+    return _catalog_cache
+
+
+def get_catalog(db: Session) -> Catalog:
+    """Current catalog, loaded through db on a miss"""
+    return _catalog_cache.get(db)
+
+
+CATALOG_MODELS = (OnlinePlatform, ExpenseCategory, PurchaseProductGroup, PurchaseProduct)
+
+# Session.info key: a reference table changed in this transaction
+_CATALOG_DIRTY_KEY = "catalog_cache_dirty"
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_catalog_changes(session, flush_context, instances):
+    if session.info.get(_CATALOG_DIRTY_KEY):
+        return
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, CATALOG_MODELS):
+            session.info[_CATALOG_DIRTY_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_catalog_changes(session):
+    if session.info.pop(_CATALOG_DIRTY_KEY, False):
+        _catalog_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_changes(session):
+    session.info.pop(_CATALOG_DIRTY_KEY, None)
@@ -3,11 +3,199 @@ AI-Powered Expense Categorization Service
 
 Uses Claude API to categorize expenses based on description.
 Uses pattern matching for common Turkish restaurant expenses.
+
+Local matching runs before any AI call:
+1. KNOWN_PATTERNS compiled into one regex over Turkish-folded text
+2. Learned rules: description n-grams -> category_id from the branch's
+   own categorized expenses (LearnedRuleIndex, refreshed on TTL or when
+   expenses of the branch change)
 """
-from dataclasses import dataclass
+import re
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, field
 from decimal import Decimal
+from threading import Lock
 import os
 
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.metrics import observe_ai_call
+from app.models import Expense, ExpenseCategory
+from app.services.ai_result_cache import (
+    AIResultCache, KIND_CATEGORY_BATCH, KIND_CATEGORY_SUGGEST, description_key
+)
+
+# İ/I must be mapped before lower(): Python lowers "I" to "i" and "İ" to "i̇"
+_TURKISH_CASE = str.maketrans({"İ": "i", "I": "ı"})
+# Excel rows are often typed without Turkish characters ("dogalgaz", "MAAS")
+_ASCII_FOLD = str.maketrans("çğıöşü", "cgiosu")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Category import fallback - never learned as a rule
+UNCATEGORIZED_NAME = "Kategorize Edilmemis"
+
+
+def fold_turkish(text: str) -> str:
+    """Turkish-aware lowercase + ASCII fold, used for patterns and descriptions alike"""
+    return text.translate(_TURKISH_CASE).lower().translate(_ASCII_FOLD)
+
+
+def description_ngrams(text: str, max_n: int = 2) -> list[str]:
+    """Word 1..max_n-grams of a folded description"""
+    tokens = [t for t in _TOKEN_RE.findall(fold_turkish(text)) if len(t) > 1 and not t.isdigit()]
+    grams = []
+    for n in range(1, max_n + 1):
+        grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return grams
+
+
+class PatternMatcher:
+    """
+    KNOWN_PATTERNS compiled into a single alternation regex.
+
+    Every match is found in one scan; when several patterns occur, the one
+    listed first in KNOWN_PATTERNS wins (same result as the old loop).
+    """
+
+    def __init__(self, patterns: dict[str, tuple[str, str]]):
+        self._entries = []  # folded pattern -> (priority, original pattern, category)
+        by_folded = {}
+        for priority, (pattern, (category, _)) in enumerate(patterns.items()):
+            by_folded.setdefault(fold_turkish(pattern), (priority, pattern, category))
+        self._by_folded = by_folded
+        # Priority order: at each position the alternation yields the first
+        # listed pattern starting there, so the best one overall is never skipped
+        alternation = "|".join(re.escape(p) for p in sorted(by_folded, key=lambda p: by_folded[p][0]))
+        # Lookahead keeps overlapping occurrences visible to finditer
+        self._regex = re.compile(f"(?=({alternation}))")
+
+    def match(self, description: str) -> tuple[str, str] | None:
+        """(pattern, category) of the highest-priority match, or None"""
+        best = None
+        for m in self._regex.finditer(fold_turkish(description)):
+            entry = self._by_folded[m.group(1)]
+            if best is None or entry[0] < best[0]:
+                best = entry
+        return (best[1], best[2]) if best else None
+
+
+@dataclass
+class LearnedRule:
+    ngram: str
+    category_id: int
+    category: str
+    support: int
+    precision: float
+
+
+@dataclass
+class LearnedRules:
+    """Learned n-gram rules of one branch"""
+    rules: dict[str, LearnedRule] = field(default_factory=dict)
+    built_at: float = 0.0
+    sample_size: int = 0
+
+    def match(self, description: str) -> LearnedRule | None:
+        """Most specific (longest n-gram), then most precise rule found in description"""
+        best = None
+        for gram in description_ngrams(description):
+            rule = self.rules.get(gram)
+            if rule is None:
+                continue
+            key = (gram.count(" "), rule.precision, rule.support)
+            if best is None or key > best[0]:
+                best = (key, rule)
+        return best[1] if best else None
+
+
+def build_learned_rules(
+    samples: list[tuple[str, int, str]],
+    min_support: int = 2,
+    min_precision: float = 0.8
+) -> LearnedRules:
+    """
+    samples: (description, category_id, category_name).
+
+    An n-gram becomes a rule when it appears in at least min_support
+    expenses and at least min_precision of them share one category.
+    """
+    counts: dict[str, Counter] = defaultdict(Counter)
+    names = {}
+    for description, category_id, category_name in samples:
+        names[category_id] = category_name
+        for gram in set(description_ngrams(description)):
+            counts[gram][category_id] += 1
+
+    rules = {}
+    for gram, by_category in counts.items():
+        total = sum(by_category.values())
+        category_id, support = by_category.most_common(1)[0]
+        precision = support / total
+        if support >= min_support and precision >= min_precision:
+            rules[gram] = LearnedRule(gram, category_id, names[category_id], support, precision)
+
+    return LearnedRules(rules=rules, built_at=time.monotonic(), sample_size=len(samples))
+
+
+class LearnedRuleIndex:
+    """
+    In-memory learned rules per branch.
+
+    Built lazily from the branch's categorized expenses, rebuilt after
+    ttl_seconds or on the next use after an expense of that branch is
+    committed (marked stale by the session hooks below).
+    """
+
+    def __init__(self, ttl_seconds: int = 600, max_samples: int = 20000):
+        self._rules: dict[int, LearnedRules] = {}
+        self._stale: set[int] = set()
+        self._lock = Lock()
+        self._ttl_seconds = ttl_seconds
+        self._max_samples = max_samples
+
+    def get(self, db: Session, branch_id: int) -> LearnedRules:
+        with self._lock:
+            rules = self._rules.get(branch_id)
+            fresh = (
+                rules is not None
+                and branch_id not in self._stale
+                and time.monotonic() - rules.built_at < self._ttl_seconds
+            )
+        if fresh:
+            return rules
+        return self.refresh(db, branch_id)
+
+    def refresh(self, db: Session, branch_id: int) -> LearnedRules:
+        stmt = (
+            select(Expense.description, Expense.category_id, ExpenseCategory.name)
+            .join(ExpenseCategory, ExpenseCategory.id == Expense.category_id)
+            .where(
+                Expense.branch_id == branch_id,
+                Expense.description.isnot(None),
+                ExpenseCategory.name != UNCATEGORIZED_NAME
+            )
+            .order_by(Expense.id.desc())
+            .limit(self._max_samples)
+        )
+        rules = build_learned_rules(db.execute(stmt).all())
+        with self._lock:
+            self._rules[branch_id] = rules
+            self._stale.discard(branch_id)
+        return rules
+
+    def mark_stale(self, branch_ids) -> None:
+        with self._lock:
+            self._stale.update(branch_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rules.clear()
+            self._stale.clear()
+
 
 @dataclass
 class CategorySuggestion:
@@ -46,74 +234,118 @@ class ExpenseCategorizer:
         "trendyol": ("Delivery", "Trendyol komisyonu"),
     }
 
-    def __init__(self):
+    # Learned rules never claim more certainty than the curated patterns
+    LEARNED_MAX_CONFIDENCE = 0.9
+
+    def __init__(self, client=None):
         self._api_key = os.getenv("ANTHROPIC_API_KEY")
+        self._client = client  # injected Anthropic-compatible client (tests)
+        self._matcher = PatternMatcher(self.KNOWN_PATTERNS)
+
+    def _has_client(self) -> bool:
+        return self._client is not None or bool(self._api_key)
+
+    def _get_client(self):
+        if self._client is not None:
+            return self._client
+        import anthropic
+        return anthropic.Anthropic(api_key=self._api_key)
+
+    def _learned_confidence(self, rule: LearnedRule) -> float:
+        return round(min(self.LEARNED_MAX_CONFIDENCE, rule.precision * 0.9 + min(rule.support, 10) * 0.01), 2)
 
     def categorize(
         self,
         description: str,
         amount: Decimal | None = None,
-        available_categories: list[dict] | None = None
+        available_categories: list[dict] | None = None,
+        learned: LearnedRules | None = None,
+        cache: AIResultCache | None = None
     ) -> list[CategorySuggestion]:
         """
         Categorize a single expense description.
 
         Returns list of suggestions sorted by confidence.
+        AI answers are read from / stored in cache when given.
         """
         # Check known patterns first (fast path)
-        desc_lower = description.lower()
-        for pattern, (category, _) in self.KNOWN_PATTERNS.items():
-            if pattern in desc_lower:
-                return [CategorySuggestion(
-                    category=category,
-                    category_id=None,  # Caller maps to actual ID
-                    confidence=0.95,
-                    reasoning=f"Matched known pattern: {pattern}"
-                )]
+        matched = self._matcher.match(description)
+        if matched:
+            pattern, category = matched
+            return [CategorySuggestion(
+                category=category,
+                category_id=None,  # Caller maps to actual ID
+                confidence=0.95,
+                reasoning=f"Matched known pattern: {pattern}"
+            )]
+
+        # Then the branch's own history
+        rule = learned.match(description) if learned else None
+        if rule:
+            return [CategorySuggestion(
+                category=rule.category,
+                category_id=rule.category_id,
+                confidence=self._learned_confidence(rule),
+                reasoning=f"Learned rule: {rule.ngram} ({rule.support} expenses)"
+            )]
 
         # Fall back to AI categorization
-        return self._call_ai(description, amount, available_categories)
+        return self._call_ai(description, amount, available_categories, cache)
 
     def categorize_batch(
         self,
         expenses: list[dict],
-        available_categories: list[dict] | None = None
+        available_categories: list[dict] | None = None,
+        learned: LearnedRules | None = None,
+        cache: AIResultCache | None = None
     ) -> list[dict]:
         """
         Categorize multiple expenses in one API call.
 
         Each expense should have 'description' and optionally 'amount'.
         Returns list with added 'suggested_category' and 'confidence'.
+        Only expenses no pattern, learned rule or cached answer covers
+        go to the AI.
         """
         if not expenses:
             return []
 
-        # First, check known patterns
+        # First, check known patterns and learned rules
         results = []
         needs_ai = []
 
         for i, exp in enumerate(expenses):
-            desc_lower = exp.get("description", "").lower()
-            matched = False
-
-            for pattern, (category, _) in self.KNOWN_PATTERNS.items():
-                if pattern in desc_lower:
-                    results.append({
-                        **exp,
-                        "index": i,
-                        "suggested_category": category,
-                        "confidence": 0.95,
-                        "reasoning": f"Pattern: {pattern}"
-                    })
-                    matched = True
-                    break
-
-            if not matched:
-                needs_ai.append({"index": i, **exp})
+            description = exp.get("description", "")
+
+            matched = self._matcher.match(description)
+            if matched:
+                pattern, category = matched
+                results.append({
+                    **exp,
+                    "index": i,
+                    "suggested_category": category,
+                    "confidence": 0.95,
+                    "reasoning": f"Pattern: {pattern}"
+                })
+                continue
+
+            rule = learned.match(description) if learned else None
+            if rule:
+                results.append({
+                    **exp,
+                    "index": i,
+                    "suggested_category": rule.category,
+                    "category_id": rule.category_id,
+                    "confidence": self._learned_confidence(rule),
+                    "reasoning": f"Learned rule: {rule.ngram}"
+                })
+                continue
+
+            needs_ai.append({"index": i, **exp})
 
         # Call AI for remaining
         if needs_ai:
-            ai_results = self._call_ai_batch(needs_ai, available_categories)
+            ai_results = self._call_ai_batch(needs_ai, available_categories, cache)
             results.extend(ai_results)
 
         # Sort by original index
@@ -124,10 +356,18 @@ class ExpenseCategorizer:
         self,
         description: str,
         amount: Decimal | None,
-        available_categories: list[dict] | None
+        available_categories: list[dict] | None,
+        cache: AIResultCache | None = None
     ) -> list[CategorySuggestion]:
         """Call Claude API for categorization"""
-        if not self._api_key:
+        key = None
+        if cache is not None:
+            key = description_key(description, [c["name"] for c in available_categories or []])
+            cached = cache.get(KIND_CATEGORY_SUGGEST, key)
+            if cached is not None:
+                return [CategorySuggestion(**c) for c in cached]
+
+        if not self._has_client():
             # No API key - return fallback
             return [CategorySuggestion(
                 category="Other",
@@ -137,9 +377,7 @@ class ExpenseCategorizer:
             )]
 
         try:
-            import anthropic
-
-            client = anthropic.Anthropic(api_key=self._api_key)
+            client = self._get_client()
 
             categories_str = """
 - Utilities (elektrik, su, doğalgaz, internet)
@@ -168,16 +406,17 @@ Return JSON array with top 2 suggestions:
 
 Only return the JSON, no other text."""
 
-            response = client.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=200,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with observe_ai_call("categorization"):
+                response = client.messages.create(
+                    model="claude-3-haiku-20240307",
+                    max_tokens=200,
+                    messages=[{"role": "user", "content": prompt}]
+                )
 
             import json
             result = json.loads(response.content[0].text)
 
-            return [
+            suggestions = [
                 CategorySuggestion(
                     category=r["category"],
                     category_id=None,
@@ -195,69 +434,95 @@ Only return the JSON, no other text."""
                 reasoning=f"AI error: {str(e)}"
             )]
 
+        if cache is not None:
+            cache.put(KIND_CATEGORY_SUGGEST, key, [asdict(s) for s in suggestions])
+        return suggestions
+
     def _call_ai_batch(
         self,
         expenses: list[dict],
-        available_categories: list[dict] | None
+        available_categories: list[dict] | None,
+        cache: AIResultCache | None = None
     ) -> list[dict]:
-        """Call Claude API for batch categorization"""
+        """Call Claude API for batch categorization (cached answers first)"""
         if not expenses:
             return []
 
-        if not self._api_key:
+        cached_results = []
+        keys = {}
+        if cache is not None:
+            # Offered category names change the prompt, so they are part of the key
+            names = [c["name"] for c in available_categories or []]
+            keys = {id(e): description_key(e.get("description", ""), names) for e in expenses}
+            hits = cache.get_many(KIND_CATEGORY_BATCH, keys.values())
+            cached_results = [{**e, **hits[keys[id(e)]]} for e in expenses if keys[id(e)] in hits]
+            expenses = [e for e in expenses if keys[id(e)] not in hits]
+            if not expenses:
+                return cached_results
+
+        if not self._has_client():
             # No API key - return all as Other
-            return [
+            return cached_results + [
                 {**e, "suggested_category": "Other", "confidence": 0.5}
                 for e in expenses
             ]
 
         try:
-            import anthropic
             import json
 
-            client = anthropic.Anthropic(api_key=self._api_key)
+            client = self._get_client()
 
             expenses_str = "\n".join([
                 f"{i+1}. {e['description']} - {e.get('amount', 'N/A')} TL"
                 for i, e in enumerate(expenses)
             ])
 
+            categories_str = "Utilities, Rent, Personnel, Supplies, Cleaning, Delivery, Maintenance, Marketing, Other"
+            if available_categories:
+                categories_str = ", ".join(c["name"] for c in available_categories)
+
             prompt = f"""Kategorize these Turkish restaurant expenses:
 
 {expenses_str}
 
-Return JSON array:
-[{{"index": 0, "category": "CategoryName", "confidence": 0.0-1.0}}]
+Return JSON array (index is the expense number above):
+[{{"index": 1, "category": "CategoryName", "confidence": 0.0-1.0}}]
 
-Categories: Utilities, Rent, Personnel, Supplies, Cleaning, Delivery, Maintenance, Marketing, Other
+Categories: {categories_str}
 
 Only return the JSON."""
 
-            response = client.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=500,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with observe_ai_call("categorization_batch"):
+                response = client.messages.create(
+                    model="claude-3-haiku-20240307",
+                    max_tokens=500,
+                    messages=[{"role": "user", "content": prompt}]
+                )
 
             result = json.loads(response.content[0].text)
 
+            # Expenses are numbered from 1; answers outside the batch are dropped
+            answers = {}
+            for r in result:
+                index = r.get("index")
+                if isinstance(index, int) and 1 <= index <= len(expenses):
+                    answers[index - 1] = {"suggested_category": r["category"], "confidence": r["confidence"]}
+
             # Merge with original expenses
-            return [
-                {
-                    **expenses[r["index"]],
-                    "suggested_category": r["category"],
-                    "confidence": r["confidence"]
-                }
-                for r in result
-                if r["index"] < len(expenses)
-            ]
+            ai_results = [{**expenses[i], **answer} for i, answer in answers.items()]
         except Exception:
             # Return all as "Other" on error
-            return [
+            return cached_results + [
                 {**e, "suggested_category": "Other", "confidence": 0.5}
                 for e in expenses
             ]
 
+        if cache is not None:
+            cache.put_many(KIND_CATEGORY_BATCH, {
+                keys[id(expenses[i])]: answer for i, answer in answers.items()
+            })
+        return cached_results + ai_results
+
 
 # Singleton instance
 _categorizer = None
@@ -269,3 +534,37 @@ def get_categorizer() -> ExpenseCategorizer:
     if _categorizer is None:
         _categorizer = ExpenseCategorizer()
     return _categorizer
+
+
+# Global learned rule index
+_rule_index = LearnedRuleIndex(ttl_seconds=settings.CATEGORIZATION_RULES_TTL_SECONDS)
+
+
+def get_rule_index() -> LearnedRuleIndex:
+    """Get the global learned rule index"""
+    return _rule_index
+
+
+# Session.info key for branches whose learned rules need a rebuild
+_RULES_STALE_KEY = "categorization_rules_stale"
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_stale_rules(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Expense):
+            history = inspect(obj).attrs.branch_id.history
+            branch_ids = {obj.branch_id, *(history.deleted or ())}
+            session.info.setdefault(_RULES_STALE_KEY, set()).update(b for b in branch_ids if b is not None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_stale_rules(session):
+    branch_ids = session.info.pop(_RULES_STALE_KEY, None)
+    if branch_ids:
+        _rule_index.mark_stale(branch_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_rules(session):
+    session.info.pop(_RULES_STALE_KEY, None)
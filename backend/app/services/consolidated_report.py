@@ -0,0 +1,188 @@
+# backend/app/services/consolidated_report.py
+"""
+Consolidated (head office) report over several branches.
+
+Per-branch and total P&L, sales per platform and the cash difference
+summary for all branches of the request in three grouped statements,
+independent of the number of branches:
+
+1. daily_summaries GROUP BY branch_id, summary_date: P&L matrix + daily totals
+2. online_sales GROUP BY branch_id, platform_id: platform breakdown
+   (names / channel types from the catalog cache)
+3. cash_differences GROUP BY branch_id: kasa vs POS summary
+
+The cost grows with the rows in the date range, not with branch count x
+query count as with one /reports/bilanco call per branch.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import case, func, select, Select
+from sqlalchemy.orm import Session
+
+from app.models import Branch, CashDifference, DailySummary, OnlineSale
+from app.schemas import (
+    BranchCashDifferenceSummary, ConsolidatedBranch, ConsolidatedDay, ConsolidatedPnL, ConsolidatedReport
+)
+from app.services.catalog_cache import get_catalog
+from app.services.daily_summary_service import sync_pending_daily_summaries
+
+# P&L metric -> daily_summaries column (matrix columns, in order)
+PNL_COLUMNS = {
+    "revenue": DailySummary.total_sales,
+    "visa": DailySummary.sales_visa,
+    "nakit": DailySummary.sales_nakit,
+    "online": DailySummary.sales_online,
+    "purchases": DailySummary.total_purchases,
+    "expenses": DailySummary.total_expenses,
+    "courier": DailySummary.total_courier,
+    "parttime": DailySummary.total_part_time,
+    "staff": DailySummary.total_staff_meals,
+    "production": DailySummary.total_production,
+}
+COST_METRICS = ("purchases", "expenses", "courier", "parttime", "staff", "production")
+METRICS = tuple(PNL_COLUMNS) + ("total_expenses", "profit")
+
+
+def _to_decimal(value) -> Decimal:
+    return Decimal(str(value)) if value is not None else Decimal("0")
+
+
+def pnl_statement(branch_ids: list[int], start_date: date, end_date: date) -> Select:
+    return (
+        select(
+            DailySummary.branch_id,
+            DailySummary.summary_date,
+            *(func.sum(column).label(metric) for metric, column in PNL_COLUMNS.items())
+        )
+        .where(
+            DailySummary.branch_id.in_(branch_ids),
+            DailySummary.summary_date >= start_date,
+            DailySummary.summary_date <= end_date
+        )
+        .group_by(DailySummary.branch_id, DailySummary.summary_date)
+    )
+
+
+def platform_statement(branch_ids: list[int], start_date: date, end_date: date) -> Select:
+    return (
+        select(OnlineSale.branch_id, OnlineSale.platform_id, func.sum(OnlineSale.amount).label("total"))
+        .where(
+            OnlineSale.branch_id.in_(branch_ids),
+            OnlineSale.sale_date >= start_date,
+            OnlineSale.sale_date <= end_date
+        )
+        .group_by(OnlineSale.branch_id, OnlineSale.platform_id)
+    )
+
+
+def cash_difference_statement(branch_ids: list[int], start_date: date, end_date: date) -> Select:
+    return (
+        select(
+            CashDifference.branch_id,
+            func.count().label("days"),
+            func.sum(CashDifference.kasa_total).label("kasa_total"),
+            func.sum(CashDifference.pos_total).label("pos_total"),
+            func.sum(case((CashDifference.severity == "warning", 1), else_=0)).label("warning_days"),
+            func.sum(case((CashDifference.severity == "critical", 1), else_=0)).label("critical_days"),
+            func.sum(case((CashDifference.status.in_(("pending", "flagged")), 1), else_=0)).label("open_days"),
+        )
+        .where(
+            CashDifference.branch_id.in_(branch_ids),
+            CashDifference.difference_date >= start_date,
+            CashDifference.difference_date <= end_date
+        )
+        .group_by(CashDifference.branch_id)
+    )
+
+
+def _add_pnl(target: ConsolidatedPnL, values: dict) -> None:
+    for metric in PNL_COLUMNS:
+        setattr(target, metric, getattr(target, metric) + values[metric])
+
+
+def _finish_pnl(pnl: ConsolidatedPnL) -> ConsolidatedPnL:
+    pnl.total_expenses = sum((getattr(pnl, metric) for metric in COST_METRICS), Decimal("0"))
+    pnl.profit = pnl.revenue - pnl.total_expenses
+    return pnl
+
+
+def _add_cash(target: BranchCashDifferenceSummary, source: BranchCashDifferenceSummary) -> None:
+    for field in BranchCashDifferenceSummary.model_fields:
+        setattr(target, field, getattr(target, field) + getattr(source, field))
+
+
+def consolidated_report(
+    db: Session,
+    branches: Iterable[Branch],
+    start_date: date,
+    end_date: date
+) -> ConsolidatedReport:
+    """
+    Branch x metric matrix (branches[i].pnl, in METRICS order) with totals
+    and the daily series of all branches together. Branches without data
+    are included with zeros.
+    """
+    branches = sorted(branches, key=lambda b: b.id)
+    branch_ids = [b.id for b in branches]
+    rows_by_branch = {
+        b.id: ConsolidatedBranch(branch_id=b.id, branch_name=b.name, pnl=ConsolidatedPnL())
+        for b in branches
+    }
+
+    days = {
+        start_date + timedelta(days=i): ConsolidatedDay(date=start_date + timedelta(days=i))
+        for i in range((end_date - start_date).days + 1)
+    }
+
+    sync_pending_daily_summaries(db)
+    for row in db.execute(pnl_statement(branch_ids, start_date, end_date)):
+        values = {metric: _to_decimal(getattr(row, metric)) for metric in PNL_COLUMNS}
+        _add_pnl(rows_by_branch[row.branch_id].pnl, values)
+        day = days[row.summary_date]
+        day.revenue += values["revenue"]
+        day.total_expenses += sum((values[metric] for metric in COST_METRICS), Decimal("0"))
+
+    catalog = get_catalog(db)
+    platform_totals: dict[str, Decimal] = {p.name: Decimal("0") for p in catalog.active_platforms}
+    for row in db.execute(platform_statement(branch_ids, start_date, end_date)):
+        platform = catalog.platforms_by_id.get(row.platform_id)
+        name = platform.name if platform is not None else str(row.platform_id)
+        branch_platforms = rows_by_branch[row.branch_id].platforms
+        amount = _to_decimal(row.total)
+        branch_platforms[name] = branch_platforms.get(name, Decimal("0")) + amount
+        platform_totals[name] = platform_totals.get(name, Decimal("0")) + amount
+
+    total_cash = BranchCashDifferenceSummary()
+    for row in db.execute(cash_difference_statement(branch_ids, start_date, end_date)):
+        kasa_total, pos_total = _to_decimal(row.kasa_total), _to_decimal(row.pos_total)
+        summary = BranchCashDifferenceSummary(
+            days=row.days,
+            kasa_total=kasa_total,
+            pos_total=pos_total,
+            diff_total=pos_total - kasa_total,
+            warning_days=row.warning_days or 0,
+            critical_days=row.critical_days or 0,
+            open_days=row.open_days or 0
+        )
+        rows_by_branch[row.branch_id].cash_difference = summary
+        _add_cash(total_cash, summary)
+
+    total_pnl = ConsolidatedPnL()
+    for branch in rows_by_branch.values():
+        _finish_pnl(branch.pnl)
+        _add_pnl(total_pnl, branch.pnl.model_dump())
+    for day in days.values():
+        day.profit = day.revenue - day.total_expenses
+
+    return ConsolidatedReport(
+        start_date=start_date,
+        end_date=end_date,
+        metrics=list(METRICS),
+        branches=list(rows_by_branch.values()),
+        total=_finish_pnl(total_pnl),
+        platforms=platform_totals,
+        cash_difference=total_cash,
+        daily=list(days.values())
+    )
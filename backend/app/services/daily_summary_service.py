@@ -0,0 +1,403 @@
+# backend/app/services/daily_summary_service.py
+"""
+Daily P&L Rollup (daily_summaries)
+
+Keeps one DailySummary row per (branch_id, date) in sync with the source
+tables that feed the bilanco reports. Every flush that touches a tracked
+model marks its (branch, date) bucket dirty; right before the session
+commits, the dirty buckets are recomputed from the source tables, so the
+rollup is written in the same transaction as the business data.
+
+Reports then read a month or a year with a single indexed range scan
+instead of seven GROUP BY aggregations.
+"""
+from datetime import date, datetime, timedelta, UTC
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import event, case, func, inspect, text
+from sqlalchemy.orm import Session
+
+from app.models import (
+    DailySummary, OnlineSale, OnlinePlatform, Purchase, Expense,
+    CourierExpense, PartTimeCost, StaffMeal, DailyProduction
+)
+
+
+# Session.info key holding the set of dirty (branch_id, date) buckets
+DIRTY_KEY = "daily_summary_dirty"
+
+# Source model -> name of its date column
+TRACKED_MODELS = {
+    OnlineSale: "sale_date",
+    Purchase: "purchase_date",
+    Expense: "expense_date",
+    CourierExpense: "expense_date",
+    PartTimeCost: "cost_date",
+    StaffMeal: "meal_date",
+    DailyProduction: "production_date",
+}
+
+# Rollup column -> (model, branch column, date column, aggregated expression)
+SOURCE_AGGREGATES = {
+    "total_purchases": (Purchase, Purchase.branch_id, Purchase.purchase_date, Purchase.total),
+    "total_expenses": (Expense, Expense.branch_id, Expense.expense_date, Expense.amount),
+    # Kurye KDV dahil: amount + amount * vat_rate / 100
+    "total_courier": (
+        CourierExpense, CourierExpense.branch_id, CourierExpense.expense_date,
+        CourierExpense.amount + CourierExpense.amount * CourierExpense.vat_rate / 100
+    ),
+    "total_part_time": (PartTimeCost, PartTimeCost.branch_id, PartTimeCost.cost_date, PartTimeCost.amount),
+    "total_staff_meals": (
+        StaffMeal, StaffMeal.branch_id, StaffMeal.meal_date,
+        StaffMeal.unit_price * StaffMeal.staff_count
+    ),
+    # Üretim: (kneaded_kg / legen_kg) * legen_cost, division by zero guarded
+    "total_production": (
+        DailyProduction, DailyProduction.branch_id, DailyProduction.production_date,
+        case(
+            (DailyProduction.legen_kg > 0, DailyProduction.kneaded_kg / DailyProduction.legen_kg * DailyProduction.legen_cost),
+            else_=0
+        )
+    ),
+}
+
+# channel_type -> rollup column
+CHANNEL_COLUMNS = {
+    "pos_visa": "sales_visa",
+    "pos_nakit": "sales_nakit",
+    "online": "sales_online",
+}
+
+AMOUNT_FIELDS = (
+    "total_sales", "sales_visa", "sales_nakit", "sales_online",
+    "total_purchases", "total_expenses", "total_courier",
+    "total_part_time", "total_staff_meals", "total_production",
+)
+
+
+def _empty_totals() -> dict:
+    return {field: Decimal("0") for field in AMOUNT_FIELDS}
+
+
+def _to_decimal(value) -> Decimal:
+    return Decimal(str(value or 0))
+
+
+def _apply_filters(query, branch_col, date_col, branch_ids, start_date, end_date, dates):
+    if branch_ids is not None:
+        query = query.filter(branch_col.in_(branch_ids))
+    if start_date is not None:
+        query = query.filter(date_col >= start_date)
+    if end_date is not None:
+        query = query.filter(date_col <= end_date)
+    if dates is not None:
+        query = query.filter(date_col.in_(dates))
+    return query
+
+
+def compute_daily_totals(
+    db: Session,
+    branch_ids: Optional[Iterable[int]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    dates: Optional[Iterable[date]] = None
+) -> dict[tuple[int, date], dict]:
+    """
+    Aggregate the source tables per (branch_id, date).
+
+    This is the source of truth the rollup is built from; only buckets with
+    at least one source row are returned.
+    """
+    branch_ids = list(branch_ids) if branch_ids is not None else None
+    dates = list(dates) if dates is not None else None
+    result: dict[tuple[int, date], dict] = {}
+
+    # Satışlar: toplam + kanal tipi kırılımı
+    sales_query = db.query(
+        OnlineSale.branch_id,
+        OnlineSale.sale_date,
+        OnlinePlatform.channel_type,
+        func.sum(OnlineSale.amount)
+    ).outerjoin(
+        OnlinePlatform, OnlinePlatform.id == OnlineSale.platform_id
+    )
+    sales_query = _apply_filters(
+        sales_query, OnlineSale.branch_id, OnlineSale.sale_date,
+        branch_ids, start_date, end_date, dates
+    )
+    for branch_id, day, channel_type, total in sales_query.group_by(
+        OnlineSale.branch_id, OnlineSale.sale_date, OnlinePlatform.channel_type
+    ).all():
+        totals = result.setdefault((branch_id, day), _empty_totals())
+        amount = _to_decimal(total)
+        totals["total_sales"] += amount
+        column = CHANNEL_COLUMNS.get(channel_type)
+        if column:
+            totals[column] += amount
+
+    # Gider tarafı
+    for field, (model, branch_col, date_col, expr) in SOURCE_AGGREGATES.items():
+        query = db.query(branch_col, date_col, func.sum(expr))
+        query = _apply_filters(query, branch_col, date_col, branch_ids, start_date, end_date, dates)
+        for branch_id, day, total in query.group_by(branch_col, date_col).all():
+            result.setdefault((branch_id, day), _empty_totals())[field] = _to_decimal(total)
+
+    return result
+
+
+def _lock_bucket(db: Session, branch_id: int, day: date) -> None:
+    """Serialize concurrent refreshes of the same bucket (PostgreSQL only)."""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:branch_id, :day)"),
+            {"branch_id": branch_id, "day": day.toordinal()}
+        )
+
+
+def refresh_daily_summaries(db: Session, buckets: Iterable[tuple[int, date]]) -> int:
+    """
+    Recompute the given (branch_id, date) buckets from the source tables.
+
+    A bucket's row is removed once the day has no source rows left, so the
+    table only holds days with activity (a day whose source rows sum to
+    zero keeps an all-zero row). Returns the number of buckets refreshed.
+    """
+    by_branch: dict[int, set[date]] = {}
+    for branch_id, day in buckets:
+        if branch_id is None or day is None:
+            continue
+        by_branch.setdefault(branch_id, set()).add(day)
+
+    refreshed = 0
+    for branch_id, days in by_branch.items():
+        for day in sorted(days):
+            _lock_bucket(db, branch_id, day)
+
+        totals = compute_daily_totals(db, branch_ids=[branch_id], dates=days)
+        existing = {
+            row.summary_date: row
+            for row in db.query(DailySummary).filter(
+                DailySummary.branch_id == branch_id,
+                DailySummary.summary_date.in_(days)
+            ).all()
+        }
+
+        for day in days:
+            row = existing.get(day)
+            values = totals.get((branch_id, day))
+            if values is None:
+                if row is not None:
+                    db.delete(row)
+            elif row is None:
+                db.add(DailySummary(branch_id=branch_id, summary_date=day, **values))
+            else:
+                for field, value in values.items():
+                    setattr(row, field, value)
+                row.updated_at = datetime.now(UTC)
+            refreshed += 1
+
+    return refreshed
+
+
+def mark_daily_summary_dirty(db: Session, branch_id: int, day: date) -> None:
+    """
+    Mark a bucket for recomputation at commit.
+
+    Needed only for bulk ``Query.delete()``/``update()`` calls, which bypass
+    the flush hooks below.
+    """
+    db.info.setdefault(DIRTY_KEY, set()).add((branch_id, day))
+
+
+def sync_pending_daily_summaries(db: Session) -> None:
+    """
+    Read-your-own-writes: refresh buckets dirtied earlier in the current
+    transaction before a report reads the rollup.
+    """
+    if db.new or db.dirty or db.deleted:
+        db.flush()
+
+    buckets = db.info.pop(DIRTY_KEY, None)
+    if buckets:
+        refresh_daily_summaries(db, buckets)
+        db.flush()
+
+
+def rebuild_daily_summaries(
+    db: Session,
+    branch_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> int:
+    """
+    Backfill: drop and recreate rollup rows in scope from the source tables.
+
+    Does not commit; returns the number of rows written.
+    """
+    delete_query = db.query(DailySummary)
+    if branch_id is not None:
+        delete_query = delete_query.filter(DailySummary.branch_id == branch_id)
+    if start_date is not None:
+        delete_query = delete_query.filter(DailySummary.summary_date >= start_date)
+    if end_date is not None:
+        delete_query = delete_query.filter(DailySummary.summary_date <= end_date)
+    delete_query.delete(synchronize_session=False)
+
+    totals = compute_daily_totals(
+        db,
+        branch_ids=[branch_id] if branch_id is not None else None,
+        start_date=start_date,
+        end_date=end_date
+    )
+    db.bulk_insert_mappings(DailySummary, [
+        {"branch_id": b_id, "summary_date": day, **values}
+        for (b_id, day), values in totals.items()
+    ])
+    return len(totals)
+
+
+def check_daily_summaries(
+    db: Session,
+    branch_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> list[dict]:
+    """
+    Consistency checker: compare the rollup with a fresh aggregation.
+
+    Returns one entry per mismatching (branch_id, date) bucket with the
+    stored and expected values; an empty list means the rollup is in sync.
+    """
+    expected = compute_daily_totals(
+        db,
+        branch_ids=[branch_id] if branch_id is not None else None,
+        start_date=start_date,
+        end_date=end_date
+    )
+
+    stored_query = db.query(DailySummary)
+    if branch_id is not None:
+        stored_query = stored_query.filter(DailySummary.branch_id == branch_id)
+    if start_date is not None:
+        stored_query = stored_query.filter(DailySummary.summary_date >= start_date)
+    if end_date is not None:
+        stored_query = stored_query.filter(DailySummary.summary_date <= end_date)
+
+    stored = {
+        (row.branch_id, row.summary_date): {field: _to_decimal(getattr(row, field)) for field in AMOUNT_FIELDS}
+        for row in stored_query.all()
+    }
+
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        want = expected.get(key, _empty_totals())
+        have = stored.get(key, _empty_totals())
+        # Rollup columns keep 5 decimals; compare at that precision
+        diff = {
+            field: {"stored": have[field], "expected": want[field]}
+            for field in AMOUNT_FIELDS
+            if round(have[field] - want[field], 5) != 0
+        }
+        if diff:
+            mismatches.append({"branch_id": key[0], "date": key[1], "fields": diff})
+    return mismatches
+
+
+def fetch_daily_summaries(db: Session, branch_id: int, start_date: date, end_date: date) -> dict:
+    """
+    Read the rollup for a date range with one indexed range scan.
+
+    Returns every date in the range (zero-filled), keyed the same way the
+    bilanco helpers in app/api/reports.py expect.
+    """
+    result = {}
+    current = start_date
+    while current <= end_date:
+        result[current] = {
+            "revenue": Decimal("0"),
+            "visa": Decimal("0"),
+            "nakit": Decimal("0"),
+            "online": Decimal("0"),
+            "purchases": Decimal("0"),
+            "expenses": Decimal("0"),
+            "courier": Decimal("0"),
+            "parttime": Decimal("0"),
+            "staff": Decimal("0"),
+            "production": Decimal("0")
+        }
+        current += timedelta(days=1)
+
+    sync_pending_daily_summaries(db)
+
+    rows = db.query(DailySummary).filter(
+        DailySummary.branch_id == branch_id,
+        DailySummary.summary_date >= start_date,
+        DailySummary.summary_date <= end_date
+    ).all()
+
+    for row in rows:
+        result[row.summary_date] = {
+            "revenue": _to_decimal(row.total_sales),
+            "visa": _to_decimal(row.sales_visa),
+            "nakit": _to_decimal(row.sales_nakit),
+            "online": _to_decimal(row.sales_online),
+            "purchases": _to_decimal(row.total_purchases),
+            "expenses": _to_decimal(row.total_expenses),
+            "courier": _to_decimal(row.total_courier),
+            "parttime": _to_decimal(row.total_part_time),
+            "staff": _to_decimal(row.total_staff_meals),
+            "production": _to_decimal(row.total_production)
+        }
+
+    return result
+
+
+# ==================== SESSION HOOKS ====================
+
+def _bucket_keys(obj) -> set[tuple[int, date]]:
+    """Current and previous (branch_id, date) of a tracked object."""
+    date_attr = TRACKED_MODELS[type(obj)]
+    state = inspect(obj)
+    branch_ids = {obj.branch_id}
+    dates = {getattr(obj, date_attr)}
+
+    # Include the old bucket when branch or date changed
+    branch_hist = state.attrs.branch_id.history
+    date_hist = state.attrs[date_attr].history
+    branch_ids.update(branch_hist.deleted or ())
+    dates.update(date_hist.deleted or ())
+
+    return {(b, d) for b in branch_ids for d in dates if b is not None and d is not None}
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+# active_history: load the previous branch/date even when the instance was
+# expired by a commit, so moving a row also refreshes its old bucket
+for _model, _date_attr in TRACKED_MODELS.items():
+    for _attr in (_model.branch_id, getattr(_model, _date_attr)):
+        event.listen(_attr, "set", _keep_old_value, active_history=True, retval=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_dirty_buckets(session, flush_context, instances):
+    dirty = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if type(obj) in TRACKED_MODELS:
+            if dirty is None:
+                dirty = session.info.setdefault(DIRTY_KEY, set())
+            dirty.update(_bucket_keys(obj))
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_dirty_buckets(session):
+    # Flush first so pending source rows are visible to the aggregation
+    sync_pending_daily_summaries(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_buckets(session):
+    session.info.pop(DIRTY_KEY, None)
@@ -0,0 +1,123 @@
+# backend/app/services/export_service.py
+"""
+Streaming export of daily-sales-analytics (cash_differences) rows.
+
+Rows are read with yield_per (server-side cursor on PostgreSQL) and written
+out chunk by chunk, so memory stays flat regardless of the date range or
+the number of branches. The generators open their own Session on the
+request's engine because the response body is produced after the endpoint
+has returned.
+"""
+import csv
+import io
+import os
+import tempfile
+from datetime import date
+from typing import Iterator
+
+from openpyxl import Workbook
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import Branch, CashDifference
+
+EXPORT_BATCH_SIZE = 1000
+EXCEL_CHUNK_BYTES = 64 * 1024
+
+CHANNELS = ("visa", "nakit", "trendyol", "getir", "yemeksepeti", "migros")
+
+ANALYTICS_HEADERS = (
+    ["date"]
+    + [f"kasa_{c}" for c in CHANNELS] + ["kasa_total"]
+    + [f"pos_{c}" for c in CHANNELS] + ["pos_total"]
+    + ["diff_total", "status"]
+)
+BRANCH_HEADERS = ["branch_id", "branch_code"]
+
+
+def _analytics_statement(branch_ids: list[int], start_date: date, end_date: date, with_branch: bool):
+    columns = [CashDifference.difference_date]
+    columns += [getattr(CashDifference, f"kasa_{c}") for c in CHANNELS] + [CashDifference.kasa_total]
+    columns += [getattr(CashDifference, f"pos_{c}") for c in CHANNELS] + [CashDifference.pos_total]
+    columns.append(CashDifference.status)
+
+    stmt = select(*columns).where(
+        CashDifference.branch_id.in_(branch_ids),
+        CashDifference.difference_date >= start_date,
+        CashDifference.difference_date <= end_date
+    )
+    if with_branch:
+        stmt = stmt.add_columns(CashDifference.branch_id, Branch.code).join(
+            Branch, Branch.id == CashDifference.branch_id
+        ).order_by(CashDifference.branch_id, CashDifference.difference_date)
+    else:
+        stmt = stmt.order_by(CashDifference.difference_date)
+    return stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def iter_analytics_rows(
+    bind: Engine,
+    branch_ids: list[int],
+    start_date: date,
+    end_date: date,
+    with_branch: bool = False
+) -> Iterator[list[str]]:
+    """Header + one row of strings per cash_differences record, batch by batch"""
+    yield (BRANCH_HEADERS if with_branch else []) + ANALYTICS_HEADERS
+
+    with Session(bind=bind) as db:
+        result = db.execute(_analytics_statement(branch_ids, start_date, end_date, with_branch))
+        for row in result:
+            amounts = [value or 0 for value in row[1:15]]
+            kasa_total, pos_total = amounts[6], amounts[13]
+            values = (
+                [str(row[0])]
+                + [str(a) for a in amounts]
+                + [str(pos_total - kasa_total), row[15] or ""]
+            )
+            if with_branch:
+                values = [str(row[16]), row[17] or ""] + values
+            yield values
+
+
+def stream_csv(rows: Iterator[list[str]], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """CSV text in chunks of batch_size rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending = 0
+
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if pending:
+        yield buffer.getvalue()
+
+
+def stream_excel(rows: Iterator[list[str]], sheet_title: str = "Daily Sales Analytics") -> Iterator[bytes]:
+    """
+    xlsx bytes via openpyxl write_only mode.
+
+    write_only keeps rows on disk instead of a cell tree in memory; the
+    finished zip is read back from a temp file in fixed-size chunks.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+    for row in rows:
+        ws.append(row)
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        wb.save(path)
+        with open(path, "rb") as f:
+            while chunk := f.read(EXCEL_CHUNK_BYTES):
+                yield chunk
+    finally:
+        os.remove(path)
@@ -0,0 +1,195 @@
+# backend/app/services/menu_price_service.py
+"""
+Batched menu price resolution + per-branch resolved-menu cache.
+
+Resolution rule (unchanged): branch-specific price -> default price
+(branch_id NULL) -> no price. All candidate prices for a set of items are
+fetched in one query and resolved in memory.
+
+The resolved menu (list of response dicts) is cached per (branch_id,
+category_id) in-process. Committed changes to menu_item_prices invalidate
+the affected branch; default prices, items and categories clear the cache.
+Other workers converge within MENU_CACHE_TTL_SECONDS (0 disables caching).
+"""
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy import event, inspect, or_, select, Select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import MenuCategory, MenuItem, MenuItemPrice
+
+ResolvedPrice = tuple[Optional[Decimal], Optional[bool]]
+
+
+def menu_prices_statement(item_ids: list[int], branch_id: int) -> Select:
+    """Branch and default prices for a set of items in one query."""
+    return select(MenuItemPrice).where(
+        MenuItemPrice.menu_item_id.in_(item_ids),
+        or_(MenuItemPrice.branch_id == branch_id, MenuItemPrice.branch_id == None)
+    )
+
+
+def resolve_prices(prices: list[MenuItemPrice], branch_id: int) -> dict[int, ResolvedPrice]:
+    """menu_item_id -> (price, is_default); items without a price are absent"""
+    resolved: dict[int, ResolvedPrice] = {}
+    for p in prices:
+        if p.branch_id is None:
+            resolved.setdefault(p.menu_item_id, (p.price, True))
+        elif p.branch_id == branch_id:
+            resolved[p.menu_item_id] = (p.price, False)
+    return resolved
+
+
+def load_resolved_prices(db: Session, item_ids: list[int], branch_id: int) -> dict[int, ResolvedPrice]:
+    """Resolve prices for item_ids with a single query"""
+    if not item_ids:
+        return {}
+    return resolve_prices(db.scalars(menu_prices_statement(item_ids, branch_id)).all(), branch_id)
+
+
+def item_response(item: MenuItem, resolved: dict[int, ResolvedPrice]) -> dict:
+    """Convert MenuItem to response dict with resolved price."""
+    price, is_default = resolved.get(item.id, (None, None))
+    return {
+        "id": item.id,
+        "category_id": item.category_id,
+        "name": item.name,
+        "description": item.description,
+        "image_url": item.image_url,
+        "display_order": item.display_order,
+        "is_active": item.is_active,
+        "price": price,
+        "price_is_default": is_default,
+        "created_at": item.created_at
+    }
+
+
+def items_to_responses(items: list[MenuItem], prices: list[MenuItemPrice], branch_id: int) -> list[dict]:
+    """Response dicts for items from pre-fetched price rows"""
+    resolved = resolve_prices(prices, branch_id)
+    return [item_response(item, resolved) for item in items]
+
+
+class MenuCache:
+    """
+    Resolved menu per (branch_id, category_id), TTL + size bounded.
+    Invalidation bumps the branch generation (clear() a global one); a
+    menu resolved under an older generation is returned but not kept.
+    """
+
+    def __init__(self, ttl_seconds: int = 300, max_entries: int = 256):
+        self._store: OrderedDict[tuple[int, Optional[int]], tuple[float, list[dict]]] = OrderedDict()
+        self._lock = Lock()
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._generations: dict[int, int] = {}
+        self._clear_generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl_seconds > 0
+
+    def get(self, branch_id: int, category_id: Optional[int]) -> Optional[list[dict]]:
+        if not self.enabled:
+            return None
+        key = (branch_id, category_id)
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._store.pop(key, None)
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self, branch_id: int) -> tuple[int, int]:
+        """Take before resolving; pass to set()"""
+        with self._lock:
+            return self._clear_generation, self._generations.get(branch_id, 0)
+
+    def set(
+        self,
+        branch_id: int,
+        category_id: Optional[int],
+        responses: list[dict],
+        generation: Optional[tuple[int, int]] = None
+    ) -> None:
+        if not self.enabled:
+            return
+        key = (branch_id, category_id)
+        with self._lock:
+            current = (self._clear_generation, self._generations.get(branch_id, 0))
+            if generation is not None and generation != current:
+                return
+            self._store[key] = (time.monotonic() + self._ttl_seconds, responses)
+            self._store.move_to_end(key)
+            while len(self._store) > self._max_entries:
+                self._store.popitem(last=False)
+
+    def invalidate_branch(self, branch_id: int) -> None:
+        with self._lock:
+            self._generations[branch_id] = self._generations.get(branch_id, 0) + 1
+            for key in [k for k in self._store if k[0] == branch_id]:
+                del self._store[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear_generation += 1
+            self._store.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._store), "hits": self.hits, "misses": self.misses}
+
+
+# Global cache instance
+_menu_cache = MenuCache(ttl_seconds=settings.MENU_CACHE_TTL_SECONDS)
+
+
+def get_menu_cache() -> MenuCache:
+    """Get the global resolved-menu cache"""
+    return _menu_cache
+
+
+# Session.info keys for pending menu cache invalidations
+_MENU_DIRTY_KEY = "menu_cache_dirty_branches"
+_MENU_CLEAR_KEY = "menu_cache_clear"
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_menu_invalidations(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, MenuItemPrice):
+            history = inspect(obj).attrs.branch_id.history
+            branch_ids = {obj.branch_id, *(history.deleted or ())}
+            if None in branch_ids:
+                # Default price applies to every branch without an override
+                session.info[_MENU_CLEAR_KEY] = True
+            else:
+                session.info.setdefault(_MENU_DIRTY_KEY, set()).update(branch_ids)
+        elif isinstance(obj, (MenuItem, MenuCategory)):
+            session.info[_MENU_CLEAR_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_menu_invalidations(session):
+    if session.info.pop(_MENU_CLEAR_KEY, False):
+        session.info.pop(_MENU_DIRTY_KEY, None)
+        _menu_cache.clear()
+        return
+    for branch_id in session.info.pop(_MENU_DIRTY_KEY, ()):
+        _menu_cache.invalidate_branch(branch_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_menu_invalidations(session):
+    session.info.pop(_MENU_DIRTY_KEY, None)
+    session.info.pop(_MENU_CLEAR_KEY, None)
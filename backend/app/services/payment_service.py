@@ -1,13 +1,12 @@
 # backend/app/services/payment_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, desc, delete
+from sqlalchemy import select, and_, desc
 from typing import Optional
 from datetime import datetime, UTC
 from decimal import Decimal
 
 from app.models.supplier_ar import (
     SupplierPayment,
-    SupplierTransaction,
     PaymentType,
     PaymentStatus,
     TransactionType
@@ -17,13 +16,12 @@ from app.schemas.supplier_ar import (
     SupplierPaymentUpdate,
     SupplierPaymentWithSupplier
 )
-from app.services.supplier_ar_service import SupplierARService
+from app.services.supplier_ledger import post_transaction, remove_reference
 
 
 class PaymentService:
     def __init__(self, db: Session):
         self.db = db
-        self.ar_service = SupplierARService(db)
 
     def create_payment(self, data: SupplierPaymentCreate) -> SupplierPaymentWithSupplier:
         """
@@ -41,11 +39,11 @@ class PaymentService:
         # Ödeme kaydı oluştur
         payment = SupplierPayment(**data.model_dump())
         self.db.add(payment)
-        self.db.commit()
-        self.db.refresh(payment)
+        self.db.flush()
 
-        # Transaction kaydı oluştur (borç azalır)
-        self.ar_service.create_transaction(
+        # Transaction kaydı oluştur (borç azalır), ödemeyle aynı commit'te
+        post_transaction(
+            self.db,
             supplier_id=data.supplier_id,
             transaction_type=TransactionType.PAYMENT,
             description=f"Ödeme - {self._get_payment_type_label(data.payment_type)}",
@@ -55,6 +53,8 @@ class PaymentService:
             reference_type='supplier_payment',
             transaction_date=data.payment_date
         )
+        self.db.commit()
+        self.db.refresh(payment)
 
         return SupplierPaymentWithSupplier(
             id=payment.id,
@@ -229,15 +229,8 @@ class PaymentService:
         if not payment:
             return False
 
-        # İlgili transaction kaydını da sil
-        self.db.execute(
-            delete(SupplierTransaction).where(
-                and_(
-                    SupplierTransaction.reference_id == payment_id,
-                    SupplierTransaction.reference_type == 'supplier_payment'
-                )
-            )
-        )
+        # İlgili transaction kaydını da sil (bakiyeler geri alınır)
+        remove_reference(self.db, 'supplier_payment', payment_id)
 
         self.db.delete(payment)
         self.db.commit()
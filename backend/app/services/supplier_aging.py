@@ -0,0 +1,181 @@
+# backend/app/services/supplier_aging.py
+"""
+Supplier payables aging (0-30 / 31-60 / 61-90 / 90+ days), per supplier
+and per branch.
+
+Payments, returns and other credits settle the oldest debts first (FIFO),
+so a debt's unpaid part is
+
+    min(debt_amount, debts up to and including it - all credits)
+
+and it is open while that is positive. open_debts_statement() computes
+this in the database with two window sums over supplier_transactions,
+ordered by (transaction_date, id). Payments are posted to the same ledger,
+so supplier_payments is not read again.
+
+Current aging reads supplier_open_items: a per-supplier snapshot of the
+same query that the ledger keeps up to date on each posting (see
+supplier_ledger). An as_of date, or SUPPLIER_AGING_SNAPSHOT=False, runs
+the window query directly.
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import and_, case, delete, desc, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Supplier
+from app.models.supplier_ar import SupplierOpenItem, SupplierTransaction
+from app.schemas.supplier_ar import AgingBuckets, BranchAging, SupplierAgingReport, SupplierAgingRow
+
+BUCKETS = ('days_0_30', 'days_31_60', 'days_61_90', 'days_90_plus')
+
+
+def open_debts_statement(
+    as_of: Optional[date] = None,
+    supplier_id: Optional[int] = None,
+    branch_id: Optional[int] = None
+):
+    """(supplier_id, transaction_id, transaction_date, open_amount) of the unpaid debts"""
+    t = SupplierTransaction
+    ledger = select(
+        t.supplier_id,
+        t.id.label('transaction_id'),
+        t.transaction_date,
+        t.debt_amount,
+        func.sum(t.debt_amount).over(
+            partition_by=t.supplier_id,
+            order_by=(t.transaction_date, t.id),
+            rows=(None, 0)
+        ).label('debt_through'),
+        func.sum(t.credit_amount).over(partition_by=t.supplier_id).label('credit_total'),
+    )
+    if as_of is not None:
+        ledger = ledger.where(t.transaction_date < datetime.combine(as_of + timedelta(days=1), time.min))
+    if supplier_id is not None:
+        ledger = ledger.where(t.supplier_id == supplier_id)
+    if branch_id is not None:
+        ledger = ledger.where(t.supplier_id.in_(select(Supplier.id).where(Supplier.branch_id == branch_id)))
+    ledger = ledger.subquery('ledger')
+
+    unpaid = ledger.c.debt_through - ledger.c.credit_total
+    return select(
+        ledger.c.supplier_id,
+        ledger.c.transaction_id,
+        ledger.c.transaction_date,
+        case((unpaid < ledger.c.debt_amount, unpaid), else_=ledger.c.debt_amount).label('open_amount'),
+    ).where(ledger.c.debt_amount > 0, unpaid > 0)
+
+
+# ============ Snapshot ============
+def add_open_item(db: Session, transaction: SupplierTransaction) -> None:
+    """
+    A debt appended at the end of the ledger is open in full and leaves
+    the older items as they are.
+    """
+    db.add(SupplierOpenItem(
+        transaction_id=transaction.id,
+        supplier_id=transaction.supplier_id,
+        transaction_date=transaction.transaction_date,
+        open_amount=transaction.debt_amount
+    ))
+
+
+def refresh_open_items(db: Session, supplier_id: int) -> None:
+    """Recompute one supplier's open items (credits, backdated or removed movements)"""
+    db.execute(delete(SupplierOpenItem).where(SupplierOpenItem.supplier_id == supplier_id))
+    db.execute(
+        insert(SupplierOpenItem).from_select(
+            ['supplier_id', 'transaction_id', 'transaction_date', 'open_amount'],
+            open_debts_statement(supplier_id=supplier_id)
+        )
+    )
+
+
+def rebuild_open_items(db: Session) -> int:
+    """Recompute the snapshot for every supplier; does not commit"""
+    db.execute(delete(SupplierOpenItem))
+    db.execute(
+        insert(SupplierOpenItem).from_select(
+            ['supplier_id', 'transaction_id', 'transaction_date', 'open_amount'],
+            open_debts_statement()
+        )
+    )
+    return db.scalar(select(func.count()).select_from(SupplierOpenItem))
+
+
+# ============ Report ============
+def _to_decimal(value) -> Decimal:
+    return Decimal(str(value)) if value is not None else Decimal('0')
+
+
+def aging_report(db: Session, as_of: Optional[date] = None, branch_id: Optional[int] = None) -> SupplierAgingReport:
+    """
+    Aging buckets of open debts per supplier (largest first), per branch
+    and overall. Age is counted in days from the movement date to as_of.
+    """
+    use_snapshot = as_of is None and settings.SUPPLIER_AGING_SNAPSHOT
+    as_of = as_of or date.today()
+
+    if use_snapshot:
+        items = select(
+            SupplierOpenItem.supplier_id, SupplierOpenItem.transaction_date, SupplierOpenItem.open_amount
+        ).subquery('items')
+    else:
+        items = open_debts_statement(as_of=as_of, branch_id=branch_id).subquery('items')
+
+    # Bucket boundaries as datetimes: no dialect specific date arithmetic
+    day_30, day_60, day_90 = (datetime.combine(as_of - timedelta(days=n), time.min) for n in (30, 60, 90))
+    day, amount = items.c.transaction_date, items.c.open_amount
+    buckets = {
+        'days_0_30': day >= day_30,
+        'days_31_60': and_(day < day_30, day >= day_60),
+        'days_61_90': and_(day < day_60, day >= day_90),
+        'days_90_plus': day < day_90,
+    }
+
+    query = (
+        select(
+            Supplier.id,
+            Supplier.name,
+            Supplier.branch_id,
+            *(func.sum(case((condition, amount), else_=0)).label(name) for name, condition in buckets.items()),
+            func.sum(amount).label('total'),
+            func.min(day).label('oldest_open_date'),
+        )
+        .join(items, items.c.supplier_id == Supplier.id)
+        .group_by(Supplier.id, Supplier.name, Supplier.branch_id)
+        .order_by(desc('total'), Supplier.id)
+    )
+    if branch_id is not None:
+        query = query.where(Supplier.branch_id == branch_id)
+
+    suppliers = [
+        SupplierAgingRow(
+            supplier_id=row.id,
+            supplier_name=row.name,
+            branch_id=row.branch_id,
+            oldest_open_date=row.oldest_open_date,
+            **{field: _to_decimal(getattr(row, field)) for field in BUCKETS + ('total',)}
+        )
+        for row in db.execute(query)
+    ]
+
+    branches: dict[int, BranchAging] = {}
+    totals = AgingBuckets()
+    for row in suppliers:
+        branch = branches.setdefault(row.branch_id, BranchAging(branch_id=row.branch_id))
+        for field in BUCKETS + ('total',):
+            value = getattr(row, field)
+            setattr(branch, field, getattr(branch, field) + value)
+            setattr(totals, field, getattr(totals, field) + value)
+
+    return SupplierAgingReport(
+        as_of=as_of,
+        source="snapshot" if use_snapshot else "live",
+        suppliers=suppliers,
+        branches=sorted(branches.values(), key=lambda b: b.branch_id),
+        totals=totals
+    )
@@ -1,26 +1,22 @@
 # backend/app/services/supplier_ar_service.py
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, and_, desc
+from sqlalchemy import select, func, desc
 from typing import Optional
-from datetime import datetime, UTC
+from datetime import datetime
 from decimal import Decimal
 
 from app.models import Supplier
 from app.models.supplier_ar import (
-    SupplierPayment,
+    SupplierBalance,
     SupplierTransaction,
-    PaymentType,
-    PaymentStatus,
     TransactionType
 )
 from app.schemas.supplier_ar import (
     SupplierARSummary,
     SupplierARDetail,
-    SupplierTransaction as TransactionSchema,
-    SupplierPaymentCreate,
-    SupplierPayment as PaymentSchema,
-    SupplierPaymentUpdate
+    SupplierTransaction as TransactionSchema
 )
+from app.services.supplier_ledger import post_transaction, transactions_page
 
 
 class SupplierARService:
@@ -30,65 +26,21 @@ class SupplierARService:
     def get_all_supplier_ar(self) -> list[SupplierARSummary]:
         """
         Tüm tedarikçilerin cari hesap özetini getirir.
-        Hesaplamalar transaction tablosundan yapılır.
+        Toplamlar supplier_balances tablosundan okunur (hareketler taranmaz).
         """
-        # Son transaction kayıtlarını her tedarikçi için
-        last_trans_subq = (
-            select(
-                SupplierTransaction.supplier_id,
-                func.max(SupplierTransaction.id).label('last_trans_id')
-            )
-            .group_by(SupplierTransaction.supplier_id)
-            .subquery()
-        )
-
-        # Son transaction bilgileri (sadece bakiye ve tarih)
-        last_trans = (
-            select(
-                SupplierTransaction.id.label('trans_id'),
-                SupplierTransaction.supplier_id,
-                SupplierTransaction.running_balance,
-                SupplierTransaction.transaction_date
-            )
-            .where(SupplierTransaction.id == last_trans_subq.c.last_trans_id)
-            .subquery()
-        )
-
-        # Toplam borç/alacak hesapla (tüm transactionları topla)
-        totals_subq = (
-            select(
-                SupplierTransaction.supplier_id,
-                func.sum(SupplierTransaction.debt_amount).label('total_debt'),
-                func.sum(SupplierTransaction.credit_amount).label('total_credit')
-            )
-            .group_by(SupplierTransaction.supplier_id)
-            .subquery()
-        )
-
-        # Son ödeme tarihi (payments tablosundan)
-        last_payment_dates = (
-            select(
-                SupplierPayment.supplier_id,
-                func.max(SupplierPayment.payment_date).label('last_payment_date')
-            )
-            .group_by(SupplierPayment.supplier_id)
-            .subquery()
-        )
-
-        # Tedarikçilerle birleştir
         query = (
             select(
                 Supplier.id,
                 Supplier.name,
-                func.coalesce(last_trans.c.running_balance, 0).label('balance'),
-                func.coalesce(totals_subq.c.total_debt, 0).label('total_debt'),
-                func.coalesce(totals_subq.c.total_credit, 0).label('total_credit'),
-                func.coalesce(last_payment_dates.c.last_payment_date, last_trans.c.transaction_date).label('last_transaction_date')
+                func.coalesce(SupplierBalance.balance, 0).label('balance'),
+                func.coalesce(SupplierBalance.total_debt, 0).label('total_debt'),
+                func.coalesce(SupplierBalance.total_credit, 0).label('total_credit'),
+                func.coalesce(
+                    SupplierBalance.last_payment_date, SupplierBalance.last_transaction_date
+                ).label('last_transaction_date')
             )
-            .outerjoin(last_trans, Supplier.id == last_trans.c.supplier_id)
-            .outerjoin(totals_subq, Supplier.id == totals_subq.c.supplier_id)
-            .outerjoin(last_payment_dates, Supplier.id == last_payment_dates.c.supplier_id)
-            .order_by(desc(func.coalesce(last_trans.c.running_balance, 0)))
+            .outerjoin(SupplierBalance, Supplier.id == SupplierBalance.supplier_id)
+            .order_by(desc(func.coalesce(SupplierBalance.balance, 0)), Supplier.id)
         )
 
         result = self.db.execute(query)
@@ -106,44 +58,57 @@ class SupplierARService:
             for row in rows
         ]
 
-    def get_supplier_ar_detail(self, supplier_id: int) -> Optional[SupplierARDetail]:
+    def get_supplier_ar_detail(
+        self,
+        supplier_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Optional[SupplierARDetail]:
         """
         Tek tedarikçinin detaylı cari hesap bilgisini getirir.
+        Hareketler en yeniden eskiye sayfalanır; sonraki sayfa next_cursor ile.
         """
-        # Tedarikçi bilgisi
-        supplier_result = self.db.execute(
-            select(Supplier).where(Supplier.id == supplier_id)
-        )
-        supplier = supplier_result.scalar_one_or_none()
-
-        if not supplier:
+        # Tedarikçi ve güncel toplamlar
+        row = self.db.execute(
+            select(Supplier.id, Supplier.name, SupplierBalance)
+            .outerjoin(SupplierBalance, Supplier.id == SupplierBalance.supplier_id)
+            .where(Supplier.id == supplier_id)
+        ).first()
+
+        if not row:
             return None
 
-        # Hareket geçmişi
-        trans_result = self.db.execute(
-            select(SupplierTransaction)
-            .where(SupplierTransaction.supplier_id == supplier_id)
-            .order_by(desc(SupplierTransaction.transaction_date))
-        )
-        transactions = trans_result.scalars().all()
-
-        # Son hareketten bakiye bilgisi
-        last_trans = transactions[0] if transactions else None
-
-        # Toplam borç/alacak hesapla
-        total_debt = sum((t.debt_amount or Decimal('0')) for t in transactions)
-        total_credit = sum((t.credit_amount or Decimal('0')) for t in transactions)
+        totals = row.SupplierBalance
+        transactions, next_cursor = transactions_page(self.db, supplier_id, limit, cursor)
 
         return SupplierARDetail(
-            id=supplier.id,
-            name=supplier.name,
-            balance=last_trans.running_balance if last_trans else Decimal('0'),
-            total_debt=total_debt,
-            total_credit=total_credit,
-            last_transaction_date=last_trans.transaction_date if last_trans else None,
-            transactions=[TransactionSchema.model_validate(t) for t in transactions]
+            id=row.id,
+            name=row.name,
+            balance=totals.balance if totals else Decimal('0'),
+            total_debt=totals.total_debt if totals else Decimal('0'),
+            total_credit=totals.total_credit if totals else Decimal('0'),
+            last_transaction_date=totals.last_transaction_date if totals else None,
+            transactions=[TransactionSchema.model_validate(t) for t in transactions],
+            next_cursor=next_cursor
         )
 
+    def get_transactions(
+        self,
+        supplier_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Optional[tuple[list[TransactionSchema], Optional[str]]]:
+        """
+        Tedarikçinin hareket geçmişinden bir sayfa: (hareketler, next_cursor).
+        Tedarikçi yoksa None.
+        """
+        exists = self.db.scalar(select(Supplier.id).where(Supplier.id == supplier_id))
+        if exists is None:
+            return None
+
+        transactions, next_cursor = transactions_page(self.db, supplier_id, limit, cursor)
+        return [TransactionSchema.model_validate(t) for t in transactions], next_cursor
+
     def create_transaction(
         self,
         supplier_id: int,
@@ -156,33 +121,21 @@ class SupplierARService:
         transaction_date: Optional[datetime] = None
     ) -> SupplierTransaction:
         """
-        Yeni hareket kaydı oluşturur. Running balance hesaplar.
+        Yeni hareket kaydı oluşturur ve commit eder.
+        Running balance ve toplamlar supplier_ledger tarafından güncellenir.
         """
-        # Son bakiyeyi bul
-        last_balance_result = self.db.execute(
-            select(SupplierTransaction.running_balance)
-            .where(SupplierTransaction.supplier_id == supplier_id)
-            .order_by(desc(SupplierTransaction.transaction_date))
-            .limit(1)
-        )
-        last_balance = last_balance_result.scalar() or Decimal('0')
-
-        # Yeni bakiye hesapla
-        new_balance = last_balance + debt_amount - credit_amount
-
-        transaction = SupplierTransaction(
+        transaction = post_transaction(
+            self.db,
             supplier_id=supplier_id,
             transaction_type=transaction_type,
             description=description,
             debt_amount=debt_amount,
             credit_amount=credit_amount,
-            running_balance=new_balance,
             reference_id=reference_id,
             reference_type=reference_type,
-            transaction_date=transaction_date or datetime.now(UTC)
+            transaction_date=transaction_date
         )
 
-        self.db.add(transaction)
         self.db.commit()
         self.db.refresh(transaction)
 
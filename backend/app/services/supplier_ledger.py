@@ -0,0 +1,384 @@
+# backend/app/services/supplier_ledger.py
+"""
+Supplier ledger (cari hesap) engine.
+
+supplier_transactions is ordered by (transaction_date, id). Every posting
+updates, inside the caller's transaction:
+- running_balance of the new row (and of the later rows when it is backdated)
+- the supplier_balances row: balance, debt/credit totals, movement count
+- a supplier_balance_checkpoints row every SUPPLIER_LEDGER_CHECKPOINT_INTERVAL
+  movements (prefix totals up to and including that movement)
+- the supplier's open items for the aging report (supplier_aging)
+
+Reads do not scan the ledger: summaries come from supplier_balances and
+history is served as keyset pages over (transaction_date, id). Checkpoints
+let check/rebuild work on the tail after the latest checkpoint instead of
+the supplier's whole history.
+
+Re-running the backfill: python rebuild_supplier_ledger.py --full
+"""
+from datetime import datetime, UTC
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import ColumnElement, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.supplier_ar import (
+    SupplierBalance,
+    SupplierBalanceCheckpoint,
+    SupplierTransaction,
+    TransactionType
+)
+from app.services.supplier_aging import add_open_item, refresh_open_items
+from app.utils.pagination import Keyset
+
+ZERO = Decimal('0')
+
+TOTAL_FIELDS = ('balance', 'total_debt', 'total_credit', 'transaction_count')
+
+LEDGER_KEYSET = Keyset(SupplierTransaction.transaction_date, SupplierTransaction.id)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # DateTime columns are timezone-naive UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+def _ledger_key():
+    return tuple_(SupplierTransaction.transaction_date, SupplierTransaction.id)
+
+
+def _checkpoint_key():
+    return tuple_(SupplierBalanceCheckpoint.transaction_date, SupplierBalanceCheckpoint.transaction_id)
+
+
+# ============ Reads ============
+def transactions_page(
+    db: Session,
+    supplier_id: int,
+    limit: int,
+    cursor: Optional[str] = None
+) -> tuple[list[SupplierTransaction], Optional[str]]:
+    """
+    Newest first page of movements after the cursor position.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    query = LEDGER_KEYSET.apply(
+        select(SupplierTransaction).where(SupplierTransaction.supplier_id == supplier_id), limit, cursor
+    )
+    return LEDGER_KEYSET.page(db.scalars(query).all(), limit)
+
+
+def _latest_checkpoint(db: Session, supplier_id: int) -> Optional[SupplierBalanceCheckpoint]:
+    return db.scalars(
+        select(SupplierBalanceCheckpoint)
+        .where(SupplierBalanceCheckpoint.supplier_id == supplier_id)
+        .order_by(SupplierBalanceCheckpoint.transaction_date.desc(), SupplierBalanceCheckpoint.transaction_id.desc())
+        .limit(1)
+    ).first()
+
+
+def _tail_totals(db: Session, supplier_id: int, after: Optional[SupplierBalanceCheckpoint] = None) -> dict:
+    """Totals of the movements after a checkpoint (all movements without one)"""
+    query = select(
+        func.coalesce(func.sum(SupplierTransaction.debt_amount), 0),
+        func.coalesce(func.sum(SupplierTransaction.credit_amount), 0),
+        func.count(SupplierTransaction.id)
+    ).where(SupplierTransaction.supplier_id == supplier_id)
+    if after is not None:
+        query = query.where(_ledger_key() > tuple_(after.transaction_date, after.transaction_id))
+
+    debt, credit, count = db.execute(query).one()
+    debt, credit = Decimal(str(debt)), Decimal(str(credit))
+    totals = {'balance': debt - credit, 'total_debt': debt, 'total_credit': credit, 'transaction_count': count}
+    if after is not None:
+        for field in TOTAL_FIELDS:
+            totals[field] += getattr(after, field)
+    return totals
+
+
+def _last_payment_date(db: Session, supplier_id: int) -> Optional[datetime]:
+    return db.scalar(
+        select(func.max(SupplierTransaction.transaction_date)).where(
+            SupplierTransaction.supplier_id == supplier_id,
+            SupplierTransaction.transaction_type == TransactionType.PAYMENT
+        )
+    )
+
+
+# ============ Writes ============
+def _lock_totals(db: Session, supplier_id: int) -> SupplierBalance:
+    """
+    supplier_balances row locked FOR UPDATE: postings for one supplier are
+    serialized. Suppliers without one (first posting, or movements written
+    before the ledger existed) are rebuilt first.
+    """
+    totals = db.get(SupplierBalance, supplier_id, with_for_update=True, populate_existing=True)
+    if totals is not None:
+        return totals
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Concurrent first postings: one insert wins, the others wait for it
+        # and then lock the row the winner has rebuilt
+        created = db.execute(
+            pg_insert(SupplierBalance).values(supplier_id=supplier_id).on_conflict_do_nothing()
+        ).rowcount
+        totals = db.get(SupplierBalance, supplier_id, with_for_update=True, populate_existing=True)
+        if not created:
+            return totals
+
+    rebuild_supplier(db, supplier_id, full=True)
+    return db.get(SupplierBalance, supplier_id)
+
+
+def _add_checkpoint(db: Session, totals: SupplierBalance, transaction_id: int, transaction_date: datetime) -> None:
+    db.add(SupplierBalanceCheckpoint(
+        supplier_id=totals.supplier_id,
+        transaction_id=transaction_id,
+        transaction_date=transaction_date,
+        **{field: getattr(totals, field) for field in TOTAL_FIELDS}
+    ))
+    totals.checkpoint_count = totals.transaction_count
+
+
+def _drop_checkpoints(db: Session, totals: SupplierBalance, condition: ColumnElement[bool]) -> None:
+    """Drop checkpoints whose prefix changed; the count restarts from the latest kept one"""
+    db.execute(
+        delete(SupplierBalanceCheckpoint).where(SupplierBalanceCheckpoint.supplier_id == totals.supplier_id, condition)
+    )
+    kept = _latest_checkpoint(db, totals.supplier_id)
+    totals.checkpoint_count = kept.transaction_count if kept is not None else 0
+
+
+def post_transaction(
+    db: Session,
+    supplier_id: int,
+    transaction_type: TransactionType,
+    description: str,
+    debt_amount: Decimal = ZERO,
+    credit_amount: Decimal = ZERO,
+    reference_id: Optional[int] = None,
+    reference_type: Optional[str] = None,
+    transaction_date: Optional[datetime] = None
+) -> SupplierTransaction:
+    """
+    Add a movement and update running balances, totals and checkpoints.
+    Flushes but does not commit.
+    """
+    transaction_date = _naive_utc(transaction_date or datetime.now(UTC))
+    delta = debt_amount - credit_amount
+    totals = _lock_totals(db, supplier_id)
+
+    appended = totals.last_transaction_date is None or transaction_date >= totals.last_transaction_date
+    if appended:
+        running_balance = totals.balance + delta
+    else:
+        # Backdated: goes after the last movement on or before its date
+        # (a new id sorts last among equal dates), later balances shift
+        previous_balance = db.scalar(
+            select(SupplierTransaction.running_balance)
+            .where(
+                SupplierTransaction.supplier_id == supplier_id,
+                SupplierTransaction.transaction_date <= transaction_date
+            )
+            .order_by(SupplierTransaction.transaction_date.desc(), SupplierTransaction.id.desc())
+            .limit(1)
+        )
+        running_balance = (previous_balance or ZERO) + delta
+        db.execute(
+            update(SupplierTransaction)
+            .where(
+                SupplierTransaction.supplier_id == supplier_id,
+                SupplierTransaction.transaction_date > transaction_date
+            )
+            .values(running_balance=SupplierTransaction.running_balance + delta)
+        )
+        _drop_checkpoints(db, totals, SupplierBalanceCheckpoint.transaction_date > transaction_date)
+
+    transaction = SupplierTransaction(
+        supplier_id=supplier_id,
+        transaction_type=transaction_type,
+        description=description,
+        debt_amount=debt_amount,
+        credit_amount=credit_amount,
+        running_balance=running_balance,
+        reference_id=reference_id,
+        reference_type=reference_type,
+        transaction_date=transaction_date
+    )
+    db.add(transaction)
+    db.flush()  # id fixes the ledger position
+
+    totals.balance += delta
+    totals.total_debt += debt_amount
+    totals.total_credit += credit_amount
+    totals.transaction_count += 1
+    if appended:
+        totals.last_transaction_id = transaction.id
+        totals.last_transaction_date = transaction_date
+    if transaction_type == TransactionType.PAYMENT and (
+        totals.last_payment_date is None or transaction_date > totals.last_payment_date
+    ):
+        totals.last_payment_date = transaction_date
+
+    if appended and totals.transaction_count - totals.checkpoint_count >= settings.SUPPLIER_LEDGER_CHECKPOINT_INTERVAL:
+        _add_checkpoint(db, totals, transaction.id, transaction_date)
+
+    if settings.SUPPLIER_AGING_SNAPSHOT:
+        # A debt appended while no credit is unapplied is open in full;
+        # anything else can move the FIFO settlement of older debts
+        if appended and credit_amount == 0 and totals.balance - debt_amount >= 0:
+            if debt_amount > 0:
+                add_open_item(db, transaction)
+        else:
+            refresh_open_items(db, supplier_id)
+
+    db.flush()
+    return transaction
+
+
+def remove_transaction(db: Session, transaction: SupplierTransaction) -> None:
+    """Delete a movement and roll its amounts out of the ledger. Flushes, does not commit."""
+    supplier_id = transaction.supplier_id
+    totals = _lock_totals(db, supplier_id)
+    position = tuple_(transaction.transaction_date, transaction.id)
+    delta = transaction.debt_amount - transaction.credit_amount
+
+    db.execute(
+        update(SupplierTransaction)
+        .where(SupplierTransaction.supplier_id == supplier_id, _ledger_key() > position)
+        .values(running_balance=SupplierTransaction.running_balance - delta)
+    )
+    db.delete(transaction)
+    db.flush()
+
+    totals.balance -= delta
+    totals.total_debt -= transaction.debt_amount
+    totals.total_credit -= transaction.credit_amount
+    totals.transaction_count -= 1
+    _drop_checkpoints(db, totals, _checkpoint_key() >= position)
+
+    if totals.last_transaction_id == transaction.id:
+        last = db.execute(
+            select(SupplierTransaction.id, SupplierTransaction.transaction_date)
+            .where(SupplierTransaction.supplier_id == supplier_id)
+            .order_by(SupplierTransaction.transaction_date.desc(), SupplierTransaction.id.desc())
+            .limit(1)
+        ).first()
+        totals.last_transaction_id, totals.last_transaction_date = last if last else (None, None)
+    if transaction.transaction_type == TransactionType.PAYMENT:
+        totals.last_payment_date = _last_payment_date(db, supplier_id)
+    if settings.SUPPLIER_AGING_SNAPSHOT:
+        refresh_open_items(db, supplier_id)
+
+    db.flush()
+
+
+def remove_reference(db: Session, reference_type: str, reference_id: int) -> int:
+    """Remove the movements of a source record (e.g. a supplier payment)"""
+    transactions = db.scalars(
+        select(SupplierTransaction).where(
+            SupplierTransaction.reference_type == reference_type,
+            SupplierTransaction.reference_id == reference_id
+        )
+    ).all()
+    for transaction in transactions:
+        remove_transaction(db, transaction)
+    return len(transactions)
+
+
+# ============ Maintenance ============
+def rebuild_supplier(db: Session, supplier_id: int, full: bool = False) -> int:
+    """
+    Recompute running balances, totals and checkpoints in ledger order.
+
+    Resumes from the latest checkpoint unless full=True (or there is none).
+    Does not commit; returns the number of movements replayed.
+    """
+    totals = db.get(SupplierBalance, supplier_id, with_for_update=True, populate_existing=True)
+    if totals is None:
+        totals = SupplierBalance(supplier_id=supplier_id)
+        db.add(totals)
+
+    checkpoint = None if full else _latest_checkpoint(db, supplier_id)
+    query = (
+        select(SupplierTransaction)
+        .where(SupplierTransaction.supplier_id == supplier_id)
+        .order_by(SupplierTransaction.transaction_date, SupplierTransaction.id)
+    )
+    if checkpoint is None:
+        db.execute(delete(SupplierBalanceCheckpoint).where(SupplierBalanceCheckpoint.supplier_id == supplier_id))
+        for field in TOTAL_FIELDS:
+            setattr(totals, field, ZERO if field != 'transaction_count' else 0)
+        totals.checkpoint_count = 0
+        totals.last_transaction_id = totals.last_transaction_date = None
+    else:
+        query = query.where(_ledger_key() > tuple_(checkpoint.transaction_date, checkpoint.transaction_id))
+        for field in TOTAL_FIELDS:
+            setattr(totals, field, getattr(checkpoint, field))
+        totals.checkpoint_count = checkpoint.transaction_count
+        totals.last_transaction_id = checkpoint.transaction_id
+        totals.last_transaction_date = checkpoint.transaction_date
+
+    replayed = 0
+    for transaction in db.scalars(query).all():
+        totals.balance += transaction.debt_amount - transaction.credit_amount
+        totals.total_debt += transaction.debt_amount
+        totals.total_credit += transaction.credit_amount
+        totals.transaction_count += 1
+        totals.last_transaction_id = transaction.id
+        totals.last_transaction_date = transaction.transaction_date
+        if transaction.running_balance != totals.balance:
+            transaction.running_balance = totals.balance
+        if totals.transaction_count - totals.checkpoint_count >= settings.SUPPLIER_LEDGER_CHECKPOINT_INTERVAL:
+            _add_checkpoint(db, totals, transaction.id, transaction.transaction_date)
+        replayed += 1
+
+    totals.last_payment_date = _last_payment_date(db, supplier_id)
+    db.flush()
+    if settings.SUPPLIER_AGING_SNAPSHOT:
+        refresh_open_items(db, supplier_id)
+    return replayed
+
+
+def ledger_supplier_ids(db: Session) -> list[int]:
+    """Suppliers with movements or a totals row"""
+    return sorted(
+        set(db.scalars(select(SupplierTransaction.supplier_id).distinct()))
+        | set(db.scalars(select(SupplierBalance.supplier_id)))
+    )
+
+
+def check_supplier(db: Session, supplier_id: int, full: bool = False) -> dict:
+    """
+    Compare the stored totals with the ledger: latest checkpoint plus the
+    movements after it, or every movement when full=True.
+
+    Returns {field: {"stored": ..., "expected": ...}} for mismatching
+    fields; empty when in sync.
+    """
+    checkpoint = None if full else _latest_checkpoint(db, supplier_id)
+    expected = _tail_totals(db, supplier_id, after=checkpoint)
+
+    totals = db.get(SupplierBalance, supplier_id)
+    stored = {field: getattr(totals, field) if totals else None for field in TOTAL_FIELDS}
+
+    last_running_balance = db.scalar(
+        select(SupplierTransaction.running_balance)
+        .where(SupplierTransaction.supplier_id == supplier_id)
+        .order_by(SupplierTransaction.transaction_date.desc(), SupplierTransaction.id.desc())
+        .limit(1)
+    )
+    stored['running_balance'] = last_running_balance if last_running_balance is not None else ZERO
+    expected['running_balance'] = expected['balance']
+
+    return {
+        field: {"stored": stored[field], "expected": expected[field]}
+        for field in expected
+        if stored[field] != expected[field]
+    }
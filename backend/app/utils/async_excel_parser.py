@@ -0,0 +1,107 @@
+# backend/app/utils/async_excel_parser.py
+"""
+Async wrappers around the synchronous upload parsers.
+
+openpyxl parsing runs in the excel process pool, vision OCR calls in the
+ocr thread pool (see parsing_executor.py); the event loop only awaits.
+Raise ParsingBusyError when the pool's queue is full.
+"""
+import asyncio
+import zipfile
+from io import BytesIO
+from typing import Optional
+
+from app.services.ai_result_cache import AIResultCache, KIND_POS_OCR, image_key
+from app.utils.excel_parser import (
+    parse_kasa_raporu, parse_hasilat_raporu, parse_kasa_sheets, parse_hasilat_sheets,
+    parse_kasa_files, parse_hasilat_files, workbook_sheet_names
+)
+from app.utils.parsing_executor import get_parsing_executor
+from app.utils.pos_ocr import build_pos_result, request_pos_ocr
+
+
+async def async_parse_kasa_raporu(file_content: bytes) -> dict:
+    """Parse Kasa Raporu Excel off the event loop"""
+    return await get_parsing_executor().run_excel(parse_kasa_raporu, file_content)
+
+
+async def async_parse_hasilat_raporu(file_content: bytes) -> dict:
+    """Parse Şefim Hasılat Raporu Excel off the event loop"""
+    return await get_parsing_executor().run_excel(parse_hasilat_raporu, file_content)
+
+
+async def async_parse_pos_image(
+    image_content: bytes,
+    media_type: str = "image/jpeg",
+    cache: Optional[AIResultCache] = None
+) -> dict:
+    """
+    POS screenshot OCR in the ocr thread pool. The cache (and its request
+    session) is only used here on the request side, never in the pool thread.
+    """
+    key = image_key(image_content)
+    if cache is not None:
+        cached = cache.get(KIND_POS_OCR, key)
+        if cached is not None:
+            return build_pos_result(cached)
+
+    data = await get_parsing_executor().run_ocr(request_pos_ocr, image_content, media_type)
+
+    if cache is not None:
+        cache.put(KIND_POS_OCR, key, data)
+    return build_pos_result(data)
+
+
+# Upper bound for one multi-day upload (a month, with some slack)
+MAX_UPLOAD_DAYS = 31
+
+
+def _zip_entries(file_content: bytes) -> list[tuple[str, bytes]]:
+    with zipfile.ZipFile(BytesIO(file_content)) as archive:
+        names = sorted(
+            info.filename for info in archive.infolist()
+            if not info.is_dir()
+            and info.filename.lower().endswith('.xlsx')
+            and not info.filename.startswith('__MACOSX/')
+        )
+        if len(names) > MAX_UPLOAD_DAYS:
+            raise ValueError(f"Tek yuklemede en fazla {MAX_UPLOAD_DAYS} gun olabilir")
+        return [(name, archive.read(name)) for name in names]
+
+
+def _chunks(items: list, count: int) -> list[list]:
+    """Split items into at most count contiguous, roughly equal chunks"""
+    if not items:
+        return []
+    size = -(-len(items) // max(count, 1))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def _parse_month(file_content: bytes, filename: str, sheets_fn, files_fn) -> list[dict]:
+    executor = get_parsing_executor()
+
+    if filename.lower().endswith('.zip'):
+        units = _zip_entries(file_content)
+        jobs = [(files_fn, chunk) for chunk in _chunks(units, executor.excel.workers)]
+    else:
+        units = await executor.run_excel(workbook_sheet_names, file_content)
+        if len(units) > MAX_UPLOAD_DAYS:
+            raise ValueError(f"Tek yuklemede en fazla {MAX_UPLOAD_DAYS} gun olabilir")
+        jobs = [(sheets_fn, file_content, chunk) for chunk in _chunks(units, executor.excel.workers)]
+
+    parsed = await asyncio.gather(*(executor.run_excel(*job) for job in jobs))
+    return [day for chunk in parsed for day in chunk]
+
+
+async def async_parse_kasa_days(file_content: bytes, filename: str) -> list[dict]:
+    """
+    Kasa raporu for several days: a workbook with one FORM sheet per day or
+    a zip of daily files. Days are parsed in parallel, one chunk per excel
+    worker; each result carries "source" and either the parsed day or "error".
+    """
+    return await _parse_month(file_content, filename, parse_kasa_sheets, parse_kasa_files)
+
+
+async def async_parse_hasilat_days(file_content: bytes, filename: str) -> list[dict]:
+    """Hasılat raporu for several days (same upload formats as kasa)"""
+    return await _parse_month(file_content, filename, parse_hasilat_sheets, parse_hasilat_files)
@@ -4,6 +4,10 @@ Excel Kasa Raporu Parser
 Parses the cashier's Excel report (1453.xlsx format) and extracts:
 - Sales data by channel (VISA, NAKİT, online platforms)
 - Expense items from the GIDERLER section
+
+Workbooks are opened read_only and each sheet is read in a single
+iter_rows(values_only=True) pass; only the cells listed in the layout maps
+below are kept, so the cell object model is never built.
 """
 from datetime import date, datetime
 from decimal import Decimal
@@ -12,6 +16,123 @@ import openpyxl
 from io import BytesIO
 
 
+# ==================== Layouts (1-based row / column numbers) ====================
+
+# Channel -> rows summed for it (FORM and KASA RAPORU share the same rows)
+KASA_CHANNEL_ROWS = {
+    "visa": (6, 7, 8),            # VISA, PAKET VISA, NFS KOMISYON
+    "nakit": (10, 11),            # NAKIT, PAKET NAKIT
+    "trendyol": (13,),
+    "getir": (14,),
+    "yemeksepeti": (15,),
+    "migros": (16,),
+}
+KASA_DATE_ROW = 4
+KASA_EXPENSE_START_ROW = 21
+KASA_EXPENSE_DESC_COL = 1           # A
+
+FORM_VALUE_COLS = (4, 14)           # D = Sabahci, N = Aksamci
+FORM_EXPENSE_AMOUNT_COLS = (8, 18)  # H = Sabahci, R = Aksamci
+
+KASA_RAPORU_VALUE_COLS = (4,)       # D
+KASA_RAPORU_EXPENSE_AMOUNT_COLS = (8,)
+
+HASILAT_CHANNEL_ROWS = {
+    "visa": (4, 5, 6, 7, 8),        # VISA, POS 1, POS 2, PAKET VISA, FATURALI SATIŞ
+    "nakit": (10, 11),              # NAKİT, PAKET NAKİT
+    "trendyol": (13,),
+    "getir": (14,),
+    "yemeksepeti": (15,),
+    "migros": (16,),
+}
+HASILAT_DATE_ROW = 3
+HASILAT_VALUE_COL = 4               # D
+
+CHANNELS = ("visa", "nakit", "trendyol", "getir", "yemeksepeti", "migros")
+
+
+def _load_workbook(file_content: bytes):
+    return openpyxl.load_workbook(BytesIO(file_content), read_only=True, data_only=True)
+
+
+def _to_decimal(val) -> Decimal:
+    """Cell value as Decimal; empty, text and uncached formulas count as 0"""
+    if val is None:
+        return Decimal("0")
+    if isinstance(val, str) and val.startswith('='):
+        return Decimal("0")
+    try:
+        return Decimal(str(val))
+    except:
+        return Decimal("0")
+
+
+def _to_date(val, required: bool = False) -> date:
+    if isinstance(val, datetime):
+        return val.date()
+    elif isinstance(val, date):
+        return val
+    if required:
+        # Bulk import: a sheet without a date can't be matched to a day
+        raise ValueError("Tarih hucresi bos veya gecersiz")
+    return date.today()
+
+
+def _cell(row: tuple, col: int):
+    return row[col - 1] if len(row) >= col else None
+
+
+def _parse_kasa_layout(
+    sheet,
+    value_cols: tuple[int, ...],
+    expense_amount_cols: tuple[int, ...],
+    require_date: bool = False
+) -> dict:
+    """
+    Single pass over a FORM / KASA RAPORU sheet.
+
+    Header rows (date + channels) are summed over value_cols; rows from
+    KASA_EXPENSE_START_ROW on are GIDERLER lines (description in column A,
+    amounts summed over expense_amount_cols).
+    """
+    header_rows = {KASA_DATE_ROW, *(r for rows in KASA_CHANNEL_ROWS.values() for r in rows)}
+    max_col = max(value_cols + expense_amount_cols)
+
+    header = {}
+    expenses = []
+    expenses_total = Decimal("0")
+
+    for row_idx, row in enumerate(sheet.iter_rows(min_row=1, max_col=max_col, values_only=True), start=1):
+        if row_idx in header_rows:
+            header[row_idx] = row
+        elif row_idx >= KASA_EXPENSE_START_ROW:
+            desc = _cell(row, KASA_EXPENSE_DESC_COL)
+            amounts = [_to_decimal(_cell(row, col)) for col in expense_amount_cols]
+            if desc and any(a > 0 for a in amounts):
+                exp_amount = sum(amounts, Decimal("0"))
+                expenses_total += exp_amount
+                expenses.append({
+                    "description": str(desc),
+                    "amount": exp_amount
+                })
+
+    def value(row_idx: int) -> Decimal:
+        row = header.get(row_idx, ())
+        return sum((_to_decimal(_cell(row, col)) for col in value_cols), Decimal("0"))
+
+    result = {"date": _to_date(_cell(header.get(KASA_DATE_ROW, ()), value_cols[0]), require_date)}
+    for channel, rows in KASA_CHANNEL_ROWS.items():
+        result[channel] = sum((value(r) for r in rows), Decimal("0"))
+    result["expenses"] = expenses
+
+    # IMPORTANT: expenses are deducted from NAKIT in the KASA report, but POS
+    # shows the full amount - add them back for an accurate comparison
+    result["nakit"] = result["nakit"] + expenses_total
+
+    result["total"] = sum((result[c] for c in CHANNELS), Decimal("0"))
+    return result
+
+
 def parse_kasa_raporu(file_content: bytes) -> dict:
     """
     Parse Excel Kasa Raporu and return structured data.
@@ -31,149 +152,31 @@ def parse_kasa_raporu(file_content: bytes) -> dict:
 
     Columns: D = Sabahci, N = Aksamci
     """
-    wb = openpyxl.load_workbook(BytesIO(file_content), data_only=True)
-
-    # Try FORM sheet first, then KASA RAPORU
-    if 'FORM' in wb.sheetnames:
-        sheet = wb['FORM']
-        return _parse_form_sheet(sheet)
-    elif 'KASA RAPORU' in wb.sheetnames:
-        sheet = wb['KASA RAPORU']
-        return _parse_kasa_raporu_sheet(sheet)
-    else:
-        raise ValueError("Excel dosyasinda FORM veya KASA RAPORU sayfasi bulunamadi")
+    return _parse_kasa_workbook(file_content)
 
 
-def _parse_form_sheet(sheet) -> dict:
-    """Parse FORM sheet with two shifts (Sabahci + Aksamci)"""
+def _parse_kasa_workbook(file_content: bytes, require_date: bool = False) -> dict:
+    wb = _load_workbook(file_content)
+    try:
+        # Try FORM sheet first, then KASA RAPORU
+        if 'FORM' in wb.sheetnames:
+            return _parse_form_sheet(wb['FORM'], require_date)
+        elif 'KASA RAPORU' in wb.sheetnames:
+            return _parse_kasa_raporu_sheet(wb['KASA RAPORU'], require_date)
+        else:
+            raise ValueError("Excel dosyasinda FORM veya KASA RAPORU sayfasi bulunamadi")
+    finally:
+        wb.close()
 
-    def get_value(row: int, col: int) -> Decimal:
-        """Get cell value, handle formulas by getting cached value"""
-        val = sheet.cell(row=row, column=col).value
-        if val is None:
-            return Decimal("0")
-        if isinstance(val, str) and val.startswith('='):
-            return Decimal("0")
-        try:
-            return Decimal(str(val))
-        except:
-            return Decimal("0")
-
-    # Column indices: D=4 (Sabahci), N=14 (Aksamci)
-    COL_SABAHCI = 4
-    COL_AKSAMCI = 14
-
-    # Parse date from row 4
-    date_val = sheet.cell(row=4, column=COL_SABAHCI).value
-    if isinstance(date_val, datetime):
-        parsed_date = date_val.date()
-    elif isinstance(date_val, date):
-        parsed_date = date_val
-    else:
-        parsed_date = date.today()
-
-    # Sum both shifts
-    result = {
-        "date": parsed_date,
-        "visa": (
-            get_value(6, COL_SABAHCI) + get_value(6, COL_AKSAMCI) +
-            get_value(7, COL_SABAHCI) + get_value(7, COL_AKSAMCI) +
-            get_value(8, COL_SABAHCI) + get_value(8, COL_AKSAMCI)
-        ),
-        "nakit": (
-            get_value(10, COL_SABAHCI) + get_value(10, COL_AKSAMCI) +
-            get_value(11, COL_SABAHCI) + get_value(11, COL_AKSAMCI)
-        ),
-        "trendyol": get_value(13, COL_SABAHCI) + get_value(13, COL_AKSAMCI),
-        "getir": get_value(14, COL_SABAHCI) + get_value(14, COL_AKSAMCI),
-        "yemeksepeti": get_value(15, COL_SABAHCI) + get_value(15, COL_AKSAMCI),
-        "migros": get_value(16, COL_SABAHCI) + get_value(16, COL_AKSAMCI),
-        "expenses": []
-    }
 
-    # Parse expenses (rows 21+) - IMPORTANT: These are deducted from NAKIT
-    # So when comparing with POS, we need to add expenses back to NAKIT
-    expenses_total = Decimal("0")
-    for row in range(21, sheet.max_row + 1):
-        desc = sheet.cell(row=row, column=1).value
-        amount_s = get_value(row, 8)
-        amount_a = get_value(row, 18)
-
-        if desc and (amount_s > 0 or amount_a > 0):
-            exp_amount = amount_s + amount_a
-            expenses_total += exp_amount
-            result["expenses"].append({
-                "description": str(desc),
-                "amount": exp_amount
-            })
-
-    # Add expenses to nakit for accurate comparison with POS
-    # (In the KASA report, expenses reduce NAKIT, but POS shows the full amount)
-    result["nakit"] = result["nakit"] + expenses_total
-
-    result["total"] = (
-        result["visa"] + result["nakit"] +
-        result["trendyol"] + result["getir"] +
-        result["yemeksepeti"] + result["migros"]
-    )
-
-    return result
+def _parse_form_sheet(sheet, require_date: bool = False) -> dict:
+    """Parse FORM sheet with two shifts (Sabahci + Aksamci)"""
+    return _parse_kasa_layout(sheet, FORM_VALUE_COLS, FORM_EXPENSE_AMOUNT_COLS, require_date)
 
 
-def _parse_kasa_raporu_sheet(sheet) -> dict:
+def _parse_kasa_raporu_sheet(sheet, require_date: bool = False) -> dict:
     """Parse KASA RAPORU sheet (combined summary)"""
-
-    def get_value(row: int, col: int = 4) -> Decimal:
-        val = sheet.cell(row=row, column=col).value
-        if val is None:
-            return Decimal("0")
-        try:
-            return Decimal(str(val))
-        except:
-            return Decimal("0")
-
-    date_val = sheet.cell(row=4, column=4).value
-    if isinstance(date_val, datetime):
-        parsed_date = date_val.date()
-    elif isinstance(date_val, date):
-        parsed_date = date_val
-    else:
-        parsed_date = date.today()
-
-    result = {
-        "date": parsed_date,
-        "visa": get_value(6) + get_value(7) + get_value(8),
-        "nakit": get_value(10) + get_value(11),
-        "trendyol": get_value(13),
-        "getir": get_value(14),
-        "yemeksepeti": get_value(15),
-        "migros": get_value(16),
-        "expenses": []
-    }
-
-    # Parse expenses (rows 21+) - IMPORTANT: Add to nakit for POS comparison
-    expenses_total = Decimal("0")
-    for row in range(21, sheet.max_row + 1):
-        desc = sheet.cell(row=row, column=1).value
-        amount = get_value(row, 8)
-
-        if desc and amount > 0:
-            expenses_total += amount
-            result["expenses"].append({
-                "description": str(desc),
-                "amount": amount
-            })
-
-    # Add expenses to nakit for accurate comparison with POS
-    result["nakit"] = result["nakit"] + expenses_total
-
-    result["total"] = (
-        result["visa"] + result["nakit"] +
-        result["trendyol"] + result["getir"] +
-        result["yemeksepeti"] + result["migros"]
-    )
-
-    return result
+    return _parse_kasa_layout(sheet, KASA_RAPORU_VALUE_COLS, KASA_RAPORU_EXPENSE_AMOUNT_COLS, require_date)
 
 
 def parse_hasilat_raporu(file_content: bytes) -> dict:
@@ -194,57 +197,96 @@ def parse_hasilat_raporu(file_content: bytes) -> dict:
     - Row 15: YEMEK SEPETİ
     - Row 16: MİGROS YEMEK
     """
-    wb = openpyxl.load_workbook(BytesIO(file_content), data_only=True)
-    sheet = wb.active  # Use first sheet
-
-    def get_value(row: int, col: int = 4) -> Decimal:
-        """Get cell value as Decimal. Default column is 4 (column D)."""
-        val = sheet.cell(row=row, column=col).value
-        if val is None:
-            return Decimal("0")
-        try:
-            return Decimal(str(val))
-        except:
-            return Decimal("0")
-
-    # Parse date from row 3 (column 4 = D column has the date value)
-    date_val = sheet.cell(row=3, column=4).value
-    if isinstance(date_val, datetime):
-        parsed_date = date_val.date()
-    elif isinstance(date_val, date):
-        parsed_date = date_val
-    elif isinstance(date_val, (int, float)):
-        # Excel serial date format (e.g., 46014 = 2026-01-14)
+    return _parse_hasilat_workbook(file_content)
+
+
+def _parse_hasilat_workbook(file_content: bytes, require_date: bool = False) -> dict:
+    wb = _load_workbook(file_content)
+    try:
+        return _parse_hasilat_sheet(wb.active, require_date)  # Use first sheet
+    finally:
+        wb.close()
+
+
+def _parse_hasilat_sheet(sheet, require_date: bool = False) -> dict:
+    last_row = max(r for rows in HASILAT_CHANNEL_ROWS.values() for r in rows)
+
+    # Only the top of the sheet is needed
+    rows = {
+        row_idx: row
+        for row_idx, row in enumerate(
+            sheet.iter_rows(min_row=1, max_row=last_row, max_col=HASILAT_VALUE_COL, values_only=True),
+            start=1
+        )
+    }
+
+    def get_value(row: int) -> Decimal:
+        return _to_decimal(_cell(rows.get(row, ()), HASILAT_VALUE_COL))
+
+    # Parse date from row 3 (column D has the date value)
+    date_val = _cell(rows.get(HASILAT_DATE_ROW, ()), HASILAT_VALUE_COL)
+    if isinstance(date_val, (int, float)):
+        # Excel serial date format (e.g., 46014 = 2025-12-23)
         parsed_date = datetime.fromordinal(datetime(1900, 1, 1).toordinal() + int(date_val) - 2).date()
     else:
-        parsed_date = date.today()
-
-    # VISA breakdown: VISA + POS 1 + POS 2 + PAKET VISA + FATURALI
-    visa_total = (
-        get_value(4) +  # VISA
-        get_value(5) +  # POS 1
-        get_value(6) +  # POS 2
-        get_value(7) +  # PAKET VISA
-        get_value(8)    # FATURALI SATIŞ
-    )
-
-    # NAKİT: NAKİT + PAKET NAKİT
-    nakit_total = get_value(10) + get_value(11)
-
-    result = {
-        "date": parsed_date,
-        "visa": visa_total,
-        "nakit": nakit_total,
-        "trendyol": get_value(13),
-        "getir": get_value(14),
-        "yemeksepeti": get_value(15),  # YEMEK SEPETİ is in the report
-        "migros": get_value(16),
-    }
+        parsed_date = _to_date(date_val, require_date)
 
-    result["total"] = (
-        result["visa"] + result["nakit"] +
-        result["trendyol"] + result["getir"] +
-        result["yemeksepeti"] + result["migros"]
-    )
+    result = {"date": parsed_date}
+    for channel, channel_rows in HASILAT_CHANNEL_ROWS.items():
+        result[channel] = sum((get_value(r) for r in channel_rows), Decimal("0"))
 
+    result["total"] = sum((result[c] for c in CHANNELS), Decimal("0"))
     return result
+
+
+# ==================== Multi-day uploads ====================
+# A month arrives either as one workbook with a sheet per day (FORM /
+# hasilat layout on every sheet) or as a zip of daily files. The functions
+# below parse one chunk of days each so a month can be spread over the
+# excel process pool; a bad day is returned as {"source", "error"} instead
+# of failing the whole chunk.
+
+def workbook_sheet_names(file_content: bytes) -> list[str]:
+    wb = _load_workbook(file_content)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def _day_result(source: str, parse) -> dict:
+    try:
+        return {**parse(), "source": source}
+    except Exception as e:
+        return {"source": source, "error": str(e)}
+
+
+def parse_kasa_sheets(file_content: bytes, sheet_names: list[str]) -> list[dict]:
+    """Kasa raporu days from a workbook with one FORM-layout sheet per day"""
+    wb = _load_workbook(file_content)
+    try:
+        return [
+            _day_result(name, lambda: _parse_form_sheet(wb[name], require_date=True))
+            for name in sheet_names
+        ]
+    finally:
+        wb.close()
+
+
+def parse_hasilat_sheets(file_content: bytes, sheet_names: list[str]) -> list[dict]:
+    """Hasılat raporu days from a workbook with one sheet per day"""
+    wb = _load_workbook(file_content)
+    try:
+        return [_day_result(name, lambda: _parse_hasilat_sheet(wb[name], require_date=True)) for name in sheet_names]
+    finally:
+        wb.close()
+
+
+def parse_kasa_files(files: list[tuple[str, bytes]]) -> list[dict]:
+    """Kasa raporu days from (filename, content) pairs, e.g. a zip's entries"""
+    return [_day_result(name, lambda: _parse_kasa_workbook(content, require_date=True)) for name, content in files]
+
+
+def parse_hasilat_files(files: list[tuple[str, bytes]]) -> list[dict]:
+    """Hasılat raporu days from (filename, content) pairs"""
+    return [_day_result(name, lambda: _parse_hasilat_workbook(content, require_date=True)) for name, content in files]
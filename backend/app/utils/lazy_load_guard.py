@@ -0,0 +1,58 @@
+# backend/app/utils/lazy_load_guard.py
+"""
+Lazy-load guard for request sessions.
+
+List endpoints serialize relationships (Purchase.items, Expense.category,
+MonthlyPayroll.employee, ...). Left to the default lazy loader, that is one
+SELECT per row. Endpoints declare what they need with loader options
+(app/api/loaders.py); with the guard on, any relationship that is still
+lazy loaded during the request raises LazyLoadError instead of silently
+issuing the extra query.
+
+Enabled for every request session by the test client and, outside tests,
+by DB_RAISE_ON_LAZY_LOAD. Many-to-one lookups answered from the identity
+map emit no SQL and are not affected.
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+# Session.info key: lazy loads are errors in this session
+_GUARD_KEY = "forbid_lazy_loads"
+
+
+class LazyLoadError(RuntimeError):
+    """A relationship was lazy loaded inside a guarded request session"""
+
+
+def forbid_lazy_loads(session: Session) -> None:
+    session.info[_GUARD_KEY] = True
+
+
+def allow_lazy_loads(session: Session) -> None:
+    session.info.pop(_GUARD_KEY, None)
+
+
+@contextmanager
+def lazy_loads_forbidden(session: Session):
+    forbid_lazy_loads(session)
+    try:
+        yield session
+    finally:
+        allow_lazy_loads(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _raise_on_lazy_load(orm_execute_state: ORMExecuteState):
+    # selectinload / subqueryload are relationship loads too, but have no
+    # lazy_loaded_from; only a per-instance lazy load sets it
+    if not orm_execute_state.is_select or orm_execute_state.lazy_loaded_from is None:
+        return
+    if not orm_execute_state.session.info.get(_GUARD_KEY):
+        return
+    path = orm_execute_state.loader_strategy_path
+    attribute = path[-1] if len(path) else "?"
+    raise LazyLoadError(
+        f"Lazy load of {attribute} in a request; add it to the endpoint's loader options (app/api/loaders.py)"
+    )
@@ -0,0 +1,93 @@
+# backend/app/utils/pagination.py
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Lists are ordered newest first by (date, id). The next page is
+WHERE (date, id) < (last row's date, id) ... LIMIT n + 1, so with an index
+on (branch_id, date, id) every page costs the same as the first one,
+unlike OFFSET. The cursor is opaque to clients (urlsafe base64 of the last
+row's key); the next one is sent in the X-Next-Cursor response header so
+response bodies stay plain lists, and is absent on the last page.
+
+    LIST_KEYSET = Keyset(Expense.expense_date, Expense.id)
+
+    query = LIST_KEYSET.apply(query, limit, cursor)
+    rows, next_cursor = LIST_KEYSET.page(query.all(), limit)
+    set_next_cursor(response, next_cursor)
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Optional, Sequence, TypeVar
+
+from fastapi import Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Statement = TypeVar("Statement")
+
+
+class InvalidCursorError(ValueError):
+    """Cursor that was not produced by the same Keyset (HTTP 400)"""
+
+
+def _encode_value(value: Any):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+class Keyset:
+    """Descending (date, id) order of a list endpoint and its cursors"""
+
+    def __init__(self, *columns: InstrumentedAttribute):
+        self.columns = columns
+
+    def encode(self, row) -> str:
+        key = [_encode_value(getattr(row, column.key)) for column in self.columns]
+        raw = json.dumps(key, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> tuple:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            key = json.loads(raw)
+            if not isinstance(key, list) or len(key) != len(self.columns):
+                raise ValueError(cursor)
+            values = []
+            for column, value in zip(self.columns, key):
+                python_type = column.type.python_type
+                if python_type is datetime:
+                    value = datetime.fromisoformat(value)
+                elif python_type is date:
+                    value = date.fromisoformat(value)
+                elif not isinstance(value, python_type):
+                    raise ValueError(cursor)
+                values.append(value)
+            return tuple(values)
+        except (ValueError, TypeError, UnicodeDecodeError, binascii.Error) as e:
+            raise InvalidCursorError("Gecersiz cursor") from e
+
+    def apply(self, stmt: Statement, limit: int, cursor: Optional[str] = None) -> Statement:
+        """
+        Order newest first and fetch one row past the page; works for
+        select() statements and legacy Query objects.
+        """
+        if cursor:
+            stmt = stmt.where(tuple_(*self.columns) < tuple_(*self.decode(cursor)))
+        return stmt.order_by(*(column.desc() for column in self.columns)).limit(limit + 1)
+
+    def page(self, rows: Sequence, limit: int) -> tuple[list, Optional[str]]:
+        """(page rows, next_cursor); next_cursor is None on the last page"""
+        rows = list(rows)
+        if len(rows) <= limit:
+            return rows, None
+        return rows[:limit], self.encode(rows[limit - 1])
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
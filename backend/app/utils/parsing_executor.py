@@ -0,0 +1,156 @@
+# backend/app/utils/parsing_executor.py
+"""
+Bounded worker pools for upload parsing, off the event loop.
+
+- excel: process pool for CPU-bound openpyxl parsing (spawned workers,
+  recycled after PARSE_MAX_TASKS_PER_CHILD tasks to cap openpyxl memory)
+- ocr: thread pool for blocking vision API calls (I/O bound)
+
+Each pool runs at most `workers` jobs and holds at most `max_queue` more
+waiting; beyond that a job is rejected with ParsingBusyError, which the
+endpoints turn into 503 instead of piling up uploads. Queue depth and
+wait/run timings are exposed via stats() (GET /api/health/parsing).
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from app.config import settings
+
+
+class ParsingBusyError(Exception):
+    """All workers busy and wait queue full"""
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> tuple[float, float, Any]:
+    """Runs in the worker: (start wall time, run seconds, result)"""
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return started, time.time() - started, result
+
+
+class BoundedPool:
+    """Executor with admission control and queue/timing counters"""
+
+    def __init__(self, name: str, factory: Callable[[int], Executor], workers: int, max_queue: int):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._lock = Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) in the pool; fn must be picklable for process pools"""
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise ParsingBusyError(f"{self.name} parse kuyrugu dolu")
+            self._in_flight += 1
+            if self._executor is None:
+                self._executor = self._factory(self.workers)
+            executor = self._executor
+
+        submitted = time.time()
+        try:
+            future = executor.submit(_timed_call, fn, args, kwargs)
+            started, run_seconds, result = await asyncio.wrap_future(future)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+                self.failed += 1
+            raise
+
+        wait_ms = max(started - submitted, 0.0) * 1000
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.total_run_ms += run_seconds * 1000
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            finished = self.completed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "active": min(self._in_flight, self.workers),
+                "queued": max(self._in_flight - self.workers, 0),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait_ms / finished, 3) if finished else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "avg_run_ms": round(self.total_run_ms / finished, 3) if finished else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _process_pool(workers: int) -> Executor:
+    # spawn: forking a process that already runs threads (uvicorn, SQLAlchemy
+    # pools) can deadlock the child; spawn also allows max_tasks_per_child
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=settings.PARSE_MAX_TASKS_PER_CHILD or None
+    )
+
+
+def _excel_pool(workers: int) -> Executor:
+    if settings.PARSE_USE_PROCESSES:
+        return _process_pool(workers)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="excel-parse")
+
+
+def _ocr_pool(workers: int) -> Executor:
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-parse")
+
+
+class ParsingExecutor:
+    """Excel (process) and OCR (thread) pools, created lazily on first use"""
+
+    def __init__(self):
+        self.excel = BoundedPool("excel", _excel_pool, settings.PARSE_EXCEL_WORKERS, settings.PARSE_MAX_QUEUE)
+        self.ocr = BoundedPool("ocr", _ocr_pool, settings.PARSE_OCR_WORKERS, settings.PARSE_MAX_QUEUE)
+
+    async def run_excel(self, fn: Callable, *args, **kwargs) -> Any:
+        return await self.excel.run(fn, *args, **kwargs)
+
+    async def run_ocr(self, fn: Callable, *args, **kwargs) -> Any:
+        return await self.ocr.run(fn, *args, **kwargs)
+
+    def stats(self) -> dict:
+        return {
+            "excel": {**self.excel.stats(), "processes": settings.PARSE_USE_PROCESSES},
+            "ocr": self.ocr.stats(),
+        }
+
+    def shutdown(self) -> None:
+        self.excel.shutdown()
+        self.ocr.shutdown()
+
+
+# Global executor instance
+_parsing_executor = ParsingExecutor()
+
+
+def get_parsing_executor() -> ParsingExecutor:
+    """Get the global parsing executor"""
+    return _parsing_executor
@@ -12,9 +12,16 @@ from decimal import Decimal
 from typing import Optional
 
 from app.config import settings
+from app.metrics import observe_ai_call
+from app.services.ai_result_cache import AIResultCache, KIND_POS_OCR, image_key
 
 
-def parse_pos_image(image_content: bytes, media_type: str = "image/jpeg") -> dict:
+def parse_pos_image(
+    image_content: bytes,
+    media_type: str = "image/jpeg",
+    client=None,
+    cache: Optional[AIResultCache] = None
+) -> dict:
     """
     Parse POS Hasilat Raporu image using Claude Vision API.
 
@@ -24,8 +31,26 @@ def parse_pos_image(image_content: bytes, media_type: str = "image/jpeg") -> dic
     - TOPLAM
 
     Returns structured data with confidence score.
+    The model's raw JSON is cached by image SHA-256 when cache is given,
+    so re-uploading the same screenshot makes no API call.
     """
-    client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+    key = image_key(image_content)
+    if cache is not None:
+        cached = cache.get(KIND_POS_OCR, key)
+        if cached is not None:
+            return build_pos_result(cached)
+
+    data = request_pos_ocr(image_content, media_type, client)
+
+    if cache is not None:
+        cache.put(KIND_POS_OCR, key, data)
+    return build_pos_result(data)
+
+
+def request_pos_ocr(image_content: bytes, media_type: str, client=None) -> dict:
+    """Send the image to the vision model and return its JSON answer"""
+    if client is None:
+        client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
 
     image_base64 = base64.standard_b64encode(image_content).decode("utf-8")
 
@@ -66,29 +91,30 @@ confidence: Ne kadar emin olduğun (0.0-1.0 arası). Görüntü net değilse vey
 
 SADECE JSON dön, başka bir şey yazma."""
 
-    message = client.messages.create(
-        model="claude-3-haiku-20240307",
-        max_tokens=1024,
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": media_type,
-                            "data": image_base64,
+    with observe_ai_call("pos_ocr"):
+        message = client.messages.create(
+            model="claude-3-haiku-20240307",
+            max_tokens=1024,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": media_type,
+                                "data": image_base64,
+                            },
                         },
-                    },
-                    {
-                        "type": "text",
-                        "text": prompt
-                    }
-                ],
-            }
-        ],
-    )
+                        {
+                            "type": "text",
+                            "text": prompt
+                        }
+                    ],
+                }
+            ],
+        )
 
     response_text = message.content[0].text.strip()
 
@@ -106,6 +132,11 @@ SADECE JSON dön, başka bir şey yazma."""
         else:
             raise ValueError(f"Could not parse OCR response: {response_text}")
 
+    return data
+
+
+def build_pos_result(data: dict) -> dict:
+    """Model JSON -> typed POS fields (visa/nakit include paket and extra terminals)"""
     try:
         parsed_date = datetime.strptime(data.get("date", ""), "%Y-%m-%d").date()
     except:
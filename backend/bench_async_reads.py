@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Sync vs async read path benchmark for the hot read endpoints.
+
+Builds a bare FastAPI app with two handlers per endpoint: the sync helper on
+SessionLocal (threadpool) and the async handler logic on AsyncSessionLocal.
+Both are driven in-process through httpx ASGITransport, so only the database
+path differs. Run against a PostgreSQL DATABASE_URL with real data:
+
+    python bench_async_reads.py --branch-id 1 --concurrency 50 100 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.cash_difference import cash_differences_statement
+from app.api.menu_items import list_menu_items, menu_items_statement
+from app.api.online_sales import fetch_today_sales, today_sales_from_rows, today_sales_statement
+from app.api.reports import build_dashboard_stats, build_dashboard_stats_async
+from app.database import AsyncSessionLocal, SessionLocal, async_engine, engine
+from app.services.catalog_cache import get_catalog_cache
+from app.services.menu_price_service import items_to_responses, menu_prices_statement
+
+ENDPOINTS = ("dashboard", "today", "menu-items", "cash-difference")
+
+
+def build_app(branch_id: int) -> FastAPI:
+    bench = FastAPI()
+
+    # ---- sync: same helpers the sync code path uses ----
+    @bench.get("/sync/dashboard")
+    def sync_dashboard():
+        with SessionLocal() as db:
+            return build_dashboard_stats(db, branch_id, date.today())
+
+    @bench.get("/sync/today")
+    def sync_today():
+        with SessionLocal() as db:
+            return fetch_today_sales(db, branch_id, date.today())
+
+    @bench.get("/sync/menu-items")
+    def sync_menu_items():
+        with SessionLocal() as db:
+            return list_menu_items(db, branch_id)
+
+    @bench.get("/sync/cash-difference")
+    def sync_cash_difference():
+        with SessionLocal() as db:
+            return [r.id for r in db.scalars(cash_differences_statement(branch_id)).all()]
+
+    # ---- async: AsyncSession, same statements ----
+    @bench.get("/async/dashboard")
+    async def async_dashboard():
+        async with AsyncSessionLocal() as db:
+            return await build_dashboard_stats_async(db, branch_id, date.today())
+
+    @bench.get("/async/today")
+    async def async_today():
+        today = date.today()
+        async with AsyncSessionLocal() as db:
+            catalog = await get_catalog_cache().aget(db)
+            sales = (await db.scalars(today_sales_statement(branch_id, today))).all()
+        return today_sales_from_rows(catalog.active_platforms, sales, today)
+
+    @bench.get("/async/menu-items")
+    async def async_menu_items():
+        async with AsyncSessionLocal() as db:
+            items = (await db.scalars(menu_items_statement(branch_id))).all()
+            if not items:
+                return []
+            prices = (await db.scalars(menu_prices_statement([i.id for i in items], branch_id))).all()
+        return items_to_responses(items, prices, branch_id)
+
+    @bench.get("/async/cash-difference")
+    async def async_cash_difference():
+        async with AsyncSessionLocal() as db:
+            return [r.id for r in (await db.scalars(cash_differences_statement(branch_id))).all()]
+
+    return bench
+
+
+async def run(client: httpx.AsyncClient, path: str, concurrency: int, requests: int) -> dict:
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(path)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            url = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Sync vs async read endpoint benchmark")
+    parser.add_argument("--branch-id", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--requests", type=int, default=2000, help="Istek sayisi (her olcum icin)")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, nargs="+", default=list(ENDPOINTS))
+    args = parser.parse_args()
+
+    if not str(engine.url).startswith("postgresql"):
+        print("Uyari: DATABASE_URL PostgreSQL degil, sonuclar anlamli olmayabilir")
+
+    transport = httpx.ASGITransport(app=build_app(args.branch_id))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'endpoint':<16} {'mode':<6} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'err':>5}")
+        for endpoint in args.endpoint:
+            for concurrency in args.concurrency:
+                for mode in ("sync", "async"):
+                    path = f"/{mode}/{endpoint}"
+                    await client.get(path)  # warm-up: pool + caches
+                    result = await run(client, path, concurrency, args.requests)
+                    print(
+                        f"{endpoint:<16} {mode:<6} {concurrency:>5} {result['rps']:>9.1f} "
+                        f"{result['p50']:>9.2f} {result['p95']:>9.2f} {result['errors']:>5}"
+                    )
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Monthly cash difference import benchmark (31 days).
+
+- parse: 31 daily kasa + hasilat workbooks parsed one by one vs
+  async_parse_*_days over the excel process pool
+- write: 31 single-day imports (one transaction each, what 31 calls to
+  POST /cash-difference/import do) vs one import_days() call for the month
+
+Statements are counted on the engine. Defaults to in-memory SQLite; point
+--database-url at an empty scratch PostgreSQL database to see the batched
+RETURNING inserts (tables are created, seed rows added, nothing dropped):
+
+    python bench_cash_import.py --database-url postgresql://localhost/bench_import
+"""
+import argparse
+import asyncio
+import time
+import zipfile
+from datetime import date, datetime, timedelta
+from io import BytesIO
+
+import openpyxl
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Branch, ExpenseCategory, OnlinePlatform, User
+from app.services.cash_import_service import day_request, import_days
+from app.utils.async_excel_parser import async_parse_hasilat_days, async_parse_kasa_days
+from app.utils.excel_parser import parse_hasilat_raporu, parse_kasa_raporu
+from app.utils.parsing_executor import get_parsing_executor
+
+DAYS = 31
+PLATFORMS = ("Visa", "Nakit", "Trendyol", "Getir", "Yemek Sepeti", "Migros Yemek")
+
+
+def workbook(fill) -> bytes:
+    wb = openpyxl.Workbook()
+    fill(wb)
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def kasa_form(ws, day: date):
+    ws["D4"] = datetime(day.year, day.month, day.day)
+    for row in (6, 7, 10, 11, 13, 14, 15, 16):
+        ws.cell(row=row, column=4, value=row * 100)
+        ws.cell(row=row, column=14, value=row * 50)
+    for i in range(8):
+        ws.cell(row=21 + i, column=1, value=f"Gider {i}")
+        ws.cell(row=21 + i, column=8, value=10 + i)
+
+
+def hasilat(ws, day: date):
+    ws["D3"] = datetime(day.year, day.month, day.day)
+    for row in range(4, 17):
+        ws.cell(row=row, column=4, value=row * 140)
+
+
+def month_files(year: int) -> tuple[list[bytes], list[bytes]]:
+    days = [date(year, 1, 1) + timedelta(days=i) for i in range(DAYS)]
+
+    def kasa_wb(day):
+        def fill(wb):
+            wb.active.title = "FORM"
+            kasa_form(wb.active, day)
+        return workbook(fill)
+
+    return [kasa_wb(d) for d in days], [workbook(lambda wb, d=d: hasilat(wb.active, d)) for d in days]
+
+
+def zipped(files: list[bytes]) -> bytes:
+    output = BytesIO()
+    with zipfile.ZipFile(output, "w") as archive:
+        for i, content in enumerate(files):
+            archive.writestr(f"{i + 1:02d}.xlsx", content)
+    return output.getvalue()
+
+
+def bench_parse(kasa_files: list[bytes], pos_files: list[bytes]) -> tuple[float, float]:
+    start = time.perf_counter()
+    for kasa, pos in zip(kasa_files, pos_files):
+        parse_kasa_raporu(kasa)
+        parse_hasilat_raporu(pos)
+    sequential = time.perf_counter() - start
+
+    async def parallel():
+        return await asyncio.gather(
+            async_parse_kasa_days(zipped(kasa_files), "kasa.zip"),
+            async_parse_hasilat_days(zipped(pos_files), "pos.zip")
+        )
+
+    asyncio.run(parallel())  # warm up the worker processes
+    start = time.perf_counter()
+    asyncio.run(parallel())
+    return sequential, time.perf_counter() - start
+
+
+def setup_database(url: str):
+    if url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        if db.get(User, 1) is None:
+            db.add(User(id=1, email="bench@example.com", password_hash="x", name="Bench"))
+            db.add(Branch(id=1, name="Bench", code="BENCH", city="Istanbul"))
+            db.add(ExpenseCategory(name="Kategorize Edilmemis", is_system=True))
+            db.add_all(OnlinePlatform(name=name, is_system=True) for name in PLATFORMS)
+            db.commit()
+    return engine
+
+
+def parsed_requests(kasa_files, pos_files):
+    return [
+        day_request(parse_kasa_raporu(kasa), parse_hasilat_raporu(pos))
+        for kasa, pos in zip(kasa_files, pos_files)
+    ]
+
+
+def bench_write(engine, single_requests, bulk_requests) -> tuple[tuple[float, int], tuple[float, int]]:
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+    start = time.perf_counter()
+    for request in single_requests:
+        with Session(engine) as db:
+            import_days(db, 1, 1, [request])
+            db.commit()
+    single = (time.perf_counter() - start, len(statements))
+
+    statements.clear()
+    start = time.perf_counter()
+    with Session(engine) as db:
+        import_days(db, 1, 1, bulk_requests)
+        db.commit()
+    bulk = (time.perf_counter() - start, len(statements))
+    return single, bulk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monthly cash difference import benchmark")
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    # Different years so both write runs insert fresh days
+    single_files = month_files(2031)
+    bulk_files = month_files(2032)
+
+    sequential, parallel = bench_parse(*bulk_files)
+    print(f"parse {DAYS} days   sequential {sequential * 1000:8.1f} ms   "
+          f"pool ({get_parsing_executor().excel.workers} workers) {parallel * 1000:8.1f} ms")
+
+    engine = setup_database(args.database_url)
+    (single_s, single_n), (bulk_s, bulk_n) = bench_write(
+        engine, parsed_requests(*single_files), parsed_requests(*bulk_files)
+    )
+    print(f"write {DAYS} days   per-day {single_s * 1000:8.1f} ms / {single_n} statements   "
+          f"bulk {bulk_s * 1000:8.1f} ms / {bulk_n} statements")
+
+    get_parsing_executor().shutdown()
+
+
+if __name__ == "__main__":
+    main()
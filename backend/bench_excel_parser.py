@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Excel parser benchmark: read_only streaming vs full workbook load.
+
+Parses each file with the current parsers (read_only, single iter_rows
+pass) and with a full-mode baseline (load_workbook without read_only +
+sheet.cell lookups, the previous implementation), checks both return the
+same dict and reports time and peak memory (tracemalloc).
+
+    python bench_excel_parser.py                      # generated sample files
+    python bench_excel_parser.py 1453.xlsx hasilat.xlsx --repeat 20
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+from io import BytesIO
+
+import openpyxl
+
+from app.utils.excel_parser import (
+    CHANNELS, FORM_EXPENSE_AMOUNT_COLS, FORM_VALUE_COLS, HASILAT_CHANNEL_ROWS, HASILAT_DATE_ROW,
+    HASILAT_VALUE_COL, KASA_CHANNEL_ROWS, KASA_DATE_ROW, KASA_EXPENSE_DESC_COL,
+    KASA_EXPENSE_START_ROW, KASA_RAPORU_EXPENSE_AMOUNT_COLS, KASA_RAPORU_VALUE_COLS,
+    _to_date, _to_decimal, parse_hasilat_raporu, parse_kasa_raporu
+)
+
+
+# ==================== Full-mode baseline ====================
+
+def _full_kasa(sheet, value_cols, expense_amount_cols) -> dict:
+    def value(row):
+        return sum((_to_decimal(sheet.cell(row=row, column=c).value) for c in value_cols), Decimal("0"))
+
+    result = {"date": _to_date(sheet.cell(row=KASA_DATE_ROW, column=value_cols[0]).value)}
+    for channel, rows in KASA_CHANNEL_ROWS.items():
+        result[channel] = sum((value(r) for r in rows), Decimal("0"))
+    result["expenses"] = []
+
+    expenses_total = Decimal("0")
+    for row in range(KASA_EXPENSE_START_ROW, sheet.max_row + 1):
+        desc = sheet.cell(row=row, column=KASA_EXPENSE_DESC_COL).value
+        amounts = [_to_decimal(sheet.cell(row=row, column=c).value) for c in expense_amount_cols]
+        if desc and any(a > 0 for a in amounts):
+            amount = sum(amounts, Decimal("0"))
+            expenses_total += amount
+            result["expenses"].append({"description": str(desc), "amount": amount})
+
+    result["nakit"] += expenses_total
+    result["total"] = sum((result[c] for c in CHANNELS), Decimal("0"))
+    return result
+
+
+def full_parse_kasa_raporu(content: bytes) -> dict:
+    wb = openpyxl.load_workbook(BytesIO(content), data_only=True)
+    if 'FORM' in wb.sheetnames:
+        return _full_kasa(wb['FORM'], FORM_VALUE_COLS, FORM_EXPENSE_AMOUNT_COLS)
+    return _full_kasa(wb['KASA RAPORU'], KASA_RAPORU_VALUE_COLS, KASA_RAPORU_EXPENSE_AMOUNT_COLS)
+
+
+def full_parse_hasilat_raporu(content: bytes) -> dict:
+    sheet = openpyxl.load_workbook(BytesIO(content), data_only=True).active
+    date_val = sheet.cell(row=HASILAT_DATE_ROW, column=HASILAT_VALUE_COL).value
+    if isinstance(date_val, (int, float)):
+        parsed_date = datetime.fromordinal(datetime(1900, 1, 1).toordinal() + int(date_val) - 2).date()
+    else:
+        parsed_date = _to_date(date_val)
+    result = {"date": parsed_date}
+    for channel, rows in HASILAT_CHANNEL_ROWS.items():
+        result[channel] = sum(
+            (_to_decimal(sheet.cell(row=r, column=HASILAT_VALUE_COL).value) for r in rows), Decimal("0")
+        )
+    result["total"] = sum((result[c] for c in CHANNELS), Decimal("0"))
+    return result
+
+
+# ==================== Sample files ====================
+
+def _fill_extra_sheets(wb, sheets: int, rows: int, cols: int) -> None:
+    """Real reports carry monthly tabs / lookup sheets the parser never reads"""
+    for s in range(sheets):
+        ws = wb.create_sheet(f"AY {s + 1}")
+        for r in range(1, rows + 1):
+            ws.append([f"satir {r}" if c == 0 else r * c * 1.5 for c in range(cols)])
+
+
+def sample_kasa_raporu() -> bytes:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "FORM"
+    ws.cell(row=KASA_DATE_ROW, column=4, value=datetime(2025, 1, 15))
+    for rows in KASA_CHANNEL_ROWS.values():
+        for r in rows:
+            for c in FORM_VALUE_COLS:
+                ws.cell(row=r, column=c, value=1250.75)
+    for r in range(KASA_EXPENSE_START_ROW, KASA_EXPENSE_START_ROW + 40):
+        ws.cell(row=r, column=1, value=f"Gider {r}")
+        ws.cell(row=r, column=8, value=45.5)
+        ws.cell(row=r, column=18, value=12)
+    _fill_extra_sheets(wb, sheets=6, rows=1500, cols=20)
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def sample_hasilat_raporu() -> bytes:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.cell(row=HASILAT_DATE_ROW, column=HASILAT_VALUE_COL, value=46014)
+    for r in range(4, 17):
+        ws.cell(row=r, column=HASILAT_VALUE_COL, value=980.4)
+    # Product sales detail below the summary block
+    for r in range(20, 5000):
+        ws.append([f"Urun {r}", r % 7, 35.0, r * 0.5, "ADET"])
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+# ==================== Runner ====================
+
+def measure(fn, content: bytes, repeat: int) -> tuple[float, float]:
+    """(median ms, peak MiB)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(content)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    fn(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="read_only vs full-mode Excel parser benchmark")
+    parser.add_argument("files", nargs="*", help="Kasa / hasilat raporu .xlsx (bos = ornek dosyalar uretilir)")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.files:
+        samples = []
+        for path in args.files:
+            with open(path, "rb") as f:
+                content = f.read()
+            sheetnames = openpyxl.load_workbook(BytesIO(content), read_only=True).sheetnames
+            kind = "kasa" if {"FORM", "KASA RAPORU"} & set(sheetnames) else "hasilat"
+            samples.append((path, kind, content))
+    else:
+        samples = [
+            ("sample kasa raporu", "kasa", sample_kasa_raporu()),
+            ("sample hasilat raporu", "hasilat", sample_hasilat_raporu()),
+        ]
+
+    parsers = {
+        "kasa": (parse_kasa_raporu, full_parse_kasa_raporu),
+        "hasilat": (parse_hasilat_raporu, full_parse_hasilat_raporu),
+    }
+
+    print(f"{'file':<28} {'mode':<10} {'median ms':>10} {'peak MiB':>9} {'speedup':>8}")
+    for name, kind, content in samples:
+        streaming, full = parsers[kind]
+        if streaming(content) != full(content):
+            raise SystemExit(f"{name}: read_only ve full mode sonuclari farkli")
+
+        full_ms, full_mib = measure(full, content, args.repeat)
+        stream_ms, stream_mib = measure(streaming, content, args.repeat)
+        print(f"{name:<28} {'full':<10} {full_ms:>10.1f} {full_mib:>9.1f}")
+        print(f"{name:<28} {'read_only':<10} {stream_ms:>10.1f} {stream_mib:>9.1f} {full_ms / stream_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Middleware stack benchmark: BaseHTTPMiddleware layers vs the pure ASGI
+RequestLoggingMiddleware (app/middleware.py).
+
+- legacy: the previous stack, three BaseHTTPMiddleware layers (request
+  logging, debug 500 handler, identity header), reproduced below
+- asgi: the current single RequestLoggingMiddleware
+
+Endpoints (same handlers in both apps, CORS outermost like app/main.py):
+- /ping: trivial JSON, measures per-request middleware overhead
+- /export: StreamingResponse of stream_csv() rows, shaped like
+  GET /api/reports/daily-sales-analytics/export?format=csv but without the
+  database, so only the chunk path through the middlewares differs
+
+Driven in-process through httpx ASGITransport (it collects the whole body,
+so latency is time to the last chunk); request logs are silenced so only
+the middleware work is measured:
+
+    python bench_middleware.py --requests 5000 --concurrency 1 50
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+import traceback
+import uuid
+from datetime import date, timedelta
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.config import settings
+from app.logging_config import get_logger
+from app.metrics import HTTP_IN_FLIGHT, observe_request
+from app.middleware import RequestLoggingMiddleware, route_template
+from app.query_stats import track_queries
+from app.services.export_service import stream_csv
+
+STACKS = ("legacy", "asgi")
+ENDPOINTS = ("ping", "export")
+
+logger = get_logger("api")
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    """RequestLoggingMiddleware before the pure ASGI rewrite"""
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = str(uuid.uuid4())[:8]
+        request.state.request_id = request_id
+        start_time = time.time()
+
+        HTTP_IN_FLIGHT.inc(request.method)
+        with track_queries() as query_stats:
+            try:
+                response = await call_next(request)
+            finally:
+                HTTP_IN_FLIGHT.dec(request.method)
+
+        duration_ms = (time.time() - start_time) * 1000
+        observe_request(request.method, route_template(request.scope), response.status_code, duration_ms / 1000)
+        logger.info(
+            f"{request.method} {request.url.path} - {response.status_code}",
+            extra={
+                "request_id": request_id,
+                "method": request.method,
+                "endpoint": request.url.path,
+                "status_code": response.status_code,
+                "duration_ms": round(duration_ms, 2),
+                **query_stats.log_fields()
+            }
+        )
+        response.headers["X-Request-ID"] = request_id
+        if settings.DB_SERVER_TIMING:
+            response.headers["Server-Timing"] = query_stats.server_timing(duration_ms)
+        return response
+
+
+def analytics_rows(count: int):
+    """Rows like iter_analytics_rows(): date, day, channel totals"""
+    day = date(2026, 1, 1)
+    for i in range(count):
+        d = day + timedelta(days=i % 365)
+        yield [d.isoformat(), d.strftime("%A"), "1250.00", "830.50", "415.00", "0.00", "2495.50"]
+
+
+def build_app(stack: str, export_rows: int) -> FastAPI:
+    bench = FastAPI()
+
+    @bench.get("/ping")
+    def ping():
+        return {"status": "ok"}
+
+    @bench.get("/export")
+    def export():
+        return StreamingResponse(stream_csv(analytics_rows(export_rows)), media_type="text/csv")
+
+    if stack == "legacy":
+        @bench.middleware("http")
+        async def debug_exception_handler(request: Request, call_next):
+            try:
+                return await call_next(request)
+            except Exception as e:
+                traceback.print_exc(file=sys.stderr)
+                return JSONResponse(status_code=500, content={"detail": "Internal Server Error", "debug_trace": str(e)})
+
+        @bench.middleware("http")
+        async def add_identity_header(request: Request, call_next):
+            response = await call_next(request)
+            response.headers["X-Service-Name"] = "cigkoftecibey-webapp"
+            response.headers["X-Service-Port"] = "8000"
+            return response
+
+        bench.add_middleware(LegacyRequestLoggingMiddleware)
+    else:
+        bench.add_middleware(RequestLoggingMiddleware)
+
+    bench.add_middleware(CORSMiddleware, allow_origins=settings.CORS_ORIGINS, allow_methods=["*"], allow_headers=["*"])
+    return bench
+
+
+async def run(client: httpx.AsyncClient, path: str, concurrency: int, requests: int) -> dict:
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(path)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            url = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="BaseHTTPMiddleware vs pure ASGI middleware benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 50])
+    parser.add_argument("--requests", type=int, default=3000, help="Istek sayisi (her olcum icin)")
+    parser.add_argument("--export-rows", type=int, default=5000, help="Export istegi basina CSV satiri")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, nargs="+", default=list(ENDPOINTS))
+    args = parser.parse_args()
+
+    logging.getLogger("api").disabled = True
+
+    clients = {}
+    for stack in STACKS:
+        transport = httpx.ASGITransport(app=build_app(stack, args.export_rows))
+        clients[stack] = httpx.AsyncClient(transport=transport, base_url="http://bench")
+
+    print(f"{'endpoint':<9} {'stack':<7} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'err':>5}")
+    for endpoint in args.endpoint:
+        requests = args.requests if endpoint == "ping" else max(args.requests // 20, 50)
+        for concurrency in args.concurrency:
+            for stack in STACKS:
+                client = clients[stack]
+                await client.get(f"/{endpoint}")  # warm-up
+                result = await run(client, f"/{endpoint}", concurrency, requests)
+                print(
+                    f"{endpoint:<9} {stack:<7} {concurrency:>5} {result['rps']:>9.1f} {result['p50']:>9.2f} "
+                    f"{result['p95']:>9.2f} {result['errors']:>5}"
+                )
+
+    for client in clients.values():
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Supplier aging report benchmark: 500 suppliers x 5 years of movements.
+
+- live: open_debts_statement() window query over supplier_transactions
+- snapshot: the same report read from supplier_open_items
+
+Defaults to in-memory SQLite; point --database-url at an empty scratch
+PostgreSQL database for the index-only window scan (tables are created,
+nothing dropped):
+
+    python bench_supplier_aging.py --database-url postgresql://localhost/bench_aging
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.database import Base
+from app.models import Branch, Supplier
+from app.models.supplier_ar import SupplierTransaction, TransactionType
+from app.services.supplier_aging import aging_report, rebuild_open_items
+
+YEARS = 5
+
+
+def setup_database(url: str, suppliers: int):
+    if url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(url)
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as db:
+        if db.scalar(select(func.count()).select_from(SupplierTransaction)):
+            return engine
+
+        db.add_all(Branch(id=i, name=f"Bench {i}", code=f"B{i}", city="Istanbul") for i in (1, 2, 3, 4))
+        db.add_all(Supplier(id=i, branch_id=i % 4 + 1, name=f"Tedarikci {i}") for i in range(1, suppliers + 1))
+        db.commit()
+
+        rng = random.Random(42)
+        start = datetime.combine(date.today() - timedelta(days=365 * YEARS), datetime.min.time())
+        rows = []
+        for supplier_id in range(1, suppliers + 1):
+            unpaid = Decimal("0")
+            for week in range(52 * YEARS):
+                day = start + timedelta(weeks=week, hours=rng.randint(8, 18))
+                amount = Decimal(rng.randint(500, 3000))
+                unpaid += amount
+                rows.append({
+                    "supplier_id": supplier_id, "transaction_type": TransactionType.ORDER,
+                    "description": "Siparis", "debt_amount": amount, "credit_amount": Decimal("0"),
+                    "running_balance": Decimal("0"), "transaction_date": day,
+                })
+                if week % 2:
+                    # Pays most of what is due: a tail of recent debts stays open
+                    paid = (unpaid * Decimal(rng.choice(("0.7", "0.9", "1")))).quantize(Decimal("1"))
+                    unpaid -= paid
+                    rows.append({
+                        "supplier_id": supplier_id, "transaction_type": TransactionType.PAYMENT,
+                        "description": "Odeme", "debt_amount": Decimal("0"), "credit_amount": paid,
+                        "running_balance": Decimal("0"), "transaction_date": day + timedelta(days=3),
+                    })
+        for i in range(0, len(rows), 10000):
+            db.execute(insert(SupplierTransaction), rows[i:i + 10000])
+        db.commit()
+    return engine
+
+
+def timed(fn, runs: int) -> tuple[float, object]:
+    samples, result = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Supplier aging report benchmark")
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--suppliers", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = setup_database(args.database_url, args.suppliers)
+    with Session(engine) as db:
+        movements = db.scalar(select(func.count()).select_from(SupplierTransaction))
+
+        start = time.perf_counter()
+        open_items = rebuild_open_items(db)
+        db.commit()
+        rebuild_ms = (time.perf_counter() - start) * 1000
+
+        settings.SUPPLIER_AGING_SNAPSHOT = True
+        live_ms, live = timed(lambda: aging_report(db, as_of=date.today()), args.runs)
+        snapshot_ms, snapshot = timed(lambda: aging_report(db), args.runs)
+        branch_ms, _ = timed(lambda: aging_report(db, branch_id=2), args.runs)
+
+    assert live.totals == snapshot.totals
+    print(f"{args.suppliers} suppliers, {movements} movements, {open_items} open items "
+          f"(snapshot rebuild {rebuild_ms:.0f} ms)")
+    print(f"aging live (window) {live_ms:8.1f} ms   snapshot {snapshot_ms:8.1f} ms   "
+          f"snapshot one branch {branch_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# backend/benchmarks/conftest.py
+"""
+Report endpoint benchmarks (pytest-benchmark) against a database filled by
+generate_history.py. Skipped unless BENCH_DATABASE_URL is set; run them on
+their own, not together with tests/ (the app's engines are created from
+DATABASE_URL at import time):
+
+    python generate_history.py --database-url postgresql://localhost/cigkofte_bench \\
+        --branches 10 --years 3 --end-date 2026-06-30
+
+    # store a baseline (benchmarks/baselines/<machine>/0001_baseline.json)
+    BENCH_DATABASE_URL=postgresql://localhost/cigkofte_bench python -m pytest benchmarks \\
+        --benchmark-storage=benchmarks/baselines --benchmark-save=baseline
+
+    # compare with the latest baseline, fail on a >20% slower mean
+    BENCH_DATABASE_URL=postgresql://localhost/cigkofte_bench python -m pytest benchmarks \\
+        --benchmark-storage=benchmarks/baselines --benchmark-compare --benchmark-compare-fail=mean:20%
+"""
+import os
+
+import pytest
+
+BENCH_DATABASE_URL = os.environ.get("BENCH_DATABASE_URL", "")
+
+if BENCH_DATABASE_URL:
+    # Before app.config is imported, so the app's engines use the bench database
+    os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+else:
+    collect_ignore_glob = ["test_*.py"]
+
+
+@pytest.fixture(scope="session")
+def bench_context():
+    """Bench user's auth headers, first generated branch and the generated period"""
+    from sqlalchemy import func, select
+
+    from app.api.deps import create_access_token
+    from app.database import SessionLocal
+    from app.models import Branch, DailySummary, User
+    from generate_history import BENCH_EMAIL
+
+    with SessionLocal() as db:
+        user_id = db.scalar(select(User.id).where(User.email == BENCH_EMAIL))
+        if user_id is None:
+            pytest.skip("Bench verisi yok: once generate_history.py calistirin")
+        branch_id = db.scalar(select(Branch.id).where(Branch.code == "BN01"))
+        start, end = db.execute(
+            select(func.min(DailySummary.summary_date), func.max(DailySummary.summary_date))
+            .where(DailySummary.branch_id == branch_id)
+        ).one()
+
+    token = create_access_token({"sub": str(user_id)})
+    return {
+        "headers": {"Authorization": f"Bearer {token}", "X-Branch-Id": str(branch_id)},
+        "branch_id": branch_id,
+        "start": start,
+        "end": end,
+    }
+
+
+@pytest.fixture(scope="session")
+def bench_client(bench_context):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app, headers=bench_context["headers"]) as client:
+        yield client
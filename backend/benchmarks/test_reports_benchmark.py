@@ -0,0 +1,96 @@
+# backend/benchmarks/test_reports_benchmark.py
+"""
+Report endpoints on generated history (see conftest.py).
+
+"cold" rounds clear the report and menu caches first, so they measure the
+queries; "warm" rounds measure a cache hit.
+"""
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.report_cache import get_report_cache
+from app.services.menu_price_service import get_menu_cache
+
+ROUNDS = 10
+
+
+def clear_caches():
+    get_report_cache().clear()
+    get_menu_cache().clear()
+
+
+def run(benchmark, client, url, cold=True, **params):
+    def request():
+        response = client.get(url, params=params)
+        assert response.status_code == 200, response.text
+        return response
+
+    benchmark.extra_info["cache"] = "cold" if cold else "warm"
+    return benchmark.pedantic(
+        request, setup=clear_caches if cold else None, rounds=ROUNDS, warmup_rounds=1
+    )
+
+
+@pytest.mark.parametrize("cold", [True, False], ids=["cold", "warm"])
+def test_dashboard(benchmark, bench_client, cold):
+    run(benchmark, bench_client, "/api/reports/dashboard", cold=cold)
+
+
+@pytest.mark.parametrize("cold", [True, False], ids=["cold", "warm"])
+def test_bilanco(benchmark, bench_client, cold):
+    run(benchmark, bench_client, "/api/reports/bilanco", cold=cold)
+
+
+def test_bilanco_compare_year_over_year(benchmark, bench_client, bench_context):
+    end = bench_context["end"]
+    month_start = end.replace(day=1)
+    run(
+        benchmark, bench_client, "/api/reports/bilanco-compare",
+        left_start=month_start.replace(year=month_start.year - 1).isoformat(),
+        left_end=end.replace(year=end.year - 1).isoformat(),
+        right_start=month_start.isoformat(),
+        right_end=end.isoformat(),
+    )
+
+
+@pytest.mark.parametrize("compare_to", ["yesterday", "last_week", "last_month"])
+def test_dashboard_comparison(benchmark, bench_client, bench_context, compare_to):
+    run(
+        benchmark, bench_client, "/api/reports/dashboard/comparison",
+        target_date=bench_context["end"].isoformat(), compare_to=compare_to,
+    )
+
+
+@pytest.mark.parametrize("days", [30, 365])
+def test_daily_sales_analytics(benchmark, bench_client, bench_context, days):
+    end = bench_context["end"]
+    run(
+        benchmark, bench_client, "/api/reports/daily-sales-analytics",
+        start_date=(end - timedelta(days=days - 1)).isoformat(), end_date=end.isoformat(),
+    )
+
+
+@pytest.mark.parametrize("format,all_branches", [("csv", False), ("csv", True), ("excel", False)])
+def test_daily_sales_analytics_export(benchmark, bench_client, bench_context, format, all_branches):
+    run(
+        benchmark, bench_client, "/api/reports/daily-sales-analytics/export",
+        start_date=bench_context["start"].isoformat(), end_date=bench_context["end"].isoformat(),
+        format=format, all_branches=all_branches,
+    )
+
+
+@pytest.mark.parametrize("cold", [True, False], ids=["cold", "warm"])
+def test_menu_items(benchmark, bench_client, cold):
+    run(benchmark, bench_client, "/api/v1/menu-items", cold=cold)
+
+
+@pytest.mark.parametrize("days", [30, 365])
+def test_consolidated(benchmark, bench_client, bench_context, days):
+    end = bench_context["end"]
+    run(
+        benchmark, bench_client, "/api/reports/consolidated",
+        start_date=(end - timedelta(days=days - 1)).isoformat(), end_date=end.isoformat(),
+    )
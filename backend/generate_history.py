@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Synthetic history generator for report benchmarks (benchmarks/).
+
+Bulk-loads N branches x M years of realistic daily data into a PostgreSQL
+database with COPY: online sales per platform (POS visa / nakit + online
+platforms), purchases with items, expenses, courier expenses, part-time
+costs, staff meals, production, monthly payroll, cash differences and the
+supplier ledger (orders + payments). daily_summaries, supplier balances /
+checkpoints and the aging snapshot are rebuilt from the loaded rows with the
+same services the app uses.
+
+Output is deterministic for the same --seed, --branches, --years and
+--end-date. Use an empty scratch database (tables are created if missing):
+
+    python generate_history.py --database-url postgresql://localhost/cigkofte_bench \\
+        --branches 10 --years 3 --end-date 2026-06-30
+
+Login: bench@cigkofte.local / bench123 (super admin, all generated branches)
+"""
+import argparse
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from psycopg import sql
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.deps import get_password_hash
+from app.database import Base
+from app.models import (
+    Branch, CashDifference, CourierExpense, DailyProduction, Employee, Expense, ExpenseCategory,
+    MenuCategory, MenuItem, MenuItemPrice, MonthlyPayroll, OnlinePlatform, OnlineSale, Organization,
+    PartTimeCost, Purchase, PurchaseItem, PurchaseProduct, PurchaseProductGroup, StaffMeal, Supplier,
+    User, UserBranch
+)
+from app.models.supplier_ar import PaymentStatus, PaymentType, SupplierPayment, SupplierTransaction, TransactionType
+from app.services.cash_import_service import calculate_severity
+from app.services.daily_summary_service import rebuild_daily_summaries
+from app.services.supplier_aging import rebuild_open_items
+from app.services.supplier_ledger import rebuild_supplier
+
+ORG_CODE = "BENCH"
+BENCH_EMAIL = "bench@cigkofte.local"
+BENCH_PASSWORD = "bench123"
+CENT = Decimal("0.01")
+
+# Same names as seed.py, so an already seeded database is reused
+PLATFORMS = [
+    ("Visa", "pos_visa", True), ("Nakit", "pos_nakit", True), ("Getir", "online", False),
+    ("Trendyol", "online", False), ("Yemek Sepeti", "online", False), ("Migros Yemek", "online", False),
+]
+# cash_differences column suffix per platform
+PLATFORM_CHANNEL = {
+    "Visa": "visa", "Nakit": "nakit", "Getir": "getir", "Trendyol": "trendyol",
+    "Yemek Sepeti": "yemeksepeti", "Migros Yemek": "migros",
+}
+# Average daily amount per platform for a branch with scale 1.0
+PLATFORM_DAILY = {
+    "Visa": 9000, "Nakit": 3200, "Getir": 900, "Trendyol": 1400, "Yemek Sepeti": 2200, "Migros Yemek": 500,
+}
+EXPENSE_CATEGORIES = [
+    ("Kira", True), ("Elektrik", False), ("Su", False), ("Dogalgaz", False),
+    ("Internet", True), ("Personel Yemek", False), ("Online Platform Komisyonlari", False), ("Diger", False),
+]
+# (product group, products, unit, unit price range)
+PRODUCTS = [
+    ("Manav", ["Marul", "Nane", "Maydanoz", "Roka", "Limon", "Havuc"], "kg", (20, 90)),
+    ("Lavas", ["Fabrika Lavas", "Cinar Lavas"], "adet", (3, 6)),
+    ("Kuru Gida", ["Esmer Bulgur", "Isot", "Biber Salca", "Nar Eksisi", "Aycicek Yag"], "kg", (40, 220)),
+    ("Icecek", ["Salgam", "Ayran", "Su 330"], "adet", (8, 25)),
+]
+MENU = {
+    "Durumler": [("Cig Kofte Durum", 85), ("Acili Durum", 90), ("Mega Durum", 130)],
+    "Porsiyonlar": [("Porsiyon 250g", 160), ("Porsiyon 500g", 300), ("Porsiyon 1kg", 560)],
+    "Icecekler": [("Ayran", 30), ("Salgam", 35), ("Su", 15)],
+}
+SUPPLIERS_PER_BRANCH = 6
+EMPLOYEES_PER_BRANCH = 8
+
+
+def money(value: float) -> Decimal:
+    return Decimal(str(round(value, 2))).quantize(CENT)
+
+
+class CopyLoader:
+    """
+    Buffers rows per table and writes them with COPY FROM STDIN on the
+    session's connection (same transaction). Ids are assigned here so child
+    rows can reference their parents; buffers are flushed in foreign key
+    order and column defaults of the models are applied like the ORM would.
+    """
+
+    def __init__(self, db: Session, batch_size: int = 20000):
+        self.db = db
+        self.batch_size = batch_size
+        self.dialect = db.get_bind().dialect
+        self.counts: Counter = Counter()
+        self._rows: dict[str, list[dict]] = defaultdict(list)
+        self._next_id: dict[str, int] = {}
+        self._order = {table.name: i for i, table in enumerate(Base.metadata.sorted_tables)}
+
+    def add(self, model, **values) -> int:
+        table = model.__table__
+        if "id" in table.c and "id" not in values:
+            if table.name not in self._next_id:
+                self._next_id[table.name] = (self.db.scalar(select(func.max(table.c.id))) or 0) + 1
+            values["id"] = self._next_id[table.name]
+            self._next_id[table.name] += 1
+        self._rows[table.name].append(values)
+        if len(self._rows[table.name]) >= self.batch_size:
+            self.flush()
+        return values.get("id")
+
+    def flush(self) -> None:
+        for name in sorted(self._rows, key=self._order.__getitem__):
+            rows = self._rows[name]
+            if rows:
+                self._copy(Base.metadata.tables[name], rows)
+                self.counts[name] += len(rows)
+                rows.clear()
+
+    def _copy(self, table, rows: list[dict]) -> None:
+        given = set().union(*rows)
+        columns = [c for c in table.columns if c.name in given or c.default is not None]
+        defaults, processors = {}, {}
+        for column in columns:
+            if column.default is not None:
+                arg = column.default.arg
+                defaults[column.name] = arg(None) if callable(arg) else arg
+            processors[column.name] = column.type.dialect_impl(self.dialect).bind_processor(self.dialect)
+
+        statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(table.name), sql.SQL(", ").join(sql.Identifier(c.name) for c in columns)
+        )
+        raw = self.db.connection().connection.driver_connection
+        with raw.cursor() as cursor, cursor.copy(statement) as copy:
+            for row in rows:
+                values = []
+                for column in columns:
+                    value = row.get(column.name, defaults.get(column.name))
+                    processor = processors[column.name]
+                    values.append(processor(value) if processor is not None and value is not None else value)
+                copy.write_row(values)
+
+    def reset_sequences(self) -> None:
+        """Move id sequences past the copied ids"""
+        for name in self._next_id:
+            self.db.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT max(id) FROM {name}))"
+            ))
+
+
+def _get_or_create(db: Session, model, lookup: dict, **values):
+    instance = db.scalars(select(model).filter_by(**lookup)).first()
+    if instance is None:
+        instance = model(**lookup, **values)
+        db.add(instance)
+        db.flush()
+    return instance
+
+
+def create_reference_data(db: Session, rng: random.Random, branch_count: int) -> dict:
+    """Organization, branches, bench user, suppliers, employees, catalog and menu (ORM, small)"""
+    org = Organization(name="Benchmark Organizasyonu", code=ORG_CODE, is_active=True)
+    db.add(org)
+    db.flush()
+
+    branches = []
+    for i in range(1, branch_count + 1):
+        branch = Branch(organization_id=org.id, name=f"Bench Sube {i:02d}", code=f"BN{i:02d}", city="Istanbul", is_active=True)
+        db.add(branch)
+        branches.append(branch)
+    db.flush()
+
+    user = _get_or_create(
+        db, User, {"email": BENCH_EMAIL},
+        organization_id=org.id, branch_id=branches[0].id, password_hash=get_password_hash(BENCH_PASSWORD),
+        name="Bench Kullanici", role="owner", is_active=True, is_super_admin=True, auth_provider="email"
+    )
+    for branch in branches:
+        db.add(UserBranch(user_id=user.id, branch_id=branch.id, role="owner", is_default=branch is branches[0]))
+
+    platforms = {}
+    for order, (name, channel_type, is_system) in enumerate(PLATFORMS, start=1):
+        platforms[name] = _get_or_create(
+            db, OnlinePlatform, {"name": name, "branch_id": None},
+            channel_type=channel_type, is_system=is_system, display_order=order, is_active=True
+        ).id
+
+    categories = {}
+    for order, (name, is_fixed) in enumerate(EXPENSE_CATEGORIES, start=1):
+        categories[name] = _get_or_create(
+            db, ExpenseCategory, {"name": name, "branch_id": None}, is_fixed=is_fixed, display_order=order
+        ).id
+
+    products = []  # (product_id, name, unit, price range)
+    for order, (group_name, names, unit, price_range) in enumerate(PRODUCTS, start=1):
+        group = _get_or_create(db, PurchaseProductGroup, {"name": group_name, "branch_id": None}, display_order=order, is_active=True)
+        for product_order, name in enumerate(names, start=1):
+            product = _get_or_create(
+                db, PurchaseProduct, {"name": name, "group_id": group.id},
+                default_unit=unit, display_order=product_order, is_active=True
+            )
+            products.append((product.id, name, unit, price_range))
+
+    # Global menu, per-branch price overrides for some items
+    menu_items = []
+    for order, (category_name, items) in enumerate(MENU.items(), start=1):
+        category = MenuCategory(name=f"Bench {category_name}", display_order=order, is_active=True, created_by=user.id)
+        db.add(category)
+        db.flush()
+        for item_order, (name, price) in enumerate(items, start=1):
+            item = MenuItem(category_id=category.id, name=name, display_order=item_order, is_active=True, created_by=user.id)
+            db.add(item)
+            db.flush()
+            db.add(MenuItemPrice(menu_item_id=item.id, branch_id=None, price=money(price)))
+            menu_items.append((item.id, price))
+
+    suppliers, employees, scales = {}, {}, {}
+    for branch in branches:
+        scales[branch.id] = rng.uniform(0.6, 1.6)
+        suppliers[branch.id] = []
+        for i in range(1, SUPPLIERS_PER_BRANCH + 1):
+            supplier = Supplier(branch_id=branch.id, name=f"Tedarikci {branch.code}-{i}", is_active=True)
+            db.add(supplier)
+            suppliers[branch.id].append(supplier)
+        employees[branch.id] = []
+        for i in range(1, EMPLOYEES_PER_BRANCH + 1):
+            employee = Employee(
+                branch_id=branch.id, name=f"Personel {branch.code}-{i}",
+                base_salary=money(rng.uniform(22000, 38000)), is_part_time=False
+            )
+            db.add(employee)
+            employees[branch.id].append(employee)
+        for item_id, price in rng.sample(menu_items, k=3):
+            db.add(MenuItemPrice(menu_item_id=item_id, branch_id=branch.id, price=money(price * rng.uniform(1.0, 1.15))))
+    db.flush()
+
+    return {
+        "user_id": user.id,
+        "branches": [b.id for b in branches],
+        "scales": scales,
+        "platforms": platforms,
+        "categories": categories,
+        "products": products,
+        "suppliers": {b: [s.id for s in items] for b, items in suppliers.items()},
+        "employees": {b: [(e.id, e.base_salary) for e in items] for b, items in employees.items()},
+    }
+
+
+def _day_factor(day: date, start: date) -> float:
+    """Weekend peak, summer season, ~12% yearly growth"""
+    weekday = {0: 0.9, 4: 1.2, 5: 1.3, 6: 1.15}.get(day.weekday(), 1.0)
+    season = 1.15 if day.month in (6, 7, 8) else 0.95 if day.month in (1, 2) else 1.0
+    growth = 1 + 0.12 * ((day - start).days / 365)
+    return weekday * season * growth
+
+
+def generate_branch(loader: CopyLoader, rng: random.Random, ref: dict, branch_id: int, start: date, end: date) -> None:
+    user_id = ref["user_id"]
+    scale = ref["scales"][branch_id]
+    suppliers = ref["suppliers"][branch_id]
+    categories = ref["categories"]
+    debts = dict.fromkeys(suppliers, Decimal("0"))
+    next_payment = {s: start + timedelta(days=rng.randint(7, 21)) for s in suppliers}
+
+    day = start
+    while day <= end:
+        factor = _day_factor(day, start) * scale
+        noon = datetime.combine(day, datetime.min.time()) + timedelta(hours=12)
+
+        # Sales per platform + the day's cash count (kasa) vs POS report
+        cash = {}
+        for name, platform_id in ref["platforms"].items():
+            amount = money(PLATFORM_DAILY[name] * factor * rng.uniform(0.75, 1.25))
+            loader.add(OnlineSale, branch_id=branch_id, platform_id=platform_id, sale_date=day, amount=amount, created_by=user_id)
+            channel = PLATFORM_CHANNEL[name]
+            cash[f"pos_{channel}"] = amount
+            cash[f"kasa_{channel}"] = amount + money(rng.gauss(0, 40)) if rng.random() < 0.3 else amount
+        kasa_total = sum(v for k, v in cash.items() if k.startswith("kasa_"))
+        pos_total = sum(v for k, v in cash.items() if k.startswith("pos_"))
+        severity = calculate_severity(pos_total - kasa_total)
+        loader.add(
+            CashDifference, branch_id=branch_id, difference_date=day, kasa_total=kasa_total, pos_total=pos_total,
+            severity=severity, status="pending" if severity != "ok" and day > end - timedelta(days=30) else "resolved",
+            created_by=user_id, **cash
+        )
+
+        # Purchases with items, posted to the supplier ledger
+        for _ in range(rng.choice((1, 1, 2, 2, 3))):
+            supplier_id = rng.choice(suppliers)
+            items = []
+            for product_id, name, unit, (low, high) in rng.sample(ref["products"], k=rng.randint(1, 6)):
+                quantity = Decimal(str(round(rng.uniform(1, 30) * scale, 3)))
+                unit_price = money(rng.uniform(low, high))
+                items.append((product_id, name, unit, quantity, unit_price, (quantity * unit_price).quantize(CENT)))
+            total = sum(item[5] for item in items)
+            purchase_id = loader.add(Purchase, branch_id=branch_id, supplier_id=supplier_id, purchase_date=day, total=total, created_by=user_id)
+            for product_id, name, unit, quantity, unit_price, item_total in items:
+                loader.add(
+                    PurchaseItem, purchase_id=purchase_id, product_id=product_id, description=name,
+                    quantity=quantity, unit=unit, unit_price=unit_price, total=item_total
+                )
+            loader.add(
+                SupplierTransaction, supplier_id=supplier_id, transaction_type=TransactionType.ORDER,
+                reference_id=purchase_id, reference_type="purchase", description=f"Alis #{purchase_id}",
+                debt_amount=total, credit_amount=Decimal("0"), running_balance=Decimal("0"), transaction_date=noon
+            )
+            debts[supplier_id] += total
+
+        # Supplier payments every 1-3 weeks, most of the open debt
+        for supplier_id in suppliers:
+            if day < next_payment[supplier_id]:
+                continue
+            next_payment[supplier_id] = day + timedelta(days=rng.randint(7, 21))
+            amount = money(float(debts[supplier_id]) * rng.uniform(0.6, 1.0))
+            if amount <= 0:
+                continue
+            payment_type = rng.choice((PaymentType.CASH, PaymentType.EFT, PaymentType.EFT, PaymentType.CHECK))
+            paid_at = noon + timedelta(hours=4)
+            payment_id = loader.add(
+                SupplierPayment, supplier_id=supplier_id, payment_type=payment_type, amount=amount,
+                payment_date=paid_at, status=PaymentStatus.COMPLETED
+            )
+            loader.add(
+                SupplierTransaction, supplier_id=supplier_id, transaction_type=TransactionType.PAYMENT,
+                reference_id=payment_id, reference_type="supplier_payment", description="Odeme",
+                debt_amount=Decimal("0"), credit_amount=amount, running_balance=Decimal("0"), transaction_date=paid_at
+            )
+            debts[supplier_id] -= amount
+
+        # Expenses: fixed on the 1st, utilities on the 10th, small daily ones
+        if day.day == 1:
+            loader.add(Expense, branch_id=branch_id, category_id=categories["Kira"], expense_date=day, description="Kira", amount=money(45000 * scale), created_by=user_id)
+            loader.add(Expense, branch_id=branch_id, category_id=categories["Internet"], expense_date=day, description="Internet", amount=money(750), created_by=user_id)
+        if day.day == 10:
+            for name, base in (("Elektrik", 6500), ("Su", 1200), ("Dogalgaz", 2800)):
+                loader.add(Expense, branch_id=branch_id, category_id=categories[name], expense_date=day, description=name, amount=money(base * factor * rng.uniform(0.8, 1.2)), created_by=user_id)
+        for _ in range(rng.choice((0, 0, 1, 1, 2))):
+            name = rng.choice(("Personel Yemek", "Online Platform Komisyonlari", "Diger"))
+            loader.add(Expense, branch_id=branch_id, category_id=categories[name], expense_date=day, description=name, amount=money(rng.uniform(100, 1500) * scale), created_by=user_id)
+
+        packages = max(1, int(rng.gauss(35, 10) * factor))
+        loader.add(CourierExpense, branch_id=branch_id, expense_date=day, package_count=packages, amount=money(packages * 37.5), created_by=user_id)
+        if rng.random() < 0.6:
+            loader.add(PartTimeCost, branch_id=branch_id, cost_date=day, amount=money(rng.uniform(400, 1200)), created_by=user_id)
+        loader.add(StaffMeal, branch_id=branch_id, meal_date=day, unit_price=money(120), staff_count=rng.randint(3, 8), created_by=user_id)
+        loader.add(DailyProduction, branch_id=branch_id, production_date=day, kneaded_kg=money(rng.uniform(20, 60) * factor), created_by=user_id)
+
+        # Payroll on the last day of the month
+        if (day + timedelta(days=1)).day == 1:
+            for employee_id, base_salary in ref["employees"][branch_id]:
+                loader.add(
+                    MonthlyPayroll, branch_id=branch_id, employee_id=employee_id, year=day.year, month=day.month,
+                    payment_date=day, base_salary=base_salary, bonus=money(rng.choice((0, 0, 0, 1000, 2500))),
+                    created_by=user_id
+                )
+
+        day += timedelta(days=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark icin sentetik gecmis veri uretici (PostgreSQL COPY)")
+    parser.add_argument("--database-url", required=True, help="Bos bir PostgreSQL veritabani")
+    parser.add_argument("--branches", type=int, default=5, help="Sube sayisi")
+    parser.add_argument("--years", type=int, default=2, help="Kac yillik gecmis")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(), help="Son gun (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=20000, help="COPY basina satir")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if not database_url.startswith("postgresql"):
+        print("HATA: COPY icin PostgreSQL gerekli")
+        return 1
+    if database_url.startswith("postgresql://"):
+        database_url = database_url.replace("postgresql://", "postgresql+psycopg://", 1)
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autoflush=False, bind=engine)()
+    rng = random.Random(args.seed)
+    start = args.end_date - timedelta(days=365 * args.years - 1)
+
+    try:
+        if db.scalar(select(Organization.id).where(Organization.code == ORG_CODE)) is not None:
+            print(f"HATA: '{ORG_CODE}' organizasyonu zaten var, bos bir veritabani kullanin")
+            return 1
+
+        started = time.perf_counter()
+        ref = create_reference_data(db, rng, args.branches)
+        loader = CopyLoader(db, batch_size=args.batch_size)
+        for branch_id in ref["branches"]:
+            generate_branch(loader, rng, ref, branch_id, start, args.end_date)
+            print(f"Sube {branch_id}: {start} - {args.end_date} uretildi")
+        loader.flush()
+        loader.reset_sequences()
+        loaded = time.perf_counter() - started
+
+        # Derived tables, with the app's own services
+        for branch_id in ref["branches"]:
+            rebuild_daily_summaries(db, branch_id)
+        for supplier_ids in ref["suppliers"].values():
+            for supplier_id in supplier_ids:
+                rebuild_supplier(db, supplier_id, full=True)
+        rebuild_open_items(db)
+        db.commit()
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+
+        print()
+        for name, count in sorted(loader.counts.items()):
+            print(f"  {name:<24} {count:>10}")
+        print(f"\nCOPY: {loaded:.1f} s, toplam: {time.perf_counter() - started:.1f} s")
+        print(f"Giris: {BENCH_EMAIL} / {BENCH_PASSWORD}")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"HATA: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
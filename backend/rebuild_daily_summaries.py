@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Rebuild / check the daily_summaries P&L rollup from source tables"""
+import argparse
+import sys
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.services.daily_summary_service import rebuild_daily_summaries, check_daily_summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="daily_summaries rollup backfill / consistency check")
+    parser.add_argument("--branch-id", type=int, default=None, help="Sadece bu sube")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="Baslangic tarihi (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Bitis tarihi (YYYY-MM-DD)")
+    parser.add_argument("--check", action="store_true", help="Sadece kontrol et, yazma")
+    args = parser.parse_args()
+
+    # Fix DATABASE_URL for psycopg3 compatibility
+    database_url = settings.DATABASE_URL
+    if database_url.startswith("postgresql://"):
+        database_url = database_url.replace("postgresql://", "postgresql+psycopg://", 1)
+
+    engine = create_engine(database_url)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+
+    try:
+        print("=" * 50)
+        print("GUNLUK OZET (daily_summaries) " + ("KONTROL" if args.check else "YENIDEN OLUSTURMA"))
+        print("=" * 50)
+        print()
+
+        if args.check:
+            mismatches = check_daily_summaries(db, args.branch_id, args.start, args.end)
+            if not mismatches:
+                print("Tutarli: fark bulunamadi.")
+                return 0
+
+            print(f"{len(mismatches)} gunde fark bulundu:")
+            for mismatch in mismatches:
+                print(f"  Sube {mismatch['branch_id']} / {mismatch['date'].isoformat()}:")
+                for field, values in mismatch["fields"].items():
+                    print(f"    {field}: kayitli={values['stored']} beklenen={values['expected']}")
+            return 1
+
+        written = rebuild_daily_summaries(db, args.branch_id, args.start, args.end)
+        db.commit()
+        print(f"{written} gunluk ozet satiri yazildi.")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"HATA: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
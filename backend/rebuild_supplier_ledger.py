@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Rebuild / check supplier ledger totals, running balances and checkpoints"""
+import argparse
+import sys
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.services.supplier_ledger import check_supplier, ledger_supplier_ids, rebuild_supplier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Supplier ledger (cari hesap) backfill / consistency check")
+    parser.add_argument("--supplier-id", type=int, default=None, help="Sadece bu tedarikci")
+    parser.add_argument("--full", action="store_true", help="Kontrol noktalarini yok say, tum hareketleri isle")
+    parser.add_argument("--check", action="store_true", help="Sadece kontrol et, yazma")
+    args = parser.parse_args()
+
+    # Fix DATABASE_URL for psycopg3 compatibility
+    database_url = settings.DATABASE_URL
+    if database_url.startswith("postgresql://"):
+        database_url = database_url.replace("postgresql://", "postgresql+psycopg://", 1)
+
+    engine = create_engine(database_url)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+
+    try:
+        print("=" * 50)
+        print("TEDARIKCI CARI HESAP " + ("KONTROL" if args.check else "YENIDEN OLUSTURMA"))
+        print("=" * 50)
+        print()
+
+        supplier_ids = [args.supplier_id] if args.supplier_id is not None else ledger_supplier_ids(db)
+
+        if args.check:
+            mismatches = 0
+            for supplier_id in supplier_ids:
+                fields = check_supplier(db, supplier_id, full=args.full)
+                if not fields:
+                    continue
+                mismatches += 1
+                print(f"  Tedarikci {supplier_id}:")
+                for field, values in fields.items():
+                    print(f"    {field}: kayitli={values['stored']} beklenen={values['expected']}")
+            if not mismatches:
+                print("Tutarli: fark bulunamadi.")
+                return 0
+            print(f"{mismatches} tedarikcide fark bulundu.")
+            return 1
+
+        replayed = 0
+        for supplier_id in supplier_ids:
+            replayed += rebuild_supplier(db, supplier_id, full=args.full)
+            db.commit()
+        print(f"{len(supplier_ids)} tedarikci, {replayed} hareket islendi.")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"HATA: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
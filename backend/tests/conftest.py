@@ -2,17 +2,26 @@
 import pytest
 from typing import AsyncGenerator, Generator
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, get_async_db
 from app.api.deps import get_current_user, get_branch_context
 from app.models import User, Branch, UserBranch
+from app.report_cache import get_report_cache
+from app.services.menu_price_service import get_menu_cache
+from app.services.categorization import get_rule_index
+from app.services.catalog_cache import get_catalog_cache
+from app.utils.lazy_load_guard import lazy_loads_forbidden
 
 # Use in-memory SQLite for speed and safety
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Shared-cache URI so the async engine (AsyncDBSession endpoints) sees the
+# same database; the StaticPool connection keeps it alive between tests.
+SQLALCHEMY_DATABASE_URL = "sqlite:///file:testdb?mode=memory&cache=shared&uri=true"
+ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///file:testdb?mode=memory&cache=shared&uri=true"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
@@ -21,6 +30,18 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def _read_uncommitted(dbapi_connection, connection_record):
+    # Async reads see the sync test session's writes without table locks
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA read_uncommitted = true")
+    cursor.close()
+
+
 @pytest.fixture(scope="function")
 def db() -> Generator[Session, None, None]:
     """
@@ -28,6 +49,13 @@ def db() -> Generator[Session, None, None]:
     """
     Base.metadata.create_all(bind=engine)
     session = TestingSessionLocal()
+
+    # Report / menu caches are process-global; start every test cold
+    get_report_cache().clear()
+    get_report_cache().reset_stats()
+    get_menu_cache().clear()
+    get_rule_index().clear()
+    get_catalog_cache().clear()
     
     # Pre-populate required data (User, Branch)
     user = User(
@@ -51,18 +79,29 @@ def db() -> Generator[Session, None, None]:
     session.close()
     Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture
+def async_db_engine():
+    """Engine behind AsyncDBSession in the client fixture"""
+    return async_engine
+
+
 @pytest.fixture(scope="function")
 def client(db: Session) -> Generator[TestClient, None, None]:
     """
     FastAPI TestClient with overridden dependencies.
     """
     def override_get_db():
-        try:
+        # N+1 guard: relationships must be eager loaded inside requests
+        with lazy_loads_forbidden(db):
             yield db
-        finally:
-            pass
             
     app.dependency_overrides[get_db] = override_get_db
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as async_db:
+            yield async_db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
     
     # No auth override needed if we get a valid token, OR we can override get_current_user
     # For integration testing, it's often better to login properly.
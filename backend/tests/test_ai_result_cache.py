@@ -0,0 +1,208 @@
+"""
+Tests for the persistent AI result cache (ai_result_cache table).
+
+External model calls are replaced with a stub client that counts requests;
+repeat descriptions and re-uploaded screenshots must not reach it.
+"""
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.models import AIResultCache as AIResultCacheEntry, ExpenseCategory
+from app.services.ai_result_cache import (
+    AIResultCache, KIND_CATEGORY_BATCH, description_key, image_key
+)
+from app.services.categorization import ExpenseCategorizer
+from app.utils import pos_ocr
+from app.utils.async_excel_parser import async_parse_pos_image
+
+
+class StubClient:
+    """Anthropic-compatible stub: returns queued JSON answers, counts calls"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        text = json.dumps(self.answers.pop(0))
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+POS_ANSWER = {
+    "date": "2025-01-15", "visa": 1000, "paket_visa": 200, "pos1": 0, "pos2": 0,
+    "nakit": 500, "paket_nakit": 100, "trendyol": 300, "getir": 50, "migros": 0,
+    "total": 2150, "confidence": 0.9
+}
+
+
+def test_description_key_normalizes():
+    assert description_key("  USTA  Ahmet ") == description_key("usta ahmet")
+    assert description_key("Kapı tamiri") == description_key("KAPI TAMİRİ")
+    assert description_key("x", ["A", "B"]) == description_key("x", ["B", "A"])
+    assert description_key("x", ["A"]) != description_key("x")
+
+
+def test_single_suggestion_cached(db):
+    client = StubClient([{"category": "Maintenance", "confidence": 0.8, "reasoning": "tamir"}])
+    categorizer = ExpenseCategorizer(client=client)
+    cache = AIResultCache(db)
+
+    first = categorizer.categorize("Kapi tamiri usta", cache=cache)
+    second = categorizer.categorize("KAPI TAMİRİ  USTA", cache=cache)
+
+    assert client.calls == 1
+    assert first == second
+    assert second[0].category == "Maintenance"
+
+
+def test_errors_are_not_cached(db):
+    client = StubClient()  # no answers -> raises
+    categorizer = ExpenseCategorizer(client=client)
+
+    result = categorizer.categorize("bilinmeyen", cache=AIResultCache(db))
+
+    assert result[0].reasoning.startswith("AI error")
+    assert db.query(AIResultCacheEntry).count() == 0
+
+
+def test_batch_only_sends_misses(db):
+    cache = AIResultCache(db)
+    cache.put(KIND_CATEGORY_BATCH, description_key("eski gider"), {"suggested_category": "Other", "confidence": 0.6})
+    client = StubClient([{"index": 1, "category": "Maintenance", "confidence": 0.7}])
+    categorizer = ExpenseCategorizer(client=client)
+
+    result = categorizer.categorize_batch(
+        [{"description": "eski gider"}, {"description": "yeni gider"}],
+        cache=cache
+    )
+
+    assert client.calls == 1
+    assert [r["suggested_category"] for r in result] == ["Other", "Maintenance"]
+
+    again = categorizer.categorize_batch([{"description": "YENI GIDER"}], cache=cache)
+    assert client.calls == 1
+    assert again[0]["suggested_category"] == "Maintenance"
+
+
+def test_batch_key_includes_categories_and_skips_bad_indexes(db):
+    cache = AIResultCache(db)
+    client = StubClient(
+        [{"index": 1, "category": "Tamir", "confidence": 0.7}, {"index": 2, "category": "Kira", "confidence": 0.9}],
+        [{"index": 1, "category": "Bakim", "confidence": 0.8}],
+    )
+    categorizer = ExpenseCategorizer(client=client)
+    expense = [{"description": "usta cagrildi"}]
+
+    first = categorizer.categorize_batch(expense, [{"name": "Tamir"}], cache=cache)
+    second = categorizer.categorize_batch(expense, [{"name": "Tamir"}, {"name": "Bakim"}], cache=cache)
+
+    assert client.calls == 2
+    assert [r["suggested_category"] for r in first] == ["Tamir"]
+    assert [r["suggested_category"] for r in second] == ["Bakim"]
+    assert db.query(AIResultCacheEntry).count() == 2  # index 2 was outside the batch
+
+
+def test_expired_entries_ignored(db):
+    cache = AIResultCache(db, ttl_seconds=60)
+    cache.put("test", "k", {"v": 1})
+    db.query(AIResultCacheEntry).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+    assert cache.get("test", "k") is None
+
+
+def test_size_eviction_drops_oldest(db):
+    cache = AIResultCache(db, max_entries=2)
+    for i in range(3):
+        cache.put("test", f"k{i}", {"v": i})
+        db.query(AIResultCacheEntry).filter(AIResultCacheEntry.key_hash == f"k{i}").update(
+            {"created_at": datetime.utcnow() - timedelta(minutes=10 - i)}
+        )
+        db.commit()
+    cache.put("other", "x", {"v": 0})  # other kinds are not counted
+
+    assert cache.get("test", "k0") is None
+    assert cache.get("test", "k2") == {"v": 2}
+    assert db.query(AIResultCacheEntry).count() == 3
+
+
+def test_eviction_only_touches_own_kind(db):
+    cache = AIResultCache(db)
+    cache.put("other", "x", {"v": 0})
+    db.query(AIResultCacheEntry).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+    assert cache.evict("test") == 0
+    assert db.query(AIResultCacheEntry).count() == 1
+
+
+def test_put_leaves_caller_session_alone(db):
+    db.add(ExpenseCategory(name="Yarim kalan", is_fixed=False, display_order=1))
+    cache = AIResultCache(db)
+
+    cache.put("test", "k", {"v": 1})
+    db.rollback()
+
+    assert db.query(ExpenseCategory).count() == 0
+    assert cache.get("test", "k") == {"v": 1}
+
+
+def test_pos_ocr_cached_by_image_hash(db):
+    client = StubClient(POS_ANSWER)
+    cache = AIResultCache(db)
+    image = b"\x89PNG fake screenshot"
+
+    first = pos_ocr.parse_pos_image(image, "image/png", client=client, cache=cache)
+    second = pos_ocr.parse_pos_image(image, "image/png", client=client, cache=cache)
+
+    assert client.calls == 1
+    assert first == second
+    assert second["visa"] == Decimal("1200")
+    assert cache.get("pos_ocr", image_key(image))["total"] == 2150
+
+
+def test_async_ocr_uses_cache_on_request_thread(db, monkeypatch):
+    """The pooled OCR call must not touch the request session"""
+    threads = []
+
+    class RecordingCache(AIResultCache):
+        def get_many(self, kind, keys):
+            threads.append(threading.get_ident())
+            return super().get_many(kind, keys)
+
+        def put_many(self, kind, results):
+            threads.append(threading.get_ident())
+            super().put_many(kind, results)
+
+    stub = StubClient(POS_ANSWER)
+    monkeypatch.setattr(pos_ocr.anthropic, "Anthropic", lambda **kwargs: stub)
+
+    result = asyncio.run(async_parse_pos_image(b"pooled-screenshot", "image/png", cache=RecordingCache(db)))
+
+    assert result["visa"] == Decimal("1200")
+    assert threads == [threading.get_ident()] * 2
+
+
+def test_parse_pos_image_endpoint(client, db, monkeypatch):
+    stub = StubClient(POS_ANSWER)
+    monkeypatch.setattr(pos_ocr.anthropic, "Anthropic", lambda **kwargs: stub)
+    files = {"file": ("pos.png", b"screenshot-bytes", "image/png")}
+
+    first = client.post("/api/cash-difference/parse-pos-image", files=files)
+    second = client.post("/api/cash-difference/parse-pos-image", files=files)
+
+    assert first.status_code == 200
+    assert first.json() == second.json()
+    assert first.json()["nakit"] == "600"
+    assert stub.calls == 1
+
+
+def test_parse_pos_image_rejects_non_image(client):
+    files = {"file": ("rapor.xlsx", b"data", "application/vnd.ms-excel")}
+    assert client.post("/api/cash-difference/parse-pos-image", files=files).status_code == 400
@@ -379,3 +379,79 @@ class TestExportEdgeCases:
         )
 
         assert response.status_code == 422
+
+
+class TestStreamingExport:
+    """Chunked writers and multi-branch export."""
+
+    @pytest.fixture
+    def two_branches(self, client, db):
+        from app.api.deps import BranchContext, get_branch_context
+        from app.main import app
+        from app.models import Branch, User
+
+        db.add(Branch(id=2, name="Second Branch", code="SEC", city="Ankara", is_active=True))
+        for day in range(1, 6):
+            for branch_id in (1, 2):
+                db.add(CashDifference(
+                    branch_id=branch_id,
+                    difference_date=date(2025, 1, day),
+                    kasa_total=Decimal("100") * branch_id,
+                    pos_total=Decimal("110") * branch_id,
+                    status="pending",
+                    created_by=1
+                ))
+        db.commit()
+
+        branches = db.query(Branch).order_by(Branch.id).all()
+        app.dependency_overrides[get_branch_context] = lambda: BranchContext(
+            user=User(id=1, email="test@example.com", is_super_admin=True, name="Test User"),
+            current_branch_id=1,
+            current_branch=branches[0],
+            accessible_branches=branches,
+            is_super_admin=True
+        )
+        return branches
+
+    def test_stream_csv_yields_chunks(self):
+        from app.services.export_service import stream_csv
+
+        rows = iter([["h"]] + [[str(i)] for i in range(5)])
+        chunks = list(stream_csv(rows, batch_size=2))
+
+        assert len(chunks) == 3
+        assert "".join(chunks).splitlines() == ["h", "0", "1", "2", "3", "4"]
+
+    def test_multi_branch_csv(self, client, db, two_branches):
+        response = client.get(
+            "/api/reports/daily-sales-analytics/export",
+            params={"start_date": "2025-01-01", "end_date": "2025-01-31", "format": "csv", "all_branches": True}
+        )
+
+        assert response.status_code == 200
+        assert "all_branches" in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8"))))
+        assert len(rows) == 10
+        assert [r["branch_code"] for r in rows] == ["TEST"] * 5 + ["SEC"] * 5
+        assert Decimal(rows[5]["diff_total"]) == Decimal("20")
+
+    def test_single_branch_has_no_branch_columns(self, client, db, two_branches):
+        response = client.get(
+            "/api/reports/daily-sales-analytics/export",
+            params={"start_date": "2025-01-01", "end_date": "2025-01-31", "format": "csv"}
+        )
+
+        rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8"))))
+        assert len(rows) == 5
+        assert "branch_id" not in rows[0]
+
+    def test_multi_branch_excel(self, client, db, two_branches):
+        response = client.get(
+            "/api/reports/daily-sales-analytics/export",
+            params={"start_date": "2025-01-01", "end_date": "2025-01-31", "format": "excel", "all_branches": True}
+        )
+
+        assert response.status_code == 200
+        ws = load_workbook(io.BytesIO(response.content)).active
+        assert ws.max_row == 11
+        assert ws.cell(row=1, column=1).value == "branch_id"
@@ -0,0 +1,89 @@
+"""
+Tests for the async read path (AsyncDBSession endpoints).
+
+Dashboard, today's sales, menu items and the cash difference list are
+served from the async session; the sync helpers kept next to them must
+return the same payload for the same data.
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+
+from app.api.cash_difference import cash_differences_statement
+from app.api.menu_items import list_menu_items
+from app.api.online_sales import fetch_today_sales
+from app.api.reports import build_dashboard_stats
+from app.models import (
+    CashDifference, MenuCategory, MenuItem, MenuItemPrice, OnlinePlatform, OnlineSale
+)
+from app.schemas import CashDifferenceResponse, MenuItemResponse
+
+
+@pytest.fixture
+def read_data(db):
+    today = date.today()
+    db.add_all([
+        OnlinePlatform(id=1, name="Salon", channel_type="pos_visa", is_active=True, display_order=1),
+        OnlinePlatform(id=2, name="Trendyol", channel_type="online", is_active=True, display_order=2),
+        MenuCategory(id=1, name="Durum", branch_id=None, created_by=1),
+    ])
+    db.commit()
+
+    db.add_all([
+        OnlineSale(branch_id=1, platform_id=1, sale_date=today, amount=Decimal("750"), created_by=1),
+        OnlineSale(branch_id=1, platform_id=2, sale_date=today, amount=Decimal("250.50"), created_by=1),
+        MenuItem(id=1, name="Cig Kofte Durum", category_id=1, display_order=1, created_by=1),
+        MenuItem(id=2, name="Ayran", category_id=1, display_order=2, created_by=1),
+        MenuItem(id=3, name="Fiyatsiz", category_id=1, display_order=3, created_by=1),
+        CashDifference(
+            branch_id=1, difference_date=date(2025, 1, 15),
+            kasa_total=Decimal("1000"), pos_total=Decimal("1100"),
+            status="pending", created_by=1
+        ),
+    ])
+    db.flush()
+    db.add_all([
+        MenuItemPrice(menu_item_id=1, branch_id=None, price=Decimal("85.00")),
+        MenuItemPrice(menu_item_id=2, branch_id=None, price=Decimal("20.00")),
+        MenuItemPrice(menu_item_id=2, branch_id=1, price=Decimal("25.00")),
+    ])
+    db.commit()
+    return today
+
+
+def test_dashboard_parity(client, db, read_data):
+    response = client.get("/api/reports/dashboard")
+    assert response.status_code == 200
+    assert response.json() == jsonable_encoder(build_dashboard_stats(db, 1, read_data))
+
+
+def test_today_sales_parity(client, db, read_data):
+    response = client.get("/api/online-sales/today")
+    assert response.status_code == 200
+    data = response.json()
+    assert data == fetch_today_sales(db, 1, read_data)
+    assert data["total"] == 1000.5
+
+
+def test_menu_items_parity(client, db, read_data):
+    response = client.get("/api/v1/menu-items")
+    assert response.status_code == 200
+    expected = [
+        MenuItemResponse.model_validate(item).model_dump(mode="json")
+        for item in list_menu_items(db, 1)
+    ]
+    assert response.json() == expected
+    prices = {item["name"]: item["price"] for item in response.json()}
+    assert prices["Ayran"] == expected[1]["price"]
+    assert prices["Fiyatsiz"] is None
+
+
+def test_cash_difference_list_parity(client, db, read_data):
+    response = client.get("/api/cash-difference", params={"year": 2025, "month": 1})
+    assert response.status_code == 200
+    rows = db.scalars(cash_differences_statement(1, month=1, year=2025)).all()
+    expected = [CashDifferenceResponse.model_validate(r).model_dump(mode="json") for r in rows]
+    assert response.json() == expected
+    assert len(expected) == 1
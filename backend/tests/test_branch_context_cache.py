@@ -0,0 +1,116 @@
+"""
+Tests for the BranchContext cache in app/api/deps.py.
+
+A cache hit must resolve the context without any SQL; changes to users,
+user_branches or branches must invalidate it on commit.
+"""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.api.deps import (
+    create_access_token, get_branch_context, get_branch_context_cache, mark_branch_context_dirty
+)
+from app.models import Branch, User, UserBranch
+
+
+@pytest.fixture
+def manager(db):
+    """Non-admin user assigned to branch 1 only"""
+    db.add(Branch(id=2, name="Second Branch", code="SEC", city="Ankara", is_active=True))
+    db.add(User(id=2, email="manager@example.com", password_hash="hash", name="Manager", is_active=True))
+    db.add(UserBranch(user_id=2, branch_id=1, is_default=True, role="manager"))
+    db.commit()
+    return create_access_token({"sub": "2"})
+
+
+def resolve(db, token, x_branch_id=None):
+    return get_branch_context(token=token, db=db, x_branch_id=x_branch_id)
+
+
+def count_statements(db, fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return result, statements
+
+
+def test_hit_needs_no_queries(db, manager):
+    cache = get_branch_context_cache()
+    first, first_statements = count_statements(db, lambda: resolve(db, manager))
+    hits_before = cache.hits
+    second, second_statements = count_statements(db, lambda: resolve(db, manager))
+
+    assert len(first_statements) >= 3
+    assert second_statements == []
+    assert cache.hits == hits_before + 1
+    assert second.current_branch_id == first.current_branch_id == 1
+    assert [b.id for b in second.accessible_branches] == [1]
+    # Merged into the request session, usable like a freshly loaded row
+    assert second.user in db
+    assert second.current_branch.name == "Test Branch"
+
+
+def test_keyed_by_branch_header(db, manager):
+    resolve(db, manager)
+    with pytest.raises(HTTPException) as exc:
+        resolve(db, manager, x_branch_id=2)
+    assert exc.value.status_code == 403
+
+
+def test_branch_assignment_invalidates(db, manager):
+    resolve(db, manager)
+
+    db.add(UserBranch(user_id=2, branch_id=2, is_default=False, role="manager"))
+    db.commit()
+
+    ctx, statements = count_statements(db, lambda: resolve(db, manager, x_branch_id=2))
+    assert ctx.current_branch_id == 2
+    assert statements  # recomputed from DB
+
+    ctx = resolve(db, manager)
+    assert sorted(b.id for b in ctx.accessible_branches) == [1, 2]
+
+
+def test_deactivated_user_rejected(db, manager):
+    resolve(db, manager)
+
+    user = db.query(User).filter(User.id == 2).first()
+    user.is_active = False
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        resolve(db, manager)
+    assert exc.value.status_code == 400
+
+
+def test_branch_change_clears_all(db, manager):
+    resolve(db, manager)
+
+    branch = db.query(Branch).filter(Branch.id == 1).first()
+    branch.name = "Renamed"
+    db.commit()
+
+    ctx = resolve(db, manager)
+    assert ctx.current_branch.name == "Renamed"
+
+
+def test_marked_bulk_update_invalidates(db, manager):
+    db.add(UserBranch(user_id=2, branch_id=2, is_default=False, role="manager"))
+    db.commit()
+    assert resolve(db, manager).current_branch_id == 1
+
+    # Bulk updates skip the flush hooks; the caller marks the user instead
+    db.query(UserBranch).filter(UserBranch.user_id == 2).update({"is_default": UserBranch.branch_id == 2})
+    mark_branch_context_dirty(db, 2)
+    db.commit()
+
+    assert resolve(db, manager).current_branch_id == 2
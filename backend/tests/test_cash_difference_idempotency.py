@@ -13,7 +13,7 @@ def test_import_with_idempotency_key_prevents_duplicate(client, db):
     """Same idempotency key should return cached response and prevent duplicate creation"""
 
     # Clear idempotency store before test
-    get_idempotency_store()._store.clear()
+    get_idempotency_store().clear()
 
     request_data = {
         "difference_date": "2024-01-15",
@@ -75,7 +75,7 @@ def test_import_without_idempotency_key_works_normally(client, db):
     """Request without idempotency key should work as before"""
 
     # Clear idempotency store before test
-    get_idempotency_store()._store.clear()
+    get_idempotency_store().clear()
 
     request_data = {
         "difference_date": "2024-01-16",
@@ -115,7 +115,7 @@ def test_different_idempotency_keys_create_separate_records(client, db):
     """Different idempotency keys should create separate records"""
 
     # Clear idempotency store before test
-    get_idempotency_store()._store.clear()
+    get_idempotency_store().clear()
 
     request_data_1 = {
         "difference_date": "2024-01-17",
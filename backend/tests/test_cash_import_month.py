@@ -0,0 +1,158 @@
+"""
+Tests for the multi-day cash difference import (POST /cash-difference/import-month).
+"""
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+import openpyxl
+from sqlalchemy import event
+
+from app.models import CashDifference, Expense, ExpenseCategory, ImportHistory, ImportHistoryItem, OnlinePlatform, OnlineSale
+from app.schemas import CashDifferenceImportRequest, ExpenseItem
+from app.services.cash_import_service import import_days
+from app.services.catalog_cache import get_catalog
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def fill_kasa_sheet(ws, day: date, visa=1000, nakit=500):
+    ws["D4"] = datetime(day.year, day.month, day.day)
+    ws["D6"] = visa
+    ws["D10"] = nakit
+    ws["A21"], ws["H21"] = "Ekmek", 40
+
+
+def fill_hasilat_sheet(ws, day: date, visa=1000, nakit=560):
+    ws["D3"] = datetime(day.year, day.month, day.day)
+    ws["D4"] = visa
+    ws["D10"] = nakit
+
+
+def workbook_bytes(days, fill, title=None) -> bytes:
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for day in days:
+        fill(wb.create_sheet(str(day.day) if title is None else title), day)
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def zip_bytes(files: dict[str, bytes]) -> bytes:
+    output = BytesIO()
+    with zipfile.ZipFile(output, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return output.getvalue()
+
+
+def seed_reference_data(db):
+    db.add_all([
+        OnlinePlatform(name="Visa", channel_type="pos_visa", is_system=True),
+        OnlinePlatform(name="Nakit", channel_type="pos_nakit", is_system=True),
+        ExpenseCategory(name="Kategorize Edilmemis", is_system=True),
+    ])
+    db.commit()
+
+
+def test_import_month_workbooks(client, db):
+    seed_reference_data(db)
+    days = [date(2025, 3, 1), date(2025, 3, 2), date(2025, 3, 3)]
+    db.add(CashDifference(branch_id=1, difference_date=days[1], created_by=1))
+    db.commit()
+
+    files = {
+        "kasa_file": ("mart.xlsx", workbook_bytes(days, fill_kasa_sheet), XLSX),
+        "pos_file": ("hasilat.xlsx", workbook_bytes(days[:2], fill_hasilat_sheet), XLSX),
+    }
+    response = client.post("/api/cash-difference/import-month", files=files)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["skipped"], data["failed"]) == (1, 2, 0)
+    assert [d["status"] for d in data["days"]] == ["created", "exists", "missing_pos"]
+
+    created = data["days"][0]
+    assert created["source"] == "1"
+    assert created["expenses_created"] == 1
+    assert created["sales_synced"] == 2
+    # Kasa nakit includes the expense added back: 1500 + 40 vs POS 1560
+    assert Decimal(created["diff_total"]) == Decimal("20")
+
+    record = db.get(CashDifference, created["record_id"])
+    assert record.kasa_nakit == Decimal("540")
+    assert db.query(Expense).filter(Expense.expense_date == days[0]).count() == 1
+    assert db.query(OnlineSale).filter(OnlineSale.sale_date == days[0]).count() == 2
+
+    history = db.query(ImportHistory).one()
+    assert history.source_filename == "mart.xlsx"
+    assert sorted(i.entity_type for i in history.items) == ["cash_difference", "expense", "online_sale", "online_sale"]
+
+
+def test_import_month_zip_reports_bad_files(client, db):
+    seed_reference_data(db)
+    days = [date(2025, 4, 1) + timedelta(days=i) for i in range(3)]
+    kasa_zip = zip_bytes({
+        f"{d.isoformat()}.xlsx": workbook_bytes([d], fill_kasa_sheet, title="FORM") for d in days
+    } | {"bozuk.xlsx": b"not an excel file", "notlar.txt": b"ignored"})
+    pos_zip = zip_bytes({f"{d.isoformat()}.xlsx": workbook_bytes([d], fill_hasilat_sheet) for d in days})
+
+    response = client.post("/api/cash-difference/import-month", files={
+        "kasa_file": ("kasa.zip", kasa_zip, "application/zip"),
+        "pos_file": ("pos.zip", pos_zip, "application/zip"),
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["failed"]) == (3, 1)
+    assert data["days"][-1]["source"] == "bozuk.xlsx"
+    assert db.query(CashDifference).count() == 3
+
+
+def test_import_month_rejects_other_files(client, db):
+    response = client.post("/api/cash-difference/import-month", files={
+        "kasa_file": ("kasa.csv", b"a,b", "text/csv"),
+        "pos_file": ("pos.xlsx", b"x", XLSX),
+    })
+    assert response.status_code == 400
+
+
+def test_import_days_lookups_do_not_grow_with_days(db):
+    """Lookups run once per call and history items go out in one executemany"""
+    seed_reference_data(db)
+    get_catalog(db)  # platforms / category come from the warm catalog
+    bind = db.get_bind()
+
+    def statements(first_day: date, n: int) -> list[str]:
+        seen = []
+        listener = lambda conn, cursor, statement, *args: seen.append(statement)
+        event.listen(bind, "before_cursor_execute", listener)
+        try:
+            import_days(db, 1, 1, [
+                CashDifferenceImportRequest(
+                    difference_date=first_day + timedelta(days=i),
+                    kasa_total=Decimal("100"), pos_visa=Decimal("60"), pos_nakit=Decimal("50"),
+                    pos_total=Decimal("110"),
+                    expenses=[ExpenseItem(description="Su", amount=Decimal("5"))]
+                )
+                for i in range(n)
+            ])
+            db.flush()
+        finally:
+            event.remove(bind, "before_cursor_execute", listener)
+        return seen
+
+    few, many = statements(date(2025, 1, 1), 3), statements(date(2025, 2, 1), 30)
+
+    def selects(seen):
+        return [s for s in seen if s.lstrip().startswith("SELECT")]
+
+    def item_inserts(seen):
+        return [s for s in seen if s.startswith("INSERT INTO import_history_items")]
+
+    # Only the existing online sales lookup remains
+    assert len(selects(few)) == len(selects(many)) == 1
+    assert len(item_inserts(many)) == 1
+    assert db.query(ImportHistoryItem).count() == 33 * 4
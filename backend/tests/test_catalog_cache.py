@@ -0,0 +1,90 @@
+"""
+Tests for the reference data cache (app/services/catalog_cache.py).
+"""
+from sqlalchemy import event
+
+from app.models import ExpenseCategory, OnlinePlatform, PurchaseProduct, PurchaseProductGroup
+from app.services.catalog_cache import get_catalog, get_catalog_cache
+
+
+def seed(db):
+    visa = OnlinePlatform(name="Visa", channel_type="pos_visa", is_system=True, display_order=1)
+    getir = OnlinePlatform(name="Getir", channel_type="online", display_order=3)
+    trendyol = OnlinePlatform(name="Trendyol", channel_type="online", display_order=2)
+    old = OnlinePlatform(name="Eski", channel_type="online", display_order=0, is_active=False)
+    group = PurchaseProductGroup(name="Manav", display_order=1)
+    db.add_all([
+        visa, getir, trendyol, old, group,
+        ExpenseCategory(name="Kira", is_fixed=True),
+        ExpenseCategory(name="Kategorize Edilmemis", is_system=True),
+    ])
+    db.flush()
+    db.add(PurchaseProduct(name="Marul", group_id=group.id))
+    db.commit()
+
+
+def test_indexes(db):
+    seed(db)
+    catalog = get_catalog(db)
+
+    assert [p.name for p in catalog.active_platforms] == ["Visa", "Trendyol", "Getir"]
+    assert [p.name for p in catalog.platforms_for_channel("online")] == ["Trendyol", "Getir"]
+    assert catalog.platform_id("Eski") is not None  # name lookup includes inactive rows
+    assert catalog.platforms_by_id[catalog.platform_id("Visa")].is_system
+    assert [c.name for c in catalog.categories] == ["Kategorize Edilmemis", "Kira"]
+    assert catalog.category_id("Kira") in catalog.categories_by_id
+    assert [p.name for p in catalog.active_product_groups[0].products] == ["Marul"]
+
+
+def test_served_from_cache_until_commit(db):
+    seed(db)
+    first = get_catalog(db)
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        assert get_catalog(db) is first
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert statements == []
+
+    platform = db.get(OnlinePlatform, first.platform_id("Getir"))
+    platform.is_active = False
+    db.flush()
+    assert get_catalog(db) is first  # not committed yet
+
+    db.commit()
+    second = get_catalog(db)
+    assert second.version > first.version
+    assert [p.name for p in second.active_platforms] == ["Visa", "Trendyol"]
+
+
+def test_rollback_keeps_catalog(db):
+    seed(db)
+    first = get_catalog(db)
+
+    db.add(ExpenseCategory(name="Gecici"))
+    db.flush()
+    db.rollback()
+
+    assert get_catalog(db) is first
+
+
+def test_endpoints_see_changes(client, db):
+    seed(db)
+    assert [p["name"] for p in client.get("/api/online-sales/platforms").json()] == ["Visa", "Trendyol", "Getir"]
+    version = get_catalog_cache().stats()["version"]
+
+    response = client.post("/api/online-sales/platforms", json={"name": "Migros Yemek", "display_order": 9})
+    assert response.status_code == 200
+
+    channels = client.get("/api/online-sales/channels").json()
+    assert [c["name"] for c in channels["online"]] == ["Trendyol", "Getir", "Migros Yemek"]
+    assert get_catalog_cache().stats()["version"] == version + 1
+
+    groups = client.get("/api/purchases/product-groups").json()
+    assert groups[0]["products"][0]["name"] == "Marul"
+
+    categories = client.get("/api/expenses/categories").json()
+    assert [c["name"] for c in categories] == ["Kategorize Edilmemis", "Kira"]
@@ -1,7 +1,9 @@
 """Tests for AI expense categorization"""
 import pytest
 from unittest.mock import patch, MagicMock
-from app.services.categorization import ExpenseCategorizer, CategorySuggestion
+from app.services.categorization import (
+    ExpenseCategorizer, CategorySuggestion, PatternMatcher, build_learned_rules, fold_turkish
+)
 
 
 def test_categorize_returns_suggestions():
@@ -54,3 +56,71 @@ def test_categorize_batch():
         assert len(result) == 2
         # First should be pattern-matched
         assert result[0]["suggested_category"] == "Utilities"
+
+
+def test_turkish_case_folding():
+    """İ/I and missing Turkish characters should still match patterns"""
+    categorizer = ExpenseCategorizer()
+
+    for description in ("ELEKTRİK FATURASI", "ELEKTRIK", "Dogalgaz Ocak", "PERSONEL MAAS"):
+        result = categorizer.categorize(description)
+        assert "pattern" in result[0].reasoning.lower(), description
+
+    assert fold_turkish("İSTANBUL IŞIK") == "istanbul isik"
+
+
+def test_pattern_priority_matches_declaration_order():
+    """When several patterns occur, the first KNOWN_PATTERNS entry wins"""
+    matcher = PatternMatcher(ExpenseCategorizer.KNOWN_PATTERNS)
+
+    assert matcher.match("trendyol kurye") == ("kurye", "Delivery")
+    assert matcher.match("getir elektrik") == ("elektrik", "Utilities")
+    assert matcher.match("bilinmeyen gider") is None
+
+
+def test_pattern_priority_with_overlap_at_same_position():
+    """A shorter, earlier pattern wins over a longer one starting at the same position"""
+    matcher = PatternMatcher({
+        "su": ("Utilities", "Su faturasi"),
+        "su fatura": ("Other", "Fatura"),
+        "fatura": ("Rent", "Fatura"),
+    })
+
+    assert matcher.match("SU FATURASI") == ("su", "Utilities")
+    assert PatternMatcher({"su fatura": ("Other", ""), "su": ("Utilities", "")}).match("su faturasi") == (
+        "su fatura", "Other"
+    )
+
+
+def test_learned_rules_from_history():
+    """N-grams seen consistently with one category become rules"""
+    samples = [
+        ("Usta Ahmet tamir", 7, "Bakim"),
+        ("usta ahmet kombi", 7, "Bakim"),
+        ("Usta Ahmet", 7, "Bakim"),
+        ("ahmet bey yemek", 8, "Yemek"),
+    ]
+    learned = build_learned_rules(samples)
+
+    rule = learned.match("USTA AHMET - kapi")
+    assert rule.category_id == 7
+    assert rule.ngram == "usta ahmet"
+    # "ahmet" alone is ambiguous: 3 of 4 expenses (0.75) is below min_precision
+    assert "ahmet" not in learned.rules
+
+
+def test_batch_skips_ai_for_learned_rules():
+    categorizer = ExpenseCategorizer()
+    learned = build_learned_rules([("Usta Ahmet", 7, "Bakim"), ("usta ahmet tamir", 7, "Bakim")])
+
+    with patch.object(categorizer, '_call_ai_batch') as mock_ai:
+        mock_ai.return_value = [{"index": 1, "description": "xyz", "suggested_category": "Other", "confidence": 0.5}]
+
+        result = categorizer.categorize_batch(
+            [{"description": "usta ahmet kapi"}, {"description": "xyz"}],
+            learned=learned
+        )
+
+        assert mock_ai.call_args[0][0] == [{"index": 1, "description": "xyz"}]
+        assert result[0]["category_id"] == 7
+        assert result[0]["suggested_category"] == "Bakim"
@@ -26,3 +26,30 @@ def test_suggest_batch(client):
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 2
+
+
+def test_suggest_uses_branch_history(client, db):
+    """Branch's own categorized expenses are learned; new expenses refresh the rules"""
+    from datetime import date
+    from decimal import Decimal
+    from app.models import Expense, ExpenseCategory
+
+    db.add(ExpenseCategory(id=5, name="Bakim", is_fixed=False, display_order=1))
+    db.commit()
+
+    def add_expense(description):
+        db.add(Expense(
+            branch_id=1, category_id=5, expense_date=date(2025, 1, 1),
+            description=description, amount=Decimal("100"), created_by=1
+        ))
+        db.commit()
+
+    add_expense("Usta Ahmet tamir")
+    response = client.post("/api/categorization/suggest", json={"description": "usta ahmet kapi"})
+    assert response.json()[0]["category"] != "Bakim"  # single expense: below min support
+
+    add_expense("Usta Ahmet kombi")
+    response = client.post("/api/categorization/suggest", json={"description": "USTA AHMET kapı"})
+    data = response.json()
+    assert data[0]["category"] == "Bakim"
+    assert data[0]["category_id"] == 5
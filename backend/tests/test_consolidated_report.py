@@ -0,0 +1,135 @@
+"""
+Tests for the consolidated head office report (GET /api/reports/consolidated).
+
+Besides the values we assert that the number of SQL statements does not
+grow with the number of branches.
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.api.deps import BranchContext, get_branch_context
+from app.main import app
+from app.models import Branch, CashDifference, Expense, ExpenseCategory, OnlinePlatform, OnlineSale, User
+from app.query_stats import track_queries
+from app.services.consolidated_report import METRICS, consolidated_report
+
+DAY1 = date(2025, 3, 1)
+DAY2 = date(2025, 3, 2)
+
+
+@pytest.fixture
+def branches(db):
+    db.add_all([
+        Branch(id=2, name="Kadikoy", code="KDK", city="Istanbul", is_active=True),
+        Branch(id=3, name="Besiktas", code="BJK", city="Istanbul", is_active=True),
+        OnlinePlatform(id=1, name="Visa", channel_type="pos_visa", is_active=True),
+        OnlinePlatform(id=2, name="Nakit", channel_type="pos_nakit", is_active=True),
+        OnlinePlatform(id=3, name="Getir", channel_type="online", is_active=True),
+        ExpenseCategory(id=1, name="Kira", is_fixed=True, display_order=1),
+    ])
+    db.commit()
+
+    db.add_all([
+        OnlineSale(branch_id=1, platform_id=1, sale_date=DAY1, amount=Decimal("1000"), created_by=1),
+        OnlineSale(branch_id=1, platform_id=3, sale_date=DAY2, amount=Decimal("200"), created_by=1),
+        OnlineSale(branch_id=2, platform_id=2, sale_date=DAY1, amount=Decimal("300"), created_by=1),
+        OnlineSale(branch_id=2, platform_id=3, sale_date=DAY1, amount=Decimal("50"), created_by=1),
+        Expense(branch_id=1, category_id=1, expense_date=DAY1, amount=Decimal("400"), created_by=1),
+        Expense(branch_id=2, category_id=1, expense_date=DAY2, amount=Decimal("100"), created_by=1),
+        CashDifference(
+            branch_id=1, difference_date=DAY1, kasa_total=Decimal("1000"), pos_total=Decimal("1100"),
+            severity="warning", status="pending", created_by=1
+        ),
+        CashDifference(
+            branch_id=2, difference_date=DAY1, kasa_total=Decimal("350"), pos_total=Decimal("350"),
+            severity="ok", status="resolved", created_by=1
+        ),
+    ])
+    db.commit()
+    return [db.get(Branch, branch_id) for branch_id in (1, 2, 3)]
+
+
+def test_branch_metric_matrix_and_totals(db, branches):
+    report = consolidated_report(db, branches, DAY1, DAY2)
+
+    assert report.metrics == list(METRICS)
+    center, kadikoy, besiktas = report.branches
+    assert (center.pnl.revenue, center.pnl.visa, center.pnl.online) == (Decimal("1200"), Decimal("1000"), Decimal("200"))
+    assert (center.pnl.total_expenses, center.pnl.profit) == (Decimal("400"), Decimal("800"))
+    assert (kadikoy.pnl.revenue, kadikoy.pnl.nakit, kadikoy.pnl.profit) == (Decimal("350"), Decimal("300"), Decimal("250"))
+    assert besiktas.pnl.revenue == 0 and besiktas.platforms == {}
+
+    assert (report.total.revenue, report.total.total_expenses, report.total.profit) == (
+        Decimal("1550"), Decimal("500"), Decimal("1050")
+    )
+    assert report.platforms == {"Visa": Decimal("1000"), "Nakit": Decimal("300"), "Getir": Decimal("250")}
+    assert kadikoy.platforms == {"Nakit": Decimal("300"), "Getir": Decimal("50")}
+
+    assert [(d.date, d.revenue, d.profit) for d in report.daily] == [
+        (DAY1, Decimal("1350"), Decimal("950")),
+        (DAY2, Decimal("200"), Decimal("100")),
+    ]
+
+
+def test_cash_difference_summary(db, branches):
+    report = consolidated_report(db, branches, DAY1, DAY2)
+
+    center = report.branches[0].cash_difference
+    assert (center.days, center.diff_total, center.warning_days, center.open_days) == (1, Decimal("100"), 1, 1)
+    assert report.branches[2].cash_difference.days == 0
+    assert (report.cash_difference.days, report.cash_difference.kasa_total, report.cash_difference.open_days) == (
+        2, Decimal("1350"), 1
+    )
+
+
+def test_statement_count_does_not_grow_with_branches(db, branches):
+    consolidated_report(db, branches[:1], DAY1, DAY2)  # warm the catalog cache
+
+    with track_queries() as one_branch:
+        consolidated_report(db, branches[:1], DAY1, DAY2)
+    with track_queries() as three_branches:
+        consolidated_report(db, branches, DAY1, DAY2)
+
+    assert one_branch.count == three_branches.count <= 3
+
+
+@pytest.fixture
+def head_office(client, branches):
+    """Branch context with branches 1 and 2 accessible (3 is not)"""
+    def override():
+        return BranchContext(
+            user=User(id=1, email="test@example.com", is_super_admin=False, name="Test User"),
+            current_branch_id=1,
+            current_branch=branches[0],
+            accessible_branches=branches[:2],
+            is_super_admin=False
+        )
+
+    app.dependency_overrides[get_branch_context] = override
+    return client
+
+
+def test_endpoint_covers_accessible_branches(head_office):
+    response = head_office.get("/api/reports/consolidated", params={"start_date": DAY1, "end_date": DAY2})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [b["branch_id"] for b in data["branches"]] == [1, 2]
+    assert Decimal(data["total"]["revenue"]) == Decimal("1550")
+
+    response = head_office.get(
+        "/api/reports/consolidated", params={"start_date": DAY1, "end_date": DAY2, "branch_id": [2]}
+    )
+    assert [b["branch_id"] for b in response.json()["branches"]] == [2]
+
+
+def test_endpoint_rejects_foreign_branch_and_reversed_range(head_office):
+    response = head_office.get(
+        "/api/reports/consolidated", params={"start_date": DAY1, "end_date": DAY2, "branch_id": [3]}
+    )
+    assert response.status_code == 403
+
+    response = head_office.get("/api/reports/consolidated", params={"start_date": DAY2, "end_date": DAY1})
+    assert response.status_code == 400
@@ -0,0 +1,114 @@
+"""
+Tests for /api/reports/dashboard endpoint.
+
+The dashboard is polled all day by every branch tablet, so besides the
+values we assert the number of SQL statements per request to keep it
+from regressing back to per-day / per-metric queries.
+"""
+import pytest
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.models import (
+    OnlinePlatform, OnlineSale, Purchase, Expense, CourierExpense,
+    PartTimeCost, StaffMeal, DailyProduction, Supplier, ExpenseCategory
+)
+from app.services.catalog_cache import get_catalog
+
+
+@contextmanager
+def count_statements(*engines):
+    """Count SQL statements executed on the given engines."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def dashboard_data(db):
+    """Today's activity in every category plus sales over the past week."""
+    today = date.today()
+    db.add_all([
+        OnlinePlatform(id=1, name="Salon", channel_type="pos_visa", is_active=True),
+        OnlinePlatform(id=2, name="Telefon", channel_type="pos_nakit", is_active=True),
+        OnlinePlatform(id=3, name="Trendyol", channel_type="online", is_active=True),
+        OnlinePlatform(id=4, name="Getir", channel_type="online", is_active=True),
+        Supplier(id=1, branch_id=1, name="Test Supplier", is_active=True),
+        ExpenseCategory(id=1, name="Test", is_fixed=False, display_order=1),
+    ])
+    db.commit()
+
+    db.add_all([
+        OnlineSale(branch_id=1, platform_id=1, sale_date=today, amount=Decimal("1000"), created_by=1),
+        OnlineSale(branch_id=1, platform_id=2, sale_date=today, amount=Decimal("300"), created_by=1),
+        OnlineSale(branch_id=1, platform_id=3, sale_date=today, amount=Decimal("500"), created_by=1),
+        Purchase(branch_id=1, supplier_id=1, purchase_date=today, total=Decimal("400"), created_by=1),
+        Expense(branch_id=1, category_id=1, expense_date=today, amount=Decimal("100"), created_by=1),
+        CourierExpense(branch_id=1, expense_date=today, package_count=5, amount=Decimal("50"), vat_rate=20, created_by=1),
+        PartTimeCost(branch_id=1, cost_date=today, amount=Decimal("120"), created_by=1),
+        StaffMeal(branch_id=1, meal_date=today, unit_price=Decimal("25"), staff_count=4, created_by=1),
+        DailyProduction(branch_id=1, production_date=today, kneaded_kg=Decimal("22.4"), legen_kg=Decimal("11.2"), legen_cost=Decimal("1040"), created_by=1),
+    ])
+    for i in range(1, 7):
+        db.add(OnlineSale(branch_id=1, platform_id=1, sale_date=today - timedelta(days=i), amount=Decimal(100 * i), created_by=1))
+    db.commit()
+    return today
+
+
+def test_dashboard_values(client, dashboard_data):
+    today = dashboard_data
+    response = client.get("/api/reports/dashboard")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert Decimal(data["today_salon"]) == Decimal("1000")
+    assert Decimal(data["today_telefon"]) == Decimal("300")
+    assert Decimal(data["today_online_sales"]) == Decimal("500")
+    assert Decimal(data["today_total_sales"]) == Decimal("1800")
+    assert data["online_platform_count"] == 1
+    assert Decimal(data["online_breakdown"]["Trendyol"]) == Decimal("500")
+    assert Decimal(data["today_purchases"]) == Decimal("400")
+    assert Decimal(data["today_expenses"]) == Decimal("100")
+    assert Decimal(data["today_courier_cost"]) == Decimal("60")
+    assert Decimal(data["today_part_time_cost"]) == Decimal("120")
+    assert Decimal(data["today_staff_meals"]) == Decimal("100")
+    assert Decimal(data["today_production_kg"]) == Decimal("22.4")
+    assert Decimal(data["today_production_cost"]) == Decimal("2080")
+    # 1800 - 400 - 100 - 100 - 60 - 120
+    assert Decimal(data["today_profit"]) == Decimal("1020")
+
+    week = data["week_sales"]
+    assert [d["date"] for d in week] == [(today - timedelta(days=i)).isoformat() for i in range(6, -1, -1)]
+    assert [d["sales"] for d in week] == [600.0, 500.0, 400.0, 300.0, 200.0, 100.0, 1800.0]
+
+
+def test_dashboard_empty(client, db):
+    response = client.get("/api/reports/dashboard")
+    assert response.status_code == 200
+    data = response.json()
+    assert Decimal(data["today_total_sales"]) == 0
+    assert Decimal(data["today_profit"]) == 0
+    assert len(data["week_sales"]) == 7
+    assert all(d["sales"] == 0 for d in data["week_sales"])
+
+
+def test_dashboard_statement_count(client, db, async_db_engine, dashboard_data):
+    """Dashboard must stay at two statements regardless of data volume."""
+    get_catalog(db)  # platforms come from the reference data cache once warm
+    with count_statements(db.get_bind(), async_db_engine.sync_engine) as statements:
+        response = client.get("/api/reports/dashboard")
+
+    assert response.status_code == 200
+    assert len(statements) == 2, statements
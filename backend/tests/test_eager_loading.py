@@ -0,0 +1,134 @@
+"""
+Statement counts of the list endpoints (app/api/loaders.py) and the
+lazy-load guard (app/utils/lazy_load_guard.py).
+
+Every list must cost the same number of SELECTs for 2 rows as for 12.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from app.models import (
+    Employee, Expense, ExpenseCategory, ImportHistory, ImportHistoryItem, MonthlyPayroll,
+    OnlinePlatform, OnlineSale, Purchase, PurchaseItem, PurchaseProduct, PurchaseProductGroup, Supplier
+)
+from app.utils.lazy_load_guard import LazyLoadError, lazy_loads_forbidden
+
+DAY = date.today()  # /purchases/today
+
+
+def seed_purchases(db, n):
+    for i in range(n):
+        supplier = Supplier(branch_id=1, name=f"Tedarikci {i}")
+        db.add(Purchase(
+            branch_id=1, supplier=supplier, purchase_date=DAY, total=Decimal(20), created_by=1,
+            items=[
+                PurchaseItem(product_id=1, description="Domates", quantity=1, unit="kg", unit_price=10, total=10),
+                PurchaseItem(product_id=1, description="Domates", quantity=1, unit="kg", unit_price=10, total=10),
+            ]
+        ))
+
+
+def seed_expenses(db, n):
+    for i in range(n):
+        category = ExpenseCategory(name=f"Kategori {i}")
+        db.add(Expense(branch_id=1, category=category, expense_date=DAY, amount=Decimal(5), created_by=1))
+
+
+def seed_online_sales(db, n):
+    for i in range(n):
+        platform = OnlinePlatform(name=f"Platform {i}")
+        db.add(OnlineSale(branch_id=1, platform=platform, sale_date=DAY, amount=Decimal(50), created_by=1))
+
+
+def seed_payrolls(db, n):
+    for i in range(n):
+        employee = Employee(branch_id=1, name=f"Personel {i}", base_salary=Decimal(1000))
+        db.add(MonthlyPayroll(
+            branch_id=1, employee=employee, year=DAY.year, month=DAY.month,
+            payment_date=DAY - timedelta(days=i), created_by=1
+        ))
+
+
+def seed_import_history(db, n):
+    for i in range(n):
+        db.add(ImportHistory(
+            branch_id=1, import_type="kasa_raporu", import_date=DAY, status="completed", created_by=1,
+            items=[ImportHistoryItem(entity_type="expense", entity_id=i, action="created")]
+        ))
+
+
+LIST_ENDPOINTS = [
+    # url, seed, SELECTs (rows + selectin collections)
+    ("/api/purchases", seed_purchases, 2),
+    ("/api/purchases/today", seed_purchases, 2),
+    ("/api/expenses", seed_expenses, 1),
+    ("/api/online-sales", seed_online_sales, 1),
+    (f"/api/online-sales/daily/{DAY.isoformat()}", seed_online_sales, 1),
+    ("/api/personnel/payroll", seed_payrolls, 1),
+    ("/api/import-history", seed_import_history, 2),
+]
+
+
+@pytest.fixture
+def product(db):
+    db.add(PurchaseProductGroup(id=1, name="Manav"))
+    db.add(PurchaseProduct(id=1, group_id=1, name="Domates"))
+    db.commit()
+
+
+def selects_of(client, db, url):
+    bind = db.get_bind()
+    seen = []
+
+    def listener(conn, cursor, statement, *args):
+        if statement.lstrip().startswith("SELECT"):
+            seen.append(statement)
+
+    event.listen(bind, "before_cursor_execute", listener)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+    assert response.status_code == 200, response.text
+    return response.json(), seen
+
+
+@pytest.mark.parametrize("url,seed,expected", LIST_ENDPOINTS)
+def test_list_statement_count_does_not_grow_with_rows(client, db, product, url, seed, expected):
+    counts = []
+    for n in (2, 12):
+        seed(db, n if not counts else n - 2)
+        db.commit()
+        db.expunge_all()  # a fresh request session: nothing in the identity map
+        body, selects = selects_of(client, db, url)
+        rows = body["entries"] if isinstance(body, dict) else body
+        assert len(rows) == n
+        counts.append(len(selects))
+
+    assert counts == [expected, expected]
+
+
+def test_purchase_list_serializes_items_and_supplier(client, db, product):
+    seed_purchases(db, 2)
+    db.commit()
+
+    purchase = client.get("/api/purchases").json()[0]
+    assert purchase["supplier"]["name"].startswith("Tedarikci")
+    assert [item["product"]["name"] for item in purchase["items"]] == ["Domates", "Domates"]
+
+
+def test_guard_raises_on_lazy_load_only_inside_requests(db, product):
+    seed_purchases(db, 1)
+    db.commit()
+    db.expunge_all()
+
+    with lazy_loads_forbidden(db):
+        purchase = db.query(Purchase).first()
+        with pytest.raises(LazyLoadError, match="Purchase.items"):
+            purchase.items
+
+    db.expunge_all()
+    assert len(db.query(Purchase).first().items) == 2
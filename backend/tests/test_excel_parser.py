@@ -0,0 +1,114 @@
+"""
+Tests for the read_only Kasa / Hasılat Excel parsers (app/utils/excel_parser.py).
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from io import BytesIO
+
+import openpyxl
+import pytest
+
+from app.utils.excel_parser import parse_hasilat_raporu, parse_kasa_raporu
+
+
+def to_bytes(wb) -> bytes:
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def form_workbook() -> bytes:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "FORM"
+    ws["D4"] = datetime(2025, 1, 15)
+    ws["D6"], ws["N6"] = 1000, 500        # VISA
+    ws["D7"] = 200                        # PAKET VISA
+    ws["D10"], ws["N10"] = 300, 150.5     # NAKIT
+    ws["N11"] = "=N10*2"                  # uncached formula -> 0
+    ws["D13"] = 80                        # TRENDYOL
+    ws["N16"] = 40                        # MIGROS
+    ws["A21"], ws["H21"], ws["R21"] = "Ekmek", 25, 10
+    ws["A22"], ws["H22"] = "Bos tutar", 0
+    ws["A23"], ws["R23"] = "Su", 7.5
+    ws["H24"] = 99                        # no description -> skipped
+    # Sheets the parser never reads
+    wb.create_sheet("NOTLAR").append(["x"] * 30)
+    return to_bytes(wb)
+
+
+def test_form_sheet_sums_both_shifts_and_expenses():
+    result = parse_kasa_raporu(form_workbook())
+
+    assert result["date"] == date(2025, 1, 15)
+    assert result["visa"] == Decimal("1700")
+    assert result["trendyol"] == Decimal("80")
+    assert result["getir"] == Decimal("0")
+    assert result["migros"] == Decimal("40")
+    assert result["expenses"] == [
+        {"description": "Ekmek", "amount": Decimal("35")},
+        {"description": "Su", "amount": Decimal("7.5")},
+    ]
+    # Expenses are added back to nakit
+    assert result["nakit"] == Decimal("450.5") + Decimal("42.5")
+    assert result["total"] == Decimal("1700") + result["nakit"] + Decimal("120")
+
+
+def test_kasa_raporu_sheet_uses_column_d():
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "KASA RAPORU"
+    ws["D4"] = datetime(2025, 2, 1)
+    ws["D6"], ws["N6"] = 900, 12345       # N is ignored on this layout
+    ws["D11"] = 60
+    ws["A21"], ws["H21"] = "Temizlik", 15
+
+    result = parse_kasa_raporu(to_bytes(wb))
+
+    assert result["date"] == date(2025, 2, 1)
+    assert result["visa"] == Decimal("900")
+    assert result["nakit"] == Decimal("75")
+    assert result["expenses"] == [{"description": "Temizlik", "amount": Decimal("15")}]
+    assert result["total"] == Decimal("975")
+
+
+def test_kasa_missing_sheet_raises():
+    wb = openpyxl.Workbook()
+    wb.active.title = "Sayfa1"
+
+    with pytest.raises(ValueError):
+        parse_kasa_raporu(to_bytes(wb))
+
+
+def test_hasilat_serial_date_and_channels():
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws["D3"] = 46014                      # Excel serial date
+    for row, value in {4: 100, 5: 20, 8: 5, 10: 300, 11: 30, 14: 70, 15: 25}.items():
+        ws.cell(row=row, column=4, value=value)
+    ws["D40"] = 99999                     # detail rows below the summary are ignored
+
+    result = parse_hasilat_raporu(to_bytes(wb))
+
+    assert result == {
+        "date": date(2025, 12, 23),
+        "visa": Decimal("125"),
+        "nakit": Decimal("330"),
+        "trendyol": Decimal("0"),
+        "getir": Decimal("70"),
+        "yemeksepeti": Decimal("25"),
+        "migros": Decimal("0"),
+        "total": Decimal("550"),
+    }
+
+
+def test_hasilat_datetime_and_short_rows():
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws["D3"] = datetime(2025, 3, 9)
+    ws["A4"] = "VISA"                     # row shorter than column D
+
+    result = parse_hasilat_raporu(to_bytes(wb))
+
+    assert result["date"] == date(2025, 3, 9)
+    assert result["total"] == Decimal("0")
@@ -41,3 +41,131 @@ def test_idempotency_store_expires_old_keys():
 
     # Should be expired
     assert store.get(key) is None
+
+
+def test_memory_backend_is_lru_bounded():
+    """Oldest keys are evicted beyond max_entries"""
+    from app.idempotency import MemoryIdempotencyBackend
+
+    store = IdempotencyStore(backend=MemoryIdempotencyBackend(max_entries=2))
+    store.save("a", 1)
+    store.save("b", 2)
+    store.get("a")  # a is now more recent than b
+    store.save("c", 3)
+
+    assert store.get("a") == 1
+    assert store.get("b") is None
+    assert store.get("c") == 3
+
+
+def test_cleanup_removes_expired_entries():
+    store = IdempotencyStore(ttl_seconds=0)
+    store.save("old", {"x": 1})
+    import time
+    time.sleep(0.01)
+    assert store.cleanup() == 1
+    assert len(store.backend) == 0
+
+
+def _shared_stores(wait_seconds=5):
+    """Two 'workers' sharing one (fake) Redis"""
+    from app.idempotency import RedisIdempotencyBackend
+    from app.report_cache import FakeRedis
+
+    redis = FakeRedis()
+    return [
+        IdempotencyStore(backend=RedisIdempotencyBackend(redis), wait_seconds=wait_seconds)
+        for _ in range(2)
+    ]
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_concurrent_duplicate_waits_for_first_response(shared):
+    """A duplicate arriving mid-flight returns the first response, work runs once"""
+    import threading
+    from app.idempotency import IdempotencySlot
+
+    if shared:
+        first_store, second_store = _shared_stores()
+    else:
+        first_store = second_store = IdempotencyStore(wait_seconds=5)
+    started, release = threading.Event(), threading.Event()
+    executions = []
+    results = {}
+
+    def request(name, store):
+        with IdempotencySlot(store, "import-1") as slot:
+            if slot.cached is not None:
+                results[name] = slot.cached
+                return
+            executions.append(name)
+            started.set()
+            release.wait(5)
+            slot.save({"id": 7})
+            results[name] = {"id": 7}
+
+    first = threading.Thread(target=request, args=("first", first_store))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=request, args=("second", second_store))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert executions == ["first"]
+    assert results == {"first": {"id": 7}, "second": {"id": 7}}
+
+
+def test_failed_request_releases_claim():
+    """If the first request fails, a retry with the same key executes"""
+    from app.idempotency import IdempotencySlot
+
+    store = IdempotencyStore(wait_seconds=0)
+    with pytest.raises(ValueError):
+        with IdempotencySlot(store, "k") as slot:
+            assert slot.cached is None
+            raise ValueError("db error")
+
+    with IdempotencySlot(store, "k") as slot:
+        assert slot.cached is None
+        slot.save("ok")
+    assert store.get("k") == "ok"
+
+
+def test_duplicate_times_out_while_first_still_running():
+    from app.idempotency import IdempotencyInProgressError
+
+    first, second = _shared_stores(wait_seconds=0.1)
+    cached, token = first.acquire("k")
+    assert cached is None and token  # claimed, still running
+
+    with pytest.raises(IdempotencyInProgressError):
+        second.acquire("k")
+
+    first.save("k", {"done": True}, token)
+    assert second.acquire("k") == ({"done": True}, None)
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_expired_claim_does_not_release_new_owner(shared):
+    """A request whose claim expired must not drop the claim of the request that took over"""
+    if shared:
+        first, second = _shared_stores(wait_seconds=0)
+    else:
+        first = second = IdempotencyStore(wait_seconds=0)
+
+    _, stale_token = first.acquire("k")
+    if shared:
+        first.backend._client.delete("idem-lock:k")  # lock TTL ran out
+    else:
+        first.backend._claims.pop("k")
+    _, token = second.acquire("k")
+    assert token not in (None, stale_token)
+
+    first.release("k", stale_token)
+    first.save("k", {"id": 0}, stale_token)
+    assert second.backend.claim("k", 60) is None  # still held by the second request
+
+    second.release("k", token)
+    assert second.backend.claim("k", 60) is not None
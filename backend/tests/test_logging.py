@@ -4,7 +4,7 @@ import pytest
 import json
 import logging
 from io import StringIO
-from app.logging_config import setup_logging, get_logger, JSONFormatter
+from app.logging_config import setup_logging, get_logger, JSONFormatter, LogPipeline, SampledRoutesFilter
 
 
 def test_logger_outputs_json():
@@ -87,3 +87,47 @@ def test_json_formatter_handles_non_serializable():
     # Should still produce valid JSON
     log_entry = json.loads(output.strip())
     assert "message" in log_entry
+
+
+def _record(endpoint=None, status_code=200, level=logging.INFO):
+    record = logging.LogRecord("api", level, __file__, 1, "GET %s", (endpoint,), None)
+    if endpoint:
+        record.endpoint = endpoint
+        record.status_code = status_code
+    return record
+
+
+def test_queue_pipeline_formats_on_listener_thread(capsys):
+    """Records are queued as-is and written as JSON by the listener"""
+    pipeline = LogPipeline(maxsize=100, block=False, sample_prefixes=(), sample_every=1)
+    pipeline.start()
+    logger = logging.getLogger("test_queue_pipeline")
+    logger.handlers = [pipeline.handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    logger.info("Siparis %s", 42, extra={"branch_id": 3})
+    pipeline.stop()
+
+    log_entry = json.loads(capsys.readouterr().out.strip())
+    assert log_entry["message"] == "Siparis 42"
+    assert log_entry["branch_id"] == 3
+
+
+def test_full_queue_drops_info_and_counts_it():
+    pipeline = LogPipeline(maxsize=2, block=False, sample_prefixes=(), sample_every=1)  # listener not started
+
+    for _ in range(5):
+        pipeline.handler.handle(_record())
+
+    assert pipeline.stats() == {"queued": 2, "dropped": 3}
+
+
+def test_sampled_routes_keep_one_in_n_and_all_errors():
+    sampler = SampledRoutesFilter(("/api/health", "/api/metrics"), every=10)
+
+    kept = [sampler.filter(_record("/api/health")) for _ in range(30)]
+    assert kept.count(True) == 3
+    assert sampler.filter(_record("/api/health/deep", status_code=503))
+    assert all(sampler.filter(_record("/api/purchases")) for _ in range(5))
+    assert sampler.filter(_record())
@@ -0,0 +1,106 @@
+"""
+Tests for batched menu price resolution and the resolved-menu cache.
+"""
+import pytest
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.api.menu_items import list_menu_items
+from app.models import Branch, MenuCategory, MenuItem, MenuItemPrice
+from app.services.menu_price_service import get_menu_cache, resolve_prices
+
+
+@pytest.fixture
+def menu(db):
+    db.add(Branch(id=2, name="Second Branch", code="SEC", city="Ankara", is_active=True))
+    db.add(MenuCategory(id=1, name="Durum", branch_id=None, created_by=1))
+    db.flush()
+    for i in range(1, 31):
+        db.add(MenuItem(id=i, name=f"Urun {i}", category_id=1, display_order=i, created_by=1))
+    db.flush()
+    for i in range(1, 31):
+        db.add(MenuItemPrice(menu_item_id=i, branch_id=None, price=Decimal("50")))
+    db.add(MenuItemPrice(menu_item_id=1, branch_id=1, price=Decimal("60")))
+    db.add(MenuItemPrice(menu_item_id=2, branch_id=2, price=Decimal("70")))
+    db.commit()
+
+
+def test_resolve_prices_prefers_branch_override():
+    prices = [
+        MenuItemPrice(menu_item_id=1, branch_id=1, price=Decimal("60")),
+        MenuItemPrice(menu_item_id=1, branch_id=None, price=Decimal("50")),
+        MenuItemPrice(menu_item_id=2, branch_id=None, price=Decimal("40")),
+    ]
+    resolved = resolve_prices(prices, branch_id=1)
+
+    assert resolved == {1: (Decimal("60"), False), 2: (Decimal("40"), True)}
+
+
+def test_list_uses_two_queries(db, menu):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        items = list_menu_items(db, 1)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert len(items) == 30
+    assert len(statements) == 2
+    assert (items[0]["price"], items[0]["price_is_default"]) == (Decimal("60"), False)
+    assert (items[1]["price"], items[1]["price_is_default"]) == (Decimal("50"), True)
+
+
+def test_menu_served_from_cache(client, db, menu):
+    cache = get_menu_cache()
+    first = client.get("/api/v1/menu-items").json()
+    second = client.get("/api/v1/menu-items").json()
+
+    assert first == second
+    assert cache.stats()["entries"] == 1
+    assert cache.hits >= 1
+
+
+def test_branch_price_change_invalidates(client, db, menu):
+    client.get("/api/v1/menu-items")
+
+    response = client.put("/api/v1/menu-items/3/prices", json={"branch_id": 1, "price": "99.00"})
+    assert response.status_code == 200
+
+    item = client.get("/api/v1/menu-items").json()[2]
+    assert float(item["price"]) == 99.0
+    assert item["price_is_default"] is False
+
+
+def test_price_change_during_resolve_is_not_cached(db, menu):
+    cache = get_menu_cache()
+    generation = cache.generation(1)
+    cache.invalidate_branch(1)  # price change committed while resolving
+
+    cache.set(1, None, [{"id": 1}], generation)
+
+    assert cache.get(1, None) is None
+    cache.set(1, None, [{"id": 1}], cache.generation(1))
+    assert cache.get(1, None) == [{"id": 1}]
+
+
+def test_other_branch_price_keeps_cache(client, db, menu):
+    client.get("/api/v1/menu-items")
+
+    client.put("/api/v1/menu-items/3/prices", json={"branch_id": 2, "price": "99.00"})
+
+    assert get_menu_cache().stats()["entries"] == 1
+
+
+def test_default_price_delete_invalidates(client, db, menu):
+    client.get("/api/v1/menu-items")
+
+    assert client.delete("/api/v1/menu-items/4/prices/0").status_code == 204
+
+    item = client.get("/api/v1/menu-items").json()[3]
+    assert item["price"] is None
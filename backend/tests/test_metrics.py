@@ -0,0 +1,99 @@
+# backend/tests/test_metrics.py
+"""
+Tests for the in-process metrics registry and GET /api/metrics (app/metrics.py)
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.metrics import AI_CALL_LATENCY, MetricsRegistry, observe_ai_call, render
+
+
+def sample(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not in exposition")
+
+
+def test_histogram_exposition_is_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("req_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value, "/api/x")
+
+    text = render(registry.snapshot())
+
+    assert "# TYPE req_seconds histogram" in text
+    assert sample(text, 'req_seconds_bucket{route="/api/x",le="0.1"}') == 1
+    assert sample(text, 'req_seconds_bucket{route="/api/x",le="1.0"}') == 3
+    assert sample(text, 'req_seconds_bucket{route="/api/x",le="+Inf"}') == 4
+    assert sample(text, 'req_seconds_count{route="/api/x"}') == 4
+    assert sample(text, 'req_seconds_sum{route="/api/x"}') == pytest.approx(4.25)
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("c_total", "C", ("path",)).inc('a"b\\c')
+    assert 'c_total{path="a\\"b\\\\c"} 1.0' in render(registry.snapshot())
+
+
+def test_metrics_endpoint_reports_routes(client, db):
+    client.get("/api/expenses")
+    client.get("/api/expenses")
+
+    response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert sample(text, 'http_requests_total{method="GET",route="/api/expenses",status="200"}') >= 2
+    assert sample(text, 'http_request_duration_seconds_count{method="GET",route="/api/expenses"}') >= 2
+    # the scrape itself is in flight
+    assert sample(text, 'http_requests_in_flight{method="GET"}') >= 1
+    assert 'cache_hit_ratio{cache="report"}' in text
+    assert 'parse_pool_queued{pool="excel"}' in text
+
+
+def test_unmatched_routes_share_one_label(client):
+    client.get("/api/no-such-route/123")
+    text = client.get("/api/metrics").text
+    assert 'route="unmatched"' in text
+    assert "no-such-route" not in text
+
+
+def test_ai_call_outcome_is_labelled():
+    with pytest.raises(RuntimeError):
+        with observe_ai_call("test_kind"):
+            raise RuntimeError("timeout")
+    with observe_ai_call("test_kind"):
+        pass
+
+    # value: per-bucket counts..., sum
+    counts = {tuple(k): sum(v[:-1]) for k, v in AI_CALL_LATENCY.state()["samples"]}
+    assert counts[("test_kind", "error")] == 1
+    assert counts[("test_kind", "ok")] == 1
+
+
+def test_multiproc_dir_merges_workers(tmp_path):
+    dead_pid = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    dead_pid = int(dead_pid.stdout)
+
+    # A worker that exited: its counter stays, its gauge is dropped
+    dead = MetricsRegistry(multiproc_dir=str(tmp_path))
+    dead.counter("jobs_total", "Jobs").inc(amount=5)
+    dead.gauge("busy", "Busy").set(3)
+    (tmp_path / f"{dead_pid}.json").write_text(json.dumps({"pid": dead_pid, "states": dead.snapshot()}))
+
+    live = MetricsRegistry(multiproc_dir=str(tmp_path))
+    live.counter("jobs_total", "Jobs").inc(amount=2)
+    live.gauge("busy", "Busy").set(1)
+
+    text = live.exposition()
+
+    assert sample(text, "jobs_total") == 7
+    assert sample(text, "busy") == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([f"{dead_pid}.json", f"{os.getpid()}.json"])
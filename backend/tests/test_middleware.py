@@ -1,10 +1,12 @@
 # backend/tests/test_middleware.py
+import asyncio
 import pytest
 import json
 import logging
 from io import StringIO
 from fastapi.testclient import TestClient
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
 from app.middleware import RequestLoggingMiddleware
 from app.logging_config import JSONFormatter
 
@@ -51,3 +53,88 @@ def test_middleware_logs_requests():
     assert log_entry["status_code"] == 200
     assert "request_id" in log_entry
     assert "duration_ms" in log_entry
+
+
+def _bare_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+def test_middleware_adds_request_id_and_identity_headers():
+    app = _bare_app()
+
+    @app.get("/whoami")
+    def whoami(request: Request):
+        return {"request_id": request.state.request_id}
+
+    response = TestClient(app).get("/whoami")
+
+    assert response.headers["X-Request-ID"] == response.json()["request_id"]
+    assert response.headers["X-Service-Name"] == "cigkoftecibey-webapp"
+    assert response.headers["X-Service-Port"] == "8000"
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+
+def test_middleware_passes_stream_chunks_through():
+    """Streaming body is forwarded chunk by chunk, not buffered"""
+    app = _bare_app()
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"row{i}\n" for i in range(3)), media_type="text/csv")
+
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+    disconnected = asyncio.Event()
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await disconnected.wait()  # client stays connected
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/stream", "raw_path": b"/stream",
+        "root_path": "", "query_string": b"", "headers": [], "server": ("test", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+
+    start, *bodies = messages
+    assert start["type"] == "http.response.start"
+    assert (b"x-request-id", scope["state"]["request_id"].encode()) in start["headers"]
+    chunks = [m["body"] for m in bodies if m["body"]]
+    assert chunks == [b"row0\n", b"row1\n", b"row2\n"]
+    assert bodies[-1]["more_body"] is False
+
+
+def test_middleware_turns_unhandled_errors_into_500_json():
+    stream = StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JSONFormatter())
+    logger = logging.getLogger("api")
+    logger.handlers.clear()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    app = _bare_app()
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("patladi")
+
+    response = TestClient(app).get("/boom")
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Internal Server Error", "debug_trace": "patladi"}
+    assert "X-Request-ID" in response.headers
+
+    log_entry = json.loads(stream.getvalue().strip().split("\n")[-1])
+    assert log_entry["message"] == "GET /boom - ERROR"
+    assert log_entry["status_code"] == 500
+    assert log_entry["error"] == "patladi"
@@ -0,0 +1,96 @@
+"""
+Tests for keyset pagination (app/utils/pagination.py) and the cursor API
+of the list endpoints.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models import Expense, ExpenseCategory, Purchase, Supplier
+from app.utils.pagination import NEXT_CURSOR_HEADER, InvalidCursorError, Keyset
+
+EXPENSE_KEYSET = Keyset(Expense.expense_date, Expense.id)
+START = date(2025, 3, 1)
+
+
+def test_cursor_round_trip_and_validation():
+    row = Expense(id=42, expense_date=date(2025, 3, 9))
+    cursor = EXPENSE_KEYSET.encode(row)
+    assert EXPENSE_KEYSET.decode(cursor) == (date(2025, 3, 9), 42)
+
+    for bad in ("bozuk", "W10", EXPENSE_KEYSET.encode(row)[:-3], "WyIyMDI1LTAzLTA5IiwiYSJd"):
+        with pytest.raises(InvalidCursorError):
+            EXPENSE_KEYSET.decode(bad)
+
+
+def test_page_splits_on_limit():
+    rows = [Expense(id=i, expense_date=START) for i in (5, 4, 3)]
+    assert EXPENSE_KEYSET.page(rows, 3) == (rows, None)
+
+    page, next_cursor = EXPENSE_KEYSET.page(rows, 2)
+    assert page == rows[:2]
+    assert EXPENSE_KEYSET.decode(next_cursor) == (START, 4)
+
+
+def walk(client, url, limit, **params):
+    """All rows of a list endpoint, following X-Next-Cursor"""
+    rows, cursor, pages = [], None, 0
+    while True:
+        response = client.get(url, params={**params, "limit": limit, "cursor": cursor})
+        assert response.status_code == 200
+        rows.extend(response.json())
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return rows, pages
+
+
+@pytest.fixture
+def expenses(db):
+    category = ExpenseCategory(id=1, name="Kira")
+    db.add(category)
+    # Several rows per day so pages split inside a date
+    for i in range(11):
+        db.add(Expense(
+            branch_id=1, category_id=1, expense_date=START + timedelta(days=i // 3),
+            amount=Decimal(i + 1), created_by=1
+        ))
+    db.commit()
+
+
+def test_expense_pages_cover_every_row_once(client, expenses):
+    rows, pages = walk(client, "/api/expenses", limit=4)
+
+    assert pages == 3
+    assert len(rows) == 11
+    assert len({r["id"] for r in rows}) == 11
+    keys = [(r["expense_date"], r["id"]) for r in rows]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_cursor_composes_with_filters(client, expenses):
+    rows, _ = walk(client, "/api/expenses", limit=2, month=3, year=2025)
+    assert len(rows) == 11
+
+    last_page = client.get("/api/expenses", params={"limit": 11})
+    assert NEXT_CURSOR_HEADER not in last_page.headers
+
+
+def test_purchase_pages(client, db):
+    db.add(Supplier(id=1, branch_id=1, name="Manav"))
+    for i in range(5):
+        db.add(Purchase(
+            branch_id=1, supplier_id=1, purchase_date=START, total=Decimal(10), created_by=1
+        ))
+    db.commit()
+
+    rows, pages = walk(client, "/api/purchases", limit=2)
+    assert pages == 3
+    assert [r["id"] for r in rows] == [5, 4, 3, 2, 1]
+
+
+def test_invalid_cursor_is_400(client, db):
+    response = client.get("/api/expenses", params={"cursor": "bozuk"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Gecersiz cursor"
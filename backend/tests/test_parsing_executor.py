@@ -0,0 +1,105 @@
+"""
+Tests for the upload parsing pools (app/utils/parsing_executor.py).
+"""
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.api import cash_difference
+from app.utils.parsing_executor import BoundedPool, ParsingBusyError, _process_pool
+
+
+def thread_pool(workers):
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def test_runs_off_event_loop():
+    """A blocking parse must not stop other coroutines from running"""
+    pool = BoundedPool("test", thread_pool, workers=1, max_queue=0)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    async def main():
+        return await asyncio.gather(pool.run(time.sleep, 0.2), ticker())
+
+    asyncio.run(main())
+    pool.shutdown()
+
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.2
+
+
+def test_rejects_when_queue_full():
+    pool = BoundedPool("test", thread_pool, workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        first = asyncio.ensure_future(pool.run(release.wait))
+        second = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        stats = pool.stats()
+        with pytest.raises(ParsingBusyError):
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(first, second)
+        return stats
+
+    busy = asyncio.run(main())
+    pool.shutdown()
+
+    assert (busy["active"], busy["queued"]) == (1, 1)
+    stats = pool.stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    assert stats["active"] == stats["queued"] == 0
+
+
+def test_failures_counted_and_raised():
+    pool = BoundedPool("test", thread_pool, workers=1, max_queue=0)
+
+    with pytest.raises(ValueError):
+        asyncio.run(pool.run(int, "not a number"))
+    pool.shutdown()
+
+    assert pool.stats()["failed"] == 1
+
+
+def test_process_pool_runs_picklable_function():
+    pool = BoundedPool("excel", _process_pool, workers=1, max_queue=0)
+    try:
+        assert asyncio.run(pool.run(math.factorial, 20)) == math.factorial(20)
+    finally:
+        pool.shutdown()
+
+
+def test_parse_excel_busy_returns_503(client, monkeypatch):
+    async def busy(content):
+        raise ParsingBusyError("excel parse kuyrugu dolu")
+
+    monkeypatch.setattr(cash_difference, "async_parse_kasa_raporu", busy)
+    files = {"file": ("kasa.xlsx", b"data", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+
+    response = client.post("/api/cash-difference/parse-excel", files=files)
+    assert response.status_code == 503
+
+
+def test_invalid_excel_is_400(client):
+    files = {"file": ("kasa.xlsx", b"not an excel file", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+
+    response = client.post("/api/cash-difference/parse-hasilat-excel", files=files)
+    assert response.status_code == 400
+
+
+def test_parsing_stats_endpoint(client):
+    data = client.get("/api/health/parsing").json()
+    for pool in ("excel", "ocr"):
+        for key in ("workers", "active", "queued", "rejected", "avg_wait_ms"):
+            assert key in data[pool]
@@ -0,0 +1,88 @@
+# backend/tests/test_query_stats.py
+"""
+Tests for per-request SQL instrumentation (app/query_stats.py)
+"""
+import json
+import logging
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from sqlalchemy import select, text
+
+from app.config import settings
+from app.logging_config import JSONFormatter
+from app.models import Expense, ExpenseCategory
+from app.query_stats import statement_shape, track_queries
+
+
+@pytest.fixture
+def sql_log():
+    stream = StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JSONFormatter())
+    logger = logging.getLogger("sql")
+    logger.addHandler(handler)
+    yield lambda: [json.loads(line) for line in stream.getvalue().splitlines() if line]
+    logger.removeHandler(handler)
+
+
+def test_statement_shape_ignores_in_list_length_and_literals():
+    assert statement_shape("SELECT a FROM t WHERE id IN (?, ?, ?)") == statement_shape(
+        "SELECT a\n  FROM t WHERE id IN (?, ?)"
+    )
+    assert statement_shape("SELECT a FROM t LIMIT 51") == "SELECT a FROM t LIMIT ?"
+    assert statement_shape("SELECT t1.a FROM t1") == "SELECT t1.a FROM t1"
+
+
+def test_request_reports_query_count_in_server_timing(client, db):
+    db.add(ExpenseCategory(id=1, name="Kira"))
+    db.add(Expense(branch_id=1, category_id=1, expense_date=date(2025, 1, 1), amount=Decimal(1), created_by=1))
+    db.commit()
+
+    response = client.get("/api/expenses")
+
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert 'desc="1 queries"' in timing
+    assert "app;dur=" in timing
+
+
+def test_async_endpoint_statements_are_counted(client, db):
+    response = client.get("/api/online-sales/today")
+
+    assert response.status_code == 200
+    assert 'desc="0 queries"' not in response.headers["Server-Timing"]
+
+
+def test_repeated_statement_shape_warns_once(db, sql_log, monkeypatch):
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_THRESHOLD", 3)
+
+    with track_queries() as stats:
+        for expense_id in range(6):
+            db.execute(select(Expense).where(Expense.id == expense_id)).all()
+
+    assert stats.count == 6
+    assert len(stats.repeated) == 1
+    warnings = [entry for entry in sql_log() if entry["message"].startswith("Possible N+1")]
+    assert len(warnings) == 1
+    assert "ran 4 times" in warnings[0]["message"]
+    assert stats.log_fields()["db_query_count"] == 6
+
+
+def test_slow_query_log(db, sql_log, monkeypatch):
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 1e-6)
+
+    db.execute(text("SELECT 1")).all()
+
+    slow = [entry for entry in sql_log() if entry["message"].startswith("Slow query")]
+    assert slow and slow[0]["db_slowest"][0]["sql"] == "SELECT 1"
+
+
+def test_statements_outside_requests_are_not_tracked(db):
+    with track_queries() as stats:
+        pass
+    db.execute(text("SELECT 1")).all()
+    assert stats.count == 0
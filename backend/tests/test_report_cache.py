@@ -0,0 +1,200 @@
+"""
+Tests for the branch-scoped report response cache.
+
+Covers both backends (LRU, Redis via FakeRedis), hit/miss counters and
+write-through invalidation limited to the affected branch and dates.
+"""
+import asyncio
+import threading
+
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.models import Branch, Expense, ExpenseCategory, CashDifference, OnlinePlatform
+from app.report_cache import (
+    LRUCacheBackend, RedisCacheBackend, FakeRedis, ReportCache, get_report_cache
+)
+
+
+@pytest.fixture
+def category(db):
+    db.add(ExpenseCategory(id=1, name="Test", is_fixed=False, display_order=1))
+    db.add(Branch(id=2, name="Other Branch", code="OTHER", city="Ankara", is_active=True))
+    db.commit()
+    return 1
+
+
+@pytest.mark.parametrize("backend_factory", [
+    lambda: LRUCacheBackend(max_entries=10),
+    lambda: RedisCacheBackend(FakeRedis()),
+])
+class TestBackends:
+    """Backend contract shared by LRU and Redis."""
+
+    def test_get_or_compute_counts_hits_and_misses(self, backend_factory):
+        cache = ReportCache(backend_factory())
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"total": Decimal("10.50")}
+
+        day = date(2025, 1, 15)
+        first = cache.get_or_compute("x", 1, {"d": day}, [(day, day)], compute)
+        second = cache.get_or_compute("x", 1, {"d": day}, [(day, day)], compute)
+
+        assert first == second == {"total": 10.5}
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_invalidate_only_matching_branch_and_dates(self, backend_factory):
+        cache = ReportCache(backend_factory())
+        jan = (date(2025, 1, 1), date(2025, 1, 31))
+        feb = (date(2025, 2, 1), date(2025, 2, 28))
+        cache.get_or_compute("r", 1, {"m": 1}, [jan], lambda: 1)
+        cache.get_or_compute("r", 1, {"m": 2}, [feb], lambda: 2)
+        cache.get_or_compute("r", 2, {"m": 1}, [jan], lambda: 3)
+
+        assert cache.invalidate(1, [date(2025, 1, 20)]) == 1
+
+        cache.get_or_compute("r", 1, {"m": 2}, [feb], lambda: 0)
+        cache.get_or_compute("r", 2, {"m": 1}, [jan], lambda: 0)
+        assert cache.stats()["hits"] == 2
+
+        cache.get_or_compute("r", 1, {"m": 1}, [jan], lambda: 0)
+        assert cache.stats()["misses"] == 4
+
+    def test_invalidation_during_compute_is_not_overwritten(self, backend_factory):
+        cache = ReportCache(backend_factory())
+        day = date(2025, 1, 15)
+
+        def compute_racing_with(invalidate):
+            def compute():
+                invalidate()  # a commit lands while the report is computed
+                return "stale"
+            return compute
+
+        cache.get_or_compute("r", 1, {}, [(day, day)], compute_racing_with(lambda: cache.invalidate(1, [day])))
+        cache.get_or_compute("r", 2, {}, [(day, day)], compute_racing_with(cache.clear))
+
+        assert cache.get_or_compute("r", 1, {}, [(day, day)], lambda: "fresh") == "fresh"
+        assert cache.get_or_compute("r", 2, {}, [(day, day)], lambda: "fresh") == "fresh"
+
+
+def test_async_path_keeps_backend_off_the_event_loop():
+    """aget_or_compute must not make (blocking) backend calls on the loop thread"""
+    calls = []
+
+    class RecordingBackend(RedisCacheBackend):
+        def get(self, key):
+            calls.append(("get", threading.get_ident()))
+            return super().get(key)
+
+        def generation(self, branch_id):
+            calls.append(("generation", threading.get_ident()))
+            return super().generation(branch_id)
+
+        def set(self, *args):
+            calls.append(("set", threading.get_ident()))
+            return super().set(*args)
+
+    cache = ReportCache(RecordingBackend(FakeRedis()))
+    day = date(2025, 1, 15)
+
+    async def main():
+        async def compute():
+            return {"total": 1}
+
+        loop_thread = threading.get_ident()
+        first = await cache.aget_or_compute("dash", 1, {}, [(day, day)], compute)
+        second = await cache.aget_or_compute("dash", 1, {}, [(day, day)], compute)
+        return loop_thread, first, second
+
+    loop_thread, first, second = asyncio.run(main())
+
+    assert first == second == {"total": 1}
+    assert {name for name, _ in calls} == {"get", "generation", "set"}
+    assert all(thread != loop_thread for _, thread in calls)
+
+
+def test_redis_index_expires_and_is_pruned():
+    redis = FakeRedis()
+    backend = RedisCacheBackend(redis)
+    day = date(2025, 1, 1)
+    backend.set("report:1:r:a", 1, [(day, day)], 1, 60)
+    redis.sadd("report-idx:1", "report:1:r:gone|2024-12-01|2024-12-31|0")  # entry expired long ago
+
+    assert "report-idx:1" in redis._expires
+    assert backend.invalidate(1, [date(2025, 2, 1)]) == 0
+    assert [m.decode().split("|")[0] for m in redis.smembers("report-idx:1")] == ["report:1:r:a"]
+
+
+def test_lru_evicts_least_recently_used():
+    backend = LRUCacheBackend(max_entries=2)
+    day = date(2025, 1, 1)
+    backend.set("a", 1, [(day, day)], 1, 60)
+    backend.set("b", 1, [(day, day)], 2, 60)
+    backend.get("a")
+    backend.set("c", 1, [(day, day)], 3, 60)
+
+    assert backend.get("a") == 1
+    assert backend.get("b") is None
+    assert backend.get("c") == 3
+
+
+def test_dashboard_served_from_cache(client, db):
+    cache = get_report_cache()
+    assert client.get("/api/reports/dashboard").status_code == 200
+    assert client.get("/api/reports/dashboard").status_code == 200
+
+    stats = client.get("/api/reports/cache/stats").json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats == cache.stats()
+
+
+def test_write_invalidates_affected_branch_and_date(client, db, category):
+    today = date.today()
+    cache = get_report_cache()
+
+    first = client.get("/api/reports/dashboard/comparison").json()
+    assert first["expenses"]["current"] == 0
+
+    # Other branch and an unrelated date: entry stays cached
+    db.add(Expense(branch_id=2, category_id=1, expense_date=today, amount=Decimal("99"), created_by=1))
+    db.add(Expense(branch_id=1, category_id=1, expense_date=today - timedelta(days=60), amount=Decimal("99"), created_by=1))
+    db.commit()
+    client.get("/api/reports/dashboard/comparison")
+    assert cache.stats()["hits"] == 1
+
+    # Same branch, covered date: recomputed
+    db.add(Expense(branch_id=1, category_id=1, expense_date=today, amount=Decimal("40"), created_by=1))
+    db.commit()
+    refreshed = client.get("/api/reports/dashboard/comparison").json()
+    assert refreshed["expenses"]["current"] == 40.0
+    assert cache.stats()["misses"] == 2
+
+
+def test_cash_difference_write_invalidates_analytics(client, db):
+    params = {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+    assert client.get("/api/reports/daily-sales-analytics", params=params).json()["meta"]["record_count"] == 0
+
+    db.add(CashDifference(
+        branch_id=1, difference_date=date(2025, 1, 15),
+        kasa_total=Decimal("100"), pos_total=Decimal("110"),
+        status="pending", created_by=1
+    ))
+    db.commit()
+
+    assert client.get("/api/reports/daily-sales-analytics", params=params).json()["meta"]["record_count"] == 1
+
+
+def test_platform_change_clears_cache(client, db):
+    client.get("/api/reports/dashboard")
+    db.add(OnlinePlatform(name="Getir", channel_type="online", is_active=True))
+    db.commit()
+
+    client.get("/api/reports/dashboard")
+    assert get_report_cache().stats()["misses"] == 2
@@ -0,0 +1,124 @@
+"""
+Tests for the supplier aging report (GET /payments/supplier/ar/aging).
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models import Branch, Supplier
+from app.models.supplier_ar import TransactionType
+from app.services.supplier_aging import aging_report, rebuild_open_items
+from app.services.supplier_ledger import post_transaction, remove_transaction
+
+AS_OF = date(2025, 6, 30)
+
+
+def days_ago(n: int, base: date = AS_OF) -> datetime:
+    return datetime.combine(base - timedelta(days=n), time(10, 0))
+
+
+def order(db, supplier_id, amount, age, base: date = AS_OF):
+    return post_transaction(
+        db, supplier_id, TransactionType.ORDER, "Siparis",
+        debt_amount=Decimal(amount), transaction_date=days_ago(age, base)
+    )
+
+
+def payment(db, supplier_id, amount, age):
+    return post_transaction(
+        db, supplier_id, TransactionType.PAYMENT, "Odeme",
+        credit_amount=Decimal(amount), transaction_date=days_ago(age)
+    )
+
+
+def buckets(row):
+    return [row.days_0_30, row.days_31_60, row.days_61_90, row.days_90_plus, row.total]
+
+
+@pytest.fixture
+def suppliers(db):
+    db.add(Branch(id=2, name="Kadikoy", code="KDK", city="Istanbul"))
+    db.add_all([
+        Supplier(id=1, branch_id=1, name="Ekmekci"),
+        Supplier(id=2, branch_id=1, name="Kasap"),
+        Supplier(id=3, branch_id=2, name="Manav"),
+    ])
+    db.commit()
+
+
+def test_credits_settle_oldest_debts_first(db, suppliers):
+    order(db, 1, "100", age=100)
+    order(db, 1, "200", age=70)
+    order(db, 1, "300", age=45)
+    order(db, 1, "400", age=10)
+    payment(db, 1, "150", age=5)  # pays the 100 and half of the 200
+    db.commit()
+
+    report = aging_report(db, as_of=AS_OF)
+    assert report.source == "live"
+    [row] = report.suppliers
+    assert buckets(row) == [Decimal("400"), Decimal("300"), Decimal("150"), Decimal("0"), Decimal("850")]
+    assert row.oldest_open_date == days_ago(70)
+
+    # Earlier as_of: the payment and the latest order are not there yet
+    [row] = aging_report(db, as_of=AS_OF - timedelta(days=20)).suppliers
+    assert buckets(row) == [Decimal("300"), Decimal("200"), Decimal("100"), Decimal("0"), Decimal("600")]
+
+
+def test_snapshot_follows_ledger_writes(db, suppliers):
+    order(db, 1, "100", age=120)
+    order(db, 1, "50", age=40)
+    order(db, 2, "80", age=20)
+    payment(db, 2, "120", age=15)      # supplier 2 in credit: not listed
+    order(db, 2, "30", age=10)         # covered by the unapplied credit
+    order(db, 3, "70", age=75)
+    late = payment(db, 1, "60", age=90)  # backdated payment
+    db.commit()
+
+    def compare():
+        snapshot = aging_report(db)
+        live = aging_report(db, as_of=date.today())
+        assert snapshot.source == "snapshot"
+        assert [(r.supplier_id, buckets(r)) for r in snapshot.suppliers] == \
+            [(r.supplier_id, buckets(r)) for r in live.suppliers]
+        return snapshot
+
+    snapshot = compare()
+    assert [r.supplier_id for r in snapshot.suppliers] == [1, 3]
+    assert snapshot.suppliers[0].total == Decimal("90")
+
+    remove_transaction(db, late)
+    db.commit()
+    assert compare().suppliers[0].total == Decimal("150")
+
+    order(db, 2, "50", age=1)
+    db.commit()
+    assert [r.supplier_id for r in compare().suppliers] == [1, 3, 2]
+
+    # Full rebuild gives the same snapshot
+    assert rebuild_open_items(db) == 4
+    compare()
+
+
+def test_aging_endpoint_branch_totals(client, db, suppliers):
+    # Current aging is counted from today
+    today = date.today()
+    order(db, 1, "100", age=10, base=today)
+    order(db, 2, "40", age=95, base=today)
+    order(db, 3, "70", age=35, base=today)
+    db.commit()
+
+    response = client.get("/api/payments/supplier/ar/aging")
+    assert response.status_code == 200
+    data = response.json()
+    assert [b["branch_id"] for b in data["branches"]] == [1, 2]
+    assert Decimal(data["branches"][0]["total"]) == Decimal("140")
+    assert Decimal(data["branches"][0]["days_90_plus"]) == Decimal("40")
+    assert Decimal(data["totals"]["total"]) == Decimal("210")
+
+    response = client.get("/api/payments/supplier/ar/aging", params={"branch_id": 2, "as_of": date.today().isoformat()})
+    data = response.json()
+    assert data["source"] == "live"
+    assert [s["supplier_id"] for s in data["suppliers"]] == [3]
+    assert Decimal(data["suppliers"][0]["days_31_60"]) == Decimal("70")
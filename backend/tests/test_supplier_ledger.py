@@ -0,0 +1,187 @@
+"""
+Tests for the supplier ledger engine (app/services/supplier_ledger.py)
+and the keyset-paginated AR endpoints.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, select
+
+from app.config import settings
+from app.models import Supplier
+from app.models.supplier_ar import (
+    SupplierBalance, SupplierBalanceCheckpoint, SupplierTransaction, TransactionType
+)
+from app.services.supplier_ledger import (
+    check_supplier, post_transaction, rebuild_supplier, remove_transaction
+)
+
+START = datetime(2025, 1, 1, 9, 0)
+
+
+@pytest.fixture
+def supplier(db):
+    supplier = Supplier(id=1, branch_id=1, name="Ekmekci")
+    db.add(supplier)
+    db.commit()
+    return supplier
+
+
+def order(db, amount, day=0, supplier_id=1):
+    return post_transaction(
+        db, supplier_id, TransactionType.ORDER, "Siparis",
+        debt_amount=Decimal(amount), transaction_date=START + timedelta(days=day)
+    )
+
+
+def payment(db, amount, day=0, supplier_id=1):
+    return post_transaction(
+        db, supplier_id, TransactionType.PAYMENT, "Odeme",
+        credit_amount=Decimal(amount), transaction_date=START + timedelta(days=day)
+    )
+
+
+def running_balances(db):
+    return [
+        t.running_balance for t in db.scalars(
+            select(SupplierTransaction).order_by(SupplierTransaction.transaction_date, SupplierTransaction.id)
+        )
+    ]
+
+
+def test_postings_keep_totals_and_running_balances(db, supplier):
+    order(db, "100", day=0)
+    order(db, "50", day=2)
+    payment(db, "30", day=3)
+    # Backdated order lands between day 0 and day 2, later balances shift
+    order(db, "20", day=1)
+    db.commit()
+
+    assert running_balances(db) == [Decimal("100"), Decimal("120"), Decimal("170"), Decimal("140")]
+    totals = db.get(SupplierBalance, 1)
+    assert (totals.balance, totals.total_debt, totals.total_credit, totals.transaction_count) == (
+        Decimal("140"), Decimal("170"), Decimal("30"), 4
+    )
+    assert totals.last_transaction_date == START + timedelta(days=3)
+    assert totals.last_payment_date == START + timedelta(days=3)
+    assert check_supplier(db, 1) == {}
+    assert check_supplier(db, 1, full=True) == {}
+
+
+def test_checkpoints_survive_appends_and_drop_on_backdating(db, supplier, monkeypatch):
+    monkeypatch.setattr(settings, "SUPPLIER_LEDGER_CHECKPOINT_INTERVAL", 3)
+    for day in range(7):
+        order(db, "10", day=day * 2)
+    db.commit()
+
+    checkpoints = db.scalars(select(SupplierBalanceCheckpoint).order_by(SupplierBalanceCheckpoint.id)).all()
+    assert [(c.transaction_count, c.balance) for c in checkpoints] == [(3, Decimal("30")), (6, Decimal("60"))]
+
+    # Day 5 sorts before the second checkpoint (day 10): only the first one stays
+    payment(db, "5", day=5)
+    db.commit()
+    assert db.scalars(select(SupplierBalanceCheckpoint.transaction_count)).all() == [3]
+    assert db.get(SupplierBalance, 1).checkpoint_count == 3
+    assert check_supplier(db, 1) == {}
+
+    # Corrupt a running balance after the checkpoint: detected and rebuilt from it
+    last = db.scalars(select(SupplierTransaction).order_by(SupplierTransaction.transaction_date.desc())).first()
+    last.running_balance = Decimal("0")
+    db.commit()
+    assert set(check_supplier(db, 1)) == {"running_balance"}
+    assert rebuild_supplier(db, 1) == 5  # 8 movements, 3 covered by the checkpoint
+    db.commit()
+    assert check_supplier(db, 1, full=True) == {}
+    assert db.get(SupplierBalance, 1).balance == Decimal("65")
+
+
+def test_remove_transaction_rolls_back_amounts(db, supplier):
+    order(db, "100", day=0)
+    paid = payment(db, "40", day=1)
+    order(db, "10", day=2)
+    db.commit()
+
+    remove_transaction(db, paid)
+    db.commit()
+
+    assert running_balances(db) == [Decimal("100"), Decimal("110")]
+    totals = db.get(SupplierBalance, 1)
+    assert (totals.balance, totals.total_credit, totals.transaction_count) == (Decimal("110"), Decimal("0"), 2)
+    assert totals.last_payment_date is None
+    assert check_supplier(db, 1, full=True) == {}
+
+
+def test_legacy_movements_are_adopted_on_first_posting(db, supplier):
+    # Written before supplier_balances existed, with a stale running balance
+    db.add(SupplierTransaction(
+        supplier_id=1, transaction_type=TransactionType.ORDER, description="Eski",
+        debt_amount=Decimal("70"), credit_amount=Decimal("0"), running_balance=Decimal("0"),
+        transaction_date=START
+    ))
+    db.commit()
+
+    order(db, "30", day=1)
+    db.commit()
+
+    assert running_balances(db) == [Decimal("70"), Decimal("100")]
+    assert db.get(SupplierBalance, 1).transaction_count == 2
+
+
+def test_ar_detail_pages_through_history(client, db, supplier):
+    for day in range(25):
+        order(db, "10", day=day // 2)  # two movements per date: id breaks the tie
+    db.commit()
+
+    bind = db.get_bind()
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(bind, "before_cursor_execute", listener)
+    try:
+        response = client.get("/api/payments/supplier/ar/1", params={"limit": 10})
+    finally:
+        event.remove(bind, "before_cursor_execute", listener)
+
+    assert response.status_code == 200
+    detail = response.json()
+    assert Decimal(detail["balance"]) == Decimal("250")
+    assert len(detail["transactions"]) == 10
+    assert len(statements) == 2  # supplier + totals, one page
+
+    seen = [t["id"] for t in detail["transactions"]]
+    cursor = detail["next_cursor"]
+    while cursor:
+        page = client.get("/api/payments/supplier/ar/1/transactions", params={"limit": 10, "cursor": cursor})
+        assert page.status_code == 200
+        seen.extend(t["id"] for t in page.json())
+        cursor = page.headers.get("X-Next-Cursor")
+
+    expected = db.scalars(
+        select(SupplierTransaction.id).order_by(
+            SupplierTransaction.transaction_date.desc(), SupplierTransaction.id.desc()
+        )
+    ).all()
+    assert seen == expected
+
+    assert client.get("/api/payments/supplier/ar/1/transactions", params={"cursor": "bozuk"}).status_code == 400
+    assert client.get("/api/payments/supplier/ar/99/transactions").status_code == 404
+
+
+def test_payment_endpoints_update_ledger(client, db, supplier):
+    order(db, "500", day=0)
+    db.commit()
+
+    response = client.post("/api/payments/supplier", json={
+        "supplier_id": 1, "payment_type": "cash", "amount": "200", "payment_date": "2025-01-05T10:00:00"
+    })
+    assert response.status_code == 200
+    payment_id = response.json()["id"]
+
+    summary = client.get("/api/payments/supplier/ar").json()
+    assert Decimal(summary[0]["balance"]) == Decimal("300")
+    assert summary[0]["last_transaction_date"] == "2025-01-05T10:00:00"
+
+    assert client.delete(f"/api/payments/supplier/{payment_id}").status_code == 200
+    db.expire_all()
+    assert db.get(SupplierBalance, 1).balance == Decimal("500")
+    assert check_supplier(db, 1, full=True) == {}
@@ -16,9 +16,10 @@ export const paymentsApi = {
   getSupplierARDetail: (id: number) =>
     api.get<SupplierARDetail>(`/payments/supplier/ar/${id}`),
 
-  getSupplierTransactions: (id: number, limit = 100) =>
+  // Next page cursor comes back in the X-Next-Cursor response header
+  getSupplierTransactions: (id: number, limit = 100, cursor?: string) =>
     api.get<SupplierTransaction[]>(`/payments/supplier/ar/${id}/transactions`, {
-      params: { limit }
+      params: { limit, cursor }
     }),
 
   // ============ Payments ============
@@ -632,6 +632,7 @@ export interface SupplierARSummary {
 
 export interface SupplierARDetail extends SupplierARSummary {
   transactions: SupplierTransaction[]
+  next_cursor: string | null
 }
 
 export interface SupplierTransaction {